@@ -13,7 +13,20 @@ from pathlib import Path
 # Añadir paths necesarios
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
-from tools.tools import attack_rsa, attack_classical, decode_text, factorize_number
+from tools.tools import attack_rsa, attack_classical, classical_candidates, classical_result, decode_text, factorize_number
+from tools.candidates import consume
+from tools.ecc import ecc_attack
+from tools.mersenne import mt19937_attack, mt19937_seed_bruteforce
+from tools.lcg import lcg_attack
+from tools.lfsr import lfsr_attack
+from tools.xor import xor_single_byte, xor_repeating_key, xor_crib_attack, xor_beam_search
+from tools.vigenere import vigenere_attack
+from tools.substitution import substitution_attack
+from tools.affine import rot_affine_attack
+from tools.transposition import transposition_attack
+from tools.hill import hill_attack
+from tools.many_time_pad import many_time_pad
+from tools.ngrams import score_many
 
 @dataclass
 class ExecutionResult:
@@ -133,16 +146,67 @@ class ExecutorAgent:
         
         elif tool_name == 'attack_classical':
             ciphertext = parameters.get('ciphertext', parameters.get('encrypted_data', ''))
-            return attack_classical.invoke({
+            # Se consume el generador directamente: la búsqueda para en el primer
+            # candidato del que _extract_flag saca una flag o texto natural
+            found, top = consume(classical_candidates(str(ciphertext)),
+                                 stop=lambda c: c.found and bool(self._extract_flag({'plaintext': c.plaintext})))
+            return classical_result(found, top)
+        
+        elif tool_name in ('xor_single_byte', 'xor_repeating_key', 'xor_crib_attack', 'xor_beam_search'):
+            tool = {'xor_single_byte': xor_single_byte, 'xor_repeating_key': xor_repeating_key,
+                    'xor_crib_attack': xor_crib_attack, 'xor_beam_search': xor_beam_search}[tool_name]
+            ciphertext = parameters.get('encrypted_data', parameters.get('ciphertext', ''))
+            return tool.invoke({
+                'ciphertext': str(ciphertext)
+            })
+        
+        elif tool_name in ('vigenere_attack', 'substitution_attack', 'rot_affine_attack', 'transposition_attack',
+                           'hill_attack'):
+            tool = {'vigenere_attack': vigenere_attack, 'substitution_attack': substitution_attack,
+                    'rot_affine_attack': rot_affine_attack, 'transposition_attack': transposition_attack,
+                    'hill_attack': hill_attack}[tool_name]
+            ciphertext = parameters.get('ciphertext', parameters.get('encrypted_data', ''))
+            return tool.invoke({
                 'ciphertext': str(ciphertext)
             })
         
+        elif tool_name == 'many_time_pad':
+            ciphertexts = parameters.get('ciphertexts', parameters.get('encrypted_data', ''))
+            return many_time_pad.invoke({
+                'ciphertexts': '\n'.join(ciphertexts) if isinstance(ciphertexts, list) else str(ciphertexts)
+            })
+        
         elif tool_name == 'decode_text':
             text = parameters.get('encoded_text', parameters.get('ciphertext', ''))
             return decode_text.invoke({
                 'text': str(text)
             })
         
+        elif tool_name == 'ecc_attack':
+            return ecc_attack.invoke({
+                key: '' if parameters.get(key) is None else str(parameters.get(key))
+                for key in ['p', 'a', 'b', 'gx', 'gy', 'qx', 'qy', 'order']
+            })
+        
+        elif tool_name in ('mt19937_attack', 'mt19937_seed_bruteforce'):
+            tool = mt19937_attack if tool_name == 'mt19937_attack' else mt19937_seed_bruteforce
+            return tool.invoke({
+                'outputs': str(parameters.get('outputs', '')),
+                'bits': int(parameters.get('bits', 32)),
+                'ciphertext': str(parameters.get('ciphertext', '') or '')
+            })
+        
+        elif tool_name == 'lcg_attack':
+            return lcg_attack.invoke({
+                key: '' if parameters.get(key) is None else str(parameters.get(key))
+                for key in ['outputs', 'modulus', 'multiplier', 'increment', 'ciphertext']
+            })
+        
+        elif tool_name == 'lfsr_attack':
+            return lfsr_attack.invoke({
+                'ciphertext': str(parameters.get('ciphertext', '') or '')
+            })
+        
         elif tool_name == 'factorize_number':
             n = parameters.get('n', '')
             return factorize_number.invoke({
@@ -176,6 +240,15 @@ class ExecutorAgent:
                     flag = self._extract_flag(result[key])
                     if flag:
                         return flag
+            
+            # Sin formato de flag: un texto descifrado que el modelo de n-gramas
+            # da por lenguaje natural también termina la ejecución
+            texts = [result[key] for key in ['plaintext', 'decrypted'] if isinstance(result.get(key), str)]
+            if texts:
+                scores = score_many(texts)
+                best = int(scores["score"].argmax())
+                if scores["confident"][best]:
+                    return texts[best]
         
         return ""
     
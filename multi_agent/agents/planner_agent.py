@@ -17,6 +17,20 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent / "rag"))
 from tools.tools import analyze_files, classify_crypto
 from rag_agent_tools import retrieve_similar_writeups, analyze_with_context
 
+# Herramienta propia de las estrategias de fallback que no usan la principal del plan
+FALLBACK_TOOLS = {
+    'known_plaintext_crib': ['xor_crib_attack'],
+    'multi_byte_analysis': ['xor_repeating_key'],
+    'beam_key_search': ['xor_beam_search'],
+    'single_byte_bruteforce': ['xor_single_byte'],
+    'key_reuse_attack': ['many_time_pad'],
+    'polyalphabetic_analysis': ['vigenere_attack'],
+    'substitution_hill_climb': ['substitution_attack'],
+    'brute_force_rotation': ['rot_affine_attack'],
+    'transposition_search': ['transposition_attack'],
+    'linear_algebra_attack': ['hill_attack'],
+}
+
 @dataclass
 class AttackPlan:
     """Plan de ataque estructurado"""
@@ -103,16 +117,22 @@ class PlannerAgent:
             },
             'Classical': {
                 'primary': 'frequency_analysis',
-                'fallbacks': ['brute_force_rotation', 'dictionary_attack'],
+                'fallbacks': ['polyalphabetic_analysis', 'substitution_hill_climb', 'brute_force_rotation', 'transposition_search', 'linear_algebra_attack', 'dictionary_attack'],
                 'tools': ['attack_classical', 'decode_text'],
                 'difficulty': 'easy'
             },
             'XOR': {
                 'primary': 'single_byte_bruteforce',
-                'fallbacks': ['multi_byte_analysis', 'key_reuse_attack'],
-                'tools': ['attack_classical'],  # XOR handled by classical
+                'fallbacks': ['known_plaintext_crib', 'multi_byte_analysis', 'beam_key_search', 'key_reuse_attack'],
+                'tools': ['xor_single_byte', 'attack_classical'],
                 'difficulty': 'easy'
             },
+            'LFSR': {
+                'primary': 'berlekamp_massey_known_plaintext',
+                'fallbacks': ['file_magic_crib', 'single_byte_bruteforce'],
+                'tools': ['lfsr_attack', 'attack_classical'],
+                'difficulty': 'medium'
+            },
             'Encoding': {
                 'primary': 'base64_decode',
                 'fallbacks': ['hex_decode', 'url_decode'],
@@ -124,6 +144,18 @@ class PlannerAgent:
                 'fallbacks': ['rainbow_table', 'brute_force'],
                 'tools': ['attack_classical'],
                 'difficulty': 'hard'
+            },
+            'ECC': {
+                'primary': 'ecc_curve_weakness',
+                'fallbacks': ['singular_curve_attack', 'smart_attack', 'ecc_pohlig_hellman'],
+                'tools': ['ecc_attack'],
+                'difficulty': 'hard'
+            },
+            'PRNG': {
+                'primary': 'mt19937_state_clone',
+                'fallbacks': ['mt19937_truncated_gf2', 'mt19937_seed_bruteforce'],
+                'tools': ['mt19937_attack', 'mt19937_seed_bruteforce'],
+                'difficulty': 'medium'
             }
         }
         
@@ -148,10 +180,56 @@ class PlannerAgent:
             parameters = {
                 'ciphertext': variables.get('ciphertext', variables.get('encrypted', 'unknown'))
             }
+        elif challenge_type == 'XOR' and len(analysis.get('hex_ciphertexts', [])) >= 2:
+            strategy = {
+                'primary': 'many_time_pad',
+                'fallbacks': ['crib_dragging'],
+                'tools': ['many_time_pad'],
+                'difficulty': 'medium'
+            }
+            parameters = {
+                'ciphertexts': analysis['hex_ciphertexts']
+            }
         elif challenge_type == 'XOR':
             parameters = {
                 'encrypted_data': variables.get('encrypted', variables.get('ciphertext', 'unknown'))
             }
+        elif challenge_type == 'LFSR':
+            parameters = {
+                'ciphertext': variables.get('ciphertext', variables.get('encrypted', ''))
+            }
+        elif challenge_type == 'ECC':
+            points = analysis.get('ecc_points', {})
+            base = points.get('G', points.get('g', (None, None)))
+            public = next((point for name, point in points.items() if name.lower() != 'g'), (None, None))
+            parameters = {
+                'p': variables.get('p', 'unknown'),
+                'a': variables.get('a', 'unknown'),
+                'b': variables.get('b', 'unknown'),
+                'gx': base[0], 'gy': base[1],
+                'qx': public[0], 'qy': public[1],
+                'order': variables.get('order', variables.get('n', ''))
+            }
+        elif challenge_type == 'PRNG' and analysis.get('prng_kind') == 'lcg':
+            strategy = {
+                'primary': 'lcg_parameter_recovery',
+                'fallbacks': ['truncated_lcg_lattice'],
+                'tools': ['lcg_attack'],
+                'difficulty': 'medium'
+            }
+            parameters = {
+                'outputs': analysis.get('prng_outputs', []),
+                'modulus': variables.get('m', variables.get('modulus', '')),
+                'multiplier': variables.get('a', variables.get('multiplier', '')),
+                'increment': variables.get('increment', variables.get('b', '')),
+                'ciphertext': variables.get('ciphertext', variables.get('encrypted', ''))
+            }
+        elif challenge_type == 'PRNG':
+            parameters = {
+                'outputs': analysis.get('prng_outputs', []),
+                'bits': analysis.get('prng_bits', 32),
+                'ciphertext': variables.get('ciphertext', variables.get('encrypted', ''))
+            }
         
         # Calcular probabilidad de éxito basada en contexto RAG
         success_probability = confidence
@@ -196,7 +274,7 @@ class PlannerAgent:
             strategies.append({
                 'name': fallback,
                 'priority': i + 2,
-                'tools': plan.tools_needed,
+                'tools': FALLBACK_TOOLS.get(fallback, plan.tools_needed),
                 'parameters': plan.parameters,
                 'success_probability': max(plan.success_probability - 0.1 * (i + 1), 0.1),
                 'reason': f'Fallback strategy #{i+1} for {plan.challenge_type}'
@@ -5,10 +5,19 @@ Valida la calidad y corrección de las soluciones encontradas.
 """
 
 import re
+import sys
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 import hashlib
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from tools.ngrams import PLAINTEXT_THRESHOLD, score_many
+
+# Letras mínimas del contenido de una flag para juzgar si es lenguaje natural
+FLAG_MIN_LETTERS = 6
+
 @dataclass
 class ValidationResult:
     """Resultado de validación"""
@@ -228,16 +237,12 @@ class ValidatorAgent:
     
     def _contains_english_words(self, text: str) -> bool:
         """
-        Verifica si contiene palabras en inglés comunes
+        Verifica si el contenido es lenguaje natural (inglés o español) según
+        el modelo de n-gramas compartido; el prefijo de la flag no cuenta
         """
-        common_words = [
-            'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-            'flag', 'ctf', 'crypto', 'key', 'cipher', 'code', 'secret', 'password',
-            'hello', 'world', 'test', 'admin', 'user', 'data', 'info', 'message'
-        ]
-        
-        text_lower = text.lower()
-        return any(word in text_lower for word in common_words)
+        content = re.sub(r'^[A-Za-z0-9_]*\{|\}$', '', text.strip())
+        scores = score_many([content])
+        return bool(scores["letters"][0] >= FLAG_MIN_LETTERS and scores["score"][0] >= PLAINTEXT_THRESHOLD)
     
     def validate_execution_result(self, execution_result: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -277,16 +277,15 @@ class EnhancedCoordinator:
                 if match:
                     ciphertext = match.group(1)
                     
-                    # Intentar Caesar
-                    for shift in range(26):
-                        decrypted = ""
-                        for char in ciphertext:
-                            if char.isalpha():
-                                base = ord('A') if char.isupper() else ord('a')
-                                decrypted += chr((ord(char) - base - shift) % 26 + base)
-                            else:
-                                decrypted += char
-                        
+                    # Intentar Caesar (tablas precalculadas del motor ROT/afín): cada
+                    # desplazamiento descifra sólo las letras ante cada "{" y sólo los que
+                    # dan "flag" se descifran enteros
+                    from src.tools.affine import affine_table
+                    from src.tools.candidates import brace_windows, window_text, decrypt_survivors
+                    windows = brace_windows(ciphertext)
+                    window = window_text(ciphertext, windows) if windows else ciphertext
+                    for _, decrypted in decrypt_survivors(range(26), lambda n, text: text.translate(affine_table(1, n)),
+                                                          ciphertext, window, accept=lambda w: 'flag' in w.lower()):
                         if 'flag' in decrypted.lower():
                             return decrypted
         except Exception as e:
@@ -8,8 +8,16 @@ import sys
 import os
 import subprocess
 import re
+from functools import lru_cache
 from pathlib import Path
 
+@lru_cache(maxsize=None)
+def run_challenge(file_path):
+    """Ejecuta el challenge una sola vez: los solvers comparten su salida"""
+    result = subprocess.run([sys.executable, file_path], 
+                          capture_output=True, text=True, timeout=30)
+    return result.stdout + result.stderr
+
 def extract_flag_from_output(output):
     """Extrae flags del output usando patrones comunes mejorados"""
     
@@ -43,6 +51,7 @@ def decode_base64_recursive(text, max_depth=10):
     """Decodifica Base64 recursivamente hasta encontrar flag o texto legible"""
     import base64
     import re
+    from src.tools.candidates import PREFIX_BYTES, plausible
     
     if not text:
         return None
@@ -51,6 +60,12 @@ def decode_base64_recursive(text, max_depth=10):
     
     for depth in range(max_depth):
         try:
+            # Sólo se decodifica la capa entera si su prefijo da texto imprimible
+            head = re.sub(r'\s+', '', current[:2 * PREFIX_BYTES])[:PREFIX_BYTES]
+            if len(head) == PREFIX_BYTES and not plausible(base64.b64decode(head)):
+                print(f"  Layer {depth + 1}: prefix is not text, stopping")
+                return current if depth > 0 else None
+            
             # Intentar decodificar Base64
             decoded_bytes = base64.b64decode(current)
             decoded = decoded_bytes.decode('utf-8', errors='ignore')
@@ -106,6 +121,11 @@ def detect_aes_ecb(ciphertext_hex):
     except:
         return False
 
+def aes_ecb_blocks(key, data):
+    """Descifra bloques completos de AES ECB sin quitar el padding (ventana de prefijo)"""
+    from Crypto.Cipher import AES
+    return AES.new(key, AES.MODE_ECB).decrypt(data[:len(data) - len(data) % 16])
+
 def decrypt_aes_ecb(ciphertext_hex, key):
     """Intenta descifrar AES ECB con una clave dada"""
     try:
@@ -132,10 +152,7 @@ def solve_aes_challenge(file_path):
     
     try:
         # Ejecutar el archivo
-        result = subprocess.run([sys.executable, file_path], 
-                              capture_output=True, text=True, timeout=30)
-        
-        output = result.stdout + result.stderr
+        output = run_challenge(file_path)
         print(f"📄 Challenge output:\n{output}")
         
         # Buscar ciphertext hex
@@ -156,13 +173,17 @@ def solve_aes_challenge(file_path):
                 b'password1234567'[:16]
             ]
             
+            # Cada clave descifra sólo el primer bloque: sólo las que dan texto
+            # imprimible se descifran enteras
             print("🎯 Trying AES decryption with common keys...")
-            for key in common_keys:
-                if len(key) == 16:  # AES-128
-                    plaintext = decrypt_aes_ecb(hex_data, key)
-                    if plaintext and 'flag{' in plaintext.lower():
-                        print(f"✅ Found flag with AES ECB key {key}: {plaintext}")
-                        return plaintext
+            from src.tools.candidates import survivors
+            first_block = bytes.fromhex(hex_data[:32])
+            aes_keys = [key for key in common_keys if len(key) == 16]  # AES-128
+            for key in survivors(aes_keys, aes_ecb_blocks, first_block):
+                plaintext = decrypt_aes_ecb(hex_data, key)
+                if plaintext and 'flag{' in plaintext.lower():
+                    print(f"✅ Found flag with AES ECB key {key}: {plaintext}")
+                    return plaintext
             
             # Detectar AES ECB para información
             if detect_aes_ecb(hex_data):
@@ -195,10 +216,7 @@ def solve_rsa_challenge(file_path):
     
     try:
         # Ejecutar el archivo para obtener los valores
-        result = subprocess.run([sys.executable, file_path], 
-                              capture_output=True, text=True, timeout=30)
-        
-        output = result.stdout + result.stderr
+        output = run_challenge(file_path)
         print(f"📄 Challenge output:\n{output}")
         
         # Extraer n, e, c del output
@@ -307,10 +325,7 @@ def solve_classical_challenge(file_path):
     
     try:
         # Ejecutar el archivo
-        result = subprocess.run([sys.executable, file_path], 
-                              capture_output=True, text=True, timeout=30)
-        
-        output = result.stdout + result.stderr
+        output = run_challenge(file_path)
         print(f"📄 Challenge output:\n{output}")
         
         # Buscar texto cifrado
@@ -319,20 +334,18 @@ def solve_classical_challenge(file_path):
             encrypted = encrypted_match.group(1).strip()
             print(f"🔤 Found encrypted text: {encrypted}")
             
-            # Intentar Caesar cipher (ROT13 y otros)
-            print("🎯 Trying Caesar cipher attacks...")
-            for shift in range(26):
-                decrypted = ""
-                for char in encrypted:
-                    if char.isalpha():
-                        ascii_offset = 65 if char.isupper() else 97
-                        decrypted += chr((ord(char) - ascii_offset - shift) % 26 + ascii_offset)
-                    else:
-                        decrypted += char
-                
-                if 'flag{' in decrypted.lower():
-                    print(f"✅ Found flag with Caesar shift {shift}: {decrypted}")
-                    return decrypted
+            # Familia ROT/afín (Caesar, ROT13, Atbash, afín y ROT47) con el motor compartido
+            print("🎯 Trying Caesar/ROT/affine attacks...")
+            from src.tools.affine import sweep
+            for candidate in sweep(encrypted):
+                name = candidate.get("name", candidate["family"])
+                if candidate["flag"]:
+                    print(f"✅ Found flag with {name}: {candidate['plaintext']}")
+                    return candidate["plaintext"]
+                # Sin flag: texto natural según el modelo de n-gramas (la clave identidad no cuenta)
+                if candidate["confident"] and candidate["key"] != (1, 0):
+                    print(f"✅ Plaintext with {name}: {candidate['plaintext']}")
+                    return candidate["plaintext"]
         
         # Buscar flag directamente
         flag = extract_flag_from_output(output)
@@ -352,10 +365,7 @@ def solve_xor_challenge(file_path):
     
     try:
         # Ejecutar el archivo
-        result = subprocess.run([sys.executable, file_path], 
-                              capture_output=True, text=True, timeout=30)
-        
-        output = result.stdout + result.stderr
+        output = run_challenge(file_path)
         print(f"📄 Challenge output:\n{output}")
         
         # Buscar datos hex
@@ -367,17 +377,24 @@ def solve_xor_challenge(file_path):
             try:
                 encrypted_bytes = bytes.fromhex(hex_data)
                 
-                # Intentar single-byte XOR
+                # Intentar single-byte XOR (256 claves puntuadas a la vez con NumPy)
                 print("🎯 Trying single-byte XOR...")
-                for key in range(256):
-                    decrypted = bytes([b ^ key for b in encrypted_bytes])
-                    try:
-                        text = decrypted.decode('ascii')
-                        if 'flag{' in text.lower():
-                            print(f"✅ Found flag with XOR key {key}: {text}")
-                            return text
-                    except:
-                        pass
+                from src.tools.xor import rank_single_byte, flag_keys
+                from src.tools.ngrams import score_many
+                candidates = rank_single_byte(encrypted_bytes, include=tuple(flag_keys(encrypted_bytes)))
+                for candidate in candidates:
+                    text = candidate["plaintext"].decode('ascii', errors='ignore')
+                    if 'flag{' in text.lower():
+                        print(f"✅ Found flag with XOR key {candidate['key']}: {text}")
+                        return text
+                
+                # Sin flag: texto natural según el modelo de n-gramas
+                scores = score_many([c["plaintext"] for c in candidates])
+                best = int(scores["score"].argmax())
+                if scores["confident"][best] and candidates[best]["key"]:
+                    text = candidates[best]["plaintext"].decode('utf-8', errors='ignore')
+                    print(f"✅ Plaintext with XOR key {candidates[best]['key']}: {text}")
+                    return text
             except Exception as e:
                 print(f"⚠️ XOR attack failed: {e}")
         
@@ -399,10 +416,7 @@ def solve_encoding_challenge(file_path):
     
     try:
         # Ejecutar el archivo
-        result = subprocess.run([sys.executable, file_path], 
-                              capture_output=True, text=True, timeout=30)
-        
-        output = result.stdout + result.stderr
+        output = run_challenge(file_path)
         print(f"📄 Challenge output:\n{output}")
         
         # Buscar datos encoded (mejorado para evitar líneas de =)
@@ -441,10 +455,7 @@ def solve_hash_challenge(file_path):
     
     try:
         # Ejecutar el archivo
-        result = subprocess.run([sys.executable, file_path], 
-                              capture_output=True, text=True, timeout=30)
-        
-        output = result.stdout + result.stderr
+        output = run_challenge(file_path)
         print(f"📄 Challenge output:\n{output}")
         
         # Buscar hash MD5/SHA
@@ -453,31 +464,21 @@ def solve_hash_challenge(file_path):
             hash_value = hash_match.group(1)
             print(f"🔢 Found hash: {hash_value}")
             
-            # Diccionario común
-            common_words = [
-                "password", "123456", "password123", "admin", "letmein",
-                "welcome", "monkey", "1234567890", "qwerty", "abc123",
-                "password1", "123123", "000000", "iloveyou", "1234567",
-                "rockyou", "12345678", "abc123", "123456789", "welcome123"
-            ]
-            
-            import hashlib
+            # Contraseñas comunes en memoria y, si está instalada, rockyou en streaming
+            from src.tools.wordlist import COMMON_PASSWORDS, crack_file, crack_words, detect_algorithm, find_wordlist
             
+            algorithm = detect_algorithm(hash_value)
             print("🎯 Trying dictionary attack...")
-            for word in common_words:
-                # MD5
-                if len(hash_value) == 32:
-                    if hashlib.md5(word.encode()).hexdigest() == hash_value.lower():
-                        flag = f"flag{{{word}}}"
-                        print(f"✅ Found flag with MD5: {flag}")
-                        return flag
-                
-                # SHA1
-                elif len(hash_value) == 40:
-                    if hashlib.sha1(word.encode()).hexdigest() == hash_value.lower():
-                        flag = f"flag{{{word}}}"
-                        print(f"✅ Found flag with SHA1: {flag}")
-                        return flag
+            result = crack_words(COMMON_PASSWORDS, [hash_value], algorithm)
+            rockyou = find_wordlist("rockyou")
+            if not result["found"] and rockyou:
+                print(f"📚 Streaming {rockyou}...")
+                result = crack_file(rockyou, [hash_value], algorithm)
+            if result["found"]:
+                word = next(iter(result["found"].values()))
+                flag = f"flag{{{word}}}"
+                print(f"✅ Found flag with {algorithm.upper()}: {flag}")
+                return flag
         
         # Buscar flag directamente
         flag = extract_flag_from_output(output)
@@ -519,6 +520,38 @@ def detect_challenge_type(file_path):
         print(f"⚠️ Error detecting challenge type: {e}")
         return 'unknown'
 
+# Solver de cada tipo de la huella (src/tools/fingerprint.py)
+FINGERPRINT_SOLVERS = {
+    'AES': 'aes',
+    'XOR': 'xor',
+    'Classical': 'classical',
+    'Encoding': 'encoding',
+    'RSA': 'rsa'
+}
+
+def fingerprint_solvers(file_path):
+    """Solvers que recomienda la huella estadística del cifrado que imprime el challenge"""
+    
+    try:
+        from src.tools.fingerprint import extract_blob, fingerprint
+        
+        blob = extract_blob(run_challenge(file_path))
+        if not blob:
+            return []
+        
+        routes = fingerprint(blob)["routes"]
+        print(f"🧬 Fingerprint: {', '.join(r['attack'] for r in routes) or 'no match'}")
+        names = []
+        for route in routes:
+            name = FINGERPRINT_SOLVERS.get(route["type"])
+            if name and name not in names:
+                names.append(name)
+        return names
+    
+    except Exception as e:
+        print(f"⚠️ Fingerprinting failed: {e}")
+        return []
+
 def solve_ctf_challenge(file_path):
     """Función principal para resolver challenges"""
     
@@ -545,12 +578,16 @@ def solve_ctf_challenge(file_path):
         if flag:
             return flag
     
-    # Fallback: intentar todos los solvers
-    print("🔄 Trying all solvers as fallback...")
-    for solver_name, solver_func in solvers.items():
+    # Fallback: sólo los solvers que recomienda la huella del cifrado (todos si no hay huella)
+    routed = fingerprint_solvers(file_path)
+    if routed:
+        print(f"🧬 Fingerprint routes to: {', '.join(routed)}")
+    else:
+        print("🔄 Trying all solvers as fallback...")
+    for solver_name in routed or list(solvers):
         if solver_name != challenge_type:  # Skip ya intentado
             print(f"🎯 Trying {solver_name} solver...")
-            flag = solver_func(file_path)
+            flag = solvers[solver_name](file_path)
             if flag:
                 return flag
     
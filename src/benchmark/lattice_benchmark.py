@@ -0,0 +1,109 @@
+"""
+Benchmark del motor de retículos (LLL, LLL profundo, BKZ) en dimensiones 20-120
+Indica hasta qué dimensión es viable resolver knapsacks y HNP sin SageMath
+
+Uso: python -m src.benchmark.lattice_benchmark --dims 20 40 60 80 100 120
+"""
+
+import json
+import random
+import time
+from typing import Any, Dict, List, Sequence
+
+from ..tools.hnp import _build_lattice, _candidate_keys
+from ..tools.lattice import DEEP_INSERTION_DEPTH, bkz_reduce, lll_reduce
+
+# Orden de secp256k1 para los retículos HNP
+SECP256K1_N = 0xfffffffffffffffffffffffffffffffebaaedce6af48a03bbfd25e8cd0364141
+
+def _knapsack_basis(rng: random.Random, n: int, density: float):
+    """Retículo CJLOSS de un subset sum aleatorio de n pesos con la densidad dada"""
+    bits = max(8, int(n / density))
+    weights = [rng.getrandbits(bits) | (1 << (bits - 1)) for _ in range(n)]
+    x = [rng.randrange(2) for _ in range(n)]
+    target = sum(w for w, b in zip(weights, x) if b)
+    N = int(n ** 0.5) + 1
+    basis = [[2 if i == j else 0 for j in range(n)] + [N * w] for i, w in enumerate(weights)]
+    basis.append([1] * n + [N * target])
+    expected = [1 - 2 * b for b in x]
+
+    def solved(reduced):
+        return any(row[:-1] in (expected, [-v for v in expected]) and row[-1] == 0 for row in reduced)
+
+    return basis, solved
+
+def _hnp_basis(rng: random.Random, m: int):
+    """Retículo HNP sobre secp256k1 con m firmas y una fuga de 4/3 del mínimo teórico"""
+    q = SECP256K1_N
+    leak = max(2, -(-4 * q.bit_length() // (3 * m)))
+    d = rng.randrange(q)
+    instances = []
+    for _ in range(m):
+        k, h, r = rng.randrange(1 << (256 - leak)), rng.randrange(q), rng.randrange(1, q)
+        s = pow(k, -1, q) * (h + r * d) % q
+        s_inv = pow(s, -1, q)
+        instances.append((r * s_inv % q, h * s_inv % q, leak))
+    basis, half, weight0 = _build_lattice(instances, q)
+
+    def solved(reduced):
+        return d in set(_candidate_keys(reduced, instances, q, half, weight0))
+
+    return basis, solved, leak
+
+def _measure(name: str, reduce, basis, solved) -> Dict[str, Any]:
+    start = time.time()
+    reduced = reduce(basis)
+    return {"algorithm": name, "time": round(time.time() - start, 3), "solved": solved(reduced)}
+
+def run_lattice_benchmark(dims: Sequence[int] = (20, 40, 60, 80, 100, 120), seed: int = 30,
+                          density: float = 0.5, bkz_block: int = 10,
+                          timeout: float = 300.0) -> List[Dict[str, Any]]:
+    """
+    Mide LLL, LLL profundo y BKZ sobre knapsacks (densidad fija) y LLL sobre
+    retículos HNP de la misma dimensión. Cada reducción se corta en `timeout`.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for dim in dims:
+        basis, solved = _knapsack_basis(rng, dim - 1, density)
+        for name, reduce in (
+            ("LLL", lambda b: lll_reduce(b, timeout=timeout)),
+            (f"LLL-deep{DEEP_INSERTION_DEPTH}", lambda b: lll_reduce(b, depth=DEEP_INSERTION_DEPTH, timeout=timeout)),
+            (f"BKZ-{bkz_block}", lambda b: bkz_reduce(b, block_size=bkz_block, timeout=timeout)),
+        ):
+            row = _measure(name, reduce, basis, solved)
+            row.update({"lattice": f"knapsack d={density}", "dimension": dim})
+            rows.append(row)
+            print(f"   {row['lattice']:<16} dim {dim:>3}  {name:<12} {row['time']:>9.2f}s  "
+                  f"{'✅' if row['solved'] else '❌'}", flush=True)
+
+        basis, solved, leak = _hnp_basis(rng, dim - 1)
+        row = _measure("LLL", lambda b: lll_reduce(b, timeout=timeout), basis, solved)
+        row.update({"lattice": f"HNP {leak}-bit", "dimension": dim})
+        rows.append(row)
+        print(f"   {row['lattice']:<16} dim {dim:>3}  {'LLL':<12} {row['time']:>9.2f}s  "
+              f"{'✅' if row['solved'] else '❌'}", flush=True)
+    return rows
+
+def run_lattice_benchmark_cli():
+    """Función CLI para ejecutar el benchmark de retículos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lattice reduction benchmark")
+    parser.add_argument("--dims", type=int, nargs="+", default=[20, 40, 60, 80, 100, 120])
+    parser.add_argument("--density", type=float, default=0.5, help="Densidad de los knapsacks")
+    parser.add_argument("--bkz-block", type=int, default=10, help="Tamaño de bloque de BKZ")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Segundos máximos por reducción")
+    parser.add_argument("--output", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    print("🧮 Lattice benchmark")
+    rows = run_lattice_benchmark(args.dims, density=args.density, bkz_block=args.bkz_block,
+                                 timeout=args.timeout)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+    return rows
+
+if __name__ == "__main__":
+    run_lattice_benchmark_cli()
@@ -216,8 +216,8 @@ def get_optimized_prompt(challenge_type=None):
         return f"{base_prompt}\n\n{XOR_SPECIFIC_PROMPT}"
     else:
         return base_prompt
-R
-AG_RETRIEVAL_PROMPT = """
+
+RAG_RETRIEVAL_PROMPT = """
 IMPORTANT: You have access to historical CTF writeups via vector retrieval.
 
 For the current challenge:
@@ -0,0 +1,53 @@
+"""
+Pruebas del motor ROT/afín: tablas precalculadas y barrido por histograma de trigramas
+"""
+
+import string
+import time
+
+from ..tools.affine import AFFINE_KEYS, ROT47_TABLE, affine_table, apply, rot_affine_attack, sweep
+from ..tools.tools import attack_classical
+
+PLAINTEXT = (
+    "It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of "
+    "foolishness, it was the epoch of belief, it was the epoch of incredulity. "
+)
+
+def _encrypt(text: str, a: int, b: int, alphabet: str = string.ascii_lowercase) -> str:
+    size = len(alphabet)
+    cipher = "".join(alphabet[(a * x + b) % size] for x in range(size))
+    if alphabet == string.ascii_lowercase:
+        return text.translate(str.maketrans(alphabet + alphabet.upper(), cipher + cipher.upper()))
+    return text.translate(str.maketrans(alphabet, cipher))
+
+def test_tables_invert_every_key():
+    """Las 312 tablas descifran str y bytes; Atbash es (25, 25) y ROT47 es involutivo"""
+    assert len(AFFINE_KEYS) == 312
+    for a, b in AFFINE_KEYS:
+        ciphertext = _encrypt(PLAINTEXT, a, b)
+        assert apply(ciphertext, a, b) == PLAINTEXT
+        assert apply(ciphertext.encode(), a, b) == PLAINTEXT.encode()
+    assert "abcxyz".translate(affine_table(25, 25)) == "zyxcba"
+    assert PLAINTEXT.translate(ROT47_TABLE).translate(ROT47_TABLE) == PLAINTEXT
+
+def test_megabyte_sweep_in_milliseconds():
+    """Barrido completo de 1 MB: clave afín y flag recuperadas en menos de medio segundo"""
+    plaintext = (PLAINTEXT * (1_000_000 // len(PLAINTEXT)))[:1_000_000] + " flag{affine_sweep}"
+    ciphertext = _encrypt(plaintext, 7, 3)
+    sweep(ciphertext[:1000])
+    start = time.perf_counter()
+    best = sweep(ciphertext)[0]
+    assert time.perf_counter() - start < 0.5
+    assert best["key"] == (7, 3) and best["flag"] == "flag{affine_sweep}"
+    assert best["plaintext"] == plaintext
+
+def test_call_sites_share_engine():
+    """attack_classical reconoce Atbash sin flag; la herramienta acepta alfabetos propios"""
+    result = attack_classical.invoke({"ciphertext": _encrypt(PLAINTEXT, 25, 25)})
+    assert result["success"] and result["cipher_type"] == "Atbash" and result["plaintext"] == PLAINTEXT
+
+    alphabet = string.ascii_uppercase + string.digits
+    ciphertext = _encrypt(PLAINTEXT.upper() + " 2024", 5, 7, alphabet)
+    result = rot_affine_attack.invoke({"ciphertext": ciphertext, "alphabet": alphabet})
+    assert result["success"] and result["key"] == (5, 7)
+    assert result["plaintext"] == PLAINTEXT.upper() + " 2024"
@@ -0,0 +1,76 @@
+"""
+Pruebas de la fuente de bytes por bloques: histogramas y perfil de entropía deslizante
+"""
+
+import os
+import tempfile
+from collections import Counter
+
+import numpy as np
+
+from ..tools import bytesource
+from ..tools.advanced_tools import entropy_analysis, frequency_analysis
+from ..tools.bytesource import ENTROPY_STEP, bigram_histogram, byte_histogram, open_bytes
+
+TEXT = (
+    b"It is a truth universally acknowledged, that a single man in possession of a good fortune, must be in "
+    b"want of a wife. However little known the feelings or views of such a man may be on his first entering a "
+    b"neighbourhood, this truth is so well fixed in the minds of the surrounding families. "
+)
+
+def test_histograms_match_direct_counts_across_chunks(monkeypatch):
+    """Bloques de 1000 bytes: los pares del borde se cuentan una sola vez"""
+    monkeypatch.setattr(bytesource, "CHUNK_BYTES", 1000)
+    data = TEXT * 20 + os.urandom(777)
+    source = open_bytes(data)
+    assert (byte_histogram(source) == np.bincount(source, minlength=256)).all()
+    pairs = Counter(a << 8 | b for a, b in zip(data, data[1:]))
+    bigrams = bigram_histogram(source)
+    assert bigrams.sum() == len(data) - 1 and all(bigrams[k] == v for k, v in pairs.items())
+
+def test_embedded_region_located_in_memmapped_file(monkeypatch):
+    """Datos aleatorios dentro de un archivo de baja entropía: la región cruza varios bloques; archivos inválidos"""
+    monkeypatch.setattr(bytesource, "CHUNK_BYTES", 4096)
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(TEXT * 100 + os.urandom(20000) + TEXT * 100)
+    try:
+        result = entropy_analysis.invoke({"path": f.name})
+    finally:
+        os.unlink(f.name)
+    regions = result["entropy_profile"]["regions"]
+    assert len(regions) == 1 and result["detected_encoding"] == "raw"
+    start = len(TEXT) * 100
+    assert abs(regions[0]["offset"] - start) < 1024
+    assert abs(regions[0]["offset"] + regions[0]["length"] - (start + 20000)) < 1024
+
+    # Un archivo que no existe o está vacío es un error de la herramienta, no una excepción
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        pass
+    try:
+        for path in (f.name, f.name + ".missing"):
+            for tool in (entropy_analysis, frequency_analysis):
+                result = tool.invoke({"path": path})
+                assert not result["success"] and path in result["error"]
+    finally:
+        os.unlink(f.name)
+
+def test_tools_keep_their_output_for_text():
+    """Mismas frecuencias, entropía y patrón que el recuento directo sobre el texto; ventana inválida como error"""
+    text = TEXT.decode()
+    result = frequency_analysis.invoke({"text": text})
+    letters = Counter(c for c in text.upper() if c.isalpha())
+    assert result["total_letters"] == sum(letters.values()) and result["most_common_letter"] == "E"
+    assert result["letter_frequencies"].keys() == letters.keys()
+
+    result = entropy_analysis.invoke({"data": TEXT.hex()})
+    counts = np.array(list(Counter(TEXT).values()))
+    p = counts / len(TEXT)
+    assert result["detected_encoding"] == "hex" and abs(result["entropy"] + (p * np.log2(p)).sum()) < 1e-9
+    assert result["most_common_byte"] == ord(" ") and result["entropy_profile"]["regions"] == []
+
+    # Una ventana que no es múltiplo del paso es un error de la herramienta, no una excepción
+    for window in (1000, 0):
+        result = entropy_analysis.invoke({"data": TEXT.hex(), "window": window})
+        assert not result["success"] and str(ENTROPY_STEP) in result["error"]
+    result = entropy_analysis.invoke({"data": TEXT.hex(), "window": 2 * ENTROPY_STEP})
+    assert result["entropy_profile"]["window"] == 2 * ENTROPY_STEP
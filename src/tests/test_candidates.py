@@ -0,0 +1,70 @@
+"""
+Pruebas de la evaluación en dos fases: ventana descifrada, supervivientes y descifrado completo
+"""
+
+import random
+
+from ..tools.affine import affine_table
+from ..tools.candidates import Candidate, brace_windows, consume, decrypt_survivors, first_flag, window_text
+from ..tools.ngrams import english_corpus
+from ..tools.tools import attack_classical
+from ..tools.vigenere import decrypt, decrypt_windows
+
+def _shift(key, text):
+    return text.translate(affine_table(1, key))
+
+def test_only_survivors_are_fully_decrypted():
+    """Las 26 claves descifran la ventana; sólo las supervivientes el texto entero"""
+    plaintext = "the quick brown fox jumps over the lazy dog " * 200 + "flag{two_phase}"
+    ciphertext = _shift(7, plaintext)
+    lengths = []
+
+    def counted(key, text):
+        lengths.append(len(text))
+        return _shift(key, text)
+
+    windows = brace_windows(ciphertext)
+    found = first_flag(range(26), counted, ciphertext, window_text(ciphertext, windows),
+                       accept=lambda window: "flag{" in window.lower())
+    assert found[0] == 19 and found[2] == "flag{two_phase}"
+    assert lengths.count(len(ciphertext)) == 1 and max(lengths[:26]) == 5
+
+    # Sin ventana explícita se usa el principio del cifrado
+    survivors = [key for key, _ in decrypt_survivors(range(26), _shift, ciphertext)]
+    assert survivors == list(range(26))
+
+def test_brace_windows_keep_vigenere_alignment():
+    """Las ventanas descifradas coinciden con el descifrado completo en cada variante"""
+    text = "Nota: x{1} y 12 {2}. La flag es flag{alineada} y otra {mas}, fin"
+    windows = brace_windows(text)
+    for variant in ("vigenere", "beaufort", "variant_beaufort", "autokey"):
+        full = decrypt(text, "LEMON", variant)
+        assert decrypt_windows(text, windows, "LEMON", variant) == window_text(full, windows)
+
+def test_large_vigenere_flag_from_windows():
+    """Un Vigenère de 120 KB con la flag en medio: la clave se valida en la ventana de la "{" """
+    words = english_corpus().split()
+    rng = random.Random(1)
+    body = " ".join(rng.choice(words) for _ in range(20000))
+    plaintext = body[:len(body) // 2] + " the flag{windowed_vigenere} ok " + body[len(body) // 2:]
+    inverse = "".join(chr((26 - (ord(c) - 65)) % 26 + 65) for c in "CIPHER")
+    result = attack_classical.invoke({"ciphertext": decrypt(plaintext, inverse, "vigenere")})
+    assert result["success"] and result["key"] == "CIPHER"
+    assert "flag{windowed_vigenere}" in result["plaintext"]
+
+def test_consume_keeps_top_k_and_stops_early():
+    """El montículo conserva los k mejores y el generador se cierra en el primer concluyente"""
+    produced = []
+
+    def keyspace():
+        for key in range(100000):
+            produced.append(key)
+            yield Candidate(score=-abs(key - 40), key=key, plaintext=b"x" * 1000, family="toy", found=key == 60)
+
+    found, top = consume(keyspace(), k=3)
+    assert found.key == 60 and len(produced) == 61
+    assert [c.key for c in top.best()] == [40, 39, 41] and top.counts == {"toy": 61}
+
+    result = attack_classical.invoke({"ciphertext": "~~~ 12345 ~~~ 999"})
+    assert not result["success"] and len(result["sample_results"]) == 5
+    assert set(result["attempts"]) >= {"caesar", "xor"}
@@ -0,0 +1,84 @@
+"""
+Pruebas del motor de logaritmo discreto (Pohlig-Hellman, BSGS, Pollard rho)
+"""
+
+import random
+
+from ..tools.dlog import (
+    MultiplicativeGroup,
+    bsgs,
+    discrete_log,
+    discrete_log_attack,
+    factorize,
+    is_probable_prime,
+    pollard_rho,
+)
+
+def _random_prime(rng, bits):
+    while True:
+        q = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if is_probable_prime(q):
+            return q
+
+def _smooth_prime(rng, bits, factor_bits):
+    """Primo p con p-1 = 2 · (producto de primos de factor_bits bits)"""
+    while True:
+        n = 2
+        while n.bit_length() < bits:
+            n *= _random_prime(rng, factor_bits)
+        if is_probable_prime(n + 1):
+            return n + 1
+
+def test_factorize_mixed_sizes():
+    """Factoriza un número con factores pequeños y medianos"""
+    n = 2 ** 5 * 3 * 1000003 * 4294967311 * 1099511627791
+    factors, cofactor = factorize(n)
+    assert cofactor == 1
+    assert factors == {2: 5, 3: 1, 1000003: 1, 4294967311: 1, 1099511627791: 1}
+
+def test_bsgs_small_group():
+    """BSGS recupera el exponente en Z_p^*"""
+    p = 1000003
+    group = MultiplicativeGroup(p)
+    g, x = group.element(2), 123456
+    assert group.key(group.pow(g, bsgs(group, g, group.pow(g, x), p - 1))) == pow(2, x, p)
+
+def test_pollard_rho_prime_order_subgroup():
+    """Pollard rho con puntos distinguidos en un subgrupo de orden primo ~2^34"""
+    rng = random.Random(26)
+    while True:
+        q = _random_prime(rng, 34)
+        if is_probable_prime(2 * q + 1):
+            break
+    p = 2 * q + 1
+    group = MultiplicativeGroup(p)
+    g = group.element(4)  # cuadrado -> orden q
+    x = rng.randrange(q)
+    assert pollard_rho(group, g, group.pow(g, x), q, workers=1, timeout=60) == x
+
+def test_discrete_log_smooth_512_bit_group():
+    """Pohlig-Hellman completo con p-1 suave"""
+    rng = random.Random(1)
+    p = _smooth_prime(rng, 512, 20)
+    x = rng.randrange(p - 1)
+    result = discrete_log_attack.invoke({'g': '3', 'h': str(pow(3, x, p)), 'p': str(p)})
+    assert result['success']
+    assert pow(3, result['x'], p) == pow(3, x, p)
+
+def test_partial_pohlig_hellman_with_bounded_exponent():
+    """Con un factor grande en p-1 basta la parte suave si x es pequeño"""
+    rng = random.Random(7)
+    while True:
+        smooth = 2
+        while smooth.bit_length() < 96:
+            smooth *= _random_prime(rng, 16)
+        p = smooth * _random_prime(rng, 160) + 1
+        if is_probable_prime(p):
+            break
+    group = MultiplicativeGroup(p)
+    g = group.element(3)
+    x = int.from_bytes(b'flag{dh}', 'big')
+    result = discrete_log(group, g, group.pow(g, x), p - 1, max_bits=64, timeout=30)
+    assert result['success']
+    assert result['partial']
+    assert result['x'] == x
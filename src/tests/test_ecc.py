@@ -0,0 +1,140 @@
+"""
+Pruebas de la aritmética de curvas elípticas y de los ataques ECC
+"""
+
+import random
+
+from ..tools.dlog import factorize, is_probable_prime
+from ..tools.ecc import (
+    EllipticCurve,
+    ecc_attack,
+    singular_curve_attack,
+    smart_attack,
+)
+
+P256 = {
+    'p': 0xffffffff00000001000000000000000000000000ffffffffffffffffffffffff,
+    'a': -3,
+    'b': 0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b,
+    'n': 0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551,
+    'gx': 0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+    'gy': 0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5,
+}
+
+def _random_point(curve, rng):
+    while True:
+        P = curve.lift_x(rng.randrange(int(curve.p)))
+        if P is not None:
+            return P
+
+def _j0_curve_with_order(rng, p, order):
+    """Busca b tal que y^2 = x^3 + b tenga exactamente `order` puntos"""
+    for b in range(1, 200):
+        curve = EllipticCurve(p, 0, b)
+        if all(curve.multiply(_random_point(curve, rng), order) is None for _ in range(3)):
+            return curve
+    return None
+
+def _anomalous_curve(rng, bits):
+    """Curva CM con D = -3 y traza 1: 4p = 1 + 3v^2  =>  #E = p"""
+    while True:
+        v = rng.getrandbits(bits // 2) | 1
+        if (1 + 3 * v * v) % 4 == 0 and is_probable_prime((1 + 3 * v * v) // 4):
+            p = (1 + 3 * v * v) // 4
+            curve = _j0_curve_with_order(rng, p, p)
+            if curve is not None:
+                return curve
+
+def _smooth_order_curve(rng, bits, smooth_bits):
+    """Curva j = 0 cuyo orden (una de las 6 trazas CM) es suave"""
+    while True:
+        t, v = rng.getrandbits(bits // 2), rng.getrandbits(bits // 2)
+        if (t - v) % 2 or not is_probable_prime((t * t + 3 * v * v) // 4):
+            continue
+        p = (t * t + 3 * v * v) // 4
+        for trace in (t, -t, (t + 3 * v) // 2, -(t + 3 * v) // 2, (t - 3 * v) // 2, -(t - 3 * v) // 2):
+            order = p + 1 - trace
+            factors, cofactor = factorize(order, trial_limit=1 << 12, timeout=1)
+            if cofactor == 1 and max(factors).bit_length() <= smooth_bits:
+                curve = _j0_curve_with_order(rng, p, order)
+                if curve is not None:
+                    return curve, order
+
+def test_wnaf_multiply_matches_affine_double_and_add():
+    """La multiplicación wNAF Jacobiana coincide con la afín ingenua"""
+    rng = random.Random(27)
+    curve = EllipticCurve(P256['p'], P256['a'], P256['b'], P256['n'])
+    G = curve.point(P256['gx'], P256['gy'])
+
+    def naive(P, k):
+        R = None
+        while k:
+            if k & 1:
+                R = curve.add(R, P)
+            P, k = curve.add(P, P), k >> 1
+        return R
+
+    for k in list(range(1, 40)) + [rng.getrandbits(256) for _ in range(5)]:
+        assert curve.multiply(G, k) == naive(G, k)
+    assert curve.multiply(G, P256['n']) is None
+    assert curve.multiply(G, -5) == curve.neg(curve.multiply(G, 5))
+
+def test_point_compression_roundtrip():
+    """Compresión SEC1 ida y vuelta"""
+    curve = EllipticCurve(P256['p'], P256['a'], P256['b'])
+    Q = curve.multiply(curve.point(P256['gx'], P256['gy']), 0xC0FFEE)
+    encoded = curve.compress(Q)
+    assert len(encoded) == 33
+    assert curve.decompress(encoded) == Q
+
+def test_smart_attack_on_anomalous_curve():
+    """Smart's attack recupera k en una curva anómala de ~96 bits"""
+    rng = random.Random(3)
+    curve = _anomalous_curve(rng, 96)
+    G = _random_point(curve, rng)
+    k = rng.randrange(1, int(curve.p))
+    Q = curve.multiply(G, k)
+    args = {'p': str(curve.p), 'a': str(curve.a), 'b': str(curve.b),
+            'gx': str(G[0]), 'gy': str(G[1]), 'qx': str(Q[0]), 'qy': str(Q[1])}
+    result = smart_attack.invoke(args)
+    assert result['success']
+    assert result['private_key'] == k
+    assert ecc_attack.invoke(args)['attacks_tried'] == ["Smart's Attack"]
+
+def test_singular_curve_cusp_and_node():
+    """Cúspide (a = b = 0) y nodos con d residuo y no residuo cuadrático"""
+    p = 11312322621216499021  # p - 1 y p + 1 son 2^28-suaves
+    rng = random.Random(5)
+    residue = next(x for x in range(1, 50) if pow(3 * x, (p - 1) // 2, p) == 1)
+    non_residue = next(x for x in range(1, 50) if pow(3 * x, (p - 1) // 2, p) == p - 1)
+
+    for x0, singularity in ((0, 'cusp'), (residue, 'node'), (non_residue, 'node')):
+        # (x - x0)^2 (x + 2·x0) = x^3 - 3·x0^2·x + 2·x0^3
+        a, b = -3 * x0 * x0 % p, 2 * x0 ** 3 % p
+        curve = EllipticCurve(p, a, b)
+        G = _random_point(curve, rng)
+        k = rng.randrange(1 << 60)
+        Q = curve.multiply(G, k)
+        result = singular_curve_attack.invoke({
+            'p': str(p), 'a': str(a), 'b': str(b),
+            'gx': str(G[0]), 'gy': str(G[1]), 'qx': str(Q[0]), 'qy': str(Q[1]),
+            'timeout': 8
+        })
+        assert result['success'], result
+        assert curve.multiply(G, result['private_key']) == Q
+        assert result['singularity'] == singularity
+
+def test_pohlig_hellman_on_smooth_order_curve():
+    """Pohlig-Hellman sobre una curva de 64 bits con orden 2^20-suave"""
+    rng = random.Random(11)
+    curve, order = _smooth_order_curve(rng, 64, 20)
+    G = _random_point(curve, rng)
+    k = rng.randrange(order)
+    Q = curve.multiply(G, k)
+    result = ecc_attack.invoke({
+        'p': str(curve.p), 'a': '0', 'b': str(curve.b),
+        'gx': str(G[0]), 'gy': str(G[1]), 'qx': str(Q[0]), 'qy': str(Q[1]),
+        'order': str(order)
+    })
+    assert result['success'], result
+    assert curve.multiply(G, result['private_key']) == Q
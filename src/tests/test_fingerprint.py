@@ -0,0 +1,101 @@
+"""
+Pruebas de la huella estadística: características del cifrado y enrutado a 1-3 ataques
+"""
+
+import base64
+import hashlib
+import time
+
+import numpy as np
+
+from ..tools.affine import apply
+from ..tools.fingerprint import BYTE_IOC_BLOCK, extract_blob, fingerprint
+from ..tools.hill import _letters, _rebuild, decrypt_values
+from ..tools.tools import analyze_files, classify_crypto
+
+PLAINTEXT = (
+    "It is a truth universally acknowledged, that a single man in possession of a good fortune, must be in want "
+    "of a wife. However little known the feelings or views of such a man may be on his first entering a "
+    "neighbourhood, this truth is so well fixed in the minds of the surrounding families, that he is considered "
+    "the rightful property of some one or other of their daughters. My dear Mr. Bennet, said his lady to him one "
+    "day, have you heard that Netherfield Park is let at last? Mr. Bennet replied that he had not. But it is, "
+    "returned she; for Mrs. Long has just been here, and she told me all about it. Mr. Bennet made no answer. "
+    "Do you not want to know who has taken it? cried his wife impatiently. You want to tell me, and I have no "
+    "objection to hearing it. This was invitation enough. Why, my dear, you must know, Mrs. Long says that "
+    "Netherfield is taken by a young man of large fortune from the north of England. "
+)
+
+def _first(ciphertext) -> str:
+    return fingerprint(ciphertext)["routes"][0]["attack"]
+
+def _elapsed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def _xor(data: bytes, key: bytes) -> bytes:
+    return bytes(b ^ key[i % len(key)] for i, b in enumerate(data))
+
+def test_letter_ciphers_route_to_their_family():
+    """Afín, Vigenère, columnar y Hill: IoC, periodo, unigramas y huella de bloques (también si parecen base64)"""
+    assert _first(apply(PLAINTEXT, 5, 8)) == "rot_affine_attack"
+
+    key = np.array([11, 4, 12, 14, 13])
+    positions, values = _letters(PLAINTEXT)
+    vigenere = _rebuild(PLAINTEXT, positions, (values + key[np.arange(len(values)) % 5]) % 26)
+    result = fingerprint(vigenere)
+    assert result["routes"][0]["attack"] == "vigenere_attack" and result["features"]["period"] == 5
+
+    letters = PLAINTEXT.replace(" ", "")
+    assert _first("".join(letters[c::7] for c in (3, 0, 6, 1, 5, 2, 4))) == "transposition_attack"
+
+    hill = _rebuild(PLAINTEXT, positions, decrypt_values(values, np.array([[3, 3], [2, 5]]), 26))
+    result = fingerprint(hill)
+    assert result["routes"][0]["attack"] == "hill_attack" and result["features"]["block_signature"] == 2
+
+    # Sólo letras con longitud múltiplo de 4 también es base64 válido: decodifica a ruido, así que son letras
+    alphabet = np.random.default_rng(43).permutation(26)
+    for length in (400, 700):
+        vigenere_block = "".join(c for c in vigenere if c.isalpha())[:length]
+        substitution = "".join(chr(65 + alphabet[v]) for v in values[:length])
+        assert len(vigenere_block) % 4 == 0 and fingerprint(vigenere_block)["features"]["charset"] == "letters"
+        assert _first(vigenere_block) == "vigenere_attack"
+        assert _first(substitution) in ("rot_affine_attack", "substitution_attack")
+    assert fingerprint(base64.b64encode(b"plain text " * 12).decode())["features"]["charset"] == "base64"
+
+def test_byte_blobs_and_speed():
+    """XOR de uno o varios bytes, bloques ECB repetidos y base64 en claro; menos de 1 ms por KB"""
+    data = PLAINTEXT.encode()
+    assert _first(_xor(data, b"\x3c").hex()) == "xor_single_byte"
+    result = fingerprint(_xor(data, b"secretkey").hex())
+    assert result["routes"][0]["attack"] == "xor_repeating_key" and result["features"]["period"] == 9
+
+    blocks = b"A" * 64 + data[:192]
+    ecb = b"".join(hashlib.md5(blocks[i:i + 16]).digest() for i in range(0, len(blocks), 16))
+    assert _first(ecb.hex()) == "aes_ecb"
+    # Muchos bloques repetidos suben el IoC de bytes por encima de BYTE_IOC_BLOCK: sigue siendo ECB
+    heavy = b"".join(hashlib.md5(bytes([i % 3])).digest() for i in range(24))
+    assert fingerprint(heavy.hex())["features"]["byte_ioc"] >= BYTE_IOC_BLOCK
+    assert _first(heavy.hex()) == "aes_ecb"
+    assert _first(base64.b64encode(data).decode()) == "decode_encoding"
+
+    # Menos de 1 ms por KB (el mejor de varios intentos, para no medir ruido del sistema)
+    small = _xor(data[:512], b"\x3c").hex()
+    assert min(_elapsed(fingerprint, small) for _ in range(50)) < 0.001
+
+    large = _xor((PLAINTEXT * 80).encode()[:1 << 16], b"longer key!").hex()
+    fingerprint(large)
+    start = time.perf_counter()
+    fingerprint(large)
+    assert time.perf_counter() - start < 0.064
+
+def test_classify_crypto_uses_fingerprint():
+    """Un reto sin palabras clave: la huella del cifrado decide el tipo y los ataques"""
+    ciphertext = _xor(PLAINTEXT.encode(), b"key").hex()
+    files = [{"name": "output.txt", "content": f"Here you go:\n{ciphertext}\n"}]
+    assert extract_blob(files[0]["content"]) == ciphertext
+
+    analysis = analyze_files.invoke({"files": files})
+    assert analysis["fingerprint"]["routes"][0]["attack"] == "xor_repeating_key"
+    result = classify_crypto.invoke({"analysis": analysis, "use_ml": False})
+    assert result["type"] == "XOR" and result["attacks"][0] == "xor_repeating_key"
@@ -0,0 +1,56 @@
+"""
+Pruebas del cifrado de Hill: sistemas lineales mod m por lotes y recuperación de la clave
+"""
+
+import numpy as np
+
+from ..tools.hill import (_letters, _rebuild, decrypt_values, hill_attack, inverse_mod, invertible_mod,
+                          solve_mod)
+
+PLAINTEXT = (
+    "It is a truth universally acknowledged that a single man in possession of a good fortune must be in want "
+    "of a wife However little known the feelings or views of such a man may be on his first entering a "
+    "neighbourhood this truth is so well fixed in the minds of the surrounding families"
+)
+
+def _encrypt_letters(text: str, key) -> str:
+    positions, values = _letters(text)
+    return _rebuild(text, positions, decrypt_values(values, np.array(key), 26))
+
+def test_batched_solve_and_inverse():
+    """Un lote de sistemas mod 26 y mod 256: solución exacta e inversas de las matrices invertibles"""
+    rng = np.random.default_rng(42)
+    for m in (26, 256):
+        A = rng.integers(0, m, size=(200, 3, 3))
+        X = rng.integers(0, m, size=(200, 3, 2))
+        X_found, ok = solve_mod(A, A @ X % m, m)
+        assert (ok == invertible_mod(A, m)).all() and ok.any()
+        assert (X_found[ok] == X[ok]).all()
+        inverse, ok = inverse_mod(A, m)
+        assert (np.einsum('bij,bjk->bik', A[ok], inverse[ok]) % m == np.eye(3, dtype=np.int64)).all()
+
+def test_three_by_three_ciphertext_only_in_workers():
+    """3×3 mod 26 sin texto conocido: filas enumeradas en procesos; letras que también son base64"""
+    key = [[6, 24, 1], [13, 16, 10], [20, 17, 15]]
+    result = hill_attack.invoke({"ciphertext": _encrypt_letters(PLAINTEXT, key), "block_size": 3, "workers": 2})
+    assert result["success"] and result["method"] == "ciphertext_only"
+    assert result["key"] == key and result["plaintext"] == PLAINTEXT
+
+    # Sólo letras y 400 de ellas: también es base64 válido, pero se resuelve en modo letras
+    letters = "".join(c for c in PLAINTEXT if c.isalpha())[:400]
+    result = hill_attack.invoke({"ciphertext": _encrypt_letters(letters, [[3, 3], [2, 5]])})
+    assert result["success"] and result["mode"] == "letters" and result["plaintext"] == letters
+
+def test_known_plaintext_and_byte_flag_crib():
+    """Texto corto con fragmento conocido en letras; bytes en hex resueltos con el crib flag{"""
+    short = "Attack at dawn, the flag is flag{short_hill}"
+    ciphertext = _encrypt_letters(short, [[6, 24, 1], [13, 16, 10], [20, 17, 15]])
+    result = hill_attack.invoke({"ciphertext": ciphertext, "known_plaintext": "the flag is"})
+    assert result["success"] and result["plaintext"] == short and result["flag"] == "flag{short_hill}"
+
+    key = np.array([[37, 12], [201, 91]])
+    data = np.frombuffer((PLAINTEXT + " flag{hill_bytes}").encode(), dtype=np.uint8).astype(np.int64)
+    ciphertext = decrypt_values(data, key, 256).astype(np.uint8).tobytes().hex()
+    result = hill_attack.invoke({"ciphertext": ciphertext})
+    assert result["mode"] == "bytes" and result["key"] == key.tolist()
+    assert result["flag"] == "flag{hill_bytes}"
@@ -0,0 +1,78 @@
+"""
+Pruebas de la ingesta de firmas, LLL y el solver HNP
+"""
+
+import json
+import random
+
+from ..tools.ecc import NAMED_CURVES, EllipticCurve
+from ..tools.hnp import hnp_attack
+from ..tools.lattice import lll_reduce
+from ..tools.signatures import iter_signatures
+
+def _p256():
+    p, a, b, n, gx, gy = NAMED_CURVES['p256']
+    curve = EllipticCurve(p, a, b, n)
+    return curve, curve.point(gx, gy), n
+
+def _sign(curve, G, n, d, k, h):
+    r = int(curve.multiply(G, k)[0]) % n
+    return r, pow(k, -1, n) * (h + r * d) % n
+
+def test_signature_formats():
+    """JSON, JSON Lines, CSV y líneas clave=valor producen los mismos registros"""
+    expected = [{'r': 1, 's': 255, 'h': 3}, {'r': 4, 's': 5, 'h': 6}]
+    dumps = [
+        json.dumps({'signatures': [{'r': 1, 's': '0xff', 'z': '3'}, {'r': 4, 's': 5, 'hash': 6}]}),
+        '{"r": 1, "s": "0xff", "h": 3}\n{"r": "4", "s": 5, "h": 6}',
+        'r,s,h\n1,0xff,3\n4,5,6',
+        'r = 1, s = 0xff, h = 3\nr: 4 s: 5 msg_hash: 6',
+    ]
+    for dump in dumps:
+        assert list(iter_signatures(dump)) == expected
+
+def test_lll_finds_short_vector():
+    """LLL encuentra el vector corto plantado en un retículo de knapsack"""
+    rng = random.Random(30)
+    weights = [rng.getrandbits(60) for _ in range(12)]
+    bits = [rng.randrange(2) for _ in weights]
+    target = sum(w for w, b in zip(weights, bits) if b)
+    basis = [[1 if i == j else 0 for j in range(12)] + [w * 2 ** 20] for i, w in enumerate(weights)]
+    basis.append([0] * 12 + [-target * 2 ** 20])
+    reduced = lll_reduce(basis)
+    assert any(row[:12] == bits or [-v for v in row[:12]] == bits for row in reduced)
+
+def test_hnp_msb_leak_with_public_key():
+    """MSB filtrados (CSV) verificados contra la clave pública"""
+    curve, G, n = _p256()
+    rng = random.Random(28)
+    d = int.from_bytes(b'flag{biased_k}', 'big')
+    Q = curve.multiply(G, d)
+    lines = ['r,s,z,msb']
+    for _ in range(20):
+        k, h = rng.randrange(1, n), rng.getrandbits(256)
+        r, s = _sign(curve, G, n, d, k, h)
+        lines.append(f'{hex(r)},{hex(s)},{h},{k >> 224}')
+    result = hnp_attack.invoke({'signatures': '\n'.join(lines), 'curve': 'P-256',
+                                'known_bits': 32, 'pubkey': f'{Q[0]},{Q[1]}'})
+    assert result['success'], result
+    assert result['private_key'] == d
+    assert result['verified_by'] == 'public_key'
+    assert result['signatures_used'] < 20
+    assert result['flag'] == 'flag{biased_k}'
+
+def test_hnp_biased_lsb_without_public_key():
+    """Nonces con LSB a cero, verificación con firmas de control"""
+    curve, G, n = _p256()
+    rng = random.Random(29)
+    d = rng.randrange(n)
+    sigs = []
+    for _ in range(24):
+        k, h = rng.randrange(n) >> 24 << 24, rng.getrandbits(256)
+        r, s = _sign(curve, G, n, d, k, h)
+        sigs.append(json.dumps({'r': r, 's': s, 'h': h}))
+    result = hnp_attack.invoke({'signatures': '\n'.join(sigs), 'q': hex(n),
+                                'leak': 'lsb', 'known_bits': 24})
+    assert result['success'], result
+    assert result['private_key'] == d
+    assert result['verified_by'] == 'signatures'
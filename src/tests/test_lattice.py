@@ -0,0 +1,91 @@
+"""
+Pruebas del motor de retículos: LLL float64/exacto, BKZ y ataque a knapsacks
+"""
+
+import random
+from fractions import Fraction
+
+from ..tools.lattice import bkz_reduce, knapsack_attack, lattice_reduce, lll_reduce
+
+def _qary_basis(rng, n, q):
+    """Retículo q-ario {x : x = A·s mod q} de dimensión n"""
+    a = [rng.randrange(q) for _ in range(n - 1)]
+    return [[1] + a] + [[0] * i + [q] + [0] * (n - 1 - i) for i in range(1, n)]
+
+def _is_lll_reduced(basis, delta=0.99):
+    """Comprueba las condiciones de tamaño y de Lovász con aritmética racional"""
+    ortho, mu = [], []
+    for i, b in enumerate(basis):
+        v = [Fraction(x) for x in b]
+        row = []
+        for j in range(i):
+            c = sum(Fraction(x) * y for x, y in zip(b, ortho[j])) / sum(y * y for y in ortho[j])
+            v = [x - c * y for x, y in zip(v, ortho[j])]
+            row.append(c)
+        ortho.append(v)
+        mu.append(row)
+    norms = [sum(x * x for x in v) for v in ortho]
+    for i in range(1, len(basis)):
+        if any(abs(c) > Fraction(51, 100) for c in mu[i]):
+            return False
+        if norms[i] < (Fraction(delta) - mu[i][i - 1] ** 2) * norms[i - 1]:
+            return False
+    return True
+
+def _det2(basis):
+    """Determinante de Gram (vol^2) exacto con eliminación racional"""
+    gram = [[Fraction(sum(x * y for x, y in zip(a, b))) for b in basis] for a in basis]
+    det = Fraction(1)
+    for i in range(len(gram)):
+        det *= gram[i][i]
+        for j in range(i + 1, len(gram)):
+            f = gram[j][i] / gram[i][i]
+            gram[j] = [x - f * y for x, y in zip(gram[j], gram[i])]
+    return det
+
+def test_float_and_exact_lll_are_reduced():
+    """La ruta float64 y la exacta devuelven bases LLL-reducidas del mismo retículo"""
+    rng = random.Random(30)
+    basis = _qary_basis(rng, 12, (1 << 61) - 1)
+    for reduced in (lll_reduce(basis), lll_reduce(basis, exact=True), lll_reduce(basis, depth=4)):
+        assert _is_lll_reduced(reduced)
+        assert _det2(reduced) == _det2(basis)
+
+def test_huge_entries_use_exact_path():
+    """Entradas de más de 480 bits no pasan por float64 y siguen reduciéndose"""
+    rng = random.Random(31)
+    basis = _qary_basis(rng, 6, (1 << 600) + 187)
+    reduced = lll_reduce(basis)
+    assert _is_lll_reduced(reduced)
+    assert _det2(reduced) == _det2(basis)
+
+def test_bkz_not_worse_than_lll():
+    """BKZ conserva el retículo y su primer vector no es más largo que el de LLL"""
+    rng = random.Random(32)
+    basis = _qary_basis(rng, 24, 10007)
+    lll = lll_reduce(basis)
+    bkz = bkz_reduce(lll, block_size=8, timeout=30)
+    norm = lambda v: sum(x * x for x in v)
+    assert norm(bkz[0]) <= norm(lll[0])
+    assert _det2(bkz) == _det2(basis)
+
+def test_knapsack_attack_recovers_flag():
+    """Merkle-Hellman de 32 bits por bloque: se recupera el mensaje completo"""
+    rng = random.Random(33)
+    weights = [rng.getrandbits(64) | (1 << 63) for _ in range(32)]
+    message = b"flag{knapsack}xx"
+    value = int.from_bytes(message, 'big')
+    bits = bin(value)[2:].zfill(len(message) * 8)
+    sums = [sum(w for w, b in zip(weights, bits[i:i + 32]) if b == '1') for i in range(0, len(bits), 32)]
+
+    result = knapsack_attack.invoke({"public_key": str(weights), "ciphertext": str(sums), "timeout": 60})
+    assert result["success"]
+    assert result["flag"] == "flag{knapsack}xx"
+
+def test_lattice_reduce_parses_sage_matrix():
+    """lattice_reduce acepta matrix(ZZ, ...) y encuentra el vector más corto"""
+    result = lattice_reduce.invoke({"matrix": "M = matrix(ZZ, [[1, 0, 0, 1345], [0, 1, 0, 35], [0, 0, 1, 154]])",
+                                    "algorithm": "bkz", "block_size": 3})
+    assert result["success"]
+    assert result["dimension"] == 3
+    assert 0 < sum(v * v for v in result["shortest_vector"]) < 100 ** 2
@@ -0,0 +1,51 @@
+"""
+Pruebas de la recuperación de parámetros de LCG (completos y truncados)
+"""
+
+import random
+
+from ..tools.lcg import lcg_attack, lcg_stream, recover_lcg, recover_truncated_lcg
+from ..tools.tools import analyze_files
+
+def test_full_outputs_recover_all_parameters():
+    """m por GCD de determinantes, a y c de salidas consecutivas (también m = 2^32)"""
+    m, a, c = 2 ** 61 - 1, 123456789, 987654321
+    states = lcg_stream(42, a, c, m, 10)
+    assert recover_lcg(states) == (m, a, c)
+
+    states = lcg_stream(7, 1103515245, 12345, 2 ** 32, 12)
+    assert recover_lcg(states) == (2 ** 32, 1103515245, 12345)
+
+def test_truncated_outputs_with_and_without_increment():
+    """Con c conocido se recuperan los estados exactos; sin c, un x_0 equivalente"""
+    rng = random.Random(32)
+    m = rng.getrandbits(128) | (1 << 127) | 1
+    a, c, x = rng.randrange(m), rng.randrange(m), rng.randrange(m)
+    states = lcg_stream(x, a, c, m, 30)
+    outputs = [s >> 64 for s in states[:20]]
+
+    known = recover_truncated_lcg(outputs, 64, m, a, c)
+    assert known["success"] and known["states"] == states[:20]
+
+    unknown = recover_truncated_lcg(outputs, 64, m, a)
+    assert unknown["success"]
+    assert [s >> 64 for s in unknown["states"]] == outputs
+
+def test_lcg_attack_decrypts_flag():
+    """La herramienta predice las siguientes salidas y descifra el XOR con el byte bajo"""
+    m, a, c = 2 ** 61 - 1, 0x5DEECE66D, 11
+    states = lcg_stream(1337, a, c, m, 30)
+    ciphertext = bytes(b ^ (k & 0xff) for b, k in zip(b"flag{lcg_broken}", states[8:])).hex()
+
+    result = lcg_attack.invoke({"outputs": str(states[:8]), "ciphertext": ciphertext, "predict": 3})
+    assert result["success"]
+    assert (result["modulus"], result["multiplier"], result["increment"]) == (m, a, c)
+    assert result["predictions"] == states[8:11]
+    assert result["flag"] == "flag{lcg_broken}"
+
+def test_lcg_detection():
+    """analyze_files reconoce el patrón (a * x + c) % m como PRNG de tipo LCG"""
+    files = [{"name": "chall.py", "content": "def next(x):\n    return (a * x + b) % m\n"}]
+    analysis = analyze_files.invoke({"files": files})
+    assert "PRNG" in analysis["crypto_indicators"]
+    assert analysis["prng_kind"] == "lcg"
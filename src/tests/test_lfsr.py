@@ -0,0 +1,62 @@
+"""
+Pruebas de Berlekamp-Massey y del ataque con texto conocido a keystreams LFSR
+"""
+
+import random
+
+from ..tools.lfsr import (berlekamp_massey, int_to_bytes, lfsr_attack, lfsr_generate,
+                          polynomial_string, verify_lfsr)
+from ..tools.tools import analyze_files, classify_crypto
+
+# x^127 + x + 1 (trinomio primitivo)
+PRIMITIVE_127 = (1 << 127) | (1 << 1) | 1
+
+def _encrypt(plaintext: bytes, C: int, L: int, state: int, order: str = "msb") -> bytes:
+    keystream = int_to_bytes(lfsr_generate(C, L, state, len(plaintext) * 8), len(plaintext), order)
+    return bytes(a ^ b for a, b in zip(plaintext, keystream))
+
+def test_berlekamp_massey_million_bits():
+    """10^6 bits: el polinomio sale del prefijo y la recurrencia se verifica en toda la secuencia"""
+    sequence = lfsr_generate(PRIMITIVE_127, 127, random.Random(33).getrandbits(127), 10 ** 6)
+    C, L = berlekamp_massey(sequence, 10 ** 6)
+    assert (C, L) == (PRIMITIVE_127, 127)
+    assert polynomial_string(C, L) == "x^127 + x + 1"
+    assert verify_lfsr(sequence, 10 ** 6, C, L) == 10 ** 6
+    assert verify_lfsr(sequence ^ (1 << 600000), 10 ** 6, C, L) == 600000
+
+def test_flag_crib_in_the_middle():
+    """'flag{' a mitad del texto: keystream hacia delante y hacia atrás, en ambos órdenes de bit"""
+    plaintext = b"Mensaje interceptado del servidor: flag{lfsr_is_linear} fin."
+    C = (1 << 16) | (1 << 14) | (1 << 13) | (1 << 11) | 1
+    for order in ("msb", "lsb"):
+        ciphertext = _encrypt(plaintext, C, 16, 0xACE1, order)
+        result = lfsr_attack.invoke({"ciphertext": ciphertext.hex()})
+        assert result["success"] and result["bit_order"] == order
+        assert result["degree"] == 16 and result["offset"] == plaintext.index(b"flag{")
+        assert result["flag"] == "flag{lfsr_is_linear}"
+        assert result["plaintext"] == plaintext.decode()
+
+def test_png_magic_crib(tmp_path):
+    """La cabecera PNG de 16 bytes basta para un LFSR de grado 48; se valida con IEND"""
+    rng = random.Random(7)
+    png = bytes.fromhex("89504e470d0a1a0a0000000d49484452") + rng.randbytes(3000) + b"IEND\xaeB`\x82"
+    C = (1 << 48) | (1 << 9) | (1 << 7) | (1 << 4) | 1
+    path = tmp_path / "flag.png.enc"
+    path.write_bytes(_encrypt(png, C, 48, rng.getrandbits(48)))
+
+    result = lfsr_attack.invoke({"ciphertext": str(path)})
+    assert result["success"] and result["file_type"] == "png"
+    assert (tmp_path / "flag.png.enc.dec").read_bytes() == png
+
+def test_keystream_prediction_and_detection():
+    """Con el keystream en bits se predicen los siguientes; 'lfsr' en el código clasifica como LFSR"""
+    bits = lfsr_generate(PRIMITIVE_127, 127, 12345, 600)
+    stream = "".join(str(bits >> i & 1) for i in range(600))
+    result = lfsr_attack.invoke({"keystream": stream[:400], "predict": 200})
+    assert result["success"] and result["degree"] == 127
+    assert result["predictions"] == stream[400:]
+
+    files = [{"name": "chall.py", "content": "class LFSR:\n    def step(self):\n        return self.s ^ key\n"}]
+    analysis = analyze_files.invoke({"files": files})
+    assert "LFSR" in analysis["crypto_indicators"]
+    assert classify_crypto.invoke({"analysis": analysis, "use_ml": False})["type"] == "LFSR"
@@ -0,0 +1,67 @@
+"""
+Pruebas del clonado de MT19937, salidas truncadas y fuerza bruta de semillas
+"""
+
+import random
+
+from ..tools.mersenne import mt19937_attack, mt19937_seed_bruteforce, temper, untemper
+from ..tools.tools import analyze_files, classify_crypto
+
+def test_untemper_inverts_temper():
+    """untemper deshace el tempering para cualquier palabra de 32 bits"""
+    rng = random.Random(31)
+    for _ in range(1000):
+        y = rng.getrandbits(32)
+        assert untemper(temper(y)) == y
+
+def test_clone_from_full_outputs():
+    """624 salidas de 32 bits (y una de 64 partida en palabras) predicen las siguientes"""
+    rng = random.Random(1234)
+    outputs = [rng.getrandbits(32) for _ in range(650)]
+    result = mt19937_attack.invoke({"outputs": str(outputs), "predict": 5})
+    assert result["success"] and result["method"] == "untemper"
+    assert result["predictions"] == [rng.getrandbits(32) for _ in range(5)]
+
+    rng = random.Random(99)
+    outputs = [rng.getrandbits(64) for _ in range(312)]
+    result = mt19937_attack.invoke({"outputs": str(outputs), "bits": 64, "predict": 2})
+    assert result["predictions"] == [rng.getrandbits(64) for _ in range(2)]
+
+def test_truncated_random_floats():
+    """random.random() (27 + 26 bits por salida) se resuelve con el sistema GF(2)"""
+    rng = random.Random(7)
+    outputs = [rng.random() for _ in range(800)]
+    result = mt19937_attack.invoke({"outputs": str(outputs), "output_type": "random", "predict": 3})
+    assert result["success"] and result["method"] == "gf2_linear_system"
+    assert result["predictions"] == [rng.random() for _ in range(3)]
+
+def test_truncated_needs_enough_outputs():
+    """Con pocas salidas truncadas se informa en lugar de devolver predicciones erróneas"""
+    rng = random.Random(8)
+    outputs = [rng.getrandbits(8) for _ in range(1000)]
+    result = mt19937_attack.invoke({"outputs": str(outputs), "bits": 8})
+    assert not result["success"]
+    assert "more" in result["error"]
+
+def test_time_seed_bruteforce_decrypts_flag():
+    """Semilla int(time.time()) dentro de la ventana: se recupera y descifra randbytes()"""
+    seed = 1760000000 + 3600
+    rng = random.Random(seed)
+    outputs = [rng.getrandbits(32) for _ in range(3)]
+    ciphertext = bytes(a ^ b for a, b in zip(b"flag{time_seed}", rng.randbytes(15))).hex()
+
+    result = mt19937_seed_bruteforce.invoke({"outputs": str(outputs), "timestamp": "1760000000",
+                                             "window": 7200, "ciphertext": ciphertext, "workers": 1})
+    assert result["success"] and result["seed"] == seed
+    assert result["flag"] == "flag{time_seed}"
+
+def test_prng_detection():
+    """analyze_files detecta getrandbits y la lista de salidas; classify_crypto elige PRNG"""
+    files = [
+        {"name": "chall.py", "content": "import random\nout = [random.getrandbits(32) for _ in range(624)]\n"},
+        {"name": "output.txt", "content": str(list(range(1000, 1030)))},
+    ]
+    analysis = analyze_files.invoke({"files": files})
+    assert "PRNG" in analysis["crypto_indicators"]
+    assert analysis["prng_bits"] == 32 and len(analysis["prng_outputs"]) == 30
+    assert classify_crypto.invoke({"analysis": analysis, "use_ml": False})["type"] == "PRNG"
@@ -0,0 +1,48 @@
+"""
+Pruebas del modelo de n-gramas compartido (tablas mmap, inglés y español, score_many)
+"""
+
+import base64
+import codecs
+
+import numpy as np
+
+from ..tools.ngrams import ngram_table, score_many, score_text
+from ..tools.tools import attack_classical, decode_text
+
+ENGLISH = "It was the best of times, it was the worst of times, it was the age of wisdom"
+SPANISH = "En un lugar de la Mancha, de cuyo nombre no quiero acordarme, no ha mucho tiempo que vivía un hidalgo"
+
+def test_tables_are_mmapped_conditionals():
+    """Cada tabla es un np.memmap y cada contexto es una distribución sobre las 26 letras"""
+    for order in (1, 2, 3, 4):
+        for language in ("en", "es"):
+            table = ngram_table(order, language)
+            assert isinstance(table, np.memmap) and table.shape == (26 ** order,)
+            sums = np.exp(np.asarray(table, dtype=np.float64)).reshape(-1, 26).sum(axis=1)
+            assert np.allclose(sums, 1.0, atol=1e-4)
+
+def test_score_many_separates_languages_and_noise():
+    """Inglés y español superan el umbral con su idioma; ROT13, base64, bytes aleatorios y bloques repetidos no"""
+    candidates = [ENGLISH, SPANISH, codecs.encode(ENGLISH, 'rot13'),
+                  base64.b64encode(ENGLISH.encode()).decode(), np.random.default_rng(39).bytes(80)]
+    scores = score_many(candidates)
+    assert scores["confident"].tolist() == [True, True, False, False, False]
+    assert scores["language"][:2].tolist() == ["en", "es"]
+    # El lote da lo mismo que cada candidato por separado
+    assert np.allclose(scores["score"], [score_text(c)["score"] for c in candidates])
+
+    # Un bloque corto repetido puntúa como texto ("Ed9#Ed9#...") pero casi no tiene bigramas distintos
+    periodic = score_many(["Ed9#" * 200, ENGLISH * 5])
+    assert periodic["bigrams"].tolist()[0] == 2 and periodic["confident"].tolist() == [False, True]
+    assert not attack_classical.invoke({"ciphertext": "Xq9#" * 200})["success"]
+
+def test_attacks_stop_on_plaintext_without_flag():
+    """attack_classical y decode_text aceptan texto natural sin formato de flag"""
+    result = attack_classical.invoke({"ciphertext": codecs.encode(ENGLISH, 'rot13')})
+    assert result["success"] and result["cipher_type"] == "Caesar" and result["key"] == 13
+    assert result["plaintext"] == ENGLISH
+
+    result = decode_text.invoke({"text": base64.b64encode(SPANISH.encode()).decode()})
+    assert result["success"] and result["results"]["plaintext_found"]["encoding"] == "base64"
+    assert result["results"]["plaintext_found"]["language"] == "es"
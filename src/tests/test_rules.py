@@ -0,0 +1,50 @@
+"""
+Pruebas del motor de reglas: semántica de hashcat, generación perezosa y reparto por bloques de reglas
+"""
+
+import hashlib
+import itertools
+
+from ..tools.advanced_tools import dictionary_attack
+from ..tools.rules import compile_rule, load_rules, mangle, parse_rules
+from ..tools.wordlist import crack_file
+
+def test_rule_functions():
+    """Cada función da lo mismo que hashcat sobre "p@ssWord" y las funciones se encadenan"""
+    expected = {
+        ":": b"p@ssWord", "l": b"p@ssword", "u": b"P@SSWORD", "c": b"P@ssword", "C": b"p@SSWORD",
+        "t": b"P@SSwORD", "r": b"droWss@p", "d": b"p@ssWordp@ssWord", "p2": b"p@ssWord" * 3,
+        "$1": b"p@ssWord1", "^1": b"1p@ssWord", "T0": b"P@ssWord", "'4": b"p@ss", "D1": b"pssWord",
+        "[": b"@ssWord", "]": b"p@ssWor", "{": b"@ssWordp", "}": b"dp@ssWor", "ss$": b"p@$$Word",
+        "@s": b"p@Word", "i4-": b"p@ss-Word", "o0P": b"P@ssWord", "x04": b"p@ss", "z2": b"ppp@ssWord",
+        "Z1": b"p@ssWordd", "c $2 $0 $2 $4": b"P@ssword2024", "^@ $!": b"@p@ssWord!",
+        "sa@ se3 si1 so0": b"p@ssW0rd",
+    }
+    for rule, word in expected.items():
+        assert compile_rule(rule)(b"p@ssWord") == word, rule
+    assert compile_rule("$ ")(b"a") == b"a " and compile_rule("T9")(b"ab") == b"ab"
+
+def test_mangle_is_lazy_and_parsing_skips_invalid():
+    """Un generador infinito de palabras se muta bajo demanda y las líneas no soportadas se descartan"""
+    words = (b"w%d" % i for i in itertools.count())
+    rules = [compile_rule(r) for r in (":", "u", "$!")]
+    assert list(itertools.islice(mangle(words, rules), 6)) == [b"w0", b"W0", b"w0!", b"w1", b"W1", b"w1!"]
+    assert list(mangle([b"a"], [compile_rule("]")])) == []
+
+    text = "# comentario\n:\n\nc $1\nX999\nK\nsa@\r\n"
+    assert parse_rules(text) == [":", "c $1", "sa@"]
+    assert load_rules(text) == parse_rules(text) and len(load_rules("default")) > 50 and load_rules("") == []
+
+def test_rule_chunks_across_workers(tmp_path):
+    """Dos procesos reparten (bloque de palabras, bloque de reglas) y encuentran una regla del último bloque"""
+    words = [b"w%05d" % i for i in range(20000)]
+    path = tmp_path / "words.txt"
+    path.write_bytes(b"\n".join(words) + b"\n")
+    rules = load_rules("default") + ["c $9 $9"]
+    target = hashlib.md5(b"W12345" + b"99").hexdigest()
+    result = crack_file(str(path), [target], "md5", workers=2, chunk=16 << 10, rules=rules)
+    assert result["found"] == {target: "W1234599"} and result["workers"] == 2
+
+    result = dictionary_attack.invoke({"hash_value": hashlib.sha1(b"w00042").hexdigest(), "wordlist": str(path),
+                                       "rules": "u\n$!\n$4 $2", "workers": 1})
+    assert not result["success"] and result["complete"] and result["attempts"] == 3 * len(words)
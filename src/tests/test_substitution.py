@@ -0,0 +1,51 @@
+"""
+Pruebas de la sustitución monoalfabética: escalada incremental sobre cuadrigramas
+"""
+
+import random
+import string
+
+import numpy as np
+
+from ..tools.advanced_tools import frequency_analysis
+from ..tools.ngrams import letter_codes, quadgram_score
+from ..tools.substitution import SubstitutionClimber, decrypt, solve_substitution, substitution_attack
+
+PLAINTEXT = (
+    "It is a truth universally acknowledged, that a single man in possession of a good fortune, must be in want "
+    "of a wife. However little known the feelings or views of such a man may be on his first entering a "
+    "neighbourhood, this truth is so well fixed in the minds of the surrounding families, that he is considered "
+    "the rightful property of some one or other of their daughters. My dear Mr. Bennet, said his lady to him one "
+    "day, have you heard that Netherfield Park is let at last? Mr. Bennet replied that he had not."
+)
+
+def _encrypt(text: str, seed: int) -> str:
+    alphabet = list(string.ascii_uppercase)
+    random.Random(seed).shuffle(alphabet)
+    key = "".join(alphabet)
+    return text.translate(str.maketrans(string.ascii_uppercase + string.ascii_lowercase, key + key.lower()))
+
+def test_incremental_swaps_match_full_score():
+    """Tras la escalada, la puntuación incremental coincide con la recalculada desde cero"""
+    climber = SubstitutionClimber(letter_codes(_encrypt(PLAINTEXT, 1)))
+    rng = np.random.default_rng(1)
+    key, score = climber.climb(climber.initial_key(rng), rng, steps=500)
+    assert sorted(key.tolist()) == list(range(26))
+    assert abs(score - climber.score(key) / climber.size) < 1e-9
+
+def test_solves_random_alphabet():
+    """Alfabeto aleatorio sobre ~400 letras: texto exacto con reinicios secuenciales"""
+    ciphertext = _encrypt(PLAINTEXT, 38)
+    solved = solve_substitution(ciphertext, restarts=6, workers=1)
+    assert decrypt(ciphertext, solved["key"]) == PLAINTEXT
+    assert abs(solved["score"] - quadgram_score(PLAINTEXT)) < 1e-4
+
+def test_tool_with_process_pool_and_flag():
+    """Reinicios en un pool de procesos; la flag aparece en el texto descifrado"""
+    plaintext = PLAINTEXT + " The flag is flag{quadgrams_climb_hills}."
+    ciphertext = _encrypt(plaintext, 7)
+    result = substitution_attack.invoke({"ciphertext": ciphertext, "restarts": 4, "workers": 2})
+    assert result["success"] and result["flag"] == "flag{quadgrams_climb_hills}"
+
+    suggestions = frequency_analysis.invoke({"text": ciphertext})["suggestions"]
+    assert any(s["type"] == "substitution" for s in suggestions)
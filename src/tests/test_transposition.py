@@ -0,0 +1,64 @@
+"""
+Pruebas de la transposición: permutaciones de índices para rail fence, columnar y rutas
+"""
+
+import numpy as np
+
+from ..tools.tools import attack_classical
+from ..tools.transposition import (apply_permutation, char_array, columnar_permutations,
+                                   rail_fence_permutation, spiral, transposition_attack)
+
+PLAINTEXT = (
+    "It is a truth universally acknowledged, that a single man in possession of a good fortune, must be in want "
+    "of a wife. However little known the feelings or views of such a man may be on his first entering a "
+    "neighbourhood, this truth is so well fixed in the minds of the surrounding families, that he is considered "
+    "the rightful property of some one or other of their daughters. "
+)
+
+def _rail_fence(text: str, rails: int, offset: int) -> str:
+    cycle = 2 * (rails - 1)
+    rows = [[] for _ in range(rails)]
+    for i, char in enumerate(text):
+        phase = (i + offset) % cycle
+        rows[min(phase, cycle - phase)].append(char)
+    return "".join("".join(row) for row in rows)
+
+def _columnar(text: str, order) -> str:
+    columns = [text[c::len(order)] for c in range(len(order))]
+    return "".join(columns[c] for c in np.argsort(order))
+
+def test_permutations_match_reference_ciphers():
+    """Las permutaciones aritméticas invierten el zigzag y las columnas incompletas"""
+    text = "WEAREDISCOVEREDFLEEATONCEQUICKLYBEFORETHEYFINDUS"
+    for rails in range(2, 12):
+        for offset in range(2 * (rails - 1)):
+            ciphertext = _rail_fence(text, rails, offset)
+            assert apply_permutation(char_array(ciphertext), rail_fence_permutation(len(text), rails, offset)) == text
+    for k in range(2, 13):
+        order = np.random.default_rng(k).permutation(k)
+        ciphertext = _columnar(text, order)
+        assert apply_permutation(char_array(ciphertext), columnar_permutations(len(text), order[None, :])[0]) == text
+
+def test_columnar_twelve_columns_by_pruned_climb():
+    """Clave de 12 columnas con la última fila incompleta: escalada con poda de adyacencias"""
+    plaintext = PLAINTEXT.replace(" ", "") + "flag{columns_in_order}"
+    order = np.random.default_rng(41).permutation(12)
+    result = transposition_attack.invoke({"ciphertext": _columnar(plaintext, order), "families": "columnar"})
+    assert result["success"] and result["key"] == order.tolist()
+    assert result["flag"] == "flag{columns_in_order}"
+
+def test_rail_fence_and_spiral_route():
+    """attack_classical llega a la transposición; espiral puntuada sobre el texto completo; el claro no cuenta"""
+    result = attack_classical.invoke({"ciphertext": _rail_fence(PLAINTEXT, 5, 3)})
+    assert result["success"] and result["cipher_type"] == "Transposition (rail_fence)"
+    assert result["key"] == {"rails": 5, "offset": 3} and result["plaintext"] == PLAINTEXT
+
+    text = (PLAINTEXT * 3)[:600]
+    ciphertext = "".join(spiral(np.rot90(np.array(list(text)).reshape(20, 30))))
+    result = transposition_attack.invoke({"ciphertext": ciphertext, "families": "route"})
+    assert result["success"] and result["plaintext"] == text
+
+    # Un texto en claro no es una transposición por intercambiar filas enteras de la rejilla
+    result = transposition_attack.invoke({"ciphertext": text})
+    assert not result["success"] and result["score"] <= result["baseline"] + 0.1
+    assert not attack_classical.invoke({"ciphertext": text}).get("cipher_type", "").startswith("Transposition")
@@ -0,0 +1,74 @@
+"""
+Pruebas de la familia Vigenère: periodo por IoC/Kasiski, clave por columnas y autoclave
+"""
+
+import random
+import time
+
+import numpy as np
+
+from ..tools.tools import attack_classical
+from ..tools.vigenere import VARIANTS, crack, decrypt, letter_values, rebuild, vigenere_attack
+
+WORDS = ("the of and to in is that for it as was with be by on not he this are or his from at which "
+         "but have an they you were her she there been one all we their has would when if so no will "
+         "attack cipher key message secret index coincidence period column shift").split()
+
+def _text(length: int, seed: int) -> str:
+    rng = random.Random(seed)
+    words, size = [], 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word.capitalize() if rng.random() < 0.1 else word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+def _encrypt(text: str, key: str, variant: str) -> str:
+    codes, mask, values = letter_values(text)
+    k = np.array([ord(c) - 65 for c in key])
+    stream = np.resize(k, len(values)) if variant != "autokey" else np.concatenate([k, values])[:len(values)]
+    cipher = {
+        "vigenere": values + stream,
+        "beaufort": stream - values,
+        "variant_beaufort": values - stream,
+        "autokey": values + stream,
+    }[variant] % 26
+    return rebuild(codes, mask, cipher)
+
+def test_all_variants_recovered():
+    """Las cuatro variantes con periodos de 3 a 30: texto exacto (Beaufort variante = Vigenère con clave opuesta)"""
+    rng = random.Random(37)
+    for variant in VARIANTS:
+        for period, length in ((3, 400), (11, 3000), (30, 8000)):
+            text = _text(length, period)
+            key = "".join(chr(65 + rng.randrange(26)) for _ in range(period))
+            best = crack(_encrypt(text, key, variant))[0]
+            assert best["period"] == period
+            assert decrypt(_encrypt(text, key, variant), best["key"], best["variant"]) == text
+
+def test_period_50_on_100kb_under_a_second():
+    """Clave de 50 letras sobre 100 KB: periodo, clave y descifrado en menos de un segundo"""
+    text = _text(100_000, 50)
+    rng = random.Random(50)
+    key = "".join(chr(65 + rng.randrange(26)) for _ in range(50))
+    ciphertext = _encrypt(text, key, "vigenere")
+
+    start = time.perf_counter()
+    result = vigenere_attack.invoke({"ciphertext": ciphertext})
+    assert time.perf_counter() - start < 1.0
+    assert result["success"] and result["key"] == key and result["plaintext"] == text
+
+def test_flag_through_attack_classical():
+    """attack_classical usa el solucionador en lugar de sólo las claves comunes"""
+    text = _text(600, 1) + " so the flag{kasiski_meets_friedman} is here"
+    result = attack_classical.invoke({"ciphertext": _encrypt(text, "LEMONADE", "vigenere")})
+    assert result["success"] and result["key"] == "LEMONADE"
+    assert "flag{kasiski_meets_friedman}" in result["plaintext"]
+
+def test_plaintext_is_not_vigenere():
+    """Un texto en claro no se da por Vigenère con la clave identidad ni con una casi identidad"""
+    for length in (300, 2000, 20000):
+        text = _text(length, length)
+        assert crack(text) == [] and not vigenere_attack.invoke({"ciphertext": text})["success"]
+        result = attack_classical.invoke({"ciphertext": text})
+        assert not result.get("cipher_type", "").startswith("Vigenère")
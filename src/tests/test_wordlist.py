@@ -0,0 +1,52 @@
+"""
+Pruebas del motor de diccionario: bloques mapeados cortados en saltos de línea, procesos y cancelación
+"""
+
+import hashlib
+
+from ..tools.advanced_tools import dictionary_attack
+from ..tools.wordlist import chunk_bounds, crack_file, split_words
+
+def _wordlist(tmp_path, count=200000, newline=b"\n"):
+    words = [b"w%06d" % i for i in range(count)]
+    path = tmp_path / "words.txt"
+    path.write_bytes(newline.join(words) + newline)
+    return str(path), words
+
+def test_chunks_split_on_newlines(tmp_path):
+    """Con bloques de 1000 bytes cada palabra cae entera en exactamente un bloque, también con \\r\\n"""
+    path, words = _wordlist(tmp_path, 5000, b"\r\n")
+    data = open(path, "rb").read()
+    bounds = list(chunk_bounds(data, 1000))
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(data)
+    assert all(data[end - 1:end] == b"\n" for _, end in bounds)
+    assert [w for start, end in bounds for w in split_words(data[start:end])] == words
+
+def test_workers_find_match_and_cancel(tmp_path):
+    """Dos procesos: la última palabra se encuentra y un acierto temprano cancela el resto"""
+    path, words = _wordlist(tmp_path)
+    progress = []
+    target = hashlib.sha256(words[-1]).hexdigest()
+    result = crack_file(path, [target], "sha256", workers=2, chunk=64 << 10,
+                        progress=lambda done, size, tested: progress.append(done))
+    assert result["found"] == {target: words[-1].decode()} and result["workers"] == 2
+    assert progress == sorted(progress) and len(progress) > 1
+
+    result = crack_file(path, [hashlib.md5(words[10]).hexdigest()], "md5", workers=2, chunk=64 << 10)
+    assert result["found"] and result["tested"] < len(words) // 2 and not result["complete"]
+
+    result = crack_file(path, [hashlib.md5(b"missing").hexdigest()], "md5", workers=1, chunk=64 << 10)
+    assert not result["found"] and result["complete"] and result["tested"] == len(words)
+
+def test_dictionary_attack_tool(tmp_path):
+    """Lista integrada con reglas, wordlist en disco por ruta y wordlist inexistente"""
+    result = dictionary_attack.invoke({"hash_value": hashlib.md5(b"@admin2024").hexdigest()})
+    assert result["success"] and result["password"] == "@admin2024" and result["method"] == "rules"
+
+    path, words = _wordlist(tmp_path, 50000)
+    result = dictionary_attack.invoke({"hash_value": hashlib.sha1(words[31337]).hexdigest(), "wordlist": path,
+                                       "workers": 1})
+    assert result["success"] and result["password"] == "w031337" and result["hash_type"] == "sha1"
+
+    result = dictionary_attack.invoke({"hash_value": hashlib.md5(b"x").hexdigest(), "wordlist": "no-such-list"})
+    assert not result["success"] and "not found" in result["error"]
@@ -0,0 +1,136 @@
+"""
+Pruebas del XOR de un byte vectorizado (histogramas + log-verosimilitud / chi-cuadrado)
+"""
+
+import base64
+import os
+import random
+import time
+
+import numpy as np
+
+from ..tools.tools import attack_classical
+from ..tools.ngrams import english_corpus
+from ..tools.xor import (beam_keys, break_repeating_key, byte_histogram, crib_keys, flag_keys, hamming_distances,
+                         rank_single_byte, xor_beam_search, xor_crib_attack, xor_repeating_key, xor_single_byte,
+                         xor_with_key)
+
+ENGLISH = (b"It was the best of times, it was the worst of times, it was the age of wisdom, "
+           b"it was the age of foolishness, it was the epoch of belief, it was the epoch of incredulity.")
+
+def test_histogram_matches_bincount():
+    """El histograma por pares uint16 coincide con np.bincount para longitudes pares e impares"""
+    for size in (0, 1, 255, 4097):
+        data = os.urandom(size)
+        expected = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+        assert (byte_histogram(data) == expected).all()
+
+def test_ranks_english_without_flag():
+    """Sin 'flag{' la clave correcta queda primera y el texto se acepta por su estadística (no en 2 bytes)"""
+    ciphertext = bytes(b ^ 0x5a for b in ENGLISH)
+    ranking = rank_single_byte(ciphertext, top_k=3)
+    assert ranking[0]["key"] == 0x5a and ranking[0]["plaintext"] == ENGLISH
+    assert ranking[0]["chi2"] < ranking[1]["chi2"]
+
+    result = xor_single_byte.invoke({"ciphertext": ciphertext.hex()})
+    assert result["success"] and result["key_decimal"] == 0x5a
+    assert [c["key"] for c in result["candidates"]][0] == 0x5a
+
+    result = attack_classical.invoke({"ciphertext": ciphertext.hex()})
+    assert result["success"] and result["key_decimal"] == 0x5a and "flag" not in result["plaintext"]
+
+    # Dos bytes no bastan: la clave que da dos espacios no es un texto en inglés
+    for tool in (xor_single_byte, xor_repeating_key, xor_beam_search):
+        assert not tool.invoke({"ciphertext": "zz"})["success"]
+
+def test_flag_in_binary_noise_and_multi_mb():
+    """'flag{' dentro de ruido binario (varios MB): la clave sale de las diferencias c[i] ^ c[i+1]"""
+    rng = random.Random(34)
+    plaintext = bytearray(rng.randbytes(4_000_000))
+    plaintext[3_000_000:3_000_000 + 20] = b"flag{vectorised_xor}"
+    ciphertext = bytes(np.frombuffer(bytes(plaintext), dtype=np.uint8) ^ np.uint8(0xc3))
+
+    start = time.perf_counter()
+    assert 0xc3 in flag_keys(ciphertext)
+    ranking = rank_single_byte(ciphertext, include=tuple(flag_keys(ciphertext)))
+    assert time.perf_counter() - start < 1.0
+    assert any(c["key"] == 0xc3 for c in ranking)
+
+    result = xor_single_byte.invoke({"ciphertext": ciphertext[2_999_990:3_000_040].hex()})
+    assert result["flag"] == "flag{vectorised_xor}"
+
+def test_repeating_key_sizes_up_to_256():
+    """Tamaños de clave de 3 a 256: distancia de Hamming mínima en múltiplos y clave exacta por columnas"""
+    rng = random.Random(35)
+    text = (ENGLISH + b" " + ENGLISH.upper() + b"\n") * 150
+    for keysize, length in ((3, 300), (17, 2000), (256, len(text))):
+        key = rng.randbytes(keysize)
+        ciphertext = xor_with_key(text[:length], key)
+        best = break_repeating_key(ciphertext)[0]
+        assert best["key"] == key and best["keysize"] == keysize
+
+    distances = hamming_distances(xor_with_key(text, rng.randbytes(5)), max_keysize=20)
+    assert max(distances[[5, 10, 15, 20]]) < min(distances[k] for k in range(1, 21) if k % 5)
+
+def test_repeating_key_tool_flag():
+    """La herramienta acepta hex, devuelve la clave y la flag"""
+    plaintext = b"Repeating key XOR is Vigenere over bytes, so the flag is flag{hamming_distance_wins} today."
+    result = xor_repeating_key.invoke({"ciphertext": xor_with_key(plaintext, b"ICE").hex()})
+    assert result["success"] and result["key_text"] == "ICE"
+    assert result["flag"] == "flag{hamming_distance_wins}"
+
+def test_crib_reads_keys_the_statistics_miss():
+    """Clave de 10 bytes sobre 71 bytes: la estadística falla y "flag{" fija la clave en una pasada"""
+    rng = random.Random(36)
+    key = rng.randbytes(10)
+    plaintext = ENGLISH[:20] + b" flag{crib_dragging_is_linear} " + ENGLISH[20:40]
+    ciphertext = xor_with_key(plaintext, key)
+    assert break_repeating_key(ciphertext)[0]["key"] != key
+    assert crib_keys(ciphertext)[0]["key"] == key
+
+    result = attack_classical.invoke({"ciphertext": ciphertext.hex()})
+    assert result["success"] and result["key"] == key.hex() and "flag{crib_dragging_is_linear}" in result["plaintext"]
+
+    # Flag corta con un solo byte de clave: el crib no debe preferir un periodo más largo
+    for byte in (0x42, 0x13, 0x7f, 0xa5):
+        result = attack_classical.invoke({"ciphertext": xor_with_key(b"flag{xor_one_byte}", bytes([byte])).hex()})
+        assert result["success"] and result["plaintext"] == "flag{xor_one_byte}"
+        assert bytes.fromhex(result["key"]) == bytes([byte])
+
+def test_crib_tool_file_header_and_known_plaintext():
+    """Cabecera PNG en el offset 0 con clave de 9 bytes; texto conocido propio en un offset dado"""
+    rng = random.Random(37)
+    png = bytes.fromhex("89504e470d0a1a0a0000000d49484452") + rng.randbytes(2000) + b"IEND\xaeB`\x82"
+    key = rng.randbytes(9)
+    result = xor_crib_attack.invoke({"ciphertext": xor_with_key(png, key).hex()})
+    assert result["success"] and result["file_type"] == "png" and result["key"] == key.hex()
+    assert result["trailer_found"]
+
+    ciphertext = xor_with_key(ENGLISH * 2, b"sekrit")
+    result = xor_crib_attack.invoke({"ciphertext": ciphertext.hex(), "known_plaintext": "the worst of", "offset": 33})
+    assert result["success"] and result["key_text"] == "sekrit" and result["crib"] == "known"
+
+def test_beam_search_long_keys_on_short_ciphertexts():
+    """Claves de 40 y 64 bytes en cifrados cortos: el haz acierta donde fallan las columnas sueltas; el ruido no"""
+    rng = random.Random(5)
+    corpus = english_corpus()
+    for size, length in ((40, 300), (64, 480)):
+        offset = rng.randrange(len(corpus) - length)
+        plaintext = corpus[offset:offset + length].encode()
+        key = bytes(rng.randrange(256) for _ in range(size))
+        ciphertext = xor_with_key(plaintext, key)
+        beam = np.frombuffer(beam_keys(ciphertext)[0]["key"], dtype=np.uint8)
+        columns = np.frombuffer(break_repeating_key(ciphertext, 64)[0]["key"], dtype=np.uint8)
+        expected = np.frombuffer(key, dtype=np.uint8)
+        assert len(beam) == size and (beam == expected).mean() >= 0.95
+        assert len(columns) != size or (columns == expected).mean() < (beam == expected).mean()
+        if size == 40:
+            # Flag en medio del texto: la búsqueda para en cuanto la descifra
+            flagged = plaintext[:200] + b" flag{beam_search} " + plaintext[200:]
+            result = xor_beam_search.invoke({"ciphertext": xor_with_key(flagged, key).hex()})
+            assert result["flag"] == "flag{beam_search}" and result["keysizes_searched"] < 64
+
+    # Último recurso de attack_classical: base64 aleatorio no se da por descifrado
+    for length in (30, 45, 60, 90) * 3:
+        blob = base64.b64encode(bytes(rng.randrange(256) for _ in range(length))).decode()
+        assert not attack_classical.invoke({"ciphertext": blob})["success"]
@@ -5,22 +5,30 @@ Herramientas avanzadas adicionales para CTF Crypto
 import re
 import hashlib
 import itertools
+import time
 from typing import Dict, List, Any, Optional
 from langchain_core.tools import tool
 import subprocess
 import tempfile
 import os
+import numpy as np
+
+from .bytesource import (ENTROPY_STEP, ENTROPY_WINDOW, open_bytes, byte_histogram, bigram_histogram, letter_histogram,
+                         shannon_entropy, entropy_profile)
+from .rules import load_rules
+from .wordlist import COMMON_PASSWORDS, crack_file, crack_words, detect_algorithm, find_wordlist
 
 # ============ HERRAMIENTA 9: ANÁLISIS DE FRECUENCIAS ============
 
 @tool
-def frequency_analysis(text: str, language: str = "english") -> Dict[str, Any]:
+def frequency_analysis(text: str = "", language: str = "english", path: str = "") -> Dict[str, Any]:
     """
     Realiza análisis de frecuencias para criptoanálisis.
     
     Args:
         text: Texto a analizar
         language: Idioma para comparar frecuencias
+        path: Archivo a analizar en lugar de `text` (se lee por bloques con memmap)
         
     Returns:
         Dict con análisis de frecuencias y sugerencias
@@ -34,35 +42,28 @@ def frequency_analysis(text: str, language: str = "english") -> Dict[str, Any]:
         'Q': 0.10, 'Z': 0.07
     }
     
-    # Contar frecuencias en el texto
-    text_upper = text.upper()
-    letter_counts = {}
-    total_letters = 0
-    
-    for char in text_upper:
-        if char.isalpha():
-            letter_counts[char] = letter_counts.get(char, 0) + 1
-            total_letters += 1
+    # Contar letras A-Z con un histograma de bytes por bloques
+    try:
+        source = open_bytes(text, path)
+    except (OSError, ValueError) as e:
+        return {"success": False, "error": f"Cannot read {path}: {e}"}
+    letter_counts = letter_histogram(byte_histogram(source))
+    total_letters = int(letter_counts.sum())
     
     if total_letters == 0:
         return {"success": False, "error": "No letters found in text"}
     
     # Calcular frecuencias porcentuales
-    text_freq = {}
-    for letter, count in letter_counts.items():
-        text_freq[letter] = (count / total_letters) * 100
+    frequencies = letter_counts * 100 / total_letters
+    text_freq = {chr(65 + i): float(frequencies[i]) for i in np.flatnonzero(letter_counts)}
     
     # Calcular chi-cuadrado para medir similitud con inglés
-    chi_squared = 0
-    for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-        expected = english_freq.get(letter, 0)
-        observed = text_freq.get(letter, 0)
-        if expected > 0:
-            chi_squared += ((observed - expected) ** 2) / expected
+    expected = np.array([english_freq[chr(65 + i)] for i in range(26)])
+    chi_squared = float(((frequencies - expected) ** 2 / expected).sum())
     
     # Sugerir posibles shifts para Caesar
     suggestions = []
-    most_common = max(letter_counts.items(), key=lambda x: x[1])[0] if letter_counts else 'A'
+    most_common = chr(65 + int(letter_counts.argmax()))
     
     # Asumir que la letra más común es 'E'
     shift_to_e = (ord(most_common) - ord('E')) % 26
@@ -71,7 +72,17 @@ def frequency_analysis(text: str, language: str = "english") -> Dict[str, Any]:
         "shift": shift_to_e,
         "reason": f"Most common letter '{most_common}' mapped to 'E'"
     })
-    
+
+    # Perfil de frecuencias ordenado como el inglés pero letras cambiadas: sustitución general
+    sorted_text, sorted_english = np.sort(frequencies)[::-1], np.sort(expected)[::-1]
+    profile_chi = float(((sorted_text - sorted_english) ** 2 / sorted_english).sum())
+    if profile_chi < chi_squared / 2:
+        suggestions.append({
+            "type": "substitution",
+            "tool": "substitution_attack",
+            "reason": "Letter frequency profile matches English under a permutation"
+        })
+
     return {
         "success": True,
         "letter_frequencies": text_freq,
@@ -86,137 +97,147 @@ def frequency_analysis(text: str, language: str = "english") -> Dict[str, Any]:
 
 @tool
 def dictionary_attack(hash_value: str, hash_type: str = "auto", 
-                     wordlist: str = "common") -> Dict[str, Any]:
+                     wordlist: str = "common", workers: int = 0, timeout: int = 600,
+                     rules: str = "") -> Dict[str, Any]:
     """
     Realiza ataque de diccionario contra hashes.
     
     Args:
-        hash_value: Hash a crackear
-        hash_type: Tipo de hash (md5, sha1, sha256, auto)
-        wordlist: Wordlist a usar (common, rockyou)
+        hash_value: Hash a crackear (o varios separados por espacios o comas)
+        hash_type: Tipo de hash (md5, sha1, sha256, sha512, auto)
+        wordlist: Wordlist a usar (common, rockyou o ruta a un archivo)
+        workers: Procesos para wordlists en disco (0 = todos los núcleos)
+        timeout: Segundos máximos
+        rules: Reglas de mutación estilo hashcat ("default", ruta a un .rule o una regla
+            por línea); la lista "common" usa las integradas si se deja vacío
         
     Returns:
         Dict con resultado del ataque
     """
-    # Wordlists comunes
-    common_passwords = [
-        "password", "123456", "password123", "admin", "letmein",
-        "welcome", "monkey", "1234567890", "qwerty", "abc123",
-        "Password1", "password1", "root", "toor", "pass",
-        "test", "guest", "user", "login", "secret"
-    ]
+    start = time.perf_counter()
+    targets = [h.lower() for h in re.split(r'[\s,]+', hash_value.strip()) if h]
+    if not targets or not all(re.fullmatch(r'[0-9a-f]+', h) and len(h) % 2 == 0 for h in targets):
+        return {"success": False, "error": "Hash must be hexadecimal"}
     
     # Detectar tipo de hash automáticamente
     if hash_type == "auto":
-        hash_len = len(hash_value)
-        if hash_len == 32:
-            hash_type = "md5"
-        elif hash_len == 40:
-            hash_type = "sha1"
-        elif hash_len == 64:
-            hash_type = "sha256"
-        else:
-            return {"success": False, "error": f"Unknown hash length: {hash_len}"}
-    
-    # Función de hash
-    hash_functions = {
-        "md5": hashlib.md5,
-        "sha1": hashlib.sha1,
-        "sha256": hashlib.sha256
-    }
+        hash_type = detect_algorithm(targets[0])
+        if hash_type is None:
+            return {"success": False, "error": f"Unknown hash length: {len(targets[0])}"}
     
-    if hash_type not in hash_functions:
+    if hash_type not in hashlib.algorithms_available:
         return {"success": False, "error": f"Unsupported hash type: {hash_type}"}
     
-    hash_func = hash_functions[hash_type]
-    target_hash = hash_value.lower()
-    
-    # Probar passwords comunes
-    for password in common_passwords:
-        computed_hash = hash_func(password.encode()).hexdigest()
-        if computed_hash == target_hash:
-            return {
-                "success": True,
-                "password": password,
-                "hash_type": hash_type,
-                "method": "common_passwords"
-            }
-    
-    # Probar variaciones comunes
-    for base_password in ["password", "admin", "test"]:
-        for suffix in ["", "1", "123", "!", "@", "2023", "2024"]:
-            for prefix in ["", "1", "@"]:
-                candidate = prefix + base_password + suffix
-                computed_hash = hash_func(candidate.encode()).hexdigest()
-                if computed_hash == target_hash:
-                    return {
-                        "success": True,
-                        "password": candidate,
-                        "hash_type": hash_type,
-                        "method": "variations"
-                    }
+    rule_list = load_rules(rules or ("default" if wordlist == "common" else ""))
+    
+    if wordlist == "common":
+        # Contraseñas comunes y después sus mutaciones por reglas, generadas bajo demanda
+        attempts = 0
+        for method, mangling in (("common_passwords", ()), ("rules", rule_list)):
+            result = crack_words(COMMON_PASSWORDS, targets, hash_type, rules=mangling)
+            attempts += result["tested"]
+            if result["found"]:
+                return {
+                    "success": True,
+                    "password": result["found"].get(targets[0], next(iter(result["found"].values()))),
+                    "passwords": result["found"],
+                    "hash_type": hash_type,
+                    "method": method
+                }
+        return {
+            "success": False,
+            "attempts": attempts,
+            "rules": len(rule_list),
+            "hash_type": hash_type
+        }
     
-    return {
-        "success": False,
-        "attempts": len(common_passwords) + 30,  # Aproximado
-        "hash_type": hash_type
+    path = find_wordlist(wordlist)
+    if path is None:
+        return {"success": False, "error": f"Wordlist not found: {wordlist}", "hash_type": hash_type}
+    
+    # Wordlist en disco: mmap por bloques (× bloques de reglas) repartidos entre procesos
+    result = crack_file(path, targets, hash_type, workers=workers, timeout=timeout, rules=rule_list)
+    elapsed = time.perf_counter() - start
+    response = {
+        "success": bool(result["found"]),
+        "hash_type": hash_type,
+        "method": "wordlist+rules" if rule_list else "wordlist",
+        "wordlist": path,
+        "rules": len(rule_list),
+        "attempts": result["tested"],
+        "complete": result["complete"],
+        "workers": result["workers"],
+        "rate": round(result["tested"] / max(elapsed, 1e-9)),
+        "time": round(elapsed, 6)
     }
+    if result["found"]:
+        response["password"] = result["found"].get(targets[0], next(iter(result["found"].values())))
+        response["passwords"] = result["found"]
+    return response
 
 # ============ HERRAMIENTA 11: ANÁLISIS DE ENTROPÍA ============
 
 @tool
-def entropy_analysis(data: str, encoding: str = "auto") -> Dict[str, Any]:
+def entropy_analysis(data: str = "", encoding: str = "auto", path: str = "",
+                     window: int = ENTROPY_WINDOW) -> Dict[str, Any]:
     """
     Analiza entropía de datos para detectar cifrado/compresión.
     
     Args:
         data: Datos a analizar
         encoding: Encoding de los datos (auto, hex, base64, raw)
+        path: Archivo binario a analizar en lugar de `data` (memmap, memoria constante)
+        window: Ventana en bytes del perfil de entropía (múltiplo de ENTROPY_STEP)
         
     Returns:
-        Dict con análisis de entropía
+        Dict con análisis de entropía y regiones de alta entropía
     """
-    import math
-    from collections import Counter
+    import base64
+    
+    # El perfil avanza de ENTROPY_STEP en ENTROPY_STEP bytes: la ventana tiene que ser múltiplo
+    if window <= 0 or window % ENTROPY_STEP:
+        return {"success": False, "error": f"window must be a positive multiple of {ENTROPY_STEP}"}
     
     # Detectar encoding automáticamente
-    if encoding == "auto":
-        if all(c in '0123456789abcdefABCDEF' for c in data.replace(' ', '')):
-            encoding = "hex"
-            try:
-                data_bytes = bytes.fromhex(data.replace(' ', ''))
-            except:
-                data_bytes = data.encode()
-        else:
-            try:
-                import base64
-                decoded = base64.b64decode(data)
-                if all(32 <= b <= 126 or b in [9, 10, 13] for b in decoded):
-                    encoding = "base64"
-                    data_bytes = decoded
-                else:
+    if path:
+        encoding = "raw"
+        try:
+            source = open_bytes(path=path)
+        except (OSError, ValueError) as e:
+            return {"success": False, "error": f"Cannot read {path}: {e}"}
+    else:
+        compact = data.replace(' ', '')
+        if encoding == "auto":
+            if re.fullmatch(r'[0-9a-fA-F]*', compact):
+                encoding = "hex"
+                try:
+                    data_bytes = bytes.fromhex(compact)
+                except ValueError:
+                    data_bytes = data.encode()
+            else:
+                try:
+                    decoded = base64.b64decode(data)
+                    if re.fullmatch(rb'[\x20-\x7e\t\n\r]*', decoded):
+                        encoding = "base64"
+                        data_bytes = decoded
+                    else:
+                        encoding = "raw"
+                        data_bytes = data.encode()
+                except Exception:
                     encoding = "raw"
                     data_bytes = data.encode()
-            except:
-                encoding = "raw"
-                data_bytes = data.encode()
-    else:
-        if encoding == "hex":
-            data_bytes = bytes.fromhex(data.replace(' ', ''))
+        elif encoding == "hex":
+            data_bytes = bytes.fromhex(compact)
         elif encoding == "base64":
-            import base64
             data_bytes = base64.b64decode(data)
         else:
             data_bytes = data.encode()
+        source = open_bytes(data_bytes)
     
-    # Calcular entropía de Shannon
-    byte_counts = Counter(data_bytes)
-    total_bytes = len(data_bytes)
-    
-    entropy = 0
-    for count in byte_counts.values():
-        probability = count / total_bytes
-        entropy -= probability * math.log2(probability)
+    # Calcular entropía de Shannon sobre el histograma de bytes
+    byte_counts = byte_histogram(source)
+    total_bytes = len(source)
+    entropy = float(shannon_entropy(byte_counts))
     
     # Análisis de patrones
     max_entropy = 8.0  # Para bytes (2^8 = 256 posibilidades)
@@ -232,13 +253,10 @@ def entropy_analysis(data: str, encoding: str = "auto") -> Dict[str, Any]:
     else:
         classification = "structured"  # Texto plano o cifrado débil
     
-    # Detectar patrones repetitivos
-    patterns = {}
-    for i in range(len(data_bytes) - 1):
-        bigram = data_bytes[i:i+2]
-        patterns[bigram] = patterns.get(bigram, 0) + 1
-    
-    most_common_pattern = max(patterns.items(), key=lambda x: x[1]) if patterns else None
+    # Detectar patrones repetitivos (histograma de pares de bytes)
+    patterns = bigram_histogram(source)
+    pattern = int(patterns.argmax())
+    pattern_frequency = int(patterns[pattern])
     
     return {
         "entropy": entropy,
@@ -246,11 +264,13 @@ def entropy_analysis(data: str, encoding: str = "auto") -> Dict[str, Any]:
         "entropy_ratio": entropy_ratio,
         "classification": classification,
         "total_bytes": total_bytes,
-        "unique_bytes": len(byte_counts),
-        "most_common_byte": max(byte_counts.items(), key=lambda x: x[1])[0],
-        "most_common_pattern": most_common_pattern[0].hex() if most_common_pattern else None,
-        "pattern_frequency": most_common_pattern[1] if most_common_pattern else 0,
-        "detected_encoding": encoding
+        "unique_bytes": int(np.count_nonzero(byte_counts)),
+        "most_common_byte": int(byte_counts.argmax()),
+        "most_common_pattern": bytes([pattern >> 8, pattern & 0xff]).hex() if pattern_frequency else None,
+        "pattern_frequency": pattern_frequency,
+        "detected_encoding": encoding,
+        # Ventanas deslizantes: localiza cifrados incrustados (p. ej. dentro de un PNG)
+        "entropy_profile": entropy_profile(source, window=window)
     }
 
 # ============ HERRAMIENTA 12: GENERADOR DE EXPLOITS ============
@@ -0,0 +1,211 @@
+"""
+Familia ROT/afín: ROT-N, Atbash, las 312 claves afines, ROT47 y alfabetos
+personalizados. Las tablas de str.translate / bytes.translate se precalculan
+y el barrido completo se puntúa sin descifrar: cada clave es una permutación
+del histograma de trigramas del cifrado.
+"""
+
+import re
+import string
+import time
+from functools import lru_cache
+from math import gcd
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from langchain_core.tools import tool
+
+from .ngrams import LANGUAGES, letter_codes, ngram_indices, ngram_table, score_many
+
+LOWER = string.ascii_lowercase
+UPPER = string.ascii_uppercase
+# Multiplicadores invertibles módulo 26 y las 12·26 = 312 claves afines E(x) = a·x + b
+MULTIPLIERS = tuple(a for a in range(1, 26) if gcd(a, 26) == 1)
+AFFINE_KEYS = tuple((a, b) for a in MULTIPLIERS for b in range(26))
+# Caracteres de ROT47 (ASCII imprimible sin espacio)
+ROT47_CHARS = "".join(chr(c) for c in range(33, 127))
+# Candidatos que se descifran enteros tras el barrido (además de los que contienen "flag{")
+DEFAULT_TOP_K = 5
+# Caracteres de cada candidato que se puntúan con score_many
+SAMPLE_CHARS = 4096
+
+# Letra en claro de cada letra cifrada para cada clave afín: DECRYPT[k, c] = a⁻¹·(c - b)
+DECRYPT = np.array([[pow(a, -1, 26) * (c - b) % 26 for c in range(26)] for a, b in AFFINE_KEYS], dtype=np.int32)
+
+# ============ TABLAS ============
+
+def key_name(a: int, b: int) -> str:
+    """Nombre habitual de una clave afín"""
+    if a == 1:
+        return f"ROT{b}"
+    if (a, b) == (25, 25):
+        return "Atbash"
+    return f"Affine(a={a}, b={b})"
+
+@lru_cache(maxsize=None)
+def affine_table(a: int, b: int, alphabet: str = LOWER) -> Dict[int, int]:
+    """
+    Tabla de str.translate que descifra E(x) = a·x + b sobre el alfabeto
+    (si es el abecedario en minúsculas también se aplica a las mayúsculas).
+    """
+    size = len(alphabet)
+    source = "".join(alphabet[(a * x + b) % size] for x in range(size))
+    table = str.maketrans(source, alphabet)
+    if alphabet == LOWER:
+        table.update(str.maketrans(source.upper(), UPPER))
+    return table
+
+@lru_cache(maxsize=None)
+def affine_bytes_table(a: int, b: int) -> bytes:
+    """Tabla de bytes.translate equivalente para letras ASCII"""
+    source = "".join(LOWER[(a * x + b) % 26] for x in range(26))
+    return bytes.maketrans((source + source.upper()).encode(), (LOWER + UPPER).encode())
+
+ROT47_TABLE = str.maketrans(ROT47_CHARS, ROT47_CHARS[47:] + ROT47_CHARS[:47])
+
+def alphabet_keys(alphabet: str) -> List[Tuple[int, int]]:
+    """Claves afines (a, b) válidas para un alfabeto de cualquier tamaño"""
+    size = len(alphabet)
+    return [(a, b) for a in range(1, size) if gcd(a, size) == 1 for b in range(size)]
+
+def apply(text, a: int, b: int, alphabet: str = LOWER):
+    """Descifra str o bytes con la clave afín (a, b)"""
+    if isinstance(text, (bytes, bytearray)):
+        return bytes(text).translate(affine_bytes_table(a, b))
+    return text.translate(affine_table(a, b, alphabet))
+
+def rotations(text: str) -> List[str]:
+    """Los 26 descifrados ROT-N (índice N = desplazamiento con el que se cifró)"""
+    return [text.translate(affine_table(1, n)) for n in range(26)]
+
+# ============ BARRIDO ============
+
+def sweep_scores(text, languages=LANGUAGES) -> np.ndarray:
+    """
+    Log-probabilidad media por letra (modelo de trigramas) del descifrado con
+    cada una de las 312 claves, sin descifrar: el histograma de trigramas del
+    cifrado se calcula una vez y cada clave sólo reindexa sus celdas no nulas.
+
+    Returns:
+        Array (312,) alineado con AFFINE_KEYS (el mejor idioma por clave)
+    """
+    codes = letter_codes(text)
+    hist = np.bincount(ngram_indices(codes, 3), minlength=26 ** 3)
+    cells = np.flatnonzero(hist)
+    if len(cells) == 0:
+        return np.full(len(AFFINE_KEYS), -np.inf)
+    # Índice del trigrama en claro de cada celda para cada clave: (312, celdas)
+    plain = DECRYPT[:, cells // 676] * 676 + DECRYPT[:, cells // 26 % 26] * 26 + DECRYPT[:, cells % 26]
+    weights = hist[cells].astype(np.float64)
+    scores = np.stack([np.asarray(ngram_table(3, language))[plain] @ weights for language in languages])
+    return scores.max(axis=0) / weights.sum()
+
+def flag_candidates(text: str, keys=AFFINE_KEYS, alphabet: str = LOWER) -> List[Tuple[int, int]]:
+    """
+    Claves que convierten en "flag" las 4 letras que preceden a alguna "{":
+    se buscan las llaves una vez y se comparan con "flag" cifrado con cada clave.
+    """
+    size = len(alphabet)
+    encrypted = {"".join(alphabet[(a * alphabet.index(c) + b) % size] for c in "flag"): (a, b)
+                 for a, b in keys if all(c in alphabet for c in "flag")}
+    source = text.lower() if alphabet == LOWER else text
+    found = []
+    for match in re.finditer(r'(.{4})\{', source):
+        key = encrypted.get(match.group(1))
+        if key and key not in found:
+            found.append(key)
+    return found
+
+def sweep(text: str, alphabet: str = "", top_k: int = DEFAULT_TOP_K) -> List[Dict[str, Any]]:
+    """
+    Barrido completo: 312 claves afines (incluye ROT-N y Atbash) puntuadas por
+    histograma, más ROT47; las mejores y las que dan "flag{" se descifran con
+    str.translate y se vuelven a puntuar juntas con score_many.
+    Con `alphabet` se barren todas las claves afines de ese alfabeto.
+
+    Returns:
+        Candidatos ordenados (flag primero) con 'family', 'key', 'plaintext', 'score', 'confident'
+    """
+    if alphabet and alphabet != LOWER:
+        keys = alphabet_keys(alphabet)
+        sample = text[:SAMPLE_CHARS]
+        texts = [apply(sample, a, b, alphabet) for a, b in keys]
+        ranked = np.argsort(-score_many(texts)["score"], kind="stable")[:top_k]
+        chosen = [keys[i] for i in ranked]
+    else:
+        alphabet = LOWER
+        keys = list(AFFINE_KEYS)
+        ranked = np.argsort(-sweep_scores(text), kind="stable")[:top_k]
+        chosen = [keys[i] for i in ranked]
+    for key in flag_candidates(text, keys, alphabet):
+        if key not in chosen:
+            chosen.insert(0, key)
+
+    candidates = [{"family": "ROT47" if key is None else ("Affine" if alphabet == LOWER else "Affine (custom)"),
+                   "key": key}
+                  for key in chosen + [None]]
+    for candidate in candidates:
+        key = candidate["key"]
+        candidate["plaintext"] = text.translate(ROT47_TABLE) if key is None else apply(text, *key, alphabet)
+        if key is not None and alphabet == LOWER:
+            candidate["name"] = key_name(*key)
+            candidate["family"] = "ROT" if key[0] == 1 else ("Atbash" if key == (25, 25) else "Affine")
+    scores = score_many([c["plaintext"][:SAMPLE_CHARS] for c in candidates])
+    for i, candidate in enumerate(candidates):
+        candidate["score"] = float(scores["score"][i])
+        candidate["language"] = str(scores["language"][i])
+        candidate["confident"] = bool(scores["confident"][i])
+        flag = re.search(r'flag\{[^}]*\}', candidate["plaintext"], re.IGNORECASE)
+        candidate["flag"] = flag.group() if flag else None
+    candidates.sort(key=lambda c: (c["flag"] is None, not c["confident"], -c["score"]))
+    return candidates
+
+# ============ HERRAMIENTA ============
+
+@tool
+def rot_affine_attack(ciphertext: str, alphabet: str = "", top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+    """
+    Prueba todas las claves de la familia ROT/afín (ROT-N, Atbash, 312 claves
+    afines y ROT47, o un alfabeto personalizado) y las ordena con el modelo de
+    n-gramas sin descifrar el texto completo para cada clave.
+
+    Args:
+        ciphertext: Texto cifrado
+        alphabet: Alfabeto personalizado (vacío = abecedario, mayúsculas y minúsculas)
+        top_k: Candidatos a descifrar y devolver
+
+    Returns:
+        Dict con 'family', 'key', 'plaintext', 'candidates' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        candidates = sweep(ciphertext, alphabet, top_k)
+        best = candidates[0]
+        result = {
+            "success": bool(best["flag"]) or best["confident"],
+            "attack_type": "ROT/Affine",
+            "family": best["family"],
+            "key": best["key"],
+            "plaintext": best["plaintext"],
+            "score": round(best["score"], 4),
+            "language": best["language"],
+            "candidates": [{"family": c["family"], "key": c["key"], "name": c.get("name", c["family"]),
+                            "score": round(c["score"], 4), "preview": c["plaintext"][:80]}
+                           for c in candidates[:top_k]],
+            "time": round(time.perf_counter() - start, 6),
+        }
+        if "name" in best:
+            result["name"] = best["name"]
+        if best["flag"]:
+            result["flag"] = best["flag"]
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "ROT/Affine",
+            "error": str(e)
+        }
+
+AFFINE_TOOLS = [
+    rot_affine_attack
+]
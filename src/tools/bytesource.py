@@ -0,0 +1,163 @@
+"""
+Fuente de bytes por bloques para estadísticas de cifrados grandes: los
+archivos se abren como np.memmap (el sistema operativo pagina bajo demanda)
+y los histogramas se acumulan bloque a bloque con np.bincount, así que la
+memoria no crece con el tamaño de la entrada.
+"""
+
+import heapq
+import os
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+import numpy as np
+
+# Bytes por bloque de lectura
+CHUNK_BYTES = 1 << 20
+# Ventana y paso (bytes) del perfil de entropía deslizante
+ENTROPY_WINDOW = 1024
+ENTROPY_STEP = 512
+# Entropía (bits/byte) de una ventana que se considera cifrada o comprimida
+HIGH_ENTROPY_BITS = 7.2
+# Regiones de alta entropía que se devuelven (las más largas) y puntos del perfil resumido
+MAX_REGIONS = 16
+PROFILE_POINTS = 128
+
+# ============ FUENTE ============
+
+def open_bytes(data: Union[str, bytes, None] = None, path: str = "") -> np.ndarray:
+    """
+    Bytes de la entrada como array uint8 sin copiar: np.memmap de sólo
+    lectura si se da `path`, o una vista sobre los bytes en memoria.
+    Un archivo que no existe o no se puede leer lanza OSError; uno vacío
+    (que np.memmap no puede mapear), ValueError.
+    """
+    if path:
+        if os.path.getsize(path) == 0:
+            raise ValueError("file is empty")
+        return np.memmap(path, dtype=np.uint8, mode='r')
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return np.frombuffer(bytes(data or b""), dtype=np.uint8)
+
+def iter_chunks(source: np.ndarray, chunk: int = CHUNK_BYTES, overlap: int = 0) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Recorre la fuente en bloques de `chunk` bytes. Cada vista incluye
+    además los `overlap` bytes siguientes, para n-gramas y ventanas que
+    cruzan el borde del bloque.
+    """
+    for offset in range(0, len(source), chunk):
+        yield offset, np.asarray(source[offset:offset + chunk + overlap])
+
+# ============ HISTOGRAMAS ============
+
+def byte_histogram(source: np.ndarray) -> np.ndarray:
+    """Cuentas de los 256 valores de byte"""
+    counts = np.zeros(256, dtype=np.int64)
+    for _, view in iter_chunks(source):
+        counts += np.bincount(view, minlength=256)
+    return counts
+
+def bigram_histogram(source: np.ndarray) -> np.ndarray:
+    """Cuentas de los 65536 pares de bytes consecutivos (el par del borde se cuenta una vez)"""
+    counts = np.zeros(1 << 16, dtype=np.int64)
+    for _, view in iter_chunks(source, overlap=1):
+        if len(view) > 1:
+            counts += np.bincount(view[:-1].astype(np.int64) << 8 | view[1:], minlength=1 << 16)
+    return counts
+
+def letter_histogram(byte_counts: np.ndarray) -> np.ndarray:
+    """Cuentas de A-Z (mayúsculas y minúsculas juntas) a partir del histograma de bytes"""
+    return byte_counts[65:91] + byte_counts[97:123]
+
+def shannon_entropy(counts: np.ndarray) -> np.ndarray:
+    """Entropía en bits de cada histograma (última dimensión)"""
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=-1, keepdims=True)
+    p = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    logs = np.log2(p, out=np.zeros_like(p), where=p > 0)
+    return -(p * logs).sum(axis=-1)
+
+# ============ PERFIL DE ENTROPÍA ============
+
+def _window_histograms(view: np.ndarray, window: int, step: int) -> np.ndarray:
+    """
+    Histogramas de todas las ventanas de una vista: un histograma por paso
+    (un solo bincount) y la suma de window/step pasos consecutivos.
+    """
+    blocks = len(view) // step
+    cells = view[:blocks * step].reshape(blocks, step) + (np.arange(blocks, dtype=np.int64) << 8)[:, None]
+    counts = np.bincount(cells.ravel(), minlength=blocks << 8).reshape(blocks, 256).astype(np.int32)
+    span = window // step
+    windows = counts[:blocks - span + 1].copy()
+    for shift in range(1, span):
+        windows += counts[shift:blocks - span + 1 + shift]
+    return windows
+
+def entropy_profile(source: np.ndarray, window: int = ENTROPY_WINDOW, step: int = ENTROPY_STEP,
+                    threshold: float = HIGH_ENTROPY_BITS) -> Dict[str, Any]:
+    """
+    Entropía de una ventana deslizante sobre toda la fuente, bloque a bloque.
+    Las ventanas consecutivas por encima de `threshold` se unen en regiones
+    (p. ej. un cifrado incrustado en un PNG); la memoria es la de un bloque
+    más las MAX_REGIONS regiones más largas y el perfil resumido.
+
+    Returns:
+        Dict con 'regions' (offset, length, mean_entropy), 'profile' (máximo
+        por tramo, hasta PROFILE_POINTS tramos), 'windows', 'window' y 'step'
+    """
+    if window % step:
+        raise ValueError("window debe ser múltiplo de step")
+    total_windows = max(0, (len(source) - window) // step + 1)
+    points = max(1, min(PROFILE_POINTS, total_windows))
+    profile = np.zeros(points)
+    regions: List[Tuple[int, int, float]] = []
+    current: Optional[List[float]] = None
+    windows = 0
+    # c·log2(c) tabulado: la entropía de cada ventana sale de una consulta por celda
+    counts = np.arange(window + 1)
+    plogp = counts * np.log2(np.maximum(counts, 1))
+
+    def close(region):
+        start, end, entropy_sum, count = region
+        item = (end - start, start, entropy_sum / count)
+        if len(regions) < MAX_REGIONS:
+            heapq.heappush(regions, item)
+        else:
+            heapq.heappushpop(regions, item)
+
+    chunk = max(step, CHUNK_BYTES - CHUNK_BYTES % step)
+    for offset, view in iter_chunks(source, chunk, overlap=window - step):
+        if len(view) < window:
+            break
+        # Sólo las ventanas que empiezan dentro del bloque: el resto las cubre el siguiente
+        histograms = _window_histograms(view, window, step)[:chunk // step]
+        entropy = np.log2(window) - plogp[histograms].sum(axis=1) / window
+        index = offset // step + np.arange(len(entropy))
+        starts = index * step
+        windows += len(entropy)
+        np.maximum.at(profile, index * points // max(total_windows, 1), entropy)
+
+        high = entropy >= threshold
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], high, [False])).astype(np.int8)))
+        for first, last in zip(edges[::2], edges[1::2]):
+            start, end = int(starts[first]), int(starts[last - 1]) + window
+            entropy_sum, count = float(entropy[first:last].sum()), int(last - first)
+            if current is not None and first == 0 and current[1] >= start:
+                current[1], current[2], current[3] = end, current[2] + entropy_sum, current[3] + count
+                continue
+            if current is not None:
+                close(current)
+            current = [start, end, entropy_sum, count]
+        if current is not None and not (len(high) and high[-1]):
+            close(current)
+            current = None
+    if current is not None:
+        close(current)
+
+    return {
+        "regions": [{"offset": start, "length": length, "mean_entropy": round(mean, 4)}
+                    for length, start, mean in sorted(regions, key=lambda r: r[1])],
+        "profile": np.round(profile, 3).tolist(),
+        "windows": windows,
+        "window": window,
+        "step": step,
+    }
@@ -0,0 +1,189 @@
+"""
+Evaluación de candidatos en dos fases para los bucles de fuerza bruta: cada
+clave descifra sólo una ventana pequeña (el principio del cifrado o los
+caracteres que preceden a una "{") y sólo las claves cuya ventana puede dar
+texto imprimible o una flag se descifran enteras. El coste por clave deja de
+depender del tamaño del cifrado.
+
+Los ataques de fuerza bruta pueden además ser generadores de Candidate:
+consume() guarda los k mejores en un montículo acotado y corta el generador
+en cuanto aparece un candidato concluyente.
+"""
+
+import heapq
+import re
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .ngrams import PRINTABLE_BYTES
+
+# Bytes (o caracteres) del principio del cifrado que se descifran con cada clave
+PREFIX_BYTES = 16
+# Proporción mínima de imprimibles en la ventana descifrada de un texto
+PRINTABLE_PREFIX = 0.9
+# Letras antes de cada "{" que se descifran en los cifrados de letras ("flag" son 4)
+BRACE_WINDOW = 4
+# Candidatos que conserva el montículo de los mejores y caracteres de cada muestra
+TOP_K = 5
+PREVIEW_CHARS = 50
+
+# Flag completa en el texto descifrado
+FLAG_PATTERN = re.compile(r'flag\{[^}]*\}', re.IGNORECASE)
+
+Text = Union[str, bytes]
+
+# ============ FILTROS DE VENTANA ============
+
+def _as_bytes(window: Text) -> bytes:
+    return window.encode('utf-8', errors='ignore') if isinstance(window, str) else bytes(window)
+
+def plausible(window: Text) -> bool:
+    """La ventana descifrada es texto: al menos PRINTABLE_PREFIX de bytes imprimibles"""
+    data = np.frombuffer(_as_bytes(window), dtype=np.uint8)
+    return bool(len(data)) and PRINTABLE_BYTES[data].mean() >= PRINTABLE_PREFIX
+
+def flag_shaped(window: Text) -> bool:
+    """La ventana contiene "flag{" (en cualquier combinación de mayúsculas)"""
+    return b"flag{" in _as_bytes(window).lower()
+
+def find_flag(plaintext: Text) -> Optional[str]:
+    """Primera flag completa flag{...} del texto descifrado"""
+    text = plaintext.decode('utf-8', errors='ignore') if isinstance(plaintext, bytes) else plaintext
+    match = FLAG_PATTERN.search(text)
+    return match.group() if match else None
+
+# ============ VENTANAS ============
+
+def brace_windows(text: str, width: int = BRACE_WINDOW) -> List[Tuple[int, int, int]]:
+    """
+    Ventanas de los cifrados de letras: los cifrados ROT/afín/Vigenère
+    conservan la "{", así que "flag{" sólo puede salir de las `width` letras
+    que la preceden.
+
+    Returns:
+        (inicio, fin, letras A-Z antes del inicio) de cada ventana, con la "{" incluida;
+        el recuento alinea la clave de los cifrados periódicos
+    """
+    windows = []
+    letters, counted = 0, 0
+    for match in re.finditer(r'\{', text):
+        start = match.start()
+        found = 0
+        while start > 0 and found < width:
+            start -= 1
+            found += text[start].isascii() and text[start].isalpha()
+        # Recuento incremental: cada letra del texto se cuenta una sola vez
+        if start >= counted:
+            letters += len(re.findall(r'[A-Za-z]', text[counted:start]))
+        else:
+            letters -= len(re.findall(r'[A-Za-z]', text[start:counted]))
+        counted = start
+        windows.append((start, match.end(), letters))
+    return windows
+
+def window_text(text: str, windows: List[Tuple[int, int, int]]) -> str:
+    """Las ventanas concatenadas, separadas por saltos de línea"""
+    return "\n".join(text[start:end] for start, end, _ in windows)
+
+# ============ EVALUACIÓN EN DOS FASES ============
+
+def survivors(keys: Iterable[Any], decrypt: Callable[[Any, Text], Text], window: Text,
+              accept: Callable[[Text], bool] = plausible) -> List[Any]:
+    """Claves cuya ventana descifrada pasa `accept` (las demás no se descifran enteras)"""
+    return [key for key in keys if accept(decrypt(key, window))]
+
+def decrypt_survivors(keys: Iterable[Any], decrypt: Callable[[Any, Text], Text], data: Text,
+                      window: Optional[Text] = None,
+                      accept: Callable[[Text], bool] = plausible) -> Iterator[Tuple[Any, Text]]:
+    """
+    (clave, texto descifrado completo) de las claves que sobreviven a la ventana.
+    Sin `window` se usa el principio del cifrado (PREFIX_BYTES).
+    """
+    window = data[:PREFIX_BYTES] if window is None else window
+    for key in survivors(keys, decrypt, window, accept):
+        yield key, decrypt(key, data)
+
+def first_flag(keys: Iterable[Any], decrypt: Callable[[Any, Text], Text], data: Text,
+               window: Optional[Text] = None,
+               accept: Callable[[Text], bool] = plausible) -> Optional[Tuple[Any, Text, str]]:
+    """Primera clave superviviente cuyo descifrado completo contiene una flag: (clave, texto, flag)"""
+    for key, plaintext in decrypt_survivors(keys, decrypt, data, window, accept):
+        flag = find_flag(plaintext)
+        if flag:
+            return key, plaintext, flag
+    return None
+
+# ============ PROTOCOLO DE GENERADORES ============
+
+class Candidate(NamedTuple):
+    """
+    Candidato que produce un ataque generador: puntuación (mayor es mejor),
+    clave, texto descifrado (o una vista/muestra de él), familia del ataque,
+    si es concluyente (flag o texto natural con confianza) y los campos que
+    el consumidor copia al resultado.
+    """
+    score: float
+    key: Any
+    plaintext: Text
+    family: str
+    found: bool = False
+    info: Optional[Dict[str, Any]] = None
+
+def preview(plaintext: Text, chars: int = PREVIEW_CHARS) -> str:
+    """Primeros caracteres del texto descifrado, como str"""
+    head = plaintext[:chars * 4] if isinstance(plaintext, (bytes, bytearray, memoryview)) else plaintext
+    text = bytes(head).decode('utf-8', errors='ignore') if not isinstance(head, str) else head
+    return text[:chars]
+
+class TopK:
+    """
+    Los k mejores candidatos vistos, en un montículo acotado (memoria O(k)
+    aunque el generador recorra millones de claves), y cuántos candidatos
+    produjo cada familia.
+    """
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.counts: Dict[str, int] = {}
+        self._heap: List[Tuple[float, int, Candidate]] = []
+        self._order = count()
+
+    def push(self, candidate: Candidate) -> None:
+        self.counts[candidate.family] = self.counts.get(candidate.family, 0) + 1
+        # El contador desempata y conserva el primero a igual puntuación
+        item = (candidate.score, -next(self._order), candidate)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def best(self) -> List[Candidate]:
+        """Candidatos de mayor a menor puntuación"""
+        return [candidate for _, _, candidate in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+    def samples(self) -> List[Tuple[str, Any, str]]:
+        """(familia, clave, muestra del texto) de los mejores candidatos"""
+        return [(c.family, c.key, preview(c.plaintext)) for c in self.best()]
+
+def consume(candidates: Iterator[Candidate], k: int = TOP_K,
+            stop: Callable[[Candidate], bool] = lambda candidate: candidate.found) -> Tuple[Optional[Candidate], TopK]:
+    """
+    Recorre un ataque generador guardando los k mejores candidatos y se
+    detiene en el primero que cumple `stop` (por defecto, el primero
+    concluyente): el generador se cierra y no se prueban más claves.
+
+    Returns:
+        (candidato que detuvo la búsqueda o None, montículo con los mejores)
+    """
+    top = TopK(k)
+    try:
+        for candidate in candidates:
+            top.push(candidate)
+            if stop(candidate):
+                return candidate, top
+    finally:
+        if hasattr(candidates, "close"):
+            candidates.close()
+    return None, top
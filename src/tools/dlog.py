@@ -0,0 +1,524 @@
+"""
+Herramientas de logaritmo discreto para CTF Crypto
+Pohlig-Hellman + Baby-step/Giant-step + Pollard rho (puntos distinguidos)
+sobre Z_p^* y sobre cualquier grupo que implemente la interfaz de grupo
+"""
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from langchain_core.tools import tool
+
+try:
+    import gmpy2
+    GMPY2_AVAILABLE = True
+except ImportError:
+    GMPY2_AVAILABLE = False
+
+# Subgrupos hasta este orden se resuelven con BSGS (tabla de ~2^18 entradas)
+BSGS_LIMIT = 2 ** 36
+# Por encima de este orden ni Pollard rho termina en tiempo razonable
+RHO_LIMIT = 2 ** 72
+# Número de multiplicadores del paseo r-adding de Pollard rho
+RHO_PARTITIONS = 32
+FINGERPRINT_MASK = (1 << 64) - 1
+# Subproblemas de Pohlig-Hellman con primos mayores se reparten entre procesos
+PARALLEL_PRIME_LIMIT = 2 ** 20
+
+# ============ TEORÍA DE NÚMEROS ============
+
+def is_probable_prime(n: int, rounds: int = 24) -> bool:
+    """Test de Miller-Rabin (determinista para n < 3.3e24)"""
+    if n < 2:
+        return False
+    if GMPY2_AVAILABLE:
+        return bool(gmpy2.is_prime(n, rounds))
+    small_primes = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+    for p in small_primes:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in small_primes[:min(rounds, len(small_primes))]:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def _pollard_brent(n: int, deadline: float) -> Optional[int]:
+    """Busca un factor no trivial de n con Pollard rho (variante de Brent)"""
+    if n % 2 == 0:
+        return 2
+    rng = random.Random(n)
+    while time.time() < deadline:
+        y, c, m = rng.randrange(1, n), rng.randrange(1, n), 128
+        g, r, q = 1, 1, 1
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+                if time.time() > deadline:
+                    return None
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+    return None
+
+def factorize(n: int, trial_limit: int = 100000, timeout: float = 10.0) -> Tuple[Dict[int, int], int]:
+    """
+    Factoriza n con división por tentativa + Pollard-Brent.
+
+    Returns:
+        (factores primos {p: exponente}, cofactor sin factorizar)
+    """
+    factors: Dict[int, int] = {}
+    deadline = time.time() + timeout
+
+    for p in (2, 3, 5):
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+
+    # Rueda 2·3·5 para la división por tentativa
+    p, steps, i = 7, (4, 2, 4, 2, 4, 6, 2, 6), 0
+    while p <= trial_limit and p * p <= n:
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+        p += steps[i]
+        i = (i + 1) % 8
+
+    pending, cofactor = [n] if n > 1 else [], 1
+    while pending:
+        m = pending.pop()
+        if m == 1:
+            continue
+        if m <= trial_limit ** 2 or is_probable_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        d = _pollard_brent(m, deadline)
+        if d is None:
+            cofactor *= m
+            continue
+        pending.extend([d, m // d])
+
+    return factors, cofactor
+
+def crt(residues: List[int], moduli: List[int]) -> Tuple[int, int]:
+    """Teorema chino del resto para módulos coprimos -> (x, M)"""
+    x, modulus = 0, 1
+    for r, m in zip(residues, moduli):
+        # x ≡ r (mod m)  combinado con  x ≡ x (mod modulus)
+        t = (r - x) * pow(modulus, -1, m) % m
+        x += modulus * t
+        modulus *= m
+    return x % modulus, modulus
+
+# ============ INTERFAZ DE GRUPO ============
+
+class MultiplicativeGroup:
+    """
+    Grupo multiplicativo Z_n^*.
+
+    Cualquier grupo usado por los algoritmos de DLP debe exponer la misma
+    interfaz: identity, op, pow, inverse, key (representación entera
+    hashable del elemento) y fingerprint (64 bits bajos de key, usados
+    por las tablas de BSGS y Pollard rho).
+    """
+
+    def __init__(self, modulus: int):
+        self.modulus = gmpy2.mpz(modulus) if GMPY2_AVAILABLE else modulus
+        self.identity = 1
+
+    def op(self, a, b):
+        return a * b % self.modulus
+
+    def pow(self, a, k: int):
+        return pow(a, k, self.modulus)
+
+    def inverse(self, a):
+        return pow(a, -1, self.modulus)
+
+    def key(self, a) -> int:
+        return int(a)
+
+    def fingerprint(self, a) -> int:
+        return int(a & FINGERPRINT_MASK)
+
+    def element(self, value: int):
+        return gmpy2.mpz(value) % self.modulus if GMPY2_AVAILABLE else value % self.modulus
+
+    def __getstate__(self):
+        return {"modulus": int(self.modulus)}
+
+    def __setstate__(self, state):
+        self.__init__(state["modulus"])
+
+def element_order(group, g, order: int, factors: Dict[int, int]) -> Tuple[int, Dict[int, int]]:
+    """Reduce el orden del grupo al orden exacto de g"""
+    exact = {}
+    for q, e in factors.items():
+        while e > 0 and group.key(group.pow(g, order // q)) == group.key(group.identity):
+            order //= q
+            e -= 1
+        if e:
+            exact[q] = e
+    return order, exact
+
+# ============ BABY-STEP / GIANT-STEP ============
+
+def bsgs(group, g, h, order: int, lower: int = 0) -> Optional[int]:
+    """
+    Baby-step/giant-step en un subgrupo de orden `order`.
+
+    La tabla de baby steps guarda solo los 64 bits bajos de cada elemento
+    (enteros pequeños de Python en lugar de elementos de 2048 bits); cada
+    coincidencia se verifica antes de devolverla.
+    """
+    m = math.isqrt(max(order - 1, 0)) + 1
+    fingerprint = group.fingerprint
+
+    table = {}
+    e = group.identity
+    for j in range(m):
+        table.setdefault(fingerprint(e), j)
+        e = group.op(e, g)
+
+    # gamma = h · g^(-lower),  factor = g^(-m)
+    gamma = group.op(h, group.inverse(group.pow(g, lower))) if lower else h
+    factor = group.inverse(group.pow(g, m))
+
+    for i in range(m + 1):
+        j = table.get(fingerprint(gamma))
+        if j is not None:
+            x = lower + i * m + j
+            if group.key(group.pow(g, x)) == group.key(h):
+                return x % order if order else x
+        gamma = group.op(gamma, factor)
+    return None
+
+# ============ POLLARD RHO (PUNTOS DISTINGUIDOS) ============
+
+def _rho_walks(group, g, h, n: int, multipliers, seed: int,
+               steps: int, dp_bits: int) -> List[Tuple[int, int, int]]:
+    """Ejecuta paseos r-adding y devuelve los puntos distinguidos encontrados"""
+    rng = random.Random(seed)
+    dp_mask = (1 << dp_bits) - 1
+    max_walk = 20 << dp_bits
+    points = []
+
+    def fresh_start():
+        a, b = rng.randrange(n), rng.randrange(1, n)
+        return group.op(group.pow(g, a), group.pow(h, b)), a, b
+
+    x, a, b = fresh_start()
+    walk = 0
+    for _ in range(steps):
+        k = group.fingerprint(x)
+        if (k >> 8) & dp_mask == 0:
+            points.append((k, a, b))
+            x, a, b = fresh_start()
+            walk = 0
+            continue
+        i = k % RHO_PARTITIONS
+        m, ma, mb = multipliers[i]
+        x = group.op(x, m)
+        a = (a + ma) % n
+        b = (b + mb) % n
+        walk += 1
+        if walk > max_walk:
+            # Probablemente atrapado en un ciclo sin punto distinguido
+            x, a, b = fresh_start()
+            walk = 0
+    return points
+
+def pollard_rho(group, g, h, n: int, workers: int = 0,
+                timeout: float = 60.0, seed: int = 0) -> Optional[int]:
+    """
+    Pollard rho paralelo (van Oorschot-Wiener) para subgrupos de orden primo n.
+
+    Cada worker ejecuta paseos independientes y reporta solo los puntos
+    distinguidos; una colisión entre dos paseos con distinto coeficiente
+    de h revela el logaritmo.
+    """
+    rng = random.Random(seed or n)
+    multipliers = []
+    for _ in range(RHO_PARTITIONS):
+        ma, mb = rng.randrange(n), rng.randrange(n)
+        multipliers.append((group.op(group.pow(g, ma), group.pow(h, mb)), ma, mb))
+
+    expected = math.isqrt(n) + 1
+    dp_bits = max(0, min(24, (expected.bit_length() // 2) - 4))
+    batch = max(4096, min(1 << 20, expected // 4))
+    workers = workers or os.cpu_count() or 1
+    deadline = time.time() + timeout
+    seen: Dict[int, Tuple[int, int]] = {}
+
+    def solve(points) -> Optional[int]:
+        for k, a, b in points:
+            if k in seen:
+                a2, b2 = seen[k]
+                if (b - b2) % n:
+                    x = (a2 - a) * pow(b - b2, -1, n) % n
+                    if group.key(group.pow(g, x)) == group.key(h):
+                        return x
+            else:
+                seen[k] = (a, b)
+        return None
+
+    if workers == 1 or expected < 1 << 16:
+        round_no = 0
+        while time.time() < deadline:
+            round_no += 1
+            x = solve(_rho_walks(group, g, h, n, multipliers,
+                                 rng.getrandbits(64) + round_no, batch, dp_bits))
+            if x is not None:
+                return x
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while time.time() < deadline:
+            futures = [
+                pool.submit(_rho_walks, group, g, h, n, multipliers,
+                            rng.getrandbits(64), batch, dp_bits)
+                for _ in range(workers)
+            ]
+            for future in futures:
+                x = solve(future.result())
+                if x is not None:
+                    for pending in futures:
+                        pending.cancel()
+                    return x
+    return None
+
+# ============ POHLIG-HELLMAN ============
+
+def _dlog_prime_order(group, g, h, q: int, workers: int, deadline: float) -> Optional[int]:
+    """Logaritmo en un subgrupo de orden primo q"""
+    if group.key(h) == group.key(group.identity):
+        return 0
+    if q <= BSGS_LIMIT:
+        return bsgs(group, g, h, q)
+    remaining = deadline - time.time()
+    if q > RHO_LIMIT or remaining <= 0:
+        return None
+    return pollard_rho(group, g, h, q, workers=workers, timeout=remaining)
+
+def _solve_prime_power(group, g, h, order: int, q: int, e: int,
+                       workers: int, deadline: float) -> Optional[int]:
+    """Resuelve x mod q^e (un paso de Pohlig-Hellman)"""
+    cofactor = order // q ** e
+    gamma = group.pow(g, order // q)          # orden q
+    g_i, h_i = group.pow(g, cofactor), group.pow(h, cofactor)
+    g_i_inv = group.inverse(g_i)
+
+    x_i = 0
+    for k in range(e):
+        # h_k = (g_i^-x_i · h_i)^(q^(e-1-k))
+        h_k = group.pow(group.op(group.pow(g_i_inv, x_i), h_i), q ** (e - 1 - k))
+        d_k = _dlog_prime_order(group, gamma, h_k, q, workers, deadline)
+        if d_k is None:
+            return None
+        x_i += d_k * q ** k
+    return x_i % q ** e
+
+def pohlig_hellman(group, g, h, order: int, factors: Dict[int, int],
+                   workers: int = 0, timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Pohlig-Hellman sobre el orden factorizado de g.
+
+    Los subproblemas con primos grandes se reparten entre procesos; los
+    factores que no se pueden resolver (demasiado grandes) se omiten y se
+    devuelve x mod M, donde M es el producto de las potencias resueltas.
+    """
+    deadline = time.time() + timeout
+    workers = workers or os.cpu_count() or 1
+    items = sorted(factors.items())
+    heavy = [(q, e) for q, e in items if q > PARALLEL_PRIME_LIMIT]
+    solutions: Dict[int, Optional[int]] = {}
+
+    if workers > 1 and len(heavy) > 1:
+        # Paralelismo entre subproblemas; rho de cada uno en un solo proceso
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                q: pool.submit(_solve_prime_power, group, g, h, order, q, e, 1, deadline)
+                for q, e in heavy
+            }
+            for q, e in items:
+                if q not in futures:
+                    solutions[q] = _solve_prime_power(group, g, h, order, q, e, 1, deadline)
+            for q, future in futures.items():
+                solutions[q] = future.result()
+    else:
+        for q, e in items:
+            solutions[q] = _solve_prime_power(group, g, h, order, q, e, workers, deadline)
+
+    residues, moduli, skipped = [], [], []
+    for q, e in items:
+        if solutions[q] is None:
+            skipped.append(q)
+        else:
+            residues.append(solutions[q])
+            moduli.append(q ** e)
+
+    x, modulus = crt(residues, moduli) if moduli else (0, 1)
+    return {"x": x, "modulus": modulus, "skipped_factors": skipped}
+
+def discrete_log(group, g, h, order: int, factors: Optional[Dict[int, int]] = None,
+                 max_bits: int = 0, workers: int = 0, timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Resuelve g^x = h en un grupo genérico.
+
+    Args:
+        group: Objeto con la interfaz de MultiplicativeGroup
+        g, h: Elementos del grupo
+        order: Orden del grupo (o múltiplo del orden de g)
+        factors: Factorización de `order` si ya se conoce
+        max_bits: Cota conocida de x; permite Pohlig-Hellman parcial
+        workers: Procesos para Pollard rho (0 = todos los núcleos)
+        timeout: Tiempo máximo en segundos
+
+    Returns:
+        Dict con 'success', 'x', 'order', 'factors', 'modulus'
+    """
+    start = time.time()
+    cofactor = 1
+    if factors is None:
+        factors, cofactor = factorize(order, timeout=timeout / 4)
+
+    # El cofactor no factorizado no aporta a Pohlig-Hellman
+    smooth_order = order // cofactor
+    if cofactor > 1:
+        # g^c y h^c viven en el subgrupo suave: su log es x mod ord(g^c)
+        g_smooth = group.pow(g, cofactor)
+        h_smooth = group.pow(h, cofactor)
+    else:
+        g_smooth, h_smooth = g, h
+    g_order, g_factors = element_order(group, g_smooth, smooth_order, factors)
+
+    partial = pohlig_hellman(group, g_smooth, h_smooth, g_order, g_factors,
+                             workers=workers, timeout=timeout - (time.time() - start))
+    x, modulus = partial["x"], partial["modulus"]
+
+    if cofactor > 1 or partial["skipped_factors"]:
+        # Sólo recuperamos x módulo M; válido si x < M (o cota max_bits)
+        candidate_ok = group.key(group.pow(g, x)) == group.key(h)
+        return {
+            "success": candidate_ok,
+            "x": x if candidate_ok else None,
+            "x_mod": x,
+            "modulus": modulus,
+            "order": g_order,
+            "factors": g_factors,
+            "unfactored_cofactor": cofactor,
+            "skipped_factors": partial["skipped_factors"],
+            "partial": True,
+            "max_bits_satisfied": bool(max_bits) and modulus.bit_length() > max_bits,
+            "time": time.time() - start
+        }
+
+    ok = group.key(group.pow(g, x)) == group.key(h)
+    return {
+        "success": ok,
+        "x": x if ok else None,
+        "modulus": modulus,
+        "order": g_order,
+        "factors": g_factors,
+        "partial": False,
+        "time": time.time() - start
+    }
+
+# ============ HERRAMIENTA: LOGARITMO DISCRETO ============
+
+@tool
+def discrete_log_attack(g: str, h: str, p: str, order: str = "",
+                        max_bits: int = 0, timeout: int = 60) -> Dict[str, Any]:
+    """
+    Resuelve el logaritmo discreto g^x = h (mod p) con Pohlig-Hellman,
+    BSGS para subgrupos pequeños y Pollard rho paralelo para medianos.
+    Útil para Diffie-Hellman / ElGamal con p-1 suave.
+
+    Args:
+        g: Generador (string decimal o hex)
+        h: Elemento objetivo, p.ej. clave pública A = g^a (string)
+        p: Módulo primo (string decimal o hex)
+        order: Orden del grupo si se conoce (por defecto p-1)
+        max_bits: Cota de bits del exponente secreto (0 = desconocida)
+        timeout: Timeout en segundos
+
+    Returns:
+        Dict con 'success', 'x' y detalles del ataque
+    """
+    try:
+        p_int = int(p, 0)
+        g_int = int(g, 0)
+        h_int = int(h, 0)
+        order_int = int(order, 0) if order else p_int - 1
+
+        group = MultiplicativeGroup(p_int)
+        result = discrete_log(group, group.element(g_int), group.element(h_int),
+                              order_int, max_bits=max_bits, timeout=timeout)
+
+        response = {
+            "success": result["success"],
+            "attack_type": "Pohlig-Hellman + BSGS/Pollard rho",
+            "x": result["x"],
+            "order_bits": result["order"].bit_length(),
+            "factors": {str(q): e for q, e in result["factors"].items()},
+            "time": round(result["time"], 3)
+        }
+        if result["partial"]:
+            response["x_mod"] = result["x_mod"]
+            response["modulus"] = result["modulus"]
+            response["skipped_factors"] = [str(q) for q in result["skipped_factors"]]
+            if not result["success"]:
+                response["error"] = "Only partial DLP solved (x mod modulus); x larger than smooth part"
+
+        if result["success"]:
+            x = result["x"]
+            try:
+                x_bytes = x.to_bytes((x.bit_length() + 7) // 8, 'big')
+                plaintext = x_bytes.decode('utf-8', errors='ignore')
+                if 'flag{' in plaintext.lower():
+                    response["flag"] = plaintext
+            except Exception:
+                pass
+
+        return response
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "Pohlig-Hellman + BSGS/Pollard rho",
+            "error": str(e)
+        }
+
+# Lista de herramientas de logaritmo discreto
+DLOG_TOOLS = [
+    discrete_log_attack
+]
@@ -0,0 +1,593 @@
+"""
+Aritmética de curvas elípticas y ataques ECC para CTF Crypto
+Coordenadas Jacobianas, multiplicación escalar wNAF, compresión de puntos,
+Smart's attack (curvas anómalas), curvas singulares y Pohlig-Hellman
+"""
+
+import random
+from typing import Dict, Any, List, Optional, Tuple
+from langchain_core.tools import tool
+
+from .dlog import FINGERPRINT_MASK, GMPY2_AVAILABLE, MultiplicativeGroup, discrete_log
+
+if GMPY2_AVAILABLE:
+    import gmpy2
+    _mpz = gmpy2.mpz
+    _invert = gmpy2.invert
+else:
+    _mpz = int
+
+    def _invert(a, m):
+        return pow(a, -1, m)
+
+# Ancho de ventana de la representación wNAF
+WNAF_WIDTH = 5
+
+# Curvas estándar: nombre -> (p, a, b, n, Gx, Gy)
+NAMED_CURVES = {
+    'secp256k1': (
+        0xfffffffffffffffffffffffffffffffffffffffffffffffffffffffefffffc2f,
+        0,
+        7,
+        0xfffffffffffffffffffffffffffffffebaaedce6af48a03bbfd25e8cd0364141,
+        0x79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798,
+        0x483ada7726a3c4655da4fbfc0e1108a8fd17b448a68554199c47d08ffb10d4b8,
+    ),
+    'p256': (
+        0xffffffff00000001000000000000000000000000ffffffffffffffffffffffff,
+        -3,
+        0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b,
+        0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551,
+        0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+        0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5,
+    ),
+}
+NAMED_CURVES['prime256v1'] = NAMED_CURVES['secp256r1'] = NAMED_CURVES['p256']
+
+# ============ UTILIDADES MODULARES ============
+
+def sqrt_mod(a: int, p: int) -> Optional[int]:
+    """Raíz cuadrada modular (Tonelli-Shanks); None si a no es residuo"""
+    a %= p
+    if a == 0:
+        return 0
+    if p == 2:
+        return a
+    if pow(a, (p - 1) // 2, p) != 1:
+        return None
+    if p % 4 == 3:
+        return pow(a, (p + 1) // 4, p)
+
+    q, s = p - 1, 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+    z = 2
+    while pow(z, (p - 1) // 2, p) != p - 1:
+        z += 1
+
+    m, c, t, r = s, pow(z, q, p), pow(a, q, p), pow(a, (q + 1) // 2, p)
+    while t != 1:
+        i, t2 = 1, t * t % p
+        while t2 != 1:
+            t2 = t2 * t2 % p
+            i += 1
+        b = pow(c, 1 << (m - i - 1), p)
+        m, c = i, b * b % p
+        t, r = t * c % p, r * b % p
+    return r
+
+def wnaf(k: int, width: int = WNAF_WIDTH) -> List[int]:
+    """Representación wNAF de k (dígitos impares, de menor a mayor peso)"""
+    digits = []
+    half, full = 1 << (width - 1), 1 << width
+    while k > 0:
+        if k & 1:
+            d = k & (full - 1)
+            if d >= half:
+                d -= full
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+# ============ CURVA ELÍPTICA ============
+
+class EllipticCurve:
+    """
+    Curva y^2 = x^3 + a·x + b sobre F_p (forma corta de Weierstrass).
+
+    Los puntos públicos son tuplas afines (x, y) y el punto en el infinito
+    es None; internamente la multiplicación escalar usa coordenadas
+    Jacobianas (X : Y : Z) con x = X/Z^2, y = Y/Z^3 para evitar inversiones.
+    """
+
+    def __init__(self, p: int, a: int, b: int, order: Optional[int] = None):
+        self.p = _mpz(p)
+        self.a = _mpz(a % p)
+        self.b = _mpz(b % p)
+        self.order = order
+
+    def __getstate__(self):
+        return {"p": int(self.p), "a": int(self.a), "b": int(self.b), "order": self.order}
+
+    def __setstate__(self, state):
+        self.__init__(state["p"], state["a"], state["b"], state["order"])
+
+    @property
+    def discriminant(self) -> int:
+        return int(-16 * (4 * self.a ** 3 + 27 * self.b ** 2) % self.p)
+
+    def is_singular(self) -> bool:
+        return self.discriminant == 0
+
+    def point(self, x: int, y: int) -> Tuple[int, int]:
+        P = (_mpz(x % self.p), _mpz(y % self.p))
+        if not self.contains(P):
+            raise ValueError("Point is not on the curve")
+        return P
+
+    def contains(self, P) -> bool:
+        if P is None:
+            return True
+        x, y = P
+        return (y * y - x * x * x - self.a * x - self.b) % self.p == 0
+
+    def lift_x(self, x: int, odd: Optional[bool] = None) -> Optional[Tuple[int, int]]:
+        """Punto con abscisa x (y de paridad `odd` si se indica)"""
+        y = sqrt_mod(int(x ** 3 + self.a * x + self.b), int(self.p))
+        if y is None:
+            return None
+        if odd is not None and (y & 1) != int(odd):
+            y = int(self.p) - y
+        return (_mpz(x % self.p), _mpz(y))
+
+    # ---------- aritmética afín (una inversión por operación) ----------
+
+    def neg(self, P):
+        if P is None:
+            return None
+        return (P[0], (-P[1]) % self.p)
+
+    def add(self, P, Q):
+        if P is None:
+            return Q
+        if Q is None:
+            return P
+        p = self.p
+        x1, y1 = P
+        x2, y2 = Q
+        if x1 == x2:
+            if (y1 + y2) % p == 0:
+                return None
+            lam = (3 * x1 * x1 + self.a) * _invert(2 * y1, p) % p
+        else:
+            lam = (y2 - y1) * _invert(x2 - x1, p) % p
+        x3 = (lam * lam - x1 - x2) % p
+        return (x3, (lam * (x1 - x3) - y1) % p)
+
+    # ---------- aritmética Jacobiana ----------
+
+    def _double_jacobian(self, X1, Y1, Z1):
+        p = self.p
+        if Z1 == 0 or Y1 == 0:
+            return 1, 1, 0
+        YY = Y1 * Y1 % p
+        S = 4 * X1 * YY % p
+        ZZ = Z1 * Z1 % p
+        M = (3 * X1 * X1 + self.a * ZZ * ZZ) % p
+        X3 = (M * M - 2 * S) % p
+        Y3 = (M * (S - X3) - 8 * YY * YY) % p
+        Z3 = 2 * Y1 * Z1 % p
+        return X3, Y3, Z3
+
+    def _add_mixed(self, X1, Y1, Z1, x2, y2):
+        """Suma Jacobiano + afín (Z2 = 1)"""
+        p = self.p
+        if Z1 == 0:
+            return x2, y2, 1
+        Z1Z1 = Z1 * Z1 % p
+        H = (x2 * Z1Z1 - X1) % p
+        r = (y2 * Z1 * Z1Z1 - Y1) % p
+        if H == 0:
+            if r == 0:
+                return self._double_jacobian(X1, Y1, Z1)
+            return 1, 1, 0
+        HH = H * H % p
+        HHH = H * HH % p
+        V = X1 * HH % p
+        X3 = (r * r - HHH - 2 * V) % p
+        Y3 = (r * (V - X3) - Y1 * HHH) % p
+        Z3 = Z1 * H % p
+        return X3, Y3, Z3
+
+    def _to_affine(self, X, Y, Z):
+        if Z == 0:
+            return None
+        p = self.p
+        zinv = _invert(Z, p)
+        zinv2 = zinv * zinv % p
+        return (X * zinv2 % p, Y * zinv2 * zinv % p)
+
+    def multiply(self, P, k: int):
+        """k·P con wNAF (ventana WNAF_WIDTH) en coordenadas Jacobianas"""
+        if P is None:
+            return None
+        if k < 0:
+            return self.multiply(self.neg(P), -k)
+        if self.order:
+            k %= self.order
+        if k == 0:
+            return None
+        if k < 1 << WNAF_WIDTH:
+            # Escalares pequeños: double-and-add simple
+            digits, table = [int(b) for b in bin(k)[:1:-1]], {1: P}
+        else:
+            digits = wnaf(k)
+            # Múltiplos impares P, 3P, ..., (2^(w-1)-1)P en afín
+            twoP = self.add(P, P)
+            table, odd = {1: P}, P
+            for d in range(3, 1 << (WNAF_WIDTH - 1), 2):
+                odd = self.add(odd, twoP)
+                table[d] = odd
+
+        p = self.p
+        X, Y, Z = 1, 1, 0
+        double, add = self._double_jacobian, self._add_mixed
+        for d in reversed(digits):
+            X, Y, Z = double(X, Y, Z)
+            if d > 0:
+                T = table[d]
+                if T is not None:
+                    X, Y, Z = add(X, Y, Z, T[0], T[1])
+            elif d < 0:
+                T = table[-d]
+                if T is not None:
+                    X, Y, Z = add(X, Y, Z, T[0], (-T[1]) % p)
+        return self._to_affine(X, Y, Z)
+
+    # ---------- compresión de puntos (SEC1) ----------
+
+    def compress(self, P) -> bytes:
+        if P is None:
+            return b'\x00'
+        size = (int(self.p).bit_length() + 7) // 8
+        return bytes([2 + int(P[1] & 1)]) + int(P[0]).to_bytes(size, 'big')
+
+    def decompress(self, data: bytes):
+        if data == b'\x00':
+            return None
+        if data[0] == 4:
+            size = (len(data) - 1) // 2
+            return self.point(int.from_bytes(data[1:1 + size], 'big'),
+                              int.from_bytes(data[1 + size:], 'big'))
+        if data[0] not in (2, 3):
+            raise ValueError("Invalid point encoding")
+        P = self.lift_x(int.from_bytes(data[1:], 'big'), odd=data[0] == 3)
+        if P is None:
+            raise ValueError("x is not on the curve")
+        return P
+
+class ECGroup:
+    """Adaptador de una curva a la interfaz de grupo de dlog.py"""
+
+    def __init__(self, curve: EllipticCurve):
+        self.curve = curve
+        self.identity = None
+
+    def op(self, P, Q):
+        return self.curve.add(P, Q)
+
+    def pow(self, P, k: int):
+        return self.curve.multiply(P, k)
+
+    def inverse(self, P):
+        return self.curve.neg(P)
+
+    def key(self, P) -> int:
+        return 0 if P is None else (int(P[0]) << 1 | int(P[1] & 1)) + 1
+
+    def fingerprint(self, P) -> int:
+        return 0 if P is None else (int(P[0] & FINGERPRINT_MASK) << 1 | int(P[1] & 1)) & FINGERPRINT_MASK
+
+# ============ ATAQUES ============
+
+def _smart_lift_multiply(p: int, a: int, b: int, P, k: int):
+    """k·P sobre la curva levantada a Z/p^2 (Jacobiano, sin inversiones)"""
+    p2 = p * p
+    x1, y1 = P
+    X, Y, Z = x1, y1, 1
+    for bit in bin(k)[3:]:
+        # Duplicación Jacobiana mod p^2
+        YY = Y * Y % p2
+        S = 4 * X * YY % p2
+        ZZ = Z * Z % p2
+        M = (3 * X * X + a * ZZ * ZZ) % p2
+        X3 = (M * M - 2 * S) % p2
+        Y, Z = (M * (S - X3) - 8 * YY * YY) % p2, 2 * Y * Z % p2
+        X = X3
+        if bit == '1':
+            Z1Z1 = Z * Z % p2
+            H = (x1 * Z1Z1 - X) % p2
+            r = (y1 * Z * Z1Z1 - Y) % p2
+            HH = H * H % p2
+            HHH = H * HH % p2
+            V = X * HH % p2
+            X3 = (r * r - HHH - 2 * V) % p2
+            Y = (r * (V - X3) - Y * HHH) % p2
+            Z = Z * H % p2
+            X = X3
+    return X, Y, Z
+
+def smart_attack_solve(curve: EllipticCurve, G, Q) -> Optional[int]:
+    """
+    Smart's attack para curvas anómalas (#E(F_p) = p).
+
+    Levanta la curva y los puntos a Z/p^2 (Hensel), calcula p·G y p·Q,
+    que caen en E1 (Z ≡ 0 mod p), y usa el parámetro del grupo formal
+    t = -x/y = -X·Z/Y para obtener el logaritmo p-ádico.
+    """
+    p, a = int(curve.p), int(curve.a)
+    p2 = p * p
+
+    rng = random.Random(p)
+    for _ in range(8):
+        # Con el levantamiento canónico el ataque falla: a aleatorio mod p^2
+        a_lift = a + p * rng.randrange(1, p)
+        gx, gy = int(G[0]), int(G[1])
+        b_lift = (gy * gy - gx ** 3 - a_lift * gx) % p2
+
+        points = []
+        for x, y in (G, Q):
+            x, y = int(x), int(y)
+            # Hensel: corregir y para que el punto esté en la curva mod p^2
+            f = (y * y - x ** 3 - a_lift * x - b_lift) % p2
+            points.append((x, (y - f * pow(2 * y, -1, p2)) % p2))
+
+        psi = []
+        for point in points:
+            X, Y, Z = _smart_lift_multiply(p, a_lift, b_lift, point, p)
+            if Z % p != 0 or Y % p == 0:
+                break
+            t = -X * Z * pow(Y, -1, p2) % p2
+            psi.append((t // p) % p)
+        else:
+            if psi[0] == 0:
+                continue
+            k = psi[1] * pow(psi[0], -1, p) % p
+            if curve.multiply(G, k) == Q:
+                return k
+    return None
+
+def singular_curve_solve(p: int, a: int, b: int, G, Q, timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Resuelve el DLP en una curva singular y^2 = x^3 + a·x + b.
+
+    - Cúspide (raíz triple): (x, y) -> x/y lleva al grupo aditivo F_p^+
+    - Nodo (raíz doble): tras desplazar la raíz doble a 0, y^2 = x^2(x + d)
+      y (x, y) -> (y + √d·x)/(y - √d·x) lleva a F_p^* (o al subgrupo de
+      norma 1 de F_{p^2}^* si d no es residuo cuadrático)
+    """
+    a, b = a % p, b % p
+    if (4 * a ** 3 + 27 * b ** 2) % p:
+        raise ValueError("Curve is not singular")
+
+    # Raíz doble del polinomio cúbico
+    x0 = 0 if a == 0 else (-3 * b * pow(2 * a, -1, p)) % p
+    (gx, gy), (qx, qy) = [(int(x) - x0, int(y)) for x, y in (G, Q)]
+
+    if a == 0 and b == 0:
+        tg = gx * pow(gy, -1, p) % p
+        tq = qx * pow(qy, -1, p) % p
+        return {"type": "cusp", "x": tq * pow(tg, -1, p) % p, "group": "additive"}
+
+    d = 3 * x0 % p
+    s = sqrt_mod(d, p)
+    if s is not None:
+        def phi(x, y):
+            return (y + s * x) * pow(y - s * x, -1, p) % p
+        group = MultiplicativeGroup(p)
+        result = discrete_log(group, group.element(phi(gx, gy)), group.element(phi(qx, qy)),
+                              p - 1, timeout=timeout)
+        return {"type": "node", "x": result["x"], "group": "F_p^*", "dlog": result}
+
+    group = QuadraticExtensionGroup(p, d)
+    def phi2(x, y):
+        # (y + √d·x)^2 / (y^2 - d·x^2), elemento de norma 1 en F_{p^2}
+        num = group.op((y, x), (y, x))
+        den_inv = pow((y * y - d * x * x) % p, -1, p)
+        return (num[0] * den_inv % p, num[1] * den_inv % p)
+    result = discrete_log(group, phi2(gx, gy), phi2(qx, qy), p + 1, timeout=timeout)
+    return {"type": "node", "x": result["x"], "group": "F_p2^* (norm 1)", "dlog": result}
+
+class QuadraticExtensionGroup:
+    """Grupo multiplicativo de F_p[√d] (elementos (u, v) = u + v·√d)"""
+
+    def __init__(self, p: int, d: int):
+        self.p, self.d = p, d
+        self.identity = (1, 0)
+
+    def op(self, A, B):
+        p = self.p
+        return ((A[0] * B[0] + self.d * A[1] * B[1]) % p, (A[0] * B[1] + A[1] * B[0]) % p)
+
+    def pow(self, A, k: int):
+        result, base = self.identity, A
+        if k < 0:
+            base, k = self.inverse(A), -k
+        while k:
+            if k & 1:
+                result = self.op(result, base)
+            base = self.op(base, base)
+            k >>= 1
+        return result
+
+    def inverse(self, A):
+        norm_inv = pow((A[0] * A[0] - self.d * A[1] * A[1]) % self.p, -1, self.p)
+        return (A[0] * norm_inv % self.p, (-A[1]) * norm_inv % self.p)
+
+    def key(self, A) -> int:
+        return A[0] * self.p + A[1]
+
+    def fingerprint(self, A) -> int:
+        return self.key(A) & FINGERPRINT_MASK
+
+# ============ HERRAMIENTAS ECC ============
+
+def _parse_curve(p: str, a: str, b: str, gx: str, gy: str, qx: str, qy: str):
+    p_int, a_int, b_int = int(p, 0), int(a, 0), int(b, 0)
+    G = (int(gx, 0) % p_int, int(gy, 0) % p_int)
+    Q = (int(qx, 0) % p_int, int(qy, 0) % p_int)
+    return p_int, a_int, b_int, G, Q
+
+def _ecc_result(attack_type: str, k: Optional[int], **extra) -> Dict[str, Any]:
+    result = {"success": k is not None, "attack_type": attack_type, "private_key": k}
+    result.update(extra)
+    if k is not None:
+        try:
+            k_bytes = k.to_bytes((k.bit_length() + 7) // 8, 'big')
+            plaintext = k_bytes.decode('utf-8', errors='ignore')
+            if 'flag{' in plaintext.lower():
+                result["flag"] = plaintext
+        except Exception:
+            pass
+    else:
+        result.setdefault("error", "Attack did not recover the private key")
+    return result
+
+@tool
+def smart_attack(p: str, a: str, b: str, gx: str, gy: str, qx: str, qy: str) -> Dict[str, Any]:
+    """
+    Smart's attack contra curvas anómalas (#E = p): resuelve Q = k·G en
+    tiempo polinomial mediante el logaritmo p-ádico.
+
+    Args:
+        p, a, b: Parámetros de la curva y^2 = x^3 + a·x + b mod p
+        gx, gy: Punto base G
+        qx, qy: Punto público Q
+
+    Returns:
+        Dict con 'success' y 'private_key'
+    """
+    try:
+        p_int, a_int, b_int, G, Q = _parse_curve(p, a, b, gx, gy, qx, qy)
+        curve = EllipticCurve(p_int, a_int, b_int)
+        if curve.multiply(curve.point(*G), p_int) is not None:
+            return _ecc_result("Smart's Attack", None, error="Curve is not anomalous (p·G != O)")
+        k = smart_attack_solve(curve, curve.point(*G), curve.point(*Q))
+        return _ecc_result("Smart's Attack", k)
+    except Exception as e:
+        return {"success": False, "attack_type": "Smart's Attack", "error": str(e)}
+
+@tool
+def singular_curve_attack(p: str, a: str, b: str, gx: str, gy: str, qx: str, qy: str,
+                          timeout: int = 60) -> Dict[str, Any]:
+    """
+    Ataque a curvas singulares (discriminante 0): transfiere el DLP al
+    grupo aditivo (cúspide) o multiplicativo (nodo) de un cuerpo finito.
+
+    Args:
+        p, a, b: Parámetros de la curva y^2 = x^3 + a·x + b mod p
+        gx, gy: Punto base G
+        qx, qy: Punto público Q
+        timeout: Timeout en segundos (DLP en F_p^* tras el mapeo)
+
+    Returns:
+        Dict con 'success', 'private_key' y tipo de singularidad
+    """
+    try:
+        p_int, a_int, b_int, G, Q = _parse_curve(p, a, b, gx, gy, qx, qy)
+        solved = singular_curve_solve(p_int, a_int, b_int, G, Q, timeout=timeout)
+        return _ecc_result("Singular Curve Attack", solved["x"],
+                           singularity=solved["type"], target_group=solved["group"])
+    except Exception as e:
+        return {"success": False, "attack_type": "Singular Curve Attack", "error": str(e)}
+
+@tool
+def ecc_pohlig_hellman(p: str, a: str, b: str, gx: str, gy: str, qx: str, qy: str,
+                       order: str, timeout: int = 60) -> Dict[str, Any]:
+    """
+    Pohlig-Hellman sobre curvas cuyo orden es suave (BSGS / Pollard rho
+    en cada subgrupo primo).
+
+    Args:
+        p, a, b: Parámetros de la curva y^2 = x^3 + a·x + b mod p
+        gx, gy: Punto base G
+        qx, qy: Punto público Q
+        order: Orden de la curva o de G (string)
+        timeout: Timeout en segundos
+
+    Returns:
+        Dict con 'success', 'private_key' y factorización del orden
+    """
+    try:
+        p_int, a_int, b_int, G, Q = _parse_curve(p, a, b, gx, gy, qx, qy)
+        order_int = int(order, 0)
+        curve = EllipticCurve(p_int, a_int, b_int)
+        result = discrete_log(ECGroup(curve), curve.point(*G), curve.point(*Q),
+                              order_int, timeout=timeout)
+        return _ecc_result(
+            "ECC Pohlig-Hellman", result["x"],
+            factors={str(q): e for q, e in result["factors"].items()},
+            partial=result["partial"],
+            time=round(result["time"], 3)
+        )
+    except Exception as e:
+        return {"success": False, "attack_type": "ECC Pohlig-Hellman", "error": str(e)}
+
+@tool
+def ecc_attack(p: str, a: str, b: str, gx: str, gy: str, qx: str, qy: str,
+               order: str = "", timeout: int = 60) -> Dict[str, Any]:
+    """
+    Detecta la debilidad de la curva y aplica el ataque ECC adecuado:
+    singular -> mapeo a F_p, anómala -> Smart, orden suave -> Pohlig-Hellman.
+
+    Args:
+        p, a, b: Parámetros de la curva y^2 = x^3 + a·x + b mod p
+        gx, gy: Punto base G
+        qx, qy: Punto público Q
+        order: Orden de la curva si se conoce (string)
+        timeout: Timeout en segundos
+
+    Returns:
+        Dict con 'success', 'private_key' y ataques probados
+    """
+    args = {'p': p, 'a': a, 'b': b, 'gx': gx, 'gy': gy, 'qx': qx, 'qy': qy}
+    attacks_tried = []
+    try:
+        p_int, a_int, b_int, G, Q = _parse_curve(p, a, b, gx, gy, qx, qy)
+        curve = EllipticCurve(p_int, a_int, b_int)
+
+        if curve.is_singular():
+            attacks_tried.append("Singular Curve Attack")
+            result = singular_curve_attack.invoke(dict(args, timeout=timeout))
+        else:
+            G_point = curve.point(*G)
+            if curve.multiply(G_point, p_int) is None:
+                attacks_tried.append("Smart's Attack")
+                result = smart_attack.invoke(args)
+            elif order:
+                attacks_tried.append("ECC Pohlig-Hellman")
+                result = ecc_pohlig_hellman.invoke(dict(args, order=order, timeout=timeout))
+            else:
+                result = {"success": False, "error": "Curve order needed for Pohlig-Hellman"}
+
+        result["attacks_tried"] = attacks_tried
+        return result
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "ECC",
+            "attacks_tried": attacks_tried,
+            "error": str(e)
+        }
+
+# Lista de herramientas ECC
+ECC_TOOLS = [
+    ecc_attack,
+    smart_attack,
+    singular_curve_attack,
+    ecc_pohlig_hellman
+]
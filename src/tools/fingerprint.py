@@ -0,0 +1,324 @@
+"""
+Huella estadística de un cifrado: clase de caracteres, índice de coincidencia,
+entropía, divisibilidad por tamaños de bloque, bloques repetidos y
+periodicidad. Un modelo de decisión pequeño (reglas con peso) elige los 1-3
+ataques que merece la pena ejecutar antes de probarlos todos a ciegas.
+"""
+
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
+from langchain_core.tools import tool
+
+from .ngrams import LANGUAGES, PRINTABLE_BYTES, PRINTABLE_THRESHOLD, is_plaintext, letter_codes, ngram_table
+from .transposition import UNIGRAM_THRESHOLD
+from .vigenere import ENGLISH_IOC, RANDOM_IOC as RANDOM_LETTER_IOC, index_of_coincidence as vigenere_ioc
+from .xor import parse_ciphertext
+
+# Tamaños de bloque de los cifrados por bloques (DES/3DES y AES)
+BLOCK_SIZES = (8, 16)
+# Desplazamientos que se prueban para buscar el periodo de la clave
+MAX_PERIOD = 40
+# Bytes que se analizan como máximo (la huella no necesita más)
+SAMPLE_BYTES = 1 << 16
+# Bytes con los que se decide si los datos ya son texto en claro
+PLAINTEXT_SAMPLE = 4096
+# Bytes imprimibles mínimos del decodificado para aceptar como base64 un bloque sólo de
+# letras: un Vigenère o una sustitución sin signos de longitud múltiplo de 4 también
+# es base64 válido, pero decodifica a bytes aleatorios
+BASE64_LETTERS_PRINTABLE = 0.95
+# Símbolos mínimos para que las estadísticas signifiquen algo
+MIN_SYMBOLS = 16
+# IoC de columna a partir del cual un periodo da letras de idioma natural (el umbral de vigenere)
+VIGENERE_THRESHOLD = RANDOM_LETTER_IOC + 0.75 * (ENGLISH_IOC - RANDOM_LETTER_IOC)
+# IoC de letras por debajo del cual las frecuencias están muy aplanadas (clave larga)
+FLAT_IOC = 0.045
+# Un periodo cuenta si el IoC de sus columnas (de sus múltiplos, en bytes) supera al resto en este factor
+PERIOD_STRENGTH = 1.25
+# Huella de Hill: el IoC en múltiplos del bloque supera al del resto en este factor
+HILL_BLOCK_SIZES = (2, 3)
+BLOCK_SIGNATURE = 1.05
+# IoC de bytes (×256): texto bajo XOR de un byte (inglés ~17, clave repetida < 9) / algo de estructura
+BYTE_IOC_TEXT = 12.0
+BYTE_IOC_STRUCTURED = 1.3
+# IoC de bytes (×256) por debajo del cual los bloques repetidos son de un cifrado por bloques
+BYTE_IOC_BLOCK = 3.0
+# Fracción de bloques repetidos que ya es ECB con cualquier IoC (las repeticiones lo suben)
+ECB_REPEATED_RATIO = 0.25
+# Entropía (bits/byte) de datos que parecen aleatorios
+HIGH_ENTROPY = 7.0
+# Confianza mínima para recomendar un ataque y número máximo de ataques
+MIN_CONFIDENCE = 0.3
+MAX_ROUTES = 3
+
+# Tipo de classify_crypto al que pertenece cada ataque recomendado
+ATTACK_TYPES = {
+    "aes_ecb": "AES",
+    "block_cipher": "AES",
+    "xor_single_byte": "XOR",
+    "xor_repeating_key": "XOR",
+    "rot_affine_attack": "Classical",
+    "substitution_attack": "Classical",
+    "vigenere_attack": "Classical",
+    "transposition_attack": "Classical",
+    "hill_attack": "Classical",
+    "decode_encoding": "Encoding",
+    "attack_rsa": "RSA",
+}
+
+# ============ EXTRACCIÓN ============
+
+# Candidatos a cifrado dentro de texto libre (salida del reto o archivo de datos)
+BLOB_PATTERNS = (
+    re.compile(r'\b(?:[0-9a-fA-F]{2}){16,}\b'),
+    re.compile(r'(?<![A-Za-z0-9+/])[A-Za-z0-9+/]{24,}={0,2}(?![A-Za-z0-9+/=])'),
+    re.compile(r'\b\d{40,}\b'),
+    re.compile(r'(?i)(?:encrypted|ciphertext|cipher|ct|output)[^:=\n]*[:=]\s*([^\n]{16,})'),
+)
+
+def extract_blob(text: str) -> Optional[str]:
+    """El fragmento con más pinta de cifrado (el más largo) dentro de un texto"""
+    blobs = []
+    for pattern in BLOB_PATTERNS:
+        for match in pattern.finditer(text):
+            blobs.append((match.group(match.lastindex or 0)).strip().strip('\'"'))
+    return max(blobs, key=len) if blobs else None
+
+# ============ CARACTERÍSTICAS ============
+
+def detect_encoding(text: str) -> Tuple[str, bytes]:
+    """
+    Interpretación del cifrado (hex, base64 o raw, la primera de parse_ciphertext).
+    Un bloque sólo de letras se toma por base64 sólo si decodifica a texto imprimible.
+    """
+    options = parse_ciphertext(text)
+    encoding, raw = options[0]
+    if encoding == "base64" and re.fullmatch(r'[A-Za-z]+', re.sub(r'\s+', '', text)):
+        data = np.frombuffer(raw, dtype=np.uint8)
+        if not len(data) or PRINTABLE_BYTES[data].mean() < BASE64_LETTERS_PRINTABLE:
+            return options[-1]
+    return encoding, raw
+
+def charset_class(text: str, encoding: Optional[str] = None) -> str:
+    """Clase de caracteres: digits, hex, base64, letters, printable o binary"""
+    compact = re.sub(r'\s+', '', text)
+    if not compact:
+        return "empty"
+    if compact.isdigit():
+        return "digits"
+    encoding = encoding or detect_encoding(text)[0]
+    if encoding != "raw":
+        return encoding
+    letters = len(re.sub(r'[^A-Za-z]+', '', compact))
+    if letters >= 0.7 * len(compact):
+        return "letters"
+    if compact.isprintable() and compact.isascii():
+        return "printable"
+    return "binary"
+
+def entropy(data: np.ndarray) -> float:
+    """Entropía de Shannon en bits por byte"""
+    counts = np.bincount(data, minlength=256)
+    p = counts[counts > 0] / len(data)
+    return float(-(p * np.log2(p)).sum())
+
+def index_of_coincidence(symbols: np.ndarray, alphabet: int) -> float:
+    """Probabilidad de que dos símbolos al azar coincidan"""
+    n = len(symbols)
+    if n < 2:
+        return 0.0
+    counts = np.bincount(symbols, minlength=alphabet).astype(np.float64)
+    return float((counts * (counts - 1)).sum() / (n * (n - 1)))
+
+def repeated_block_ratio(data: np.ndarray, size: int) -> float:
+    """Fracción de bloques alineados de `size` bytes que repiten uno anterior (ECB)"""
+    count = len(data) // size
+    if count < 2:
+        return 0.0
+    blocks = np.ascontiguousarray(data[:count * size]).view(f'V{size}')
+    return 1.0 - len(np.unique(blocks)) / count
+
+def periodicity(symbols: np.ndarray, alphabet: int) -> Dict[str, Any]:
+    """
+    IoC medio de las columnas para cada periodo (el estimador de vigenere):
+    con clave periódica (Vigenère, XOR repetido) el periodo y sus múltiplos
+    recuperan el IoC del texto en claro. Devuelve el menor periodo que
+    destaca (1 = monoalfabético, 0 = ninguno), cuánto destaca y el tamaño de
+    bloque cuyos múltiplos tienen más IoC que el resto (huella de Hill).
+    """
+    limit = min(MAX_PERIOD, len(symbols) // 4)
+    if limit < 2:
+        return {"period": 0, "strength": 0.0, "block_signature": 0}
+    # El IoC no depende de la etiqueta de cada símbolo: sólo se cuentan los que aparecen
+    present, dense = np.unique(symbols, return_inverse=True)
+    ioc = vigenere_ioc(dense, limit, len(present))[1:]
+    lags = np.arange(1, limit + 1)
+    signature = 0
+    for size in HILL_BLOCK_SIZES:
+        multiples = lags % size == 0
+        if multiples.any() and ioc[multiples].mean() >= BLOCK_SIGNATURE * ioc[~multiples].mean():
+            signature = size
+            break
+    if alphabet == 26:
+        natural = np.flatnonzero(ioc >= VIGENERE_THRESHOLD)
+        period = int(natural[0]) + 1 if len(natural) else 0
+        strength = float(ioc[period - 1] / ioc[0]) if period else float(ioc.max() / ioc[0])
+        if period > 1 and strength < PERIOD_STRENGTH:
+            period = 1
+    else:
+        # Bytes: el periodo destaca en todos sus múltiplos, el ruido de columnas cortas no
+        multiples = lags[None, :] % lags[:, None] == 0
+        counts = multiples.sum(axis=1)
+        on = multiples @ ioc
+        off = (ioc.sum() - on)[1:] / (limit - counts[1:])
+        ratio = np.concatenate(([1.0], on[1:] / counts[1:] / np.maximum(off, 1e-12)))
+        strength = float(ratio.max())
+        if ioc[0] * alphabet >= BYTE_IOC_TEXT:
+            # El cifrado entero conserva el IoC de un texto: un solo byte de clave
+            period = 1
+        elif strength >= PERIOD_STRENGTH:
+            # El máximo es el periodo: en sus múltiplos hay columnas en claro y en el resto ninguna
+            period = int(ratio.argmax()) + 1
+        else:
+            period = 1 if ioc[0] * alphabet >= BYTE_IOC_STRUCTURED else 0
+    return {"period": period, "strength": round(strength, 4), "block_signature": signature}
+
+def features(ciphertext: str) -> Dict[str, Any]:
+    """Vector de características del cifrado (los bytes se acotan a SAMPLE_BYTES)"""
+    encoding, raw = detect_encoding(ciphertext)
+    charset = charset_class(ciphertext, encoding)
+    data = np.frombuffer(raw[:SAMPLE_BYTES], dtype=np.uint8)
+    result = {"charset": charset, "length": len(data)}
+    if len(data) < MIN_SYMBOLS:
+        return result
+
+    result["entropy"] = round(entropy(data), 4)
+    result["byte_ioc"] = round(index_of_coincidence(data, 256) * 256, 4)
+    result["printable_ratio"] = round(float(np.mean((data >= 32) & (data < 127) | (data == 10) | (data == 9))), 4)
+    # Hex o base64 que ya es texto: sólo hay que decodificarlo (el modelo de n-gramas
+    # sólo se consulta si casi todo es imprimible)
+    result["plaintext"] = (charset in ("hex", "base64") and result["printable_ratio"] >= PRINTABLE_THRESHOLD
+                           and bool(is_plaintext(data[:PLAINTEXT_SAMPLE].tobytes())))
+    for size in BLOCK_SIZES:
+        result[f"divisible_{size}"] = len(data) % size == 0
+        result[f"repeated_blocks_{size}"] = round(repeated_block_ratio(data, size), 4)
+
+    if charset == "letters":
+        codes = letter_codes(ciphertext[:SAMPLE_BYTES])
+        result["letters"] = len(codes)
+        result["ioc"] = round(index_of_coincidence(codes, 26), 5)
+        result["unigram"] = round(max(float(np.asarray(ngram_table(1, language))[codes].mean())
+                                      for language in LANGUAGES), 4)
+        result.update(periodicity(codes, 26))
+    else:
+        result.update(periodicity(data, 256))
+    return result
+
+# ============ MODELO DE DECISIÓN ============
+
+def route(feats: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Reglas con peso sobre la huella: cada ataque acumula confianza según las
+    características que lo delatan y se devuelven los MAX_ROUTES mejores que
+    pasan MIN_CONFIDENCE, ordenados de más a menos probable.
+    """
+    charset = feats.get("charset")
+    scores = dict.fromkeys(ATTACK_TYPES, 0.0)
+
+    if charset == "digits":
+        scores["attack_rsa"] += 0.6
+    if charset in ("hex", "base64") and feats.get("plaintext"):
+        scores["decode_encoding"] += 0.7
+
+    if charset == "letters" and "ioc" in feats:
+        period = feats.get("period", 0)
+        if period == 1:
+            # Monoalfabético: frecuencias en su sitio (transposición) o permutadas
+            if feats["unigram"] >= UNIGRAM_THRESHOLD:
+                scores["transposition_attack"] += 0.8
+            else:
+                scores["rot_affine_attack"] += 0.7
+                scores["substitution_attack"] += 0.6
+        elif period >= 2:
+            scores["vigenere_attack"] += 0.8
+        else:
+            # Frecuencias aplanadas sin periodo: Hill (bloques) o clave larga
+            scores["hill_attack"] += 0.7 if feats.get("block_signature") else 0.4
+            scores["vigenere_attack"] += 0.4 if feats["ioc"] >= FLAT_IOC else 0.3
+        return _ranked(scores)
+
+    if "entropy" not in feats:
+        return _ranked(scores)
+
+    repeated = [feats.get("repeated_blocks_16", 0), feats.get("repeated_blocks_8", 0)]
+    ecb_like = feats["byte_ioc"] < BYTE_IOC_BLOCK or max(repeated) >= ECB_REPEATED_RATIO
+    if sum(repeated) > 0 and ecb_like and (feats.get("divisible_16") or feats.get("divisible_8")):
+        scores["aes_ecb"] += 0.9
+    elif feats["entropy"] >= HIGH_ENTROPY and feats.get("divisible_16"):
+        scores["block_cipher"] += 0.4
+
+    structured = feats["byte_ioc"] >= BYTE_IOC_STRUCTURED and not feats["plaintext"]
+    if charset != "digits" and structured and not scores["aes_ecb"]:
+        if feats.get("period", 0) >= 2:
+            scores["xor_repeating_key"] += 0.8
+        elif feats.get("period") == 1 or feats["byte_ioc"] >= BYTE_IOC_TEXT:
+            scores["xor_single_byte"] += 0.8
+        else:
+            scores["xor_repeating_key"] += 0.4
+            scores["xor_single_byte"] += 0.3
+    return _ranked(scores)
+
+def _ranked(scores: Dict[str, float]) -> List[Dict[str, Any]]:
+    ranked = sorted((item for item in scores.items() if item[1] >= MIN_CONFIDENCE), key=lambda item: -item[1])
+    return [{"attack": attack, "type": ATTACK_TYPES[attack], "confidence": round(min(score, 1.0), 2)}
+            for attack, score in ranked[:MAX_ROUTES]]
+
+def fingerprint(ciphertext: Union[str, bytes]) -> Dict[str, Any]:
+    """Huella y ataques recomendados para un cifrado (str o bytes)"""
+    if isinstance(ciphertext, bytes):
+        ciphertext = ciphertext.decode('latin-1')
+    feats = features(ciphertext)
+    return {"features": feats, "routes": route(feats)}
+
+# ============ HERRAMIENTA ============
+
+@tool
+def fingerprint_ciphertext(ciphertext: str) -> Dict[str, Any]:
+    """
+    Huella estadística rápida de un cifrado (clase de caracteres, IoC,
+    entropía, bloques repetidos, periodicidad) y los 1-3 ataques que merece
+    la pena ejecutar. Si se pasa texto libre se analiza el fragmento con más
+    pinta de cifrado.
+
+    Args:
+        ciphertext: Cifrado (hex, base64, letras o texto que lo contenga)
+
+    Returns:
+        Dict con 'features', 'routes' (ataque, tipo y confianza) y 'attacks'
+    """
+    start = time.perf_counter()
+    try:
+        blob = ciphertext
+        if charset_class(ciphertext) == "printable":
+            blob = extract_blob(ciphertext) or ciphertext
+        result = fingerprint(blob)
+        return {
+            "success": bool(result["routes"]),
+            "attack_type": "Fingerprint",
+            "features": result["features"],
+            "routes": result["routes"],
+            "attacks": [r["attack"] for r in result["routes"]],
+            "time": round(time.perf_counter() - start, 6),
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "Fingerprint",
+            "error": str(e)
+        }
+
+FINGERPRINT_TOOLS = [
+    fingerprint_ciphertext
+]
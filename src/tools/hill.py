@@ -0,0 +1,415 @@
+"""
+Cifrado de Hill: álgebra lineal modular vectorizada (eliminación gaussiana
+mod m por lotes, combinada con CRT sobre las potencias de primos de m).
+La clave se recupera con texto conocido (incluido el crib "flag{") o sólo
+con el cifrado, enumerando cada fila de la matriz de descifrado por separado.
+Convención: cada bloque de n símbolos es un vector columna y C = K·P mod m.
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError
+from functools import lru_cache
+from itertools import permutations, product
+from math import gcd
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from langchain_core.tools import tool
+
+from .ngrams import CONFIDENT_LETTERS, LANGUAGES, PLAINTEXT_THRESHOLD, ngram_table, score_letter_matrix, score_many
+from .fingerprint import detect_encoding
+from .xor import ENGLISH_BYTE_LOGP
+
+# Módulos del cifrado por letras (A-Z) y por bytes
+LETTER_MODULUS = 26
+BYTE_MODULUS = 256
+# Tamaños de bloque que se prueban si no se indica uno
+BLOCK_SIZES = (2, 3)
+# Filas que pasan de la búsqueda fila a fila a la combinación en matrices
+ROW_CANDIDATES = 12
+# Bloques con los que se puntúa cada fila candidata (letras y bytes)
+ROW_SAMPLE_BLOCKS = {LETTER_MODULUS: 256, BYTE_MODULUS: 48}
+# Símbolos descifrados con los que se ordenan las matrices candidatas
+SAMPLE_SYMBOLS = 512
+# A partir de este tamaño de bloque la búsqueda por filas se reparte entre procesos
+PARALLEL_BLOCK_SIZE = 3
+# Si el sistema del crib es singular se enumeran las filas que lo cumplen (hasta m^n filas)
+ROW_ENUMERATION_LIMIT = 1 << 17
+# Combinaciones de filas compatibles admitidas por desplazamiento del crib
+CRIB_COMBINATIONS = 4096
+# Proporción mínima de letras (sin espacios) para tratar el cifrado como letras en modo auto
+LETTER_RATIO = 0.7
+# Cribs automáticos (texto conocido) de cada modo: las letras de "flag" o los bytes de "flag{"
+FLAG_CRIBS = {LETTER_MODULUS: np.array([5, 11, 0, 6]), BYTE_MODULUS: b"flag{"}
+
+# ============ ÁLGEBRA LINEAL MOD m ============
+
+def prime_powers(m: int) -> List[Tuple[int, int]]:
+    """Factorización de m como [(p, p^e), ...]"""
+    factors, p = [], 2
+    while p * p <= m:
+        if m % p == 0:
+            q = 1
+            while m % p == 0:
+                m //= p
+                q *= p
+            factors.append((p, q))
+        p += 1
+    if m > 1:
+        factors.append((m, m))
+    return factors
+
+@lru_cache(maxsize=None)
+def inverse_table(q: int) -> np.ndarray:
+    """inverse[x] = x⁻¹ mod q para las unidades (0 para el resto)"""
+    return np.array([pow(x, -1, q) if gcd(x, q) == 1 else 0 for x in range(q)], dtype=np.int64)
+
+def _solve_prime_power(A: np.ndarray, B: np.ndarray, p: int, q: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Eliminación de Gauss-Jordan mod q = p^e para todo el lote a la vez. Cada
+    pivote debe ser una unidad (no múltiplo de p): es lo que garantiza una
+    solución única, y una matriz invertible mod p siempre tiene uno disponible.
+    """
+    count, rows, n = A.shape
+    M = np.concatenate([A % q, B % q], axis=2)
+    ok = np.ones(count, dtype=bool)
+    batch = np.arange(count)
+    for column in range(n):
+        unit = M[:, column:, column] % p != 0
+        ok &= unit.any(axis=1)
+        pivot = column + unit.argmax(axis=1)
+        pivot_row = M[batch, pivot].copy()
+        M[batch, pivot] = M[batch, column]
+        pivot_row = pivot_row * inverse_table(q)[pivot_row[:, column]][:, None] % q
+        factor = M[:, :, column].copy()
+        factor[:, column] = 0
+        M = (M - factor[:, :, None] * pivot_row[:, None, :]) % q
+        M[batch, column] = pivot_row
+    # Las filas sobrantes (sistema sobredeterminado) deben quedar a cero
+    ok &= ~M[:, n:, n:].any(axis=(1, 2))
+    return M[:, :n, n:], ok
+
+def solve_mod(A: np.ndarray, B: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resuelve A·X = B mod m para un lote de sistemas (A: lote × filas × n,
+    B: lote × filas × k; también sin la dimensión de lote). Se resuelve mod
+    cada potencia de primo y se combina por el teorema chino del resto.
+
+    Returns:
+        (X: lote × n × k, ok: sistemas con solución única)
+    """
+    single = np.ndim(A) == 2
+    A = np.asarray(A, dtype=np.int64).reshape((-1,) + np.shape(A)[-2:])
+    B = np.asarray(B, dtype=np.int64).reshape((-1,) + np.shape(B)[-2:])
+    X = np.zeros((len(A), A.shape[2], B.shape[2]), dtype=np.int64)
+    ok = np.ones(len(A), dtype=bool)
+    for p, q in prime_powers(m):
+        partial, solved = _solve_prime_power(A, B, p, q)
+        cofactor = m // q
+        X = (X + partial * (cofactor * pow(cofactor, -1, q))) % m
+        ok &= solved
+    return (X[0], ok[0]) if single else (X, ok)
+
+def inverse_mod(M: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Inversa de una o varias matrices cuadradas mod m (y si existe)"""
+    n = np.shape(M)[-1]
+    return solve_mod(M, np.broadcast_to(np.eye(n, dtype=np.int64), np.shape(M)), m)
+
+def determinant_mod(M: np.ndarray, m: int) -> np.ndarray:
+    """Determinante mod m de un lote de matrices pequeñas (desarrollo de Leibniz)"""
+    M = np.asarray(M, dtype=np.int64)
+    n = M.shape[-1]
+    total = np.zeros(M.shape[:-2], dtype=np.int64)
+    for perm in permutations(range(n)):
+        inversions = sum(perm[i] > perm[j] for i in range(n) for j in range(i + 1, n))
+        term = np.ones(M.shape[:-2], dtype=np.int64)
+        for row, column in enumerate(perm):
+            term = term * M[..., row, column] % m
+        total = (total + (-1) ** inversions * term) % m
+    return total
+
+def invertible_mod(M: np.ndarray, m: int) -> np.ndarray:
+    """Matrices con determinante coprimo con m"""
+    return np.gcd(determinant_mod(M, m), m) == 1
+
+# ============ DESCIFRADO ============
+
+def decrypt_values(values: np.ndarray, D: np.ndarray, m: int, limit: Optional[int] = None) -> np.ndarray:
+    """
+    Aplica una o varias matrices de descifrado D (P = D·C por bloque) a los
+    primeros `limit` símbolos; el bloque final incompleto se deja igual.
+    """
+    n = D.shape[-1]
+    values = values[:limit] if limit else values
+    blocks = values[:len(values) // n * n].reshape(-1, n)
+    plain = np.einsum('...ij,bj->...bi', D, blocks) % m
+    plain = plain.reshape(plain.shape[:-2] + (-1,))
+    tail = np.broadcast_to(values[len(blocks) * n:], plain.shape[:-1] + (len(values) - len(blocks) * n,))
+    return np.concatenate([plain, tail], axis=-1)
+
+def _score(plain: np.ndarray, m: int) -> np.ndarray:
+    """Puntuación de cada fila de símbolos descifrados con el modelo de n-gramas"""
+    if m == LETTER_MODULUS:
+        return score_letter_matrix(plain)
+    return score_many([row.astype(np.uint8).tobytes() for row in plain])["score"]
+
+def crib_matrices(values: np.ndarray, crib: np.ndarray, n: int, m: int) -> np.ndarray:
+    """
+    Matrices de descifrado compatibles con el crib en cada desplazamiento
+    que cubre al menos n bloques completos: C_b^T·D^T = P_b^T, un sistema por
+    desplazamiento, resueltos todos en un lote por cada alineación.
+    """
+    found = []
+    for alignment in range(n):
+        first = (-alignment) % n
+        count = (len(crib) - first) // n
+        if count < n:
+            continue
+        starts = np.arange(alignment, len(values) - len(crib) + 1, n)
+        if len(starts) == 0:
+            continue
+        plain = crib[first:first + count * n].reshape(count, n)
+        cipher = values[(starts + first)[:, None] + np.arange(count * n)].reshape(len(starts), count, n)
+        solution, ok = solve_mod(cipher, np.broadcast_to(plain, cipher.shape), m)
+        found.append(np.swapaxes(solution[ok], 1, 2))
+        if m ** n <= ROW_ENUMERATION_LIMIT:
+            for blocks in cipher[~ok]:
+                found.append(_crib_rows(blocks, plain, m))
+    return np.concatenate(found) if found else np.zeros((0, n, n), dtype=np.int64)
+
+@lru_cache(maxsize=None)
+def all_rows(n: int, m: int) -> np.ndarray:
+    """Las m^n filas posibles de una matriz n×n mod m"""
+    return np.array(list(product(range(m), repeat=n)), dtype=np.int64)
+
+def _crib_rows(blocks: np.ndarray, plain: np.ndarray, m: int) -> np.ndarray:
+    """
+    Sistema singular (bloques cifrados no invertibles mod m): cada fila de D
+    cumple por separado fila·C_b = P_b[:, i], así que se enumeran las filas
+    compatibles y se combinan en las matrices invertibles resultantes.
+    """
+    n = blocks.shape[1]
+    rows = all_rows(n, m)
+    products = rows @ blocks.T % m
+    choices = [rows[(products == plain[:, i]).all(axis=1)] for i in range(n)]
+    if np.prod([len(c) for c in choices]) > CRIB_COMBINATIONS or not all(len(c) for c in choices):
+        return np.zeros((0, n, n), dtype=np.int64)
+    index = np.array(list(product(*(range(len(c)) for c in choices))), dtype=np.int64)
+    matrices = np.stack([choices[i][index[:, i]] for i in range(n)], axis=1)
+    return matrices[invertible_mod(matrices, m)]
+
+# ============ BÚSQUEDA FILA A FILA ============
+
+def _row_log_probabilities(m: int) -> np.ndarray:
+    """log P(símbolo en claro): mezcla de unigramas de los idiomas o modelo de bytes"""
+    if m == LETTER_MODULUS:
+        probabilities = np.mean([np.exp(np.asarray(ngram_table(1, language))) for language in LANGUAGES], axis=0)
+        return np.log(probabilities)
+    return ENGLISH_BYTE_LOGP
+
+def _row_chunk(blocks: np.ndarray, m: int, first: range, top: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mejores filas con el primer coeficiente en `first`: la parte del resto de
+    coeficientes se calcula una vez (m^(n-1) filas × bloques) y cada primer
+    coeficiente sólo suma su columna. Las filas que son múltiplo de un primo
+    de m no pueden estar en una matriz invertible.
+    """
+    n = blocks.shape[1]
+    logp = _row_log_probabilities(m)
+    rest = np.array(list(product(range(m), repeat=n - 1)), dtype=np.int64)
+    partial = rest @ blocks[:, 1:].T % m
+    primes = [p for p, _ in prime_powers(m)]
+    rest_divisible = {p: (rest % p == 0).all(axis=1) for p in primes}
+    best_rows, best_scores = np.zeros((0, n), dtype=np.int64), np.zeros(0)
+    for d0 in first:
+        scores = logp[(d0 * blocks[:, 0] + partial) % m].mean(axis=1)
+        for p in primes:
+            if d0 % p == 0:
+                scores[rest_divisible[p]] = -np.inf
+        keep = np.argpartition(-scores, top - 1)[:top] if len(scores) > top else np.arange(len(scores))
+        rows = np.column_stack([np.full(len(keep), d0), rest[keep]])
+        best_rows = np.concatenate([best_rows, rows])
+        best_scores = np.concatenate([best_scores, scores[keep]])
+        order = np.argsort(-best_scores, kind="stable")[:top]
+        best_rows, best_scores = best_rows[order], best_scores[order]
+    return best_rows, best_scores
+
+def best_rows(values: np.ndarray, n: int, m: int, workers: int = 0,
+              timeout: float = 60.0) -> np.ndarray:
+    """
+    Las ROW_CANDIDATES filas de descifrado cuya salida (un símbolo de cada
+    bloque) más se parece al idioma: m^n filas en lugar de m^(n²) matrices.
+    Para n >= PARALLEL_BLOCK_SIZE los primeros coeficientes se reparten
+    entre procesos.
+    """
+    blocks = values[:len(values) // n * n].reshape(-1, n)[:ROW_SAMPLE_BLOCKS[m]]
+    workers = workers or os.cpu_count() or 1
+    deadline = time.time() + timeout
+    if workers == 1 or n < PARALLEL_BLOCK_SIZE:
+        rows, _ = _row_chunk(blocks, m, range(m), ROW_CANDIDATES)
+        return rows
+
+    results = []
+    step = -(-m // workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_row_chunk, blocks, m, range(lo, min(lo + step, m)), ROW_CANDIDATES)
+                   for lo in range(0, m, step)]
+        try:
+            for future in as_completed(futures, timeout=max(deadline - time.time(), 0)):
+                results.append(future.result())
+        except TimeoutError:
+            pass
+        finally:
+            for future in futures:
+                future.cancel()
+    if not results:
+        return np.zeros((0, n), dtype=np.int64)
+    rows = np.concatenate([r for r, _ in results])
+    scores = np.concatenate([s for _, s in results])
+    return rows[np.argsort(-scores, kind="stable")[:ROW_CANDIDATES]]
+
+def row_matrices(rows: np.ndarray, n: int, m: int) -> np.ndarray:
+    """Matrices invertibles formadas con n filas candidatas distintas en cualquier orden"""
+    if len(rows) < n:
+        return np.zeros((0, n, n), dtype=np.int64)
+    index = np.array(list(permutations(range(len(rows)), n)), dtype=np.int64)
+    matrices = rows[index]
+    return matrices[invertible_mod(matrices, m)]
+
+# ============ ATAQUE ============
+
+def rank_matrices(values: np.ndarray, matrices: np.ndarray, m: int) -> List[Tuple[float, np.ndarray]]:
+    """Ordena matrices de descifrado por la puntuación de su texto descifrado (muestra)"""
+    if len(matrices) == 0:
+        return []
+    scores = _score(decrypt_values(values, matrices, m, SAMPLE_SYMBOLS), m)
+    order = np.argsort(-scores, kind="stable")
+    return [(float(scores[i]), matrices[i]) for i in order]
+
+def solve_hill(values: np.ndarray, m: int, block_sizes=BLOCK_SIZES, crib=None,
+               workers: int = 0, timeout: float = 60.0) -> List[Dict[str, Any]]:
+    """
+    Candidatos de matriz de descifrado por tamaño de bloque: primero los que
+    dan el crib (el indicado y el de la flag); si ninguno da texto con
+    sentido, la búsqueda fila a fila sólo con el cifrado.
+
+    Returns:
+        Lista de dicts con 'block_size', 'method', 'matrix' (descifrado) y 'score'
+    """
+    cribs = [c for c in (crib, FLAG_CRIBS[m]) if c is not None and len(c)]
+    candidates = []
+    for n in block_sizes:
+        # Un tamaño de bloque ya dio texto con sentido: no se prueban los mayores
+        if len(values) < 2 * n or any(c["score"] >= PLAINTEXT_THRESHOLD for c in candidates):
+            continue
+        for known in cribs:
+            known = np.asarray(list(known), dtype=np.int64)
+            for score, matrix in rank_matrices(values, crib_matrices(values, known, n, m), m)[:3]:
+                candidates.append({"block_size": n, "method": "known_plaintext", "matrix": matrix, "score": score})
+        if any(c["block_size"] == n and c["score"] >= PLAINTEXT_THRESHOLD for c in candidates):
+            continue
+        rows = best_rows(values, n, m, workers, timeout)
+        for score, matrix in rank_matrices(values, row_matrices(rows, n, m), m)[:3]:
+            candidates.append({"block_size": n, "method": "ciphertext_only", "matrix": matrix, "score": score})
+    candidates.sort(key=lambda c: -c["score"])
+    return candidates
+
+def _letters(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Posiciones y códigos 0..25 de las letras ASCII del texto"""
+    chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    lower = chars | 0x20
+    positions = np.flatnonzero((lower >= 97) & (lower <= 122))
+    return positions, (lower[positions] - 97).astype(np.int64)
+
+def _rebuild(text: str, positions: np.ndarray, plain: np.ndarray) -> str:
+    """Vuelve a colocar las letras descifradas respetando mayúsculas y el resto de caracteres"""
+    chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).copy()
+    upper = chars[positions] < 97
+    chars[positions] = np.where(upper, 65, 97) + plain
+    return chars.tobytes().decode('utf-32-le')
+
+@tool
+def hill_attack(ciphertext: str, block_size: int = 0, mode: str = "auto", known_plaintext: str = "",
+                workers: int = 0, timeout: int = 60) -> Dict[str, Any]:
+    """
+    Rompe un cifrado de Hill (bloques de 2 o 3 símbolos, mod 26 sobre letras
+    o mod 256 sobre bytes). Con texto conocido (o el crib "flag{") la clave
+    sale de un sistema lineal mod m; si no, se enumera cada fila de la matriz
+    de descifrado por separado (n·m^n en lugar de m^(n²)) y las mejores filas
+    se combinan en matrices invertibles.
+
+    Args:
+        ciphertext: Texto cifrado (letras, o hex/base64 en modo bytes)
+        block_size: Tamaño de bloque (0 = probar 2 y 3)
+        mode: "letters", "bytes" o "auto"
+        known_plaintext: Fragmento del texto en claro (cualquier posición)
+        workers: Procesos para la búsqueda 3×3 sólo con el cifrado (0 = todos los núcleos)
+        timeout: Tiempo máximo en segundos
+
+    Returns:
+        Dict con 'key' (matriz de cifrado), 'decryption_matrix', 'plaintext' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        if mode == "auto":
+            compact = re.sub(r'\s+', '', ciphertext)
+            letters = sum(c.isascii() and c.isalpha() for c in compact)
+            # Sólo letras con longitud múltiplo de 4 también es base64 válido: detect_encoding lo descarta
+            encoding, _ = detect_encoding(ciphertext)
+            mode = "bytes" if encoding != "raw" or letters < LETTER_RATIO * max(len(compact), 1) else "letters"
+        if mode == "letters":
+            m = LETTER_MODULUS
+            positions, values = _letters(ciphertext)
+            crib = _letters(known_plaintext)[1] if known_plaintext else None
+        else:
+            m = BYTE_MODULUS
+            values = np.frombuffer(detect_encoding(ciphertext)[1], dtype=np.uint8).astype(np.int64)
+            crib = known_plaintext.encode() if known_plaintext else None
+
+        sizes = (block_size,) if block_size else BLOCK_SIZES
+        candidates = solve_hill(values, m, sizes, crib, workers, timeout)
+        if not candidates:
+            return {
+                "success": False,
+                "attack_type": "Hill",
+                "error": "Texto demasiado corto para los tamaños de bloque"
+            }
+
+        decoded = []
+        for candidate in candidates[:5]:
+            plain = decrypt_values(values, candidate["matrix"], m)
+            text = (_rebuild(ciphertext, positions, plain) if m == LETTER_MODULUS
+                    else plain.astype(np.uint8).tobytes().decode('latin-1'))
+            decoded.append((candidate, text, re.search(r'flag\{[^}]*\}', text, re.IGNORECASE)))
+        best, plaintext, flag = next((d for d in decoded if d[2]), decoded[0])
+        key, _ = inverse_mod(best["matrix"], m)
+        confident = best["score"] >= PLAINTEXT_THRESHOLD and len(values) >= CONFIDENT_LETTERS
+
+        result = {
+            "success": bool(flag) or confident,
+            "attack_type": "Hill",
+            "mode": mode,
+            "modulus": m,
+            "block_size": best["block_size"],
+            "method": best["method"],
+            "key": key.tolist(),
+            "decryption_matrix": best["matrix"].tolist(),
+            "plaintext": plaintext,
+            "score": round(best["score"], 4),
+            "time": round(time.perf_counter() - start, 6),
+        }
+        if flag:
+            result["flag"] = flag.group()
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "Hill",
+            "error": str(e)
+        }
+
+HILL_TOOLS = [
+    hill_attack
+]
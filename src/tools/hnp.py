@@ -0,0 +1,259 @@
+"""
+Hidden Number Problem: recuperación de la clave privada ECDSA/DSA
+a partir de nonces sesgados o con bits filtrados (MSB/LSB)
+"""
+
+import math
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from langchain_core.tools import tool
+
+from .ecc import NAMED_CURVES
+from .lattice import bkz_reduce, lll_reduce
+from .signatures import load_signatures, make_key_verifier, parse_int
+
+# Margen de bits sobre el límite teórico m·l > log2(q) al empezar
+HNP_MARGIN_BITS = 8
+# Factor de crecimiento del número de firmas entre intentos
+HNP_GROWTH = 1.25
+# Bloque de BKZ del último intento (BKZ-10 apenas mejora a LLL en HNP)
+HNP_BKZ_BLOCK_SIZE = 20
+# Fracción de firmas de control que deben cumplir la fuga
+HNP_CONSISTENCY = 0.9
+
+# ============ MODELO DE FUGA ============
+
+def _reduce_signature(sig: Dict[str, Any], q: int, leak: str, known_bits: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Convierte una firma en una instancia HNP  k' = t·d + u (mod q), 0 <= k' < 2^bound_bits.
+
+    Returns:
+        (t, u, bits conocidos) o None si la firma no es utilizable
+    """
+    r, s, h = sig['r'] % q, sig['s'] % q, sig.get('h', 0) % q
+    if not r or not s:
+        return None
+    bits = int(sig.get('known_bits', known_bits))
+    kind = str(sig.get('leak', 'lsb' if 'lsb' in sig and 'msb' not in sig else leak)).lower()
+    s_inv = pow(s, -1, q)
+    t, u = r * s_inv % q, h * s_inv % q
+    if bits <= 0:
+        return None
+
+    if kind == 'lsb':
+        # k = k'·2^l + v
+        inv = pow(1 << bits, -1, q)
+        value = sig.get('lsb', 0) % (1 << bits)
+        return t * inv % q, (u - value) * inv % q, bits
+    # k = v·2^(N-l) + k'
+    shift = q.bit_length() - bits
+    value = sig.get('msb', 0) % (1 << bits)
+    return t, (u - (value << shift)) % q, bits
+
+def _build_lattice(instances: List[Tuple[int, int, int]], q: int) -> Tuple[List[List[int]], int, int]:
+    """
+    Retículo de dimensión m+1 eliminando d con la primera firma
+    (embedding de Kannan, nonces centrados en el intervalo).
+
+    Returns:
+        (base, mitad de la cota, peso de la columna de k'_0)
+    """
+    N = q.bit_length()
+    min_bits = min(bits for _, _, bits in instances)
+    bound = 1 << (N - min_bits)
+    half = bound // 2
+
+    t0, u0, bits0 = instances[0]
+    t0_inv = pow(t0, -1, q)
+    m = len(instances)
+    weights = [1 << (bits - min_bits) for _, _, bits in instances]
+
+    basis = []
+    for i in range(1, m):
+        row = [0] * (m + 1)
+        row[i - 1] = q * weights[i]
+        basis.append(row)
+
+    row_a = [0] * (m + 1)
+    row_e = [0] * (m + 1)
+    for i in range(1, m):
+        t, u, _ = instances[i]
+        a = t * t0_inv % q
+        b = (u - a * u0) % q
+        # centrado: c_i = a·c_0 + (b + (a - 1)·half_i)
+        half_i = (1 << (N - instances[i][2])) // 2
+        half_0 = (1 << (N - bits0)) // 2
+        row_a[i - 1] = a * weights[i]
+        row_e[i - 1] = ((b + a * half_0 - half_i) % q) * weights[i]
+    row_a[m - 1] = weights[0]
+    row_e[m] = half
+    basis.append(row_a)
+    basis.append(row_e)
+    return basis, half, weights[0]
+
+def _candidate_keys(reduced: List[List[int]], instances, q: int, half: int, weight0: int):
+    """Extrae las claves candidatas de los vectores con la coordenada de embedding = ±half"""
+    t0, u0, bits0 = instances[0]
+    t0_inv = pow(t0, -1, q)
+    half_0 = (1 << (q.bit_length() - bits0)) // 2
+    seen = set()
+    for row in reduced:
+        if abs(row[-1]) != half or row[-2] % weight0:
+            continue
+        sign = 1 if row[-1] > 0 else -1
+        k0 = sign * row[-2] // weight0 + half_0
+        d = (k0 - u0) * t0_inv % q
+        if d and d not in seen:
+            seen.add(d)
+            yield d
+
+# ============ VERIFICACIÓN ============
+
+def _nonce_fits(instance: Tuple[int, int, int], d: int, q: int) -> bool:
+    t, u, bits = instance
+    return (t * d + u) % q < (1 << (q.bit_length() - bits))
+
+# ============ SOLVER ============
+
+def solve_hnp(signatures: List[Dict[str, Any]], q: int, leak: str = "msb", known_bits: int = 8,
+              verifier=None, max_signatures: int = 200, timeout: float = 120.0,
+              block_size: int = HNP_BKZ_BLOCK_SIZE) -> Dict[str, Any]:
+    """
+    Resuelve el HNP aumentando el número de firmas hasta que una clave verifica.
+
+    Empieza con el mínimo teórico m ≈ (log2 q + margen) / l y crece
+    geométricamente; cada intento reduce el retículo con LLL y el último
+    prueba además BKZ. Sin clave pública, las firmas no usadas en el
+    retículo sirven de control.
+
+    Returns:
+        Dict con 'success', 'private_key', 'signatures_used' e intentos
+    """
+    start = time.time()
+    instances = []
+    for sig in signatures:
+        # Nonce conocido: recuperación directa d = (s·k - h) / r
+        if 'k' in sig and sig['r'] % q:
+            d = (sig['s'] * sig['k'] - sig.get('h', 0)) * pow(sig['r'], -1, q) % q
+            if verifier is None or verifier(d):
+                return {"success": True, "private_key": d, "signatures_used": 1,
+                        "signatures_loaded": len(signatures), "attempts": [],
+                        "verified_by": "public_key" if verifier else "known_nonce",
+                        "time": time.time() - start}
+        instance = _reduce_signature(sig, q, leak, known_bits)
+        if instance is not None:
+            instances.append(instance)
+
+    if len(instances) < 2:
+        return {"success": False, "error": "Need at least 2 usable signatures",
+                "signatures_loaded": len(signatures), "attempts": []}
+
+    N = q.bit_length()
+    avg_bits = sum(bits for _, _, bits in instances) / len(instances)
+    limit = min(len(instances), max_signatures)
+    m = min(limit, max(2, math.ceil((N + HNP_MARGIN_BITS) / avg_bits)))
+    attempts = []
+
+    while True:
+        used, control = instances[:m], instances[m:]
+        t_start = time.time()
+        basis, half, weight0 = _build_lattice(used, q)
+        reduced = lll_reduce(basis)
+        reductions = [("LLL", reduced)]
+        final = m >= limit or time.time() - start > timeout
+        if final and time.time() - start < timeout:
+            # Última oportunidad: BKZ sobre la base ya reducida con LLL
+            reductions.append((f"BKZ-{block_size}", None))
+
+        for algorithm, candidate_basis in reductions:
+            if candidate_basis is None:
+                candidate_basis = bkz_reduce(reduced, block_size=block_size,
+                                             timeout=max(timeout - (time.time() - start), 1))
+            attempts.append({"signatures": m, "dimension": len(basis), "algorithm": algorithm,
+                             "time": round(time.time() - t_start, 3)})
+            for d in _candidate_keys(candidate_basis, used, q, half, weight0):
+                if verifier is not None:
+                    ok = verifier(d)
+                elif control:
+                    ok = sum(_nonce_fits(inst, d, q) for inst in control) >= HNP_CONSISTENCY * len(control)
+                else:
+                    ok = all(_nonce_fits(inst, d, q) for inst in used)
+                if ok:
+                    return {"success": True, "private_key": d, "signatures_used": m,
+                            "signatures_loaded": len(signatures), "lattice_dimension": len(basis),
+                            "algorithm": algorithm, "attempts": attempts,
+                            "verified_by": "public_key" if verifier else "signatures",
+                            "time": time.time() - start}
+
+        if final:
+            break
+        m = min(limit, max(m + 1, int(m * HNP_GROWTH)))
+
+    return {"success": False, "error": "Lattice reduction did not reveal the key",
+            "signatures_loaded": len(signatures), "attempts": attempts,
+            "time": time.time() - start}
+
+# ============ TOOL ============
+
+@tool
+def hnp_attack(signatures: str, q: str = "", curve: str = "", leak: str = "msb", known_bits: int = 8,
+               pubkey: str = "", p: str = "", g: str = "", max_signatures: int = 200,
+               block_size: int = HNP_BKZ_BLOCK_SIZE, timeout: int = 120) -> Dict[str, Any]:
+    """
+    Recupera la clave privada ECDSA/DSA con nonces sesgados o parcialmente
+    filtrados resolviendo el Hidden Number Problem con LLL (y BKZ al final).
+
+    Args:
+        signatures: Firmas (r, s, h) en JSON, JSON Lines, CSV o líneas "r= s= h=", o ruta al archivo.
+                    Campos opcionales por firma: msb/lsb (bits filtrados), known_bits, leak, k
+        q: Orden del grupo (opcional si se da curve)
+        curve: Curva estándar (secp256k1, P-256)
+        leak: 'msb' (bits altos conocidos; 0 = nonce sesgado) o 'lsb'
+        known_bits: Bits del nonce conocidos por firma
+        pubkey: Clave pública para verificar ("x,y" o hex SEC1; entero y para DSA)
+        p, g: Parámetros DSA si se verifica con y = g^x mod p
+        max_signatures: Máximo de firmas por retículo
+        block_size: Bloque de BKZ para el último intento
+        timeout: Timeout en segundos
+
+    Returns:
+        Dict con 'private_key' y 'signatures_used'
+    """
+    try:
+        name = curve.lower().replace('-', '').replace('_', '')
+        if q:
+            q_int = parse_int(q)
+        elif name in NAMED_CURVES:
+            q_int = NAMED_CURVES[name][3]
+        else:
+            return {"success": False, "attack_type": "HNP Lattice Attack",
+                    "error": "Group order q or a named curve is required"}
+
+        sigs = load_signatures(signatures)
+        verifier = make_key_verifier(curve, pubkey, p, g)
+        result = solve_hnp(sigs, q_int, leak=leak, known_bits=known_bits, verifier=verifier,
+                           max_signatures=max_signatures, timeout=timeout, block_size=block_size)
+        result["attack_type"] = "HNP Lattice Attack"
+        if "time" in result:
+            result["time"] = round(result["time"], 3)
+
+        if result["success"]:
+            d = result["private_key"]
+            try:
+                plaintext = d.to_bytes((d.bit_length() + 7) // 8, 'big').decode('utf-8', errors='ignore')
+                if 'flag{' in plaintext.lower():
+                    result["flag"] = plaintext
+            except Exception:
+                pass
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "HNP Lattice Attack",
+            "error": str(e)
+        }
+
+HNP_TOOLS = [
+    hnp_attack
+]
@@ -0,0 +1,566 @@
+"""
+Reducción de retículos en el árbol (sin SageMath ni fpylll)
+LLL entero con Gram-Schmidt en coma flotante (NumPy float64) y fallback
+exacto, inserciones profundas, BKZ por bloques y ataque a knapsacks
+"""
+
+import ast
+import json
+import math
+import re
+import time
+from fractions import Fraction
+from typing import Dict, Any, List, Optional, Sequence
+from langchain_core.tools import tool
+
+import numpy as np
+
+# Parámetros estándar de LLL
+LLL_DELTA = 0.99
+LLL_ETA = 0.51
+# Bits máximos de una entrada para la ruta float64 (normas^2 < 2^1023)
+FLOAT_MAX_BITS = 480
+# Coeficiente de reducción a partir del cual se recalcula Gram-Schmidt
+RECOMPUTE_THRESHOLD = 2 ** 26
+# |b*_i| / |b_i| mínimo para confiar en el Gram-Schmidt float64 de una fila
+PRECISION_RATIO = 2.0 ** -26
+# Reducciones de tamaño seguidas sobre una fila antes de declarar pérdida de precisión
+MAX_REDUCTION_LOOPS = 64
+# Profundidad de inserción de LLL profundo (toda la base es mucho más lento)
+DEEP_INSERTION_DEPTH = 16
+# Tamaño de bloque y número de pasadas por defecto de BKZ
+BKZ_BLOCK_SIZE = 10
+BKZ_MAX_TOURS = 8
+
+class PrecisionError(ArithmeticError):
+    """float64 no basta para la ortogonalización de esta base"""
+
+# ============ LLL FLOTANTE ============
+
+class _FloatReducer:
+    """
+    Base entera exacta (filas como arrays NumPy de objetos int) con
+    Gram-Schmidt en float64: Q ortonormal, mu y normas de b*_i.
+
+    Cada fila de Gram-Schmidt depende solo de las filas anteriores, así que
+    se recalcula al llegar a ella; tras un intercambio o una inserción basta
+    con retroceder el índice k.
+    """
+
+    def __init__(self, rows: List[List[int]], eta: float = LLL_ETA):
+        self.B = [np.array(row, dtype=object) for row in rows]
+        self.d = len(rows)
+        self.eta = eta
+        self.Bf = np.array([row.astype(float) for row in self.B])
+        self.Q = np.zeros(self.Bf.shape)
+        self.mu = np.zeros((self.d, self.d))
+        self.norms = np.zeros(self.d)
+
+    def rows(self) -> List[List[int]]:
+        return [[int(v) for v in row] for row in self.B]
+
+    def gso(self, i: int) -> bool:
+        """
+        Recalcula la fila i con Gram-Schmidt clásico reortogonalizado (CGS2):
+        dos productos matriz-vector en lugar de un bucle por columna.
+
+        Returns:
+            False si |b*_i| es tan pequeño frente a |b_i| que conviene
+            recalcularlo tras reducir b_i
+        """
+        v = self.Bf[i]
+        Q = self.Q[:i]
+        coeffs = Q @ v
+        w = v - coeffs @ Q
+        correction = Q @ w
+        w -= correction @ Q
+        coeffs += correction
+        norm = float(np.sqrt(w @ w))
+        if not math.isfinite(norm):
+            raise PrecisionError(f"Gram-Schmidt overflow at row {i}")
+        self.norms[i] = norm
+        self.Q[i] = w / norm if norm else 0.0
+        self.mu[i, :i] = coeffs / self.norms[:i]
+        return norm > PRECISION_RATIO * float(np.sqrt(v @ v))
+
+    def size_reduce(self, k: int):
+        """Reducción de tamaño de b_k contra b_{k-1}, ..., b_0 (Schnorr-Euchner)"""
+        eta, mu = self.eta, self.mu
+        reliable = self.gso(k)
+        for _ in range(MAX_REDUCTION_LOOPS):
+            if k == 0 or np.abs(mu[k, :k]).max() <= eta:
+                if not self.norms[k]:
+                    raise PrecisionError(f"row {k} is numerically dependent")
+                return
+            coeffs = []
+            largest = 0
+            for j in range(k - 1, -1, -1):
+                if abs(mu[k, j]) > eta:
+                    x = round(mu[k, j])
+                    mu[k, :j] -= x * mu[j, :j]
+                    mu[k, j] -= x
+                    coeffs.append((j, int(x)))
+                    largest = max(largest, abs(x))
+            row = self.B[k]
+            for j, x in coeffs:
+                row = row - x * self.B[j]
+            self.B[k] = row
+            self.Bf[k] = row.astype(float)
+            # Con coeficientes pequeños y b*_k fiable, mu actualizado vale; si no, recalcular
+            if largest < RECOMPUTE_THRESHOLD and reliable:
+                return
+            reliable = self.gso(k)
+        raise PrecisionError(f"size reduction of row {k} does not converge")
+
+    def _move(self, k: int, i: int):
+        """Mueve la fila k a la posición i < k"""
+        if i == k - 1:
+            self.B[i], self.B[k] = self.B[k], self.B[i]
+            self.Bf[[i, k]] = self.Bf[[k, i]]
+        else:
+            self.B.insert(i, self.B.pop(k))
+            self.Bf[i:k + 1] = np.roll(self.Bf[i:k + 1], 1, axis=0)
+
+    def lll(self, lo: int = 0, delta: float = LLL_DELTA, depth: int = 0, deadline: Optional[float] = None):
+        """
+        LLL desde la fila lo (las filas < lo ya están reducidas y su
+        Gram-Schmidt es válido). depth > 0 activa inserciones profundas:
+        b_k puede insertarse en la posición i si i < depth o k - i <= depth.
+        """
+        if lo == 0:
+            self.gso(0)
+        k = max(lo, 1)
+        norms, mu = self.norms, self.mu
+        steps = 0
+        while k < self.d:
+            self.size_reduce(k)
+            steps += 1
+            if deadline is not None and steps % 256 == 0 and time.time() > deadline:
+                raise TimeoutError("lattice reduction timeout")
+
+            if depth:
+                # ||pi_i(b_k)||^2 para cada i; primera posición donde mejora
+                Bi = norms[:k] ** 2
+                projected = norms[k] ** 2 + np.cumsum((mu[k, :k] ** 2 * Bi)[::-1])[::-1]
+                allowed = projected < delta * Bi
+                allowed[depth:max(depth, k - depth)] = False
+                insert_at = int(np.argmax(allowed)) if allowed.any() else None
+                if insert_at is None:
+                    k += 1
+                else:
+                    self._move(k, insert_at)
+                    if insert_at == 0:
+                        self.gso(0)
+                    k = max(insert_at, 1)
+            elif norms[k] ** 2 >= (delta - mu[k, k - 1] ** 2) * norms[k - 1] ** 2:
+                k += 1
+            else:
+                self._move(k, k - 1)
+                k -= 1
+                if k == 0:
+                    self.gso(0)
+                    k = 1
+
+    # ============ BKZ ============
+
+    def _enumerate(self, j: int, k: int, radius: float) -> Optional[List[int]]:
+        """
+        Enumeración Schnorr-Euchner (zigzag en profundidad) del vector más
+        corto del retículo proyectado en el bloque [j, k] con norma^2 < radius.
+
+        Returns:
+            Coeficientes respecto a b_j..b_k, o None si no hay ninguno
+        """
+        n = k - j + 1
+        mu = self.mu[j:k + 1, j:k + 1].tolist()
+        B = (self.norms[j:k + 1] ** 2).tolist()
+        u = [0] * n
+        best = [radius, None]
+
+        def search(t: int, partial: float, top: bool):
+            if top:
+                # Todos los coeficientes superiores son 0: centro 0 y, por la
+                # simetría v / -v, solo valores no negativos
+                value = 0
+                while True:
+                    dist = partial + value * value * B[t]
+                    if dist >= best[0]:
+                        break
+                    u[t] = value
+                    if t > 0:
+                        search(t - 1, dist, value == 0)
+                    elif value:
+                        best[0], best[1] = dist, list(u)
+                    value += 1
+                u[t] = 0
+                return
+
+            c = -sum(u[i] * mu[i][t] for i in range(t + 1, n))
+            x = round(c)
+            sign = 1 if c >= x else -1
+            value, step = x, 0
+            # zigzag x, x±1, x∓1, x±2, ...: |value - c| no decreciente
+            while True:
+                dist = partial + (value - c) ** 2 * B[t]
+                if dist >= best[0]:
+                    break
+                u[t] = value
+                if t > 0:
+                    search(t - 1, dist, False)
+                else:
+                    best[0], best[1] = dist, list(u)
+                step += 1
+                value = x + sign * ((step + 1) // 2) if step % 2 else x - sign * (step // 2)
+            u[t] = 0
+
+        search(n - 1, 0.0, True)
+        return best[1]
+
+    def _insert_combination(self, j: int, coeffs: List[int]):
+        """
+        Sustituye el bloque por una base que empieza por sum(coeffs[i]·b_{j+i})
+        mediante operaciones unimodulares (Euclides sobre los coeficientes).
+        """
+        u = list(coeffs)
+        rows = [j + i for i in range(len(u))]
+        while sum(1 for x in u if x) > 1:
+            a = min((i for i in range(len(u)) if u[i]), key=lambda i: abs(u[i]))
+            for b in range(len(u)):
+                if b != a and u[b]:
+                    q = u[b] // u[a]
+                    u[b] -= q * u[a]
+                    # u_a·b_a + u_b·b_b = u_a·(b_a + q·b_b) + (u_b - q·u_a)·b_b
+                    self.B[rows[a]] = self.B[rows[a]] + q * self.B[rows[b]]
+        a = next(i for i in range(len(u)) if u[i])
+        if u[a] < 0:
+            self.B[rows[a]] = -self.B[rows[a]]
+        for i in rows:
+            self.Bf[i] = self.B[i].astype(float)
+        if rows[a] != j:
+            self._move(rows[a], j)
+
+    def bkz(self, block_size: int = BKZ_BLOCK_SIZE, delta: float = LLL_DELTA,
+            max_tours: int = BKZ_MAX_TOURS, deadline: Optional[float] = None) -> int:
+        """BKZ: LLL + SVP por enumeración en cada bloque, hasta una pasada sin cambios"""
+        self.lll(0, delta, deadline=deadline)
+        tours = 0
+        for tours in range(1, max_tours + 1):
+            changed = False
+            for j in range(self.d - 1):
+                if deadline is not None and time.time() > deadline:
+                    return tours
+                k = min(j + block_size - 1, self.d - 1)
+                coeffs = self._enumerate(j, k, delta * self.norms[j] ** 2)
+                if coeffs is None:
+                    continue
+                changed = True
+                self._insert_combination(j, coeffs)
+                self.lll(j, delta, deadline=deadline)
+            if not changed:
+                break
+        return tours
+
+# ============ LLL EXACTO ============
+
+def _lll_exact(b: List[List[int]], delta: float = LLL_DELTA) -> List[List[int]]:
+    """
+    LLL entero de De Weger (Cohen, Alg. 2.6.7): determinantes de Gram d_i
+    y coeficientes lambda enteros, sin coma flotante. Lento pero exacto.
+    """
+    b = [list(row) for row in b]
+    n = len(b)
+    if n < 2:
+        return b
+    frac = Fraction(delta).limit_denominator(1000)
+    num, den = frac.numerator, frac.denominator
+    d = [1] + [0] * n  # d[i + 1] = d_i
+    lam = [[0] * n for _ in range(n)]
+
+    def dot(x, y):
+        return sum(p * q for p, q in zip(x, y))
+
+    def gram(k):
+        for j in range(k + 1):
+            u = dot(b[k], b[j])
+            for i in range(j):
+                u = (d[i + 1] * u - lam[k][i] * lam[j][i]) // d[i]
+            if j < k:
+                lam[k][j] = u
+            else:
+                if u == 0:
+                    raise ValueError("Basis vectors are linearly dependent")
+                d[k + 1] = u
+
+    def redi(k, l):
+        if 2 * abs(lam[k][l]) > d[l + 1]:
+            q = (2 * lam[k][l] + d[l + 1]) // (2 * d[l + 1])
+            b[k] = [x - q * y for x, y in zip(b[k], b[l])]
+            lam[k][l] -= q * d[l + 1]
+            for i in range(l):
+                lam[k][i] -= q * lam[l][i]
+
+    def swapi(k, kmax):
+        b[k], b[k - 1] = b[k - 1], b[k]
+        for j in range(k - 1):
+            lam[k][j], lam[k - 1][j] = lam[k - 1][j], lam[k][j]
+        lm = lam[k][k - 1]
+        B = (d[k - 1] * d[k + 1] + lm * lm) // d[k]
+        for i in range(k + 1, kmax + 1):
+            t = lam[i][k]
+            lam[i][k] = (d[k + 1] * lam[i][k - 1] - lm * t) // d[k]
+            lam[i][k - 1] = (B * t + lm * lam[i][k]) // d[k + 1]
+        d[k] = B
+
+    gram(0)
+    k, kmax = 1, 0
+    while k < n:
+        if k > kmax:
+            kmax = k
+            gram(k)
+        redi(k, k - 1)
+        # d_k·d_{k-2} < delta·d_{k-1}^2 - lambda^2  (escalado por den)
+        if den * d[k + 1] * d[k - 1] < num * d[k] ** 2 - den * lam[k][k - 1] ** 2:
+            swapi(k, kmax)
+            k = max(1, k - 1)
+        else:
+            for l in range(k - 2, -1, -1):
+                redi(k, l)
+            k += 1
+    return b
+
+# ============ API ============
+
+def _as_rows(basis: Sequence[Sequence[int]]) -> List[List[int]]:
+    return [[int(v) for v in row] for row in basis]
+
+def _max_bits(rows: List[List[int]]) -> int:
+    return max((abs(v).bit_length() for row in rows for v in row), default=0)
+
+def lll_reduce(basis: Sequence[Sequence[int]], delta: float = LLL_DELTA,
+               eta: float = LLL_ETA, depth: int = 0, exact: bool = False,
+               timeout: Optional[float] = None) -> List[List[int]]:
+    """
+    LLL (variante Schnorr-Euchner) sobre una base entera.
+
+    La base se mantiene exacta como enteros de Python y la ortogonalización
+    de Gram-Schmidt se hace en float64; si las entradas superan
+    FLOAT_MAX_BITS bits o float64 pierde precisión, se continúa con el LLL
+    entero exacto desde la base parcialmente reducida.
+
+    Args:
+        basis: Filas de la base (enteros, linealmente independientes)
+        delta: Parámetro de Lovász
+        eta: Umbral de reducción de tamaño
+        depth: Profundidad de inserción (0 = LLL clásico)
+        exact: Forzar la aritmética entera exacta
+        timeout: Segundos máximos de la ruta float64 (devuelve la base actual)
+
+    Returns:
+        Base reducida (lista de listas de int)
+    """
+    rows = _as_rows(basis)
+    if not rows:
+        return []
+    if exact or _max_bits(rows) > FLOAT_MAX_BITS:
+        return _lll_exact(rows, delta)
+    reducer = _FloatReducer(rows, eta)
+    deadline = time.time() + timeout if timeout else None
+    try:
+        reducer.lll(0, delta, depth, deadline)
+    except PrecisionError:
+        return _lll_exact(reducer.rows(), delta)
+    except TimeoutError:
+        pass
+    return reducer.rows()
+
+def bkz_reduce(basis: Sequence[Sequence[int]], block_size: int = BKZ_BLOCK_SIZE,
+               delta: float = LLL_DELTA, max_tours: int = BKZ_MAX_TOURS,
+               timeout: Optional[float] = None) -> List[List[int]]:
+    """
+    BKZ por bloques: tras LLL, busca por enumeración el vector más corto de
+    cada bloque proyectado y lo inserta. block_size 2 equivale a LLL; 10-20
+    es lo práctico en Python. Al agotar `timeout` devuelve la base actual.
+    """
+    rows = _as_rows(basis)
+    if not rows:
+        return []
+    if _max_bits(rows) > FLOAT_MAX_BITS:
+        rows = _lll_exact(rows, delta)
+        if _max_bits(rows) > FLOAT_MAX_BITS:
+            return rows
+    reducer = _FloatReducer(rows)
+    deadline = time.time() + timeout if timeout else None
+    try:
+        reducer.bkz(block_size, delta, max_tours, deadline)
+    except PrecisionError:
+        return _lll_exact(reducer.rows(), delta)
+    except TimeoutError:
+        pass
+    return reducer.rows()
+
+def parse_matrix(text: str) -> List[List[int]]:
+    """Matriz en JSON/lista de Python, matrix(ZZ, [[...]]) de Sage o una fila por línea"""
+    text = text.strip()
+    match = re.search(r'\[\s*\[.*\]\s*\]', text, re.DOTALL)
+    if match:
+        try:
+            return _as_rows(json.loads(match.group(0)))
+        except json.JSONDecodeError:
+            return _as_rows(ast.literal_eval(match.group(0)))
+    rows = [re.findall(r'-?\d+', line) for line in text.splitlines()]
+    return [[int(v) for v in row] for row in rows if row]
+
+# ============ KNAPSACK ============
+
+def solve_subset_sum(weights: Sequence[int], target: int, block_size: int = BKZ_BLOCK_SIZE,
+                     timeout: float = 120.0) -> Optional[List[int]]:
+    """
+    Subset sum de baja densidad (Merkle-Hellman) con el retículo CJLOSS:
+    filas [2·e_i | N·a_i] y [1, ..., 1 | N·s]; la solución es un vector
+    de ±1 con última coordenada 0. Prueba LLL, LLL profundo y BKZ con
+    bloques crecientes hasta el timeout.
+
+    Returns:
+        Lista de bits x con sum(x_i·a_i) = target, o None
+    """
+    n = len(weights)
+    N = math.isqrt(n) + 1
+    basis = [[2 if i == j else 0 for j in range(n)] + [N * w] for i, w in enumerate(weights)]
+    basis.append([1] * n + [N * target])
+    deadline = time.time() + timeout
+
+    def extract(reduced):
+        for row in reduced:
+            if row[-1] == 0 and all(v in (1, -1) for v in row[:-1]):
+                for sign in (1, -1):
+                    bits = [(1 - sign * v) // 2 for v in row[:-1]]
+                    if sum(b * w for b, w in zip(bits, weights)) == target:
+                        return bits
+        return None
+
+    reduced = lll_reduce(basis, timeout=timeout)
+    bits = extract(reduced)
+    if bits is None and time.time() < deadline:
+        reduced = lll_reduce(reduced, depth=DEEP_INSERTION_DEPTH, timeout=deadline - time.time())
+        bits = extract(reduced)
+    size = block_size
+    while bits is None and time.time() < deadline and size <= n + 1:
+        reduced = bkz_reduce(reduced, block_size=size, timeout=deadline - time.time())
+        bits = extract(reduced)
+        size += 5
+    return bits
+
+def _parse_int_list(text: str) -> List[int]:
+    return [int(v, 0) for v in re.findall(r'-?(?:0x[0-9a-fA-F]+|\d+)', text)]
+
+@tool
+def knapsack_attack(public_key: str, ciphertext: str, block_size: int = BKZ_BLOCK_SIZE,
+                    timeout: int = 120) -> Dict[str, Any]:
+    """
+    Rompe Merkle-Hellman / knapsacks de baja densidad resolviendo el subset
+    sum con reducción de retículos (LLL y BKZ propios, sin SageMath).
+
+    Args:
+        public_key: Pesos públicos a_1..a_n ("[a1, a2, ...]")
+        ciphertext: Suma cifrada o lista de sumas (un bloque de n bits cada una)
+        block_size: Tamaño de bloque inicial de BKZ
+        timeout: Timeout en segundos
+
+    Returns:
+        Dict con 'bits', 'plaintext' y 'density'
+    """
+    start = time.time()
+    try:
+        weights = _parse_int_list(public_key)
+        sums = _parse_int_list(ciphertext)
+        if not weights or not sums:
+            return {"success": False, "attack_type": "Knapsack Lattice Attack",
+                    "error": "Need public key weights and ciphertext sums"}
+        density = len(weights) / math.log2(max(weights))
+
+        bits = []
+        for s in sums:
+            remaining = timeout - (time.time() - start)
+            block = solve_subset_sum(weights, s, block_size, max(remaining, 1))
+            if block is None:
+                return {"success": False, "attack_type": "Knapsack Lattice Attack",
+                        "density": round(density, 3), "blocks_solved": len(bits) // len(weights),
+                        "error": "Lattice reduction did not find the subset",
+                        "time": round(time.time() - start, 3)}
+            bits.extend(block)
+
+        bit_string = ''.join(map(str, bits))
+        value = int(bit_string, 2)
+        plaintext = value.to_bytes((len(bits) + 7) // 8, 'big').lstrip(b'\x00').decode('utf-8', errors='ignore')
+        result = {
+            "success": True,
+            "attack_type": "Knapsack Lattice Attack",
+            "bits": bit_string,
+            "message_int": value,
+            "plaintext": plaintext,
+            "density": round(density, 3),
+            "time": round(time.time() - start, 3)
+        }
+        if 'flag{' in plaintext.lower():
+            result["flag"] = plaintext
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "Knapsack Lattice Attack",
+            "error": str(e)
+        }
+
+# ============ REDUCCIÓN GENÉRICA ============
+
+@tool
+def lattice_reduce(matrix: str, algorithm: str = "lll", block_size: int = BKZ_BLOCK_SIZE,
+                   timeout: int = 120) -> Dict[str, Any]:
+    """
+    Reduce una base de retículo (LLL o BKZ) sin SageMath: alternativa rápida
+    a execute_sage para ataques de retículos (SVP/CVP, embeddings manuales).
+
+    Args:
+        matrix: Filas de la base: "[[...], [...]]", matrix(ZZ, [[...]]) o una fila por línea
+        algorithm: 'lll', 'deep' (LLL con inserciones profundas) o 'bkz'
+        block_size: Tamaño de bloque para BKZ
+        timeout: Timeout en segundos (devuelve la mejor base alcanzada)
+
+    Returns:
+        Dict con 'reduced_basis' y 'shortest_vector'
+    """
+    start = time.time()
+    try:
+        rows = parse_matrix(matrix)
+        if not rows:
+            return {"success": False, "attack_type": "Lattice Reduction", "error": "Empty matrix"}
+        algorithm = algorithm.lower()
+        if algorithm == 'bkz':
+            reduced = bkz_reduce(rows, block_size=block_size, timeout=timeout)
+        else:
+            reduced = lll_reduce(rows, depth=DEEP_INSERTION_DEPTH if algorithm == 'deep' else 0,
+                                 timeout=timeout)
+        shortest = min(reduced, key=lambda row: sum(v * v for v in row))
+        return {
+            "success": True,
+            "attack_type": "Lattice Reduction",
+            "algorithm": algorithm,
+            "dimension": len(rows),
+            "reduced_basis": reduced,
+            "shortest_vector": shortest,
+            "shortest_norm_bits": round(math.log2(max(sum(v * v for v in shortest), 1)) / 2, 2),
+            "time": round(time.time() - start, 3)
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "Lattice Reduction",
+            "error": str(e)
+        }
+
+LATTICE_TOOLS = [
+    lattice_reduce,
+    knapsack_attack
+]
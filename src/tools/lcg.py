@@ -0,0 +1,319 @@
+"""
+Generadores lineales congruenciales (LCG): x_{i+1} = a·x_i + c (mod m)
+Recuperación de m, a y c con salidas completas y de la semilla con
+salidas truncadas (bits altos) mediante reducción de retículos
+"""
+
+import math
+import re
+import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from langchain_core.tools import tool
+
+from .lattice import lll_reduce
+
+# Primos pequeños que se prueban a quitar de un módulo recuperado por GCD
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+# Soluciones máximas de a·t ≡ t' (mod m) cuando t no es invertible
+MAX_MULTIPLIER_CANDIDATES = 1 << 12
+# Dimensión máxima del retículo de salidas truncadas
+LCG_MAX_DIMENSION = 40
+# Salidas extra sobre el mínimo teórico al construir el retículo
+LCG_MARGIN_OUTPUTS = 2
+
+# ============ SALIDAS COMPLETAS ============
+
+def lcg_stream(x: int, a: int, c: int, m: int, count: int) -> List[int]:
+    """Siguientes `count` estados a partir de x"""
+    out = []
+    for _ in range(count):
+        x = (a * x + c) % m
+        out.append(x)
+    return out
+
+def _consistent(outputs: Sequence[int], a: int, c: int, m: int) -> bool:
+    return all((a * x + c) % m == y for x, y in zip(outputs, outputs[1:]))
+
+def recover_modulus(outputs: Sequence[int]) -> int:
+    """
+    m = gcd(t_{i+2}·t_i - t_{i+1}^2) con t_i = x_{i+1} - x_i
+    (t_{i+1} = a·t_i mod m, así que cada determinante es múltiplo de m).
+
+    Returns:
+        Múltiplo de m (igual a m con 6-8 salidas casi siempre); 0 si no hay datos
+    """
+    t = [y - x for x, y in zip(outputs, outputs[1:])]
+    g = 0
+    for t0, t1, t2 in zip(t, t[1:], t[2:]):
+        g = math.gcd(g, t2 * t0 - t1 * t1)
+    return abs(g)
+
+def recover_multiplier(outputs: Sequence[int], m: int) -> List[int]:
+    """
+    a a partir de t_{i+1} = a·t_i (mod m); si ningún t_i es invertible se
+    resuelve la congruencia lineal y se devuelven todas las soluciones.
+    """
+    t = [(y - x) % m for x, y in zip(outputs, outputs[1:])]
+    for t0, t1 in zip(t, t[1:]):
+        if math.gcd(t0, m) == 1:
+            return [t1 * pow(t0, -1, m) % m]
+    for t0, t1 in zip(t, t[1:]):
+        g = math.gcd(t0, m)
+        if t0 and t1 % g == 0 and g <= MAX_MULTIPLIER_CANDIDATES:
+            step = m // g
+            base = (t1 // g) * pow(t0 // g, -1, step) % step
+            return [base + k * step for k in range(g)]
+    return []
+
+def recover_lcg(outputs: Sequence[int], m: Optional[int] = None, a: Optional[int] = None,
+                c: Optional[int] = None) -> Optional[Tuple[int, int, int]]:
+    """
+    Completa los parámetros desconocidos (m, a, c) a partir de salidas
+    consecutivas completas y los verifica contra todas ellas.
+
+    Returns:
+        (m, a, c) o None
+    """
+    outputs = list(outputs)
+    if m is None:
+        m = recover_modulus(outputs)
+        if not m:
+            return None
+        # El GCD puede arrastrar factores pequeños: se quitan mientras m siga
+        # siendo mayor que las salidas y el LCG siga siendo consistente
+        bound = max(outputs)
+        reduced = True
+        while reduced:
+            reduced = False
+            for p in SMALL_PRIMES:
+                if m % p == 0 and m // p > bound:
+                    params = recover_lcg(outputs, m // p, a, c)
+                    if params:
+                        m, reduced = m // p, True
+                        break
+    candidates = [a % m] if a is not None else recover_multiplier(outputs, m)
+    for a_candidate in candidates:
+        c_candidate = (outputs[1] - a_candidate * outputs[0]) % m if c is None else c % m
+        if _consistent(outputs, a_candidate, c_candidate, m):
+            return m, a_candidate, c_candidate
+    return None
+
+# ============ SALIDAS TRUNCADAS ============
+
+def _embedding_cvp(coefficients: Sequence[int], offsets: Sequence[int], m: int, half: int) -> List[int]:
+    """
+    Encuentra w con |w_i| <= half y w_i ≡ A_i·w_0 + K_i (mod m) por embedding de Kannan.
+
+    Returns:
+        Candidatos para w_0
+    """
+    n = len(coefficients)
+    basis = [[0] * (n + 1) for _ in range(n + 1)]
+    basis[0][:n] = list(coefficients)
+    for i in range(1, n):
+        basis[i][i] = m
+    basis[n][:n] = list(offsets)
+    basis[n][n] = half
+    candidates = []
+    for row in lll_reduce(basis):
+        if abs(row[-1]) == half:
+            sign = 1 if row[-1] > 0 else -1
+            candidates.append(sign * row[0])
+    return candidates
+
+def _dimension_plan(m: int, shift: int, available: int) -> List[int]:
+    """Dimensiones a probar: desde el mínimo teórico hasta LCG_MAX_DIMENSION"""
+    known = m.bit_length() - shift
+    if known <= 0:
+        return []
+    minimum = math.ceil(m.bit_length() / known) + LCG_MARGIN_OUTPUTS
+    top = min(available, LCG_MAX_DIMENSION)
+    sizes = []
+    n = max(3, minimum)
+    while n < top:
+        sizes.append(n)
+        n = max(n + 1, int(n * 1.5))
+    sizes.append(top)
+    return sizes
+
+def _seed_from_difference(outputs: Sequence[int], d0: int, shift: int, m: int, a: int) -> Optional[Tuple[int, int]]:
+    """
+    Con la diferencia exacta d_0 = x_1 - x_0, cada salida acota los bits bajos
+    de x_0 a un intervalo (x_i = x_0 + D_i mod m); se intersectan todos.
+
+    Returns:
+        (x_0, c, anchura del intervalo) o None si los intervalos no se cortan
+    """
+    size = 1 << shift
+    Y0 = outputs[0] << shift
+    lo, hi = 0, size
+    D, d = 0, d0
+    for y in outputs[1:]:
+        D = (D + d) % m
+        d = a * d % m
+        r = (Y0 + D - (y << shift)) % m
+        if r >= size:
+            r -= m
+        lo, hi = max(lo, -r), min(hi, size - r)
+        if lo >= hi:
+            return None
+    # El centro del intervalo minimiza los acarreos distintos en salidas futuras
+    x0 = Y0 + (lo + hi - 1) // 2
+    return x0, (x0 + d0 - a * x0) % m, hi - lo
+
+def recover_truncated_lcg(outputs: Sequence[int], shift: int, m: int, a: int,
+                          c: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Estados completos a partir de y_i = x_i >> shift con m y a conocidos.
+
+    Con c conocido el retículo acota los bits bajos z_i de cada estado;
+    sin c se usan las diferencias d_i = x_{i+1} - x_i (d_{i+1} = a·d_i) y
+    x_0 se acota después por intervalos. La dimensión crece desde el mínimo
+    teórico hasta LCG_MAX_DIMENSION.
+
+    Returns:
+        Dict con 'success', 'x0', 'increment', 'states', 'dimension'
+    """
+    outputs = list(outputs)
+    Y = [y << shift for y in outputs]
+    half = 1 << max(shift - 1, 0)
+    attempts = []
+    available = len(outputs) if c is not None else len(outputs) - 1
+
+    for n in _dimension_plan(m, shift, available):
+        A = [pow(a, i, m) for i in range(n)]
+        seeds = []
+        if c is not None:
+            # x_i = A_i·x_0 + B_i; bits bajos centrados: w_i = z_i - half
+            B = [0]
+            for _ in range(1, n):
+                B.append((a * B[-1] + c) % m)
+            offsets = [0] + [(A[i] * (Y[0] + half) + B[i] - Y[i] - half) % m for i in range(1, n)]
+            seeds = [(Y[0] + w0 + half, c % m, 1) for w0 in _embedding_cvp(A, offsets, m, half)]
+        else:
+            # e_i = z_{i+1} - z_i en (-2^shift, 2^shift): e_i ≡ A_i·e_0 + K_i
+            delta = [Y[i + 1] - Y[i] for i in range(n)]
+            offsets = [0] + [(A[i] * delta[0] - delta[i]) % m for i in range(1, n)]
+            for e0 in _embedding_cvp(A, offsets, m, 1 << shift):
+                seed = _seed_from_difference(outputs, (delta[0] + e0) % m, shift, m, a)
+                if seed is not None:
+                    seeds.append(seed)
+        attempts.append(n + 1)
+
+        for x0, increment, ambiguity in seeds:
+            states = [x0] + lcg_stream(x0, a, increment, m, len(outputs) - 1)
+            if all(x >> shift == y for x, y in zip(states, outputs)):
+                # Sin c, cualquier x_0 del intervalo (con su c) da las mismas salidas
+                return {"success": True, "x0": x0, "increment": increment, "states": states,
+                        "equivalent_seeds": ambiguity, "dimension": n + 1, "attempts": attempts}
+    return {"success": False, "attempts": attempts}
+
+# ============ HERRAMIENTA ============
+
+def _parse_int(value: str) -> Optional[int]:
+    value = str(value).strip()
+    return int(value, 0) if value else None
+
+def _decrypt(ciphertext: str, keystream: List[int], width: int) -> Dict[str, Any]:
+    """
+    XOR del texto cifrado con las siguientes salidas: lista de enteros (un
+    bloque por salida) o bytes (hex) con el byte bajo, el alto o la salida completa.
+    """
+    if re.fullmatch(r'\s*\[?\s*\d+(?:\s*,\s*\d+)*\s*\]?\s*', ciphertext):
+        blocks = [int(v) ^ k for v, k in zip(re.findall(r'\d+', ciphertext), keystream)]
+        data = b''.join(b.to_bytes(max(1, (b.bit_length() + 7) // 8), 'big') for b in blocks)
+        candidates = {"integer_blocks": data}
+    else:
+        text = ciphertext.strip()
+        data = bytes.fromhex(text) if re.fullmatch(r'(?:[0-9a-fA-F]{2})+', text) else text.encode('latin-1')
+        nbytes = max(1, (width + 7) // 8)
+        full = b''.join(k.to_bytes(nbytes, 'big') for k in keystream)
+        candidates = {
+            "low_byte": bytes(b ^ (k & 0xff) for b, k in zip(data, keystream)),
+            "high_byte": bytes(b ^ (k >> max(width - 8, 0) & 0xff) for b, k in zip(data, keystream)),
+            "full_output": bytes(b ^ k for b, k in zip(data, full)),
+        }
+    result = {}
+    for mode, plaintext in candidates.items():
+        text = plaintext.decode('utf-8', errors='ignore')
+        if 'flag{' in text.lower():
+            return {"plaintext": text, "keystream": mode, "flag": text}
+        result.setdefault("plaintext", text)
+    return result
+
+@tool
+def lcg_attack(outputs: str, modulus: str = "", multiplier: str = "", increment: str = "",
+               truncated_bits: int = 0, predict: int = 10, ciphertext: str = "") -> Dict[str, Any]:
+    """
+    Rompe un LCG x_{i+1} = a·x_i + c (mod m): recupera m por GCD de
+    determinantes, a y c de salidas consecutivas, o el estado completo con
+    salidas truncadas (bits altos) mediante LLL.
+
+    Args:
+        outputs: Salidas consecutivas ("[x1, x2, ...]" o una por línea)
+        modulus: m si se conoce (obligatorio con salidas truncadas)
+        multiplier: a si se conoce (obligatorio con salidas truncadas)
+        increment: c si se conoce
+        truncated_bits: Bits bajos descartados de cada salida (salida = x >> truncated_bits)
+        predict: Número de salidas futuras a devolver
+        ciphertext: Texto cifrado XOR con las siguientes salidas (hex o lista de enteros)
+
+    Returns:
+        Dict con 'modulus', 'multiplier', 'increment', 'predictions' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        values = [int(v, 0) for v in re.findall(r'0x[0-9a-fA-F]+|\d+', outputs)]
+        m, a, c = _parse_int(modulus), _parse_int(multiplier), _parse_int(increment)
+        result: Dict[str, Any] = {"attack_type": "LCG Parameter Recovery"}
+
+        if truncated_bits > 0:
+            if m is None or a is None:
+                return {"success": False, "attack_type": "LCG Parameter Recovery",
+                        "error": "Truncated outputs need the modulus and the multiplier"}
+            recovered = recover_truncated_lcg(values, truncated_bits, m, a, c)
+            result.update({"dimension": recovered.get("dimension"), "attempts": recovered["attempts"]})
+            if not recovered["success"]:
+                result.update({"success": False, "error": "Lattice did not reveal the states; give more outputs"})
+                return result
+            c, state = recovered["increment"], recovered["states"][-1]
+            result.update({"seed": recovered["x0"], "state": state,
+                           "equivalent_seeds": recovered["equivalent_seeds"]})
+            width = m.bit_length() - truncated_bits
+        else:
+            needed = 6 if m is None else 3 if a is None else 2
+            if len(values) < needed:
+                return {"success": False, "attack_type": "LCG Parameter Recovery",
+                        "error": "Not enough consecutive outputs (need ~6 with unknown modulus)"}
+            params = recover_lcg(values, m, a, c)
+            if params is None:
+                result.update({"success": False, "error": "Outputs are not consistent with a single LCG"})
+                return result
+            m, a, c = params
+            state = values[-1]
+            width = m.bit_length()
+
+        stream = lcg_stream(state, a, c, m, max(predict, 0) + (len(ciphertext) if ciphertext else 0))
+        keystream = [x >> truncated_bits for x in stream]
+        result.update({
+            "success": True,
+            "modulus": m,
+            "multiplier": a,
+            "increment": c,
+            "predictions": keystream[:predict],
+        })
+        if ciphertext:
+            result.update(_decrypt(ciphertext, keystream, width))
+        result["time"] = round(time.perf_counter() - start, 6)
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "LCG Parameter Recovery",
+            "error": str(e)
+        }
+
+LCG_TOOLS = [
+    lcg_attack
+]
@@ -0,0 +1,372 @@
+"""
+LFSR: Berlekamp-Massey con bits empaquetados en enteros de Python y
+ataques de texto conocido a cifrados de flujo (flag{, cabeceras de archivo)
+"""
+
+import os
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from langchain_core.tools import tool
+
+# Grado máximo del LFSR buscado (la ventana de Berlekamp-Massey ocupa max_degree bits)
+LFSR_MAX_DEGREE = 4096
+# Bits del keystream que deben sobrar tras 2·L para aceptar el polinomio
+LFSR_VERIFY_BITS = 8
+# Bytes iniciales del cifrado donde se busca la cabecera "flag{" si no se da offset
+CRIB_SEARCH_BYTES = 4096
+# Bytes que se descifran tras el crib para descartar candidatos antes de generar todo el keystream
+PREVIEW_BYTES = 32
+# Proporción mínima de caracteres imprimibles de un texto descifrado
+PRINTABLE_THRESHOLD = 0.9
+# Tamaño máximo del texto descifrado que se devuelve en hex
+MAX_HEX_BYTES = 4096
+
+# Cribs por defecto: prefijo de flag y números mágicos de formatos de archivo
+DEFAULT_CRIBS = {
+    "flag": b"flag{",
+    "png": bytes.fromhex("89504e470d0a1a0a0000000d49484452"),
+    "pdf": b"%PDF-1.",
+    "zip": b"PK\x03\x04",
+    "gif": b"GIF89a",
+    "jpeg": b"\xff\xd8\xff",
+}
+# Finales característicos para validar un archivo descifrado
+FILE_TRAILERS = {
+    "png": b"IEND\xaeB`\x82",
+    "pdf": b"%%EOF",
+    "zip": b"PK\x05\x06",
+    "gif": b"\x00\x3b",
+    "jpeg": b"\xff\xd9",
+}
+
+# Inversión de bits de cada byte (orden MSB primero <-> LSB primero)
+_REVERSE_BITS = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+
+# ============ BITS ============
+
+def bytes_to_int(data: bytes, order: str = "msb") -> int:
+    """Secuencia de bits como entero: el bit n del entero es s_n"""
+    if order == "msb":
+        data = data.translate(_REVERSE_BITS)
+    return int.from_bytes(data, 'little')
+
+def int_to_bytes(bits: int, nbytes: int, order: str = "msb") -> bytes:
+    """Inversa de bytes_to_int para los primeros nbytes·8 bits"""
+    data = (bits & ((1 << (8 * nbytes)) - 1)).to_bytes(nbytes, 'little')
+    return data.translate(_REVERSE_BITS) if order == "msb" else data
+
+def _reverse(value: int, width: int) -> int:
+    """Invierte el orden de los `width` bits bajos"""
+    if width <= 0:
+        return 0
+    return int(f"{value & ((1 << width) - 1):0{width}b}"[::-1], 2)
+
+# ============ BERLEKAMP-MASSEY ============
+
+def berlekamp_massey(sequence: int, nbits: int, max_degree: int = LFSR_MAX_DEGREE) -> Tuple[int, int]:
+    """
+    LFSR mínimo que genera la secuencia (Berlekamp-Massey sobre GF(2)).
+
+    Los polinomios C, B y la ventana de bits recientes son enteros de Python,
+    así que la discrepancia es un AND + popcount. Sólo se procesa el prefijo
+    de 2·max_degree + LFSR_VERIFY_BITS bits: si el grado real es <= max_degree
+    ese prefijo ya lo determina, y el resto se comprueba con verify_lfsr().
+
+    Args:
+        sequence: Entero con el bit n = s_n
+        nbits: Longitud de la secuencia
+        max_degree: Grado a partir del cual se abandona
+
+    Returns:
+        (C, L): polinomio de conexión (bit j = c_j, c_0 = 1) y grado;
+        L = -1 si el grado supera max_degree
+    """
+    limit = min(nbits, 2 * max_degree + LFSR_VERIFY_BITS)
+    prefix = (sequence & ((1 << limit) - 1)).to_bytes((limit + 7) // 8, 'little')
+    mask = (1 << (max_degree + 1)) - 1
+    C, B = 1, 1
+    L, shift = 0, 1
+    window = 0
+    n = 0
+    for byte in prefix:
+        for k in range(8):
+            if n == limit:
+                return C, L
+            # window: bit j = s_{n-j}
+            window = ((window << 1) | (byte >> k & 1)) & mask
+            if (C & window).bit_count() & 1:
+                T = C
+                C ^= B << shift
+                if 2 * L <= n:
+                    L = n + 1 - L
+                    if L > max_degree:
+                        return C, -1
+                    B, shift = T, 1
+                    n += 1
+                    continue
+            shift += 1
+            n += 1
+    return C, L
+
+def verify_lfsr(sequence: int, nbits: int, C: int, L: int) -> int:
+    """
+    Comprueba la recurrencia en toda la secuencia con XOR de copias desplazadas:
+    XOR_j c_j·(S << j) tiene a cero los bits L..nbits-1 si el LFSR la genera.
+
+    Returns:
+        Bits que cumplen la recurrencia antes del primer fallo (nbits si no hay fallos)
+    """
+    residue = 0
+    taps, j = C, 0
+    while taps:
+        if taps & 1:
+            residue ^= sequence << j
+        taps >>= 1
+        j += 1
+    residue = (residue >> L) & ((1 << max(nbits - L, 0)) - 1)
+    if not residue:
+        return nbits
+    return L + (residue & -residue).bit_length() - 1
+
+# ============ GENERACIÓN ============
+
+def lfsr_generate(C: int, L: int, state: int, count: int) -> int:
+    """
+    Genera `count` bits a partir del estado inicial (bit j = s_j para j < L).
+
+    Returns:
+        Entero con el bit n = s_n
+    """
+    taps = C >> 1
+    mask = (1 << L) - 1
+    out = bytearray()
+    window = byte = k = 0
+    for n in range(count):
+        s = state >> n & 1 if n < L else (window & taps).bit_count() & 1
+        # window: bit j = s_{n-j}
+        window = ((window << 1) | s) & mask
+        byte |= s << k
+        k += 1
+        if k == 8:
+            out.append(byte)
+            byte = k = 0
+    if k:
+        out.append(byte)
+    return int.from_bytes(out, 'little')
+
+def regenerate(C: int, L: int, segment: int, position: int, total: int) -> Optional[int]:
+    """
+    Keystream completo (bits 0..total-1) a partir de L bits conocidos en `position`.
+    Hacia atrás se usa el polinomio recíproco, que exige c_L = 1.
+    """
+    state = segment & ((1 << L) - 1)
+    forward = lfsr_generate(C, L, state, total - position)
+    if position == 0:
+        return forward
+    if L == 0:
+        return forward << position
+    if not C >> L & 1:
+        return None
+    backward = lfsr_generate(_reverse(C, L + 1), L, _reverse(state, L), L + position)
+    return _reverse(backward >> L, position) | (forward << position)
+
+def polynomial_string(C: int, L: int) -> str:
+    """Polinomio de conexión 1 + c_1·x + ... + c_L·x^L en notación legible"""
+    terms = [("x^%d" % j if j > 1 else "x" if j == 1 else "1") for j in range(L, -1, -1) if C >> j & 1]
+    return " + ".join(terms)
+
+# ============ ATAQUE CON TEXTO CONOCIDO ============
+
+def _printable_ratio(data: bytes) -> float:
+    if not data:
+        return 0.0
+    return sum(32 <= b < 127 or b in (9, 10, 13) for b in data) / len(data)
+
+def _score(plaintext: bytes, kind: str) -> float:
+    """Texto: proporción imprimible; archivo: 1.0 si aparece su final característico"""
+    if kind == "known":
+        return 1.0
+    if kind in FILE_TRAILERS:
+        return 1.0 if FILE_TRAILERS[kind] in plaintext[-1024:] else 0.0
+    return _printable_ratio(plaintext)
+
+def crib_attack(data: bytes, crib: bytes, offset: int, order: str, kind: str = "text",
+                max_degree: int = LFSR_MAX_DEGREE) -> Optional[Dict[str, Any]]:
+    """
+    Keystream = cifrado XOR crib en `offset`; Berlekamp-Massey sobre esos bits,
+    regeneración del flujo entero y descifrado.
+
+    Returns:
+        Dict con el LFSR y el texto descifrado, o None si el crib no da un LFSR
+        suficientemente corto o el resultado no parece válido
+    """
+    segment = bytes(a ^ b for a, b in zip(data[offset:], crib))
+    nbits = len(segment) * 8
+    degree_bound = min(max_degree, (nbits - LFSR_VERIFY_BITS) // 2)
+    if degree_bound < 1:
+        return None
+    sequence = bytes_to_int(segment, order)
+    C, L = berlekamp_massey(sequence, nbits, degree_bound)
+    if L < 0:
+        return None
+
+    # Vista previa barata tras el crib antes de generar el flujo completo
+    if kind in ("text", "flag"):
+        end = min(len(data), offset + len(segment) + PREVIEW_BYTES)
+        preview = lfsr_generate(C, L, sequence, (end - offset) * 8)
+        window = data[offset:end]
+        decrypted = bytes(a ^ b for a, b in zip(window, int_to_bytes(preview, len(window), order)))
+        if _printable_ratio(decrypted) < PRINTABLE_THRESHOLD:
+            return None
+
+    keystream = regenerate(C, L, sequence, offset * 8, len(data) * 8)
+    if keystream is None:
+        return None
+    plaintext = bytes(a ^ b for a, b in zip(data, int_to_bytes(keystream, len(data), order)))
+    score = _score(plaintext, kind)
+    if score < (1.0 if kind in FILE_TRAILERS else PRINTABLE_THRESHOLD):
+        return None
+    return {
+        "degree": L,
+        "connection_polynomial": polynomial_string(C, L),
+        "taps": [j for j in range(1, L + 1) if C >> j & 1],
+        "initial_state": format(_reverse(keystream, L), f"0{L}b") if L else "",
+        "bit_order": order,
+        "crib": kind,
+        "offset": offset,
+        "score": round(score, 4),
+        "plaintext_bytes": plaintext,
+    }
+
+def _candidates(data: bytes, known_plaintext: bytes, offset: int) -> List[Tuple[str, bytes, List[int]]]:
+    """(tipo, crib, offsets) en orden: cabeceras de archivo al inicio y después "flag{" """
+    if known_plaintext:
+        kind = "text" if _printable_ratio(known_plaintext) == 1.0 else "known"
+        offsets = [offset] if offset >= 0 else list(range(min(len(data), CRIB_SEARCH_BYTES)))
+        return [(kind, known_plaintext, offsets)]
+    cribs = [(kind, magic, [0]) for kind, magic in DEFAULT_CRIBS.items() if kind != "flag"]
+    offsets = [offset] if offset >= 0 else list(range(min(len(data), CRIB_SEARCH_BYTES)))
+    return cribs + [("flag", DEFAULT_CRIBS["flag"], offsets)]
+
+# ============ HERRAMIENTA ============
+
+def _load(value: str) -> Tuple[bytes, Optional[str]]:
+    """Ruta de archivo, hex o texto latin-1"""
+    value = value.strip()
+    if len(value) < 4096 and os.path.isfile(value):
+        with open(value, 'rb') as f:
+            return f.read(), value
+    if re.fullmatch(r'(?:[0-9a-fA-F]{2})+', value):
+        return bytes.fromhex(value), None
+    return value.encode('latin-1'), None
+
+def _load_keystream(value: str, order: str) -> Tuple[int, int]:
+    """Keystream como cadena de '0'/'1' o bytes (hex/archivo): (entero, número de bits)"""
+    compact = re.sub(r'[\s,\[\]]', '', value)
+    if compact and set(compact) <= {"0", "1"} and not os.path.isfile(value.strip()):
+        return int(compact[::-1], 2), len(compact)
+    data, _ = _load(value)
+    return bytes_to_int(data, order), len(data) * 8
+
+@tool
+def lfsr_attack(ciphertext: str = "", known_plaintext: str = "", offset: int = -1, keystream: str = "",
+                bit_order: str = "", max_degree: int = LFSR_MAX_DEGREE, predict: int = 64) -> Dict[str, Any]:
+    """
+    Rompe cifrados de flujo con keystream de un LFSR: Berlekamp-Massey recupera
+    el polinomio de conexión a partir de 2·L bits de keystream, que se obtienen
+    con texto conocido ("flag{" o cabeceras PNG/PDF/ZIP/GIF/JPEG), y se regenera
+    el flujo completo para descifrar.
+
+    Args:
+        ciphertext: Texto cifrado (hex, texto o ruta de archivo)
+        known_plaintext: Texto conocido propio (por defecto "flag{" y cabeceras de archivo)
+        offset: Posición en bytes del texto conocido (-1 = buscar en los primeros 4096 bytes)
+        keystream: Keystream directo ('0101...', hex o ruta) para recuperar sólo el LFSR
+        bit_order: 'msb' o 'lsb' (primer bit del byte); vacío = probar ambos
+        max_degree: Grado máximo del LFSR
+        predict: Bits siguientes a devolver cuando se da el keystream
+
+    Returns:
+        Dict con 'degree', 'connection_polynomial', 'taps', 'plaintext' y 'flag'
+    """
+    start = time.perf_counter()
+    orders = [bit_order] if bit_order in ("msb", "lsb") else ["msb", "lsb"]
+    try:
+        if keystream:
+            sequence, nbits = _load_keystream(keystream, orders[0])
+            C, L = berlekamp_massey(sequence, nbits, max_degree)
+            if L < 0:
+                return {"success": False, "attack_type": "LFSR Berlekamp-Massey",
+                        "error": f"Linear complexity above {max_degree}: not a short LFSR"}
+            verified = verify_lfsr(sequence, nbits, C, L)
+            state = sequence >> (nbits - L) if L else 0
+            following = lfsr_generate(C, L, state, L + max(predict, 0)) >> L
+            return {
+                "success": verified == nbits and 2 * L < nbits,
+                "attack_type": "LFSR Berlekamp-Massey",
+                "degree": L,
+                "connection_polynomial": polynomial_string(C, L),
+                "taps": [j for j in range(1, L + 1) if C >> j & 1],
+                "initial_state": format(_reverse(sequence, L), f"0{L}b") if L else "",
+                "verified_bits": verified,
+                "bits": nbits,
+                "predictions": format(_reverse(following, predict), f"0{predict}b") if predict > 0 else "",
+                "time": round(time.perf_counter() - start, 6),
+            }
+
+        if not ciphertext:
+            return {"success": False, "attack_type": "LFSR Known Plaintext",
+                    "error": "Give a ciphertext or a keystream"}
+        data, path = _load(ciphertext)
+        crib = _load(known_plaintext)[0] if known_plaintext else b""
+
+        best = None
+        tried = 0
+        for kind, candidate, offsets in _candidates(data, crib, offset):
+            for position in offsets:
+                if position + len(candidate) > len(data):
+                    break
+                for order in orders:
+                    tried += 1
+                    found = crib_attack(data, candidate, position, order, kind, max_degree)
+                    if found and (best is None or found["score"] > best["score"]):
+                        best = found
+                if best and best["score"] == 1.0:
+                    break
+            if best and best["score"] == 1.0:
+                break
+
+        if best is None:
+            return {"success": False, "attack_type": "LFSR Known Plaintext", "candidates_tried": tried,
+                    "error": "No crib produced a short LFSR; give known_plaintext/offset or more keystream"}
+
+        plaintext = best.pop("plaintext_bytes")
+        result: Dict[str, Any] = {"success": True, "attack_type": "LFSR Known Plaintext",
+                                  "candidates_tried": tried, **best}
+        if best["crib"] in FILE_TRAILERS:
+            result["file_type"] = best["crib"]
+            if path:
+                result["output_file"] = path + ".dec"
+                with open(result["output_file"], 'wb') as f:
+                    f.write(plaintext)
+            elif len(plaintext) <= MAX_HEX_BYTES:
+                result["plaintext_hex"] = plaintext.hex()
+        else:
+            result["plaintext"] = plaintext.decode('utf-8', errors='ignore')
+        flag = re.search(rb'flag\{[^}]*\}', plaintext, re.IGNORECASE)
+        if flag:
+            result["flag"] = flag.group().decode('latin-1')
+        result["time"] = round(time.perf_counter() - start, 6)
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "LFSR",
+            "error": str(e)
+        }
+
+LFSR_TOOLS = [
+    lfsr_attack
+]
@@ -0,0 +1,223 @@
+"""
+Many-time pad: varios cifrados XOR/CTR con el mismo keystream.
+Resolución estadística por columnas y arrastre de cribs (crib dragging)
+vectorizado sobre todos los cifrados a la vez.
+"""
+
+import re
+import time
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from langchain_core.tools import tool
+
+from .ngrams import score_text
+from .xor import ENGLISH_BYTE_LOGP, PRINTABLE_MASK, XOR_TABLE, is_english, score_histograms
+
+# Posiciones devueltas por defecto al arrastrar un crib
+DEFAULT_DRAG_TOP_K = 10
+# Cribs que se prueban siempre además de los del usuario
+DEFAULT_CRIBS = ("flag{",)
+# Bytes ficticios con log-probabilidad de texto imprimible uniforme que se suman a cada ventana:
+# las ventanas que sólo cubren uno o dos cifrados no ganan por azar
+DRAG_PRIOR_BYTES = 8
+DRAG_PRIOR_LOGP = float(np.log(1 / 95))
+# Pérdida máxima de log-verosimilitud media (nats/byte) frente a la solución estadística
+# para aplicar un crib: el máximo por columna siempre puntúa igual o mejor que el texto real
+CRIB_TOLERANCE = 0.5
+
+class ManyTimePad:
+    """
+    Cifrados que comparten keystream, como matriz (N, L) rellena con ceros y
+    una máscara de bytes válidos. El keystream se estima por columnas y se
+    corrige con cribs; cada operación es una única operación de arrays.
+    """
+
+    def __init__(self, ciphertexts: Sequence[bytes]):
+        self.count = len(ciphertexts)
+        self.lengths = np.array([len(c) for c in ciphertexts], dtype=np.int64)
+        self.width = int(self.lengths.max()) if self.count else 0
+        self.matrix = np.zeros((self.count, self.width), dtype=np.uint8)
+        for row, ciphertext in enumerate(ciphertexts):
+            self.matrix[row, :len(ciphertext)] = np.frombuffer(ciphertext, dtype=np.uint8)
+        self.mask = np.arange(self.width)[None, :] < self.lengths[:, None]
+        self.keystream = np.zeros(self.width, dtype=np.uint8)
+        # Columnas fijadas por un crib (la resolución estadística no las toca)
+        self.fixed = np.zeros(self.width, dtype=bool)
+
+    def column_histograms(self) -> np.ndarray:
+        """Histograma (L, 256) de cada columna con un único np.bincount"""
+        columns = np.broadcast_to(np.arange(self.width), self.matrix.shape)[self.mask]
+        flat = columns * 256 + self.matrix[self.mask]
+        return np.bincount(flat, minlength=self.width * 256).reshape(self.width, 256).astype(np.float64)
+
+    def solve(self) -> np.ndarray:
+        """
+        Estima cada byte del keystream como la clave de un byte que mejor
+        convierte su columna en texto: las L columnas se puntúan en un lote.
+
+        Returns:
+            Log-verosimilitud media de cada columna con el byte elegido
+        """
+        loglik = score_histograms(self.column_histograms())["loglik"]
+        best = loglik.argmax(axis=1).astype(np.uint8)
+        self.keystream = np.where(self.fixed, self.keystream, best)
+        return loglik[np.arange(self.width), self.keystream]
+
+    def drag(self, crib: bytes, index: Optional[int] = None,
+             top_k: int = DEFAULT_DRAG_TOP_K) -> List[Dict[str, Any]]:
+        """
+        Arrastra un crib por todas las posiciones de todos los cifrados (o de
+        uno): el keystream implicado en cada colocación se puntúa contra las
+        columnas de los N cifrados a la vez. Con la tabla T[c, k] = suma de
+        log P(C[r, c] ^ k) sobre los cifrados, cada colocación cuesta len(crib)
+        consultas y todas se resuelven en una única indexación (N, posiciones, n).
+
+        Returns:
+            Colocaciones ordenadas por log-verosimilitud media del resto de
+            cifrados en esa ventana, con 'index', 'position', 'score' y 'window'
+        """
+        size = len(crib)
+        if size == 0 or size > self.width:
+            return []
+        crib_array = np.frombuffer(crib, dtype=np.uint8)
+        hist = self.column_histograms()
+        table = hist @ ENGLISH_BYTE_LOGP[XOR_TABLE]
+        rows = np.arange(self.count) if index is None else np.array([index])
+        columns = np.arange(self.width - size + 1)[:, None] + np.arange(size)
+        # Keystream implicado por el crib en cada (cifrado, posición) y su puntuación
+        implied = sliding_window_view(self.matrix[rows], size, axis=1) ^ crib_array
+        totals = table[columns[None], implied].sum(axis=2)
+        # Se descuenta el propio cifrado, que siempre descifra al crib
+        own = float(ENGLISH_BYTE_LOGP[crib_array].sum())
+        counts = hist.sum(axis=1)[columns].sum(axis=1) - size
+        scores = (totals - own + DRAG_PRIOR_BYTES * DRAG_PRIOR_LOGP) / (counts + DRAG_PRIOR_BYTES)
+        scores[np.arange(self.width - size + 1)[None, :] > (self.lengths[rows] - size)[:, None]] = -np.inf
+
+        flat = np.argsort(-scores, axis=None)[:top_k]
+        placements = []
+        for row_offset, position in zip(*np.unravel_index(flat, scores.shape)):
+            if not np.isfinite(scores[row_offset, position]):
+                continue
+            row = int(rows[row_offset])
+            placements.append({
+                "index": row,
+                "position": int(position),
+                "score": float(scores[row_offset, position]),
+                "window": self.window(int(position), size, row, crib),
+            })
+        return placements
+
+    def window(self, position: int, size: int, index: int, text: bytes) -> List[bytes]:
+        """Ventana [position, position + size) de cada cifrado si `text` está en el cifrado `index`"""
+        implied = self.matrix[index, position:position + size] ^ np.frombuffer(text, dtype=np.uint8)
+        decrypted = self.matrix[:, position:position + size] ^ implied
+        ends = np.clip(self.lengths - position, 0, size)
+        return [decrypted[row, :ends[row]].tobytes() for row in range(self.count)]
+
+    def apply(self, index: int, position: int, text: bytes) -> List[bytes]:
+        """
+        Fija el keystream con un texto supuesto en (index, position) y devuelve
+        la ventana descifrada de todos los cifrados.
+        """
+        end = position + len(text)
+        self.keystream[position:end] = self.matrix[index, position:end] ^ np.frombuffer(text, dtype=np.uint8)
+        self.fixed[position:end] = True
+        return self.window(position, len(text), index, text)
+
+    def plaintexts(self) -> List[bytes]:
+        """Todos los cifrados descifrados con el keystream actual"""
+        decrypted = self.matrix ^ self.keystream
+        return [decrypted[row, :self.lengths[row]].tobytes() for row in range(self.count)]
+
+    def window_loglik(self, position: int, size: int, keystream: np.ndarray) -> float:
+        """Log-verosimilitud media de las columnas [position, position + size) con un keystream dado"""
+        decrypted = self.matrix[:, position:position + size] ^ keystream
+        weight = self.mask[:, position:position + size]
+        return float(np.where(weight, ENGLISH_BYTE_LOGP[decrypted], 0.0).sum() / max(weight.sum(), 1))
+
+# ============ HERRAMIENTA ============
+
+def parse_ciphertexts(ciphertexts: str) -> List[bytes]:
+    """Lista de cifrados en hex (uno por línea, separados por comas o como lista de Python)"""
+    tokens = [t for t in re.split(r'[\s,\[\]\'"]+', ciphertexts) if t]
+    result = []
+    for token in tokens:
+        if re.fullmatch(r'(?:[0-9a-fA-F]{2})+', token):
+            result.append(bytes.fromhex(token))
+    return result
+
+@tool
+def many_time_pad(ciphertexts: str, cribs: str = "", top_k: int = DEFAULT_DRAG_TOP_K) -> Dict[str, Any]:
+    """
+    Rompe cifrados XOR/CTR que reutilizan el mismo keystream: estima cada
+    byte del keystream por frecuencias de su columna (todos los cifrados a
+    la vez) y lo corrige arrastrando cribs ("flag{" y los indicados) por
+    todas las posiciones.
+
+    Args:
+        ciphertexts: Cifrados en hex, uno por línea o separados por comas
+        cribs: Palabras supuestas separadas por '|' (p. ej. "the | password")
+        top_k: Colocaciones de crib a devolver
+
+    Returns:
+        Dict con 'plaintexts', 'keystream', 'crib_placements' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        data = parse_ciphertexts(ciphertexts)
+        if len(data) < 2:
+            return {"success": False, "attack_type": "Many-Time Pad",
+                    "error": "Need at least two hex ciphertexts encrypted with the same keystream"}
+        pad = ManyTimePad(data)
+        pad.solve()
+
+        words = [c.strip() for c in cribs.split('|') if c.strip()] + list(DEFAULT_CRIBS)
+        applied = []
+        placements = []
+        for word in words:
+            crib = word.encode('latin-1')
+            found = pad.drag(crib, top_k=top_k)
+            placements.extend({"crib": word, **{k: v for k, v in p.items() if k != "window"}} for p in found)
+            if not found:
+                continue
+            best = found[0]
+            position, size = best["position"], len(crib)
+            current = pad.window_loglik(position, size, pad.keystream[position:position + size])
+            implied = pad.matrix[best["index"], position:position + size] ^ np.frombuffer(crib, dtype=np.uint8)
+            if pad.window_loglik(position, size, implied) >= current - CRIB_TOLERANCE:
+                pad.apply(best["index"], position, crib)
+                applied.append({"crib": word, "index": best["index"], "position": position})
+
+        plaintexts = pad.plaintexts()
+        texts = [p.decode('utf-8', errors='replace') for p in plaintexts]
+        joined = b"\n".join(plaintexts)
+        hist = np.bincount(np.frombuffer(joined, dtype=np.uint8), minlength=256)
+        quality = {"loglik": float(hist @ ENGLISH_BYTE_LOGP / max(len(joined), 1)),
+                   "printable": float(hist @ PRINTABLE_MASK / max(len(joined), 1)), "plaintext": joined}
+        flag = re.search(r'flag\{[^}\s]*\}', "\n".join(texts), re.IGNORECASE)
+        result = {
+            "success": bool(flag) or is_english(quality) or score_text(joined)["confident"],
+            "attack_type": "Many-Time Pad",
+            "ciphertexts": len(data),
+            "keystream": pad.keystream.tobytes().hex(),
+            "plaintexts": texts,
+            "loglik": round(quality["loglik"], 4),
+            "cribs_applied": applied,
+            "crib_placements": sorted(placements, key=lambda p: -p["score"])[:top_k],
+            "time": round(time.perf_counter() - start, 6),
+        }
+        if flag:
+            result["flag"] = flag.group()
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "Many-Time Pad",
+            "error": str(e)
+        }
+
+MANY_TIME_PAD_TOOLS = [
+    many_time_pad
+]
@@ -0,0 +1,523 @@
+"""
+Mersenne Twister (MT19937) del módulo `random` de Python: clonado del estado
+con 624 salidas, salidas truncadas con un sistema lineal sobre GF(2) y
+fuerza bruta de semillas basadas en tiempo
+"""
+
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from langchain_core.tools import tool
+
+import numpy as np
+
+# Parámetros de MT19937
+MT_N = 624
+MT_M = 397
+MATRIX_A = 0x9908b0df
+# Ecuaciones de más sobre el número de incógnitas antes de resolver
+GF2_MARGIN = 64
+# Incógnitas que pueden quedar libres (bits bajos de la primera palabra, nunca reutilizados)
+GF2_FREE_BITS = 32
+# Columnas eliminadas por tabla (método de los cuatro rusos)
+GF2_BLOCK = 8
+# Filas por pasada al aplicar la tabla (el bloque cabe en caché)
+GF2_CHUNK = 256
+# Semillas por tarea del pool de procesos
+SEED_BATCH = 1 << 14
+# Ventana por defecto de la fuerza bruta de semillas temporales (±1 día)
+SEED_WINDOW = 86400
+
+# ============ TEMPERING ============
+
+def temper(y: int) -> int:
+    """Transformación de salida de MT19937"""
+    y ^= y >> 11
+    y ^= (y << 7) & 0x9d2c5680
+    y ^= (y << 15) & 0xefc60000
+    return y ^ (y >> 18)
+
+def untemper(y: int) -> int:
+    """Inversa de temper(): recupera la palabra de estado a partir de una salida de 32 bits"""
+    y ^= y >> 18
+    y ^= (y << 15) & 0xefc60000
+    x = y
+    for _ in range(4):
+        x = y ^ ((x << 7) & 0x9d2c5680)
+    y = x
+    for _ in range(2):
+        x = y ^ (x >> 11)
+    return x & 0xffffffff
+
+# Fila m de la matriz de temper: bits del estado que forman el bit m de la salida
+_TEMPER_ROWS = [[i for i in range(32) if temper(1 << i) >> m & 1] for m in range(32)]
+# Columna m de la matriz de untemper como máscara de 32 filas
+_UNTEMPER_MASKS = [np.array([untemper(1 << m) >> i & 1 for i in range(32)], dtype=bool) for m in range(32)]
+_MATRIX_A_ROWS = [i for i in range(32) if MATRIX_A >> i & 1]
+
+# ============ SALIDAS ============
+
+def output_words(outputs: Sequence, bits: int = 32, output_type: str = "getrandbits") -> List[Tuple[int, int]]:
+    """
+    Convierte salidas de `random` en palabras de MT19937 con sus bits conocidos.
+
+    getrandbits(k) con k <= 32 deja los k bits altos de una palabra; con k > 32
+    consume palabras en orden little-endian. random() usa 27 + 26 bits altos.
+
+    Returns:
+        Lista de (bits conocidos, valor de esos bits altos) por palabra
+    """
+    words = []
+    if output_type == "random":
+        for value in outputs:
+            x = int(float(value) * (1 << 53))
+            words.append((27, x >> 26))
+            words.append((26, x & ((1 << 26) - 1)))
+        return words
+    if bits <= 0:
+        raise ValueError("bits must be positive")
+    for value in outputs:
+        value = int(value)
+        remaining = bits
+        while remaining > 0:
+            chunk = min(32, remaining)
+            words.append((chunk, value & ((1 << chunk) - 1)))
+            value >>= 32
+            remaining -= 32
+    return words
+
+def _draw(rng: random.Random, bits: int, output_type: str):
+    return rng.random() if output_type == "random" else rng.getrandbits(bits)
+
+def _matches(rng: random.Random, words: Sequence[Tuple[int, int]]) -> int:
+    """Cuenta las palabras que no coinciden al avanzar rng sobre las salidas observadas"""
+    return sum(rng.getrandbits(32) >> (32 - k) != v for k, v in words)
+
+def _clone(state_words: Sequence[int]) -> random.Random:
+    """random.Random cuya siguiente palabra sigue a las 624 dadas"""
+    rng = random.Random()
+    rng.setstate((3, tuple(int(w) for w in state_words) + (MT_N,), None))
+    return rng
+
+# ============ CLONADO DIRECTO ============
+
+def clone_from_outputs(words: Sequence[Tuple[int, int]]) -> random.Random:
+    """
+    Clona el generador a partir de 624 palabras completas consecutivas.
+
+    Returns:
+        random.Random situado justo después de la última palabra observada
+    """
+    if len(words) < MT_N or any(k != 32 for k, _ in words[:MT_N]):
+        raise ValueError("Need 624 consecutive full 32-bit outputs")
+    rng = _clone([untemper(v) for _, v in words[:MT_N]])
+    if _matches(rng, words[MT_N:]):
+        raise ValueError("Outputs are not consecutive MT19937 outputs")
+    return rng
+
+# ============ GF(2) ============
+
+def _gf2_eliminate(M: np.ndarray, ncols: int) -> Tuple[int, List[int]]:
+    """
+    Eliminación gaussiana sobre GF(2) en filas empaquetadas (uint64) con
+    tablas de GF2_BLOCK columnas (método de los cuatro rusos).
+
+    Deja las primeras `rank` filas en forma escalonada; la columna `ncols`
+    es el término independiente y nunca es pivote.
+
+    Returns:
+        (rango, columnas pivote en orden)
+    """
+    rows, nw = M.shape
+    rank = 0
+    pivots: List[int] = []
+    one = np.uint64(1)
+    for c0 in range(0, ncols, GF2_BLOCK):
+        if rank == rows:
+            break
+        w, offset = divmod(c0, 64)
+        width = min(GF2_BLOCK, ncols - c0)
+        sub = M[rank:]
+        column = sub[:, w] >> np.uint64(offset)
+
+        # Elección de pivotes sobre los bits del bloque (copia pequeña)
+        v = (column & np.uint64((1 << width) - 1)).astype(np.int64)
+        available = np.ones(len(v), dtype=bool)
+        chosen = []
+        for j in range(width):
+            has = ((v >> j) & 1).astype(bool)
+            candidates = np.flatnonzero(has & available)
+            if not len(candidates):
+                continue
+            p = candidates[0]
+            available[p] = False
+            others = np.flatnonzero(has)
+            v[others[others != p]] ^= v[p]
+            chosen.append((p, j))
+        if not chosen:
+            continue
+
+        # Filas pivote reducidas entre sí y tabla con sus 2^k combinaciones
+        pivot_rows = sub[[p for p, _ in chosen], w:].copy()
+        for t, (_, j) in enumerate(chosen):
+            bit = np.uint64(offset + j)
+            for s in range(len(chosen)):
+                if s != t and (pivot_rows[s, 0] >> bit) & one:
+                    pivot_rows[s] ^= pivot_rows[t]
+        table = np.zeros((1 << len(chosen), nw - w), dtype=np.uint64)
+        for t in range(len(chosen)):
+            table[1 << t:2 << t] = table[:1 << t] ^ pivot_rows[t]
+        index = np.zeros(len(v), dtype=np.int64)
+        for t, (_, j) in enumerate(chosen):
+            index |= ((column >> np.uint64(j)) & one).astype(np.int64) << t
+        for start in range(0, len(v), GF2_CHUNK):
+            sub[start:start + GF2_CHUNK, w:] ^= table[index[start:start + GF2_CHUNK]]
+
+        # Las filas pivote quedaron a cero: se ocupan sus huecos con las primeras filas
+        pivot_idx = [p for p, _ in chosen]
+        top = len(pivot_idx)
+        displaced = [t for t in range(top) if t not in set(pivot_idx)]
+        holes = [p for p in pivot_idx if p >= top]
+        for hole, t in zip(holes, displaced):
+            sub[hole] = sub[t]
+        sub[:top, :w] = 0
+        sub[:top, w:] = pivot_rows
+        pivots.extend(c0 + j for _, j in chosen)
+        rank += top
+    return rank, pivots
+
+def _gf2_back_substitute(M: np.ndarray, rank: int, pivots: List[int], ncols: int) -> np.ndarray:
+    """Solución del sistema escalonado con las variables libres a cero (bits empaquetados)"""
+    const_word, const_bit = divmod(ncols, 64)
+    x = np.zeros(M.shape[1], dtype=np.uint64)
+    for r in range(rank - 1, -1, -1):
+        row = M[r]
+        parity = int(np.bitwise_xor.reduce(row & x)).bit_count() & 1
+        if parity ^ (int(row[const_word]) >> const_bit & 1):
+            c = pivots[r]
+            x[c >> 6] |= np.uint64(1 << (c & 63))
+    return x
+
+def _twist_symbolic(x0: np.ndarray, x1: np.ndarray, x397: np.ndarray) -> np.ndarray:
+    """x[j+624] = x[j+397] ^ ((msb(x[j]) | low31(x[j+1])) >> 1) ^ (x[j+1][0] · MATRIX_A)"""
+    new = x397.copy()
+    new[0:30] ^= x1[1:31]
+    new[30] ^= x0[31]
+    new[_MATRIX_A_ROWS] ^= x1[0]
+    return new
+
+def recover_truncated(words: Sequence[Tuple[int, int]], timeout: float = 120.0) -> Dict[str, Any]:
+    """
+    Recupera el estado con salidas truncadas resolviendo un sistema lineal sobre GF(2).
+
+    Las 624 primeras palabras se parametrizan con sus bits desconocidos
+    (32 - k por palabra, deshaciendo el tempering); la recurrencia de MT19937
+    es lineal, así que cada bit observado de las palabras siguientes es una
+    ecuación sobre esas incógnitas.
+
+    Returns:
+        Dict con 'rng' (random.Random tras la última salida), 'unknowns', 'rank'
+    """
+    start = time.time()
+    if len(words) <= MT_N:
+        raise ValueError("Need more than 624 outputs for truncated recovery")
+    base = words[:MT_N]
+    offsets = []
+    n = 0
+    for k, _ in base:
+        offsets.append(n)
+        n += 32 - k
+    known = sum(k for k, _ in words[MT_N:])
+    if known < n:
+        per_word = max(1, known // max(1, len(words) - MT_N))
+        missing = -(-(n - known) // per_word)
+        raise ValueError(f"Not enough output bits: about {missing} more outputs needed")
+
+    nw = (n + 1 + 63) // 64
+    const_word, const_bit = divmod(n, 64)
+    const_mask = np.uint64(1 << const_bit)
+
+    # x_j = untemper(y_j) con y_j = (valor conocido << libres) | incógnitas
+    window = []
+    for (k, value), offset in zip(base, offsets):
+        expr = np.zeros((32, nw), dtype=np.uint64)
+        free = 32 - k
+        for m in range(free):
+            col = offset + m
+            expr[_UNTEMPER_MASKS[m], col >> 6] |= np.uint64(1 << (col & 63))
+        constant = untemper(value << free) if k else 0
+        for i in range(32):
+            if constant >> i & 1:
+                expr[i, const_word] |= const_mask
+        window.append(expr)
+
+    # Ecuaciones por lotes hasta que el rango deja libres sólo los bits que
+    # nunca influyen en salidas futuras (o se acaban las salidas)
+    equations = np.zeros((min(n + GF2_MARGIN + n // 2, known), nw), dtype=np.uint64)
+    rank, pivots, count = 0, [], 0
+    limit = min(n + GF2_MARGIN, len(equations))
+    j = MT_N
+    while True:
+        while j < len(words) and count < limit:
+            slot = j % MT_N
+            x = _twist_symbolic(window[slot], window[(j + 1) % MT_N], window[(j + MT_M) % MT_N])
+            window[slot] = x
+            k, value = words[j]
+            j += 1
+            for m in range(32 - k, 32):
+                if count >= limit:
+                    break
+                row = equations[count]
+                for i in _TEMPER_ROWS[m]:
+                    row ^= x[i]
+                constant = row[const_word] & const_mask
+                row[const_word] ^= constant
+                observed = value >> (m - (32 - k)) & 1
+                if not row.any():
+                    # Bit ya determinado por los bits conocidos: sólo sirve de comprobación
+                    if bool(constant) != bool(observed):
+                        raise ValueError("Inconsistent outputs: check the bit size and that outputs are consecutive")
+                    continue
+                if bool(constant) != bool(observed):
+                    row[const_word] ^= const_mask
+                count += 1
+            if time.time() - start > timeout:
+                raise TimeoutError("Timeout building the GF(2) system")
+
+        rank, pivots = _gf2_eliminate(equations[:count], n)
+        if np.any(equations[rank:count, const_word] & const_mask):
+            raise ValueError("Inconsistent system: outputs do not match the given bit size")
+        if rank >= n - GF2_FREE_BITS or j >= len(words):
+            # Con variables libres a cero; si alguna influye en salidas
+            # posteriores, la verificación falla y se añaden más ecuaciones
+            solution = _gf2_back_substitute(equations, rank, pivots, n)
+            state = []
+            for (k, value), offset in zip(base, offsets):
+                free = 32 - k
+                unknown = 0
+                for m in range(free):
+                    col = offset + m
+                    unknown |= (int(solution[col >> 6]) >> (col & 63) & 1) << m
+                state.append(untemper(((value << free) | unknown) & 0xffffffff))
+            rng = _clone(state)
+            mismatches = _matches(rng, words[MT_N:])
+            if not mismatches or j >= len(words):
+                break
+        # Las filas dependientes se descartan y se rellenan con nuevas salidas
+        equations[rank:] = 0
+        count = rank
+        limit = len(equations)
+
+    return {"rng": rng, "unknowns": n, "rank": rank, "words_used": j, "mismatches": mismatches,
+            "determined": rank >= n - GF2_FREE_BITS, "time": time.time() - start}
+
+def recover_state(words: Sequence[Tuple[int, int]], timeout: float = 120.0) -> Dict[str, Any]:
+    """
+    Clona el generador: untemper directo si hay 624 palabras completas,
+    sistema GF(2) si las salidas están truncadas.
+
+    Returns:
+        Dict con 'success', 'method' y 'rng' situado tras las salidas observadas
+    """
+    start = time.time()
+    if len(words) >= MT_N and all(k == 32 for k, _ in words[:MT_N]):
+        rng = clone_from_outputs(words)
+        return {"success": True, "method": "untemper", "rng": rng, "time": time.time() - start}
+    result = recover_truncated(words, timeout)
+    result["success"] = result["mismatches"] == 0 and result["determined"]
+    result["method"] = "gf2_linear_system"
+    return result
+
+# ============ SEMILLAS ============
+
+def _seed_batch(start: int, stop: int, words: Sequence[Tuple[int, int]]) -> Optional[int]:
+    """Prueba las semillas [start, stop) comparando las primeras palabras de salida"""
+    rng = random.Random()
+    (k0, v0), rest = words[0], words[1:]
+    shift = 32 - k0
+    getrandbits = rng.getrandbits
+    for seed in range(start, stop):
+        rng.seed(seed)
+        if getrandbits(32) >> shift == v0 and not _matches(rng, rest):
+            return seed
+    return None
+
+def brute_force_seed(words: Sequence[Tuple[int, int]], start: int, stop: int, center: Optional[int] = None,
+                     workers: int = 0, timeout: float = 120.0) -> Optional[int]:
+    """
+    Busca la semilla entera de random.seed() en [start, stop) que produce las palabras dadas.
+
+    Los lotes se recorren desde `center` hacia fuera (semillas temporales) y
+    se reparten entre procesos.
+    """
+    words = list(words[:8])
+    center = (start + stop) // 2 if center is None else center
+    batches = [(a, min(a + SEED_BATCH, stop)) for a in range(start, stop, SEED_BATCH)]
+    batches.sort(key=lambda b: abs((b[0] + b[1]) // 2 - center))
+    workers = workers or os.cpu_count() or 1
+    deadline = time.time() + timeout
+
+    if workers == 1 or len(batches) == 1:
+        for a, b in batches:
+            seed = _seed_batch(a, b, words)
+            if seed is not None:
+                return seed
+            if time.time() > deadline:
+                break
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_seed_batch, a, b, words) for a, b in batches]
+        try:
+            for future in as_completed(futures, timeout=max(deadline - time.time(), 0)):
+                seed = future.result()
+                if seed is not None:
+                    return seed
+        except TimeoutError:
+            pass
+        finally:
+            for future in futures:
+                future.cancel()
+    return None
+
+# ============ DESCIFRADO ============
+
+def _parse_outputs(outputs: str, output_type: str) -> List:
+    if output_type == "random":
+        return [float(v) for v in re.findall(r'\d*\.\d+(?:[eE]-?\d+)?', outputs)]
+    return [int(v, 0) for v in re.findall(r'0x[0-9a-fA-F]+|\d+', outputs)]
+
+def _parse_bytes(data: str) -> bytes:
+    data = data.strip()
+    if re.fullmatch(r'(?:[0-9a-fA-F]{2})+', data):
+        return bytes.fromhex(data)
+    return data.encode('latin-1')
+
+def _predict(rng: random.Random, bits: int, output_type: str, predict: int, ciphertext: str) -> Dict[str, Any]:
+    """Siguientes salidas y descifrado XOR con randbytes() o getrandbits(8) por byte"""
+    state = rng.getstate()
+    result: Dict[str, Any] = {"predictions": [_draw(rng, bits, output_type) for _ in range(predict)]}
+    if ciphertext:
+        data = _parse_bytes(ciphertext)
+        for mode in ("randbytes", "getrandbits8"):
+            rng.setstate(state)
+            stream = rng.randbytes(len(data)) if mode == "randbytes" else bytes(rng.getrandbits(8) for _ in data)
+            plaintext = bytes(a ^ b for a, b in zip(data, stream)).decode('utf-8', errors='ignore')
+            if 'flag{' in plaintext.lower():
+                result.update({"plaintext": plaintext, "keystream": mode, "flag": plaintext})
+                break
+            result.setdefault("plaintext", plaintext)
+    rng.setstate(state)
+    return result
+
+# ============ HERRAMIENTAS ============
+
+@tool
+def mt19937_attack(outputs: str, bits: int = 32, output_type: str = "getrandbits", predict: int = 10,
+                   ciphertext: str = "", timeout: int = 120) -> Dict[str, Any]:
+    """
+    Predice el `random` de Python (MT19937) a partir de salidas consecutivas:
+    untemper de 624 salidas de 32 bits o sistema lineal GF(2) si están truncadas.
+
+    Args:
+        outputs: Salidas observadas en orden ("[1, 2, ...]", una por línea o floats de random())
+        bits: k de getrandbits(k) (8 = truncado, 64/128 = varias palabras)
+        output_type: 'getrandbits' o 'random' (floats de random.random())
+        predict: Número de salidas futuras a devolver
+        ciphertext: Texto cifrado (hex) XOR con las siguientes salidas (randbytes o getrandbits(8))
+        timeout: Timeout en segundos
+
+    Returns:
+        Dict con 'predictions', 'method' y 'flag' si el descifrado la revela
+    """
+    try:
+        values = _parse_outputs(outputs, output_type)
+        words = output_words(values, bits, output_type)
+        result = recover_state(words, timeout)
+        rng = result.pop("rng")
+        result.update({"attack_type": "MT19937 State Recovery", "outputs_observed": len(values),
+                       "time": round(result["time"], 3)})
+        if not result["success"]:
+            if result["mismatches"]:
+                result["error"] = f"Recovered state disagrees with {result['mismatches']} outputs"
+            else:
+                result["error"] = (f"Not enough outputs: rank {result['rank']} of {result['unknowns']} "
+                                   "unknown bits, give more consecutive outputs")
+            return result
+        result.update(_predict(rng, bits, output_type, predict, ciphertext))
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "MT19937 State Recovery",
+            "error": str(e)
+        }
+
+@tool
+def mt19937_seed_bruteforce(outputs: str, bits: int = 32, output_type: str = "getrandbits",
+                            timestamp: str = "", window: int = SEED_WINDOW, seed_start: int = -1,
+                            seed_end: int = -1, predict: int = 10, ciphertext: str = "",
+                            workers: int = 0, timeout: int = 120) -> Dict[str, Any]:
+    """
+    Encuentra la semilla de random.seed() (p.ej. int(time.time())) probando
+    una ventana de semillas en paralelo y comparando las primeras salidas.
+
+    Args:
+        outputs: Primeras salidas observadas tras random.seed()
+        bits: k de getrandbits(k)
+        output_type: 'getrandbits' o 'random'
+        timestamp: Instante aproximado de la semilla (epoch); por defecto ahora
+        window: Segundos a cada lado del timestamp (por defecto ±1 día)
+        seed_start, seed_end: Rango explícito [start, end) en lugar de la ventana temporal
+        predict: Número de salidas futuras a devolver
+        ciphertext: Texto cifrado (hex) XOR con las siguientes salidas
+        workers: Procesos (0 = todos los núcleos)
+        timeout: Timeout en segundos
+
+    Returns:
+        Dict con 'seed', 'predictions' y 'flag' si el descifrado la revela
+    """
+    start = time.time()
+    try:
+        values = _parse_outputs(outputs, output_type)
+        words = output_words(values, bits, output_type)
+        if not words:
+            return {"success": False, "attack_type": "MT19937 Seed Brute Force", "error": "No outputs given"}
+        if seed_start >= 0 and seed_end > seed_start:
+            low, high, center = seed_start, seed_end, None
+        else:
+            center = int(float(timestamp)) if timestamp else int(time.time())
+            low, high = max(0, center - window), center + window + 1
+
+        seed = brute_force_seed(words, low, high, center, workers, timeout)
+        result = {
+            "success": seed is not None,
+            "attack_type": "MT19937 Seed Brute Force",
+            "seed": seed,
+            "seeds_range": [low, high],
+            "time": round(time.time() - start, 3)
+        }
+        if seed is None:
+            result["error"] = "Seed not found in range"
+            return result
+        rng = random.Random(seed)
+        for _ in values:
+            _draw(rng, bits, output_type)
+        result.update(_predict(rng, bits, output_type, predict, ciphertext))
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "MT19937 Seed Brute Force",
+            "error": str(e)
+        }
+
+MT_TOOLS = [
+    mt19937_attack,
+    mt19937_seed_bruteforce
+]
@@ -0,0 +1,327 @@
+"""
+Modelo de n-gramas de letras (unigramas a cuadrigramas, inglés y español)
+compartido por todos los ataques para puntuar texto candidato.
+Las tablas de log-probabilidades se generan una vez a partir de un corpus,
+se guardan como .npy en src/tools/data y se cargan con mmap.
+
+Regenerar: python -m src.tools.ngrams [en|es]
+"""
+
+import ast
+import functools
+import glob
+import gettext
+import re
+import subprocess
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Dict, Any, Iterable, Sequence, Union
+import numpy as np
+
+# Directorio de las tablas precalculadas
+DATA_DIR = Path(__file__).parent / "data"
+# Idiomas con tablas (el corpus de writeups es mixto)
+LANGUAGES = ("en", "es")
+# Órdenes del modelo y nombre de su fichero: <nombre>_<idioma>.npy
+NGRAM_NAMES = {1: "unigrams", 2: "bigrams", 3: "trigrams", 4: "quadgrams"}
+# Recuento añadido a cada letra en la tabla de unigramas (ninguna letra queda con probabilidad 0)
+SMOOTHING = 0.01
+# Palabras mínimas por línea para considerarla prosa al construir el corpus
+MIN_PROSE_WORDS = 6
+
+# Log-probabilidad media por letra (nats, regla de la cadena con contexto de 3 letras)
+# a partir de la cual un texto se considera lenguaje natural: inglés/español reales
+# quedan en -1.8..-3.1; letras aleatorias, base64 o descifrados parciales por debajo de -4
+PLAINTEXT_THRESHOLD = -3.4
+# Letras mínimas para dar un texto por bueno sin formato de flag
+CONFIDENT_LETTERS = 20
+# Bigramas de letras distintos mínimos (o la mitad de las letras si son menos): un
+# bloque corto repetido ('Xq9#' * 200) puntúa como "ththth..." y no es lenguaje natural;
+# 20 letras de inglés real tienen al menos 12 distintos
+MIN_DISTINCT_BIGRAMS = 16
+# Proporción mínima de caracteres imprimibles y de letras
+PRINTABLE_THRESHOLD = 0.95
+LETTER_RATIO_THRESHOLD = 0.5
+
+# Bytes imprimibles (ASCII 32-126 más tabulador y saltos de línea)
+PRINTABLE_BYTES = np.zeros(256, dtype=np.float64)
+PRINTABLE_BYTES[32:127] = 1.0
+PRINTABLE_BYTES[[9, 10, 13]] = 1.0
+# Inicio de cada orden en chained_table y módulo que recorta un cuadrigrama a ese orden
+TABLE_OFFSETS = np.array([0, 26, 26 + 26 ** 2, 26 + 26 ** 2 + 26 ** 3])
+ORDER_MODULUS = np.array([26, 26 ** 2, 26 ** 3, 26 ** 4])
+# Letras A-Z/a-z
+LETTER_BYTES = np.zeros(256, dtype=bool)
+LETTER_BYTES[65:91] = LETTER_BYTES[97:123] = True
+
+# ============ CODIFICACIÓN ============
+
+def normalise(candidate: Union[str, bytes]) -> bytes:
+    """
+    Candidato como bytes: el texto (o bytes UTF-8 válidos) pierde acentos
+    (á -> a, ñ -> n); los bytes que no son UTF-8 se dejan tal cual para que
+    cuenten como no imprimibles.
+    """
+    if isinstance(candidate, (bytes, bytearray)):
+        try:
+            candidate = bytes(candidate).decode('utf-8')
+        except UnicodeDecodeError:
+            return bytes(candidate)
+    if candidate.isascii():
+        return candidate.encode('ascii')
+    stripped = "".join(c for c in unicodedata.normalize('NFKD', candidate) if not unicodedata.combining(c))
+    return stripped.encode('ascii', errors='replace')
+
+def letter_codes(text: Union[str, bytes]) -> np.ndarray:
+    """Letras A-Z/a-z del texto como int8 0..25 (el resto se descarta)"""
+    array = np.frombuffer(normalise(text), dtype=np.uint8)
+    return ((array[LETTER_BYTES[array]] & 0x1f) - 1).astype(np.int8)
+
+def ngram_indices(codes: np.ndarray, order: int) -> np.ndarray:
+    """Índice en base 26 de cada n-grama consecutivo de orden `order`"""
+    codes = codes.astype(np.int32)
+    count = len(codes) - order + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.int32)
+    index = codes[:count].copy()
+    for offset in range(1, order):
+        index = index * 26 + codes[offset:offset + count]
+    return index
+
+def quadgram_indices(codes: np.ndarray) -> np.ndarray:
+    """Índice a·26³ + b·26² + c·26 + d de cada cuadrigrama consecutivo"""
+    return ngram_indices(codes, 4)
+
+# ============ TABLAS ============
+
+def table_path(order: int, language: str = "en") -> Path:
+    return DATA_DIR / f"{NGRAM_NAMES[order]}_{language}.npy"
+
+def build_tables(corpus: str) -> Dict[int, np.ndarray]:
+    """
+    Log-probabilidades condicionales float32 de orden n = 1..4: la tabla n
+    guarda log P(x | n-1 letras anteriores) en el índice ctx·26 + x, con
+    suavizado de Witten-Bell hacia el orden inferior (un contexto no visto
+    usa directamente la probabilidad del contexto más corto).
+    """
+    codes = letter_codes(corpus)
+    counts = np.bincount(codes, minlength=26).astype(np.float64) + SMOOTHING
+    lower = counts / counts.sum()
+    tables = {1: np.log(lower).astype(np.float32)}
+    for order in range(2, 5):
+        counts = np.bincount(ngram_indices(codes, order), minlength=26 ** order).astype(np.float64).reshape(-1, 26)
+        totals = counts.sum(axis=1, keepdims=True)
+        types = (counts > 0).sum(axis=1, keepdims=True)
+        # Probabilidad del orden inferior para el mismo contexto sin su primera letra
+        backoff = np.tile(lower.reshape(-1, 26), (26, 1))
+        probs = (counts + types * backoff) / np.maximum(totals + types, 1)
+        probs = np.where(totals > 0, probs, backoff)
+        lower = probs.reshape(-1)
+        tables[order] = np.log(lower).astype(np.float32)
+    return tables
+
+@functools.lru_cache(maxsize=None)
+def ngram_table(order: int, language: str = "en") -> np.ndarray:
+    """Tabla de log-probabilidades del orden e idioma, mapeada en memoria (sólo lectura)"""
+    return np.load(table_path(order, language), mmap_mode='r')
+
+def quadgram_table(language: str = "en") -> np.ndarray:
+    return ngram_table(4, language)
+
+def quadgram_score(text: Union[str, bytes, np.ndarray], language: str = "en") -> float:
+    """Media de log P(d | abc) sobre los cuadrigramas del texto (más alto = más parecido al idioma)"""
+    codes = text if isinstance(text, np.ndarray) else letter_codes(text)
+    indices = quadgram_indices(codes)
+    if len(indices) == 0:
+        return float('-inf')
+    return float(quadgram_table(language)[indices].mean())
+
+# ============ PUNTUACIÓN ============
+
+def _chain_loglik(codes: np.ndarray, position: np.ndarray, language: str) -> np.ndarray:
+    """
+    log P(letra | hasta 3 letras anteriores del mismo candidato) para cada
+    letra, con el orden min(posición en el candidato, 3) + 1.
+    """
+    codes = codes.astype(np.int32)
+    order = np.minimum(position, 3) + 1
+    result = np.zeros(len(codes), dtype=np.float64)
+    index = np.zeros(len(codes), dtype=np.int32)
+    for o in range(1, 5):
+        # o-grama que termina en cada letra (donde no cabe en el candidato no se usa)
+        index = np.roll(codes, o - 1) * 26 ** (o - 1) + index
+        use = order == o
+        result[use] = ngram_table(o, language)[index[use]]
+    return result
+
+@functools.lru_cache(maxsize=None)
+def chained_table(language: str = "en") -> np.ndarray:
+    """Tablas condicionales de órdenes 1 a 4 concatenadas (inicio de cada orden en TABLE_OFFSETS)"""
+    return np.concatenate([np.asarray(ngram_table(order, language), dtype=np.float32) for order in range(1, 5)])
+
+def score_letter_matrix(letters: np.ndarray, languages: Iterable[str] = LANGUAGES) -> np.ndarray:
+    """
+    Puntúa a la vez muchos candidatos de la misma longitud dados como matriz
+    de códigos de letra (filas = candidatos, -1 = carácter que no es letra).
+    Cada letra se evalúa condicionada a las hasta 3 letras anteriores; el
+    contexto se corta en los -1. El cuadrigrama que termina en cada letra,
+    módulo 26^(contexto + 1), es el índice del orden que le corresponde.
+
+    Returns:
+        Log-probabilidad media por letra de cada fila con el mejor idioma (-inf sin letras)
+    """
+    letters = np.asarray(letters, dtype=np.int64)
+    valid = letters >= 0
+    digits = np.where(valid, letters, 0)
+    quadgram = digits.copy()
+    context = np.zeros(letters.shape, dtype=np.int64)
+    run = valid.copy()
+    for o in range(1, 4):
+        quadgram[:, o:] += digits[:, :-o] * 26 ** o
+        run[:, o:] &= valid[:, :-o]
+        run[:, :o] = False
+        context += run
+    index = TABLE_OFFSETS[context] + quadgram % ORDER_MODULUS[context]
+    count = valid.sum(axis=1)
+    best = np.max([np.where(valid, chained_table(language)[index], 0).sum(axis=1) for language in languages],
+                  axis=0)
+    return np.where(count > 0, best / np.maximum(count, 1), -np.inf)
+
+def score_many(candidates: Sequence[Union[str, bytes]],
+               languages: Iterable[str] = LANGUAGES) -> Dict[str, np.ndarray]:
+    """
+    Puntúa todos los candidatos a la vez: se concatenan, cada letra se evalúa
+    con su contexto dentro de su candidato y las sumas por candidato salen de
+    un np.bincount. Para cada candidato se queda el idioma que mejor puntúa.
+
+    Returns:
+        Dict de arrays: 'score' (log-probabilidad media por letra), 'language',
+        'letters', 'bigrams' (bigramas de letras distintos), 'printable',
+        'letter_ratio' y 'confident' (texto natural con suficientes letras y
+        bigramas distintos aunque no tenga formato de flag)
+    """
+    blobs = [normalise(c) for c in candidates]
+    count = len(blobs)
+    lengths = np.array([len(b) for b in blobs], dtype=np.int64)
+    data = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+    owner = np.repeat(np.arange(count), lengths)
+    printable = np.bincount(owner, weights=PRINTABLE_BYTES[data], minlength=count) / np.maximum(lengths, 1)
+
+    is_letter = LETTER_BYTES[data]
+    codes = (data[is_letter] & 0x1f).astype(np.int8) - 1
+    letter_owner = owner[is_letter]
+    letters = np.bincount(letter_owner, minlength=count)
+    starts = np.concatenate([[0], np.cumsum(letters)[:-1]])
+    position = np.arange(len(codes)) - starts[letter_owner] if len(codes) else np.zeros(0, dtype=np.int64)
+    # Bigramas distintos por candidato: tabla de presencia (candidatos × 676)
+    adjacent = letter_owner[1:] == letter_owner[:-1]
+    seen = np.zeros(count * 676, dtype=bool)
+    wide = codes.astype(np.int64)
+    seen[letter_owner[1:][adjacent] * 676 + wide[:-1][adjacent] * 26 + wide[1:][adjacent]] = True
+    bigrams = seen.reshape(count, 676).sum(axis=1)
+
+    languages = tuple(languages)
+    scores = np.full((len(languages), count), -np.inf)
+    for row, language in enumerate(languages):
+        if len(codes):
+            totals = np.bincount(letter_owner, weights=_chain_loglik(codes, position, language), minlength=count)
+            scores[row] = np.where(letters > 0, totals / np.maximum(letters, 1), -np.inf)
+    best = scores.argmax(axis=0)
+    score = scores[best, np.arange(count)]
+    letter_ratio = letters / np.maximum(lengths, 1)
+    return {
+        "score": score,
+        "language": np.array(languages)[best],
+        "letters": letters,
+        "bigrams": bigrams,
+        "printable": printable,
+        "letter_ratio": letter_ratio,
+        "confident": ((letters >= CONFIDENT_LETTERS) & (printable >= PRINTABLE_THRESHOLD)
+                      & (letter_ratio >= LETTER_RATIO_THRESHOLD) & (score >= PLAINTEXT_THRESHOLD)
+                      & (bigrams >= np.minimum(MIN_DISTINCT_BIGRAMS, letters // 2))),
+    }
+
+def score_text(candidate: Union[str, bytes], languages: Iterable[str] = LANGUAGES) -> Dict[str, Any]:
+    """score_many para un único candidato, con valores escalares"""
+    scores = score_many([candidate], languages)
+    return {key: value[0].item() for key, value in scores.items()}
+
+def is_plaintext(candidate: Union[str, bytes], min_letters: int = CONFIDENT_LETTERS) -> bool:
+    """Texto natural en inglés o español con al menos `min_letters` letras"""
+    scores = score_text(candidate)
+    return (scores["letters"] >= min_letters and scores["printable"] >= PRINTABLE_THRESHOLD
+            and scores["letter_ratio"] >= LETTER_RATIO_THRESHOLD and scores["score"] >= PLAINTEXT_THRESHOLD
+            and scores["bigrams"] >= min(MIN_DISTINCT_BIGRAMS, scores["letters"] // 2))
+
+# ============ CORPUS ============
+
+def _prose_lines(text: str, stopwords: frozenset = frozenset()) -> str:
+    """Líneas de prosa (descarta código, tablas, líneas cortas y, si se dan, las de otro idioma)"""
+    lines = []
+    for line in text.splitlines():
+        words = re.findall(r"[^\W\d_]+", line)
+        if len(words) < MIN_PROSE_WORDS or sum(map(len, words)) <= 0.7 * len(line.strip()):
+            continue
+        if stopwords and sum(w.lower() in stopwords for w in words) < 2:
+            continue
+        lines.append(line.strip())
+    return "\n".join(lines)
+
+def english_corpus() -> str:
+    """
+    Corpus inglés disponible en cualquier instalación de Python: los temas de
+    ayuda de pydoc y los docstrings de la biblioteca estándar.
+    """
+    import pydoc_data.topics
+    parts = [_prose_lines(" ".join(pydoc_data.topics.topics.values()))]
+    stdlib = Path(ast.__file__).parent
+    for path in sorted(stdlib.glob("*.py")):
+        try:
+            tree = ast.parse(path.read_text(encoding='utf-8'))
+        except (SyntaxError, UnicodeDecodeError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                docstring = ast.get_docstring(node)
+                if docstring:
+                    parts.append(_prose_lines(docstring))
+    return "\n".join(parts)
+
+SPANISH_STOPWORDS = frozenset("de la que el en los las para con por una del se es un como su al lo no "
+                              "este esta sin pero sobre entre cuando ya puede".split())
+
+def spanish_corpus() -> str:
+    """
+    Corpus español: catálogos gettext en español del sistema
+    (/usr/share/locale/es) y la prosa en español del propio repositorio.
+    """
+    parts = []
+    for path in sorted(glob.glob('/usr/share/locale/es/LC_MESSAGES/*.mo')):
+        # Los catálogos ISO son listas de nombres propios, no prosa
+        if Path(path).name.startswith('iso_'):
+            continue
+        try:
+            with open(path, 'rb') as handle:
+                catalog = gettext.GNUTranslations(handle)._catalog
+        except (OSError, ValueError, UnicodeDecodeError):
+            continue
+        messages = [m for k, m in catalog.items() if k and isinstance(m, str) and len(m.split()) >= 4]
+        parts.append(re.sub(r'%\w|\{\w*\}', ' ', "\n".join(messages)))
+    root = Path(__file__).resolve().parents[2]
+    files = subprocess.run(["git", "ls-files", "*.md", "*.py"], cwd=root, capture_output=True, text=True).stdout
+    for name in sorted(files.split()):
+        try:
+            parts.append(_prose_lines((root / name).read_text(encoding='utf-8'), SPANISH_STOPWORDS))
+        except (OSError, UnicodeDecodeError):
+            continue
+    return "\n".join(parts)
+
+if __name__ == "__main__":
+    DATA_DIR.mkdir(exist_ok=True)
+    corpora = {"en": english_corpus, "es": spanish_corpus}
+    for language in sys.argv[1:] or LANGUAGES:
+        corpus = corpora[language]()
+        for order, table in build_tables(corpus).items():
+            np.save(table_path(order, language), table)
+        print(f"{language}: {len(letter_codes(corpus))} letras", file=sys.stderr)
@@ -0,0 +1,169 @@
+"""
+Reglas de mutación de contraseñas con la sintaxis de hashcat (subconjunto):
+mayúsculas/minúsculas, añadir y anteponer, sustituciones tipo leetspeak,
+duplicación y truncado. Cada regla se compila una vez a una composición de
+funciones sobre bytes y se aplica de forma perezosa: el producto
+wordlist × reglas nunca se guarda en memoria.
+"""
+
+import os
+from typing import Callable, Iterable, Iterator, List, Sequence
+
+# Reglas integradas ("default"): las variaciones de prefijo/sufijo del
+# diccionario común más las mutaciones habituales de las listas de hashcat
+DEFAULT_RULES = [
+    ":", "l", "u", "c", "C", "t", "r", "d", "f", "p2", "q", "'6", "'8", "]", "[",
+    "$1", "$!", "$@", "$1 $2 $3", "$2 $0 $2 $3", "$2 $0 $2 $4", "$2 $0 $2 $5",
+    "^1", "^@", "^1 $1", "^1 $1 $2 $3", "^1 $!", "^1 $@", "^1 $2 $0 $2 $3", "^1 $2 $0 $2 $4",
+    "^@ $1", "^@ $1 $2 $3", "^@ $!", "^@ $@", "^@ $2 $0 $2 $3", "^@ $2 $0 $2 $4",
+    "c $1", "c $!", "c $1 $2 $3", "c $2 $0 $2 $4", "u $1", "d $1",
+    "sa@", "sa4", "se3", "si1", "si!", "so0", "ss$", "ss5", "st7", "sa@ se3 si1 so0", "c sa@ so0 $1",
+    "T0", "T0 $1", "z1", "Z1", "}", "{",
+]
+
+# Longitud máxima de una palabra mutada (como hashcat)
+MAX_LENGTH = 256
+
+Rule = Callable[[bytes], bytes]
+
+# ============ POSICIONES ============
+
+def position(char: str) -> int:
+    """Posición en la notación de hashcat: 0-9 y A-Z = 10-35"""
+    if char.isdigit():
+        return int(char)
+    if "A" <= char <= "Z":
+        return ord(char) - ord("A") + 10
+    raise ValueError(f"Invalid position: {char!r}")
+
+def _toggle(word: bytes, n: int) -> bytes:
+    return word[:n] + word[n:n + 1].swapcase() + word[n + 1:] if n < len(word) else word
+
+# ============ FUNCIONES ============
+
+# Funciones sin argumentos
+SIMPLE = {
+    ":": lambda w: w,
+    "l": bytes.lower,
+    "u": bytes.upper,
+    "c": bytes.capitalize,
+    "C": lambda w: w[:1].lower() + w[1:].upper(),
+    "t": bytes.swapcase,
+    "r": lambda w: w[::-1],
+    "d": lambda w: w + w,
+    "f": lambda w: w + w[::-1],
+    "{": lambda w: w[1:] + w[:1],
+    "}": lambda w: w[-1:] + w[:-1],
+    "[": lambda w: w[1:],
+    "]": lambda w: w[:-1],
+    "q": lambda w: bytes(b for b in w for _ in (0, 1)),
+}
+
+# Funciones con una posición
+POSITIONAL = {
+    "T": lambda n: lambda w: _toggle(w, n),
+    "p": lambda n: lambda w: w * (n + 1),
+    "D": lambda n: lambda w: w[:n] + w[n + 1:],
+    "'": lambda n: lambda w: w[:n],
+    "z": lambda n: lambda w: w[:1] * n + w,
+    "Z": lambda n: lambda w: w + w[-1:] * n,
+}
+
+# Funciones con un carácter
+CHARACTER = {
+    "$": lambda c: lambda w: w + c,
+    "^": lambda c: lambda w: c + w,
+    "@": lambda c: lambda w: w.replace(c, b""),
+}
+
+def compile_rule(text: str) -> Rule:
+    """
+    Compila una línea de reglas (funciones encadenadas, los espacios entre
+    funciones se ignoran) a una función bytes -> bytes.
+
+    Soporta: : l u c C t r d f { } [ ] q, TN pN DN 'N zN ZN, $X ^X @X,
+    sXY (sustitución), iNX (insertar), oNX (sobrescribir) y xNM (extraer).
+    """
+    steps: List[Rule] = []
+    i = 0
+    while i < len(text):
+        op = text[i]
+        if op == " ":
+            i += 1
+            continue
+        if op in SIMPLE:
+            steps.append(SIMPLE[op])
+            i += 1
+        elif op in POSITIONAL and i + 1 < len(text):
+            steps.append(POSITIONAL[op](position(text[i + 1])))
+            i += 2
+        elif op in CHARACTER and i + 1 < len(text):
+            steps.append(CHARACTER[op](text[i + 1].encode("latin-1")))
+            i += 2
+        elif op == "s" and i + 2 < len(text):
+            old, new = text[i + 1].encode("latin-1"), text[i + 2].encode("latin-1")
+            steps.append(lambda w, old=old, new=new: w.replace(old, new))
+            i += 3
+        elif op in "io" and i + 2 < len(text):
+            n, c = position(text[i + 1]), text[i + 2].encode("latin-1")
+            if op == "i":
+                steps.append(lambda w, n=n, c=c: w[:n] + c + w[n:] if n <= len(w) else w)
+            else:
+                steps.append(lambda w, n=n, c=c: w[:n] + c + w[n + 1:] if n < len(w) else w)
+            i += 3
+        elif op == "x" and i + 2 < len(text):
+            n, m = position(text[i + 1]), position(text[i + 2])
+            steps.append(lambda w, n=n, m=m: w[n:n + m])
+            i += 3
+        else:
+            raise ValueError(f"Unsupported rule function {op!r} in {text!r}")
+
+    if len(steps) == 1:
+        return steps[0]
+
+    def apply(word: bytes) -> bytes:
+        for step in steps:
+            word = step(word)
+        return word
+
+    return apply
+
+# ============ CONJUNTOS DE REGLAS ============
+
+def parse_rules(text: str) -> List[str]:
+    """Líneas de reglas válidas de un archivo .rule (sin comentarios ni líneas que no compilan)"""
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.startswith("#"):
+            continue
+        try:
+            compile_rule(line)
+        except ValueError:
+            continue
+        rules.append(line)
+    return rules
+
+def load_rules(source: str) -> List[str]:
+    """Reglas de "default", de una ruta a un archivo .rule o de texto con una regla por línea"""
+    if not source:
+        return []
+    if source == "default":
+        return list(DEFAULT_RULES)
+    path = os.path.expanduser(source)
+    if os.path.isfile(path):
+        with open(path, encoding="latin-1") as handle:
+            return parse_rules(handle.read())
+    return parse_rules(source)
+
+def mangle(words: Iterable[bytes], rules: Sequence[Rule]) -> Iterator[bytes]:
+    """
+    Candidatos palabra × regla, generados bajo demanda (palabra por fuera,
+    reglas por dentro como en hashcat). Se descartan los vacíos y los de más
+    de MAX_LENGTH bytes.
+    """
+    for word in words:
+        for rule in rules:
+            candidate = rule(word)
+            if 0 < len(candidate) <= MAX_LENGTH:
+                yield candidate
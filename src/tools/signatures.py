@@ -0,0 +1,434 @@
+"""
+Ingesta de firmas ECDSA/DSA en bloque y escáner de reutilización de nonces
+Formatos: JSON (lista u objeto con lista), JSON Lines, CSV con cabecera
+y líneas de texto "r = ..., s = ..., h = ..."
+"""
+
+import csv
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from langchain_core.tools import tool
+
+from .ecc import NAMED_CURVES, EllipticCurve
+
+# Nombres alternativos de los campos de una firma
+FIELD_ALIASES = {
+    'r': 'r',
+    's': 's',
+    'h': 'h', 'z': 'h', 'e': 'h', 'hash': 'h', 'msg_hash': 'h', 'message_hash': 'h',
+    'digest': 'h', 'msghash': 'h',
+    'k': 'k', 'nonce': 'k',
+    'msb': 'msb', 'lsb': 'lsb',
+    'known_bits': 'known_bits', 'leak_bits': 'known_bits', 'bits': 'known_bits',
+}
+
+# Campos que no son enteros aunque lo parezcan
+TEXT_FIELDS = {'leak', 'msg', 'message', 'id'}
+
+# Tamaño de bloque al leer volcados grandes
+CHUNK_SIZE = 1 << 20
+# Firmas indexadas en memoria antes de volcar a particiones en disco
+NONCE_INDEX_LIMIT = 1 << 18
+# Particiones por hash de r para el volcado a disco
+SPILL_PARTITIONS = 64
+# Colisiones detalladas en la respuesta (el recuento es completo)
+COLLISION_REPORT_LIMIT = 20
+
+_KV_PATTERN = re.compile(r'\b([A-Za-z_][A-Za-z0-9_]*)\s*[=:]\s*(0x[0-9a-fA-F]+|-?\d+|[0-9a-fA-F]{16,})')
+
+# ============ CONVERSIÓN ============
+
+def parse_int(value: Any) -> Optional[int]:
+    """Entero decimal o hexadecimal (con o sin 0x); None si no es numérico"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().strip('"\'')
+    body = text[1:] if text[:1] == '-' else text
+    try:
+        return int(text, 10) if body.isdigit() else int(text, 16)
+    except ValueError:
+        return None
+
+def normalize_signature(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Normaliza un registro a {'r', 's', 'h', ...} con enteros.
+    Devuelve None si falta r o s.
+    """
+    signature: Dict[str, Any] = {}
+    for raw_key, raw_value in record.items():
+        key = str(raw_key).strip().lower()
+        if key in TEXT_FIELDS:
+            signature[key] = str(raw_value)
+            continue
+        value = parse_int(raw_value)
+        if value is not None:
+            signature[FIELD_ALIASES.get(key, key)] = value
+    if 'r' not in signature or 's' not in signature:
+        return None
+    signature.setdefault('h', 0)
+    return signature
+
+# ============ PARSERS ============
+
+def _iter_json_records(data: Any) -> Iterator[Dict[str, Any]]:
+    if isinstance(data, dict):
+        lists = [v for v in data.values() if isinstance(v, list)]
+        if lists and not ('r' in data and 's' in data):
+            for value in lists:
+                yield from _iter_json_records(value)
+        else:
+            yield data
+    elif isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict):
+                yield item
+            elif isinstance(item, (list, tuple)) and len(item) >= 2:
+                yield dict(zip(('r', 's', 'h'), item))
+
+def iter_signature_lines(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parser en streaming línea a línea: JSON Lines, CSV con cabecera
+    o pares clave=valor. Nunca mantiene más de una línea en memoria.
+    """
+    header: Optional[List[str]] = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        if line.startswith('{'):
+            try:
+                for record in _iter_json_records(json.loads(line)):
+                    signature = normalize_signature(record)
+                    if signature:
+                        yield signature
+                continue
+            except json.JSONDecodeError:
+                pass
+
+        if header is None and (',' in line or ';' in line or '\t' in line):
+            delimiter = max(',;\t', key=line.count)
+            cells = [c.strip().lower() for c in next(csv.reader([line], delimiter=delimiter))]
+            mapped = [FIELD_ALIASES.get(c, c) for c in cells]
+            if 'r' in mapped and 's' in mapped:
+                header = cells
+                header_delimiter = delimiter
+                continue
+
+        if header is not None:
+            if '"' in line:
+                cells = next(csv.reader([line], delimiter=header_delimiter))
+            else:
+                cells = line.split(header_delimiter)
+            signature = normalize_signature(dict(zip(header, cells)))
+            if signature:
+                yield signature
+            continue
+
+        pairs = _KV_PATTERN.findall(line)
+        if pairs:
+            signature = normalize_signature(dict(pairs))
+            if signature:
+                yield signature
+
+def iter_signatures(text: str) -> Iterator[Dict[str, Any]]:
+    """Detecta el formato de un volcado de firmas y lo recorre"""
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        for record in _iter_json_records(json.loads(stripped)):
+            signature = normalize_signature(record)
+            if signature:
+                yield signature
+        return
+    if stripped.startswith('{'):
+        try:
+            data = json.loads(stripped)
+        except json.JSONDecodeError:
+            data = None  # JSON Lines
+        if data is not None:
+            for record in _iter_json_records(data):
+                signature = normalize_signature(record)
+                if signature:
+                    yield signature
+            return
+    yield from iter_signature_lines(text.splitlines())
+
+def _iter_json_array_stream(f, buffer: str) -> Iterator[Dict[str, Any]]:
+    """Decodifica uno a uno los elementos del primer array JSON sin cargar el archivo"""
+    decoder = json.JSONDecoder()
+    while '[' not in buffer:
+        more = f.read(CHUNK_SIZE)
+        if not more:
+            return
+        buffer = more
+    pos = buffer.index('[') + 1
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+        try:
+            item, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            more = f.read(CHUNK_SIZE)
+            if not more:
+                return
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+        for record in _iter_json_records([item]):
+            signature = normalize_signature(record)
+            if signature:
+                yield signature
+
+def iter_signature_file(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre un volcado de firmas desde disco en streaming: arrays JSON
+    se decodifican elemento a elemento y el resto línea a línea.
+    """
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        head = f.read(CHUNK_SIZE)
+        stripped = head.lstrip()
+        first_line = stripped.split('\n', 1)[0].strip()
+        is_json_lines = False
+        if stripped.startswith('{'):
+            try:
+                json.loads(first_line)
+                is_json_lines = True
+            except json.JSONDecodeError:
+                pass
+        if stripped.startswith('[') or (stripped.startswith('{') and not is_json_lines):
+            yield from _iter_json_array_stream(f, head)
+            return
+
+        def lines():
+            buffer = head
+            while True:
+                more = f.read(CHUNK_SIZE)
+                if not more:
+                    yield from buffer.splitlines()
+                    return
+                buffer += more
+                cut = buffer.rfind('\n')
+                if cut >= 0:
+                    yield from buffer[:cut].splitlines()
+                    buffer = buffer[cut + 1:]
+
+        yield from iter_signature_lines(lines())
+
+def open_signatures(source: str) -> Iterator[Dict[str, Any]]:
+    """Iterador de firmas desde una ruta de archivo (streaming) o desde el propio texto"""
+    if len(source) < 4096 and os.path.isfile(source):
+        return iter_signature_file(source)
+    return iter_signatures(source)
+
+def load_signatures(source: str) -> List[Dict[str, Any]]:
+    """Carga firmas desde una ruta de archivo o desde el propio texto"""
+    return list(open_signatures(source))
+
+# ============ VERIFICACIÓN DE CLAVES ============
+
+def make_key_verifier(curve: str = "", pubkey: str = "", p: str = "", g: str = "") -> Optional[Callable[[int], bool]]:
+    """Verificador por clave pública (ECDSA con curva conocida o DSA con p, g); None si no hay datos"""
+    if not pubkey:
+        return None
+    if p and g:
+        p_int, g_int, y = int(p, 0), int(g, 0), int(pubkey, 0)
+        return lambda d: pow(g_int, d, p_int) == y
+    name = curve.lower().replace('-', '').replace('_', '')
+    if name not in NAMED_CURVES:
+        return None
+    cp, ca, cb, n, gx, gy = NAMED_CURVES[name]
+    ec = EllipticCurve(cp, ca, cb, n)
+    text = pubkey.strip()
+    if ',' in text:
+        x, y = (int(v.strip().strip('()'), 0) for v in text.split(',')[:2])
+        Q = ec.point(x, y)
+    else:
+        Q = ec.decompress(bytes.fromhex(text[2:] if text.lower().startswith('0x') else text))
+    G = ec.point(gx, gy)
+    return lambda d: ec.multiply(G, d) == Q
+
+# ============ REUTILIZACIÓN DE NONCE ============
+
+def recover_reused_nonce(r: int, s1: int, h1: int, s2: int, h2: int, q: int) -> List[Tuple[int, int]]:
+    """
+    Dos firmas con el mismo r comparten k:  k = (h1 - h2) / (s1 - s2),
+    d = (s1·k - h1) / r. También prueba s2 -> -s2 (firmas normalizadas low-s).
+
+    Returns:
+        Lista de candidatos (k, d)
+    """
+    candidates = []
+    r_inv = pow(r, -1, q)
+    for s2_signed in (s2, -s2):
+        ds = (s1 - s2_signed) % q
+        if ds:
+            k = (h1 - h2) * pow(ds, -1, q) % q
+            d = (s1 * k - h1) * r_inv % q
+            if k and d and (k, d) not in candidates:
+                candidates.append((k, d))
+    return candidates
+
+class NonceReuseScanner:
+    """
+    Escáner en una pasada indexado por r (tabla hash).
+
+    Las primeras `max_index` firmas con r distinto quedan en memoria; las
+    siguientes se comparan contra el índice y, si no colisionan, se
+    vuelcan a SPILL_PARTITIONS archivos por hash(r) que se procesan al
+    final con su propio índice. Tiempo lineal, memoria acotada.
+    """
+
+    def __init__(self, q: Optional[int] = None, verifier: Optional[Callable[[int], bool]] = None,
+                 max_index: int = NONCE_INDEX_LIMIT):
+        self.q = q
+        self.verifier = verifier
+        self.max_index = max_index
+        self.index: Dict[int, Tuple[int, int]] = {}
+        self.scanned = 0
+        self.spilled = 0
+        self.collisions = 0
+        self.keys: Dict[int, int] = {}
+        self.examples: List[Dict[str, Any]] = []
+        self._spill_dir = None
+        self._spill_files = None
+
+    def _collide(self, r: int, first: Tuple[int, int], s: int, h: int):
+        s1, h1 = first
+        if (s1, h1) == (s, h):
+            return  # firma duplicada
+        self.collisions += 1
+        d = None
+        if self.q:
+            candidates = recover_reused_nonce(r, s1, h1, s, h, self.q)
+            if self.verifier is not None:
+                candidates = [c for c in candidates if self.verifier(c[1])]
+            # Cada par vota por sus candidatos: la clave real aparece en todos
+            for _, candidate in candidates:
+                self.keys[candidate] = self.keys.get(candidate, 0) + 1
+            if candidates:
+                d = candidates[0][1]
+        if len(self.examples) < COLLISION_REPORT_LIMIT:
+            self.examples.append({"r": r, "private_key": d})
+
+    def _spill(self, r: int, s: int, h: int):
+        if self._spill_files is None:
+            self._spill_dir = tempfile.TemporaryDirectory(prefix='nonce_scan_')
+            self._spill_files = [
+                open(os.path.join(self._spill_dir.name, f'{i}.txt'), 'w')
+                for i in range(SPILL_PARTITIONS)
+            ]
+        self._spill_files[hash(r) % SPILL_PARTITIONS].write(f'{r:x} {s:x} {h:x}\n')
+        self.spilled += 1
+
+    def add(self, signature: Dict[str, Any]):
+        """Procesa una firma normalizada ({'r', 's', 'h'})"""
+        self.scanned += 1
+        r, s, h = signature['r'], signature['s'], signature.get('h', 0)
+        if self.q:
+            r, s, h = r % self.q, s % self.q, h % self.q
+        first = self.index.get(r)
+        if first is not None:
+            self._collide(r, first, s, h)
+        elif len(self.index) < self.max_index:
+            self.index[r] = (s, h)
+        else:
+            self._spill(r, s, h)
+
+    def finish(self) -> Dict[str, Any]:
+        """Procesa las particiones volcadas y devuelve el resumen"""
+        if self._spill_files is not None:
+            self.index.clear()
+            for spill_file in self._spill_files:
+                spill_file.close()
+                partition: Dict[int, Tuple[int, int]] = {}
+                with open(spill_file.name) as f:
+                    for line in f:
+                        r, s, h = (int(v, 16) for v in line.split())
+                        first = partition.get(r)
+                        if first is not None:
+                            self._collide(r, first, s, h)
+                        else:
+                            partition[r] = (s, h)
+            self._spill_dir.cleanup()
+            self._spill_files = None
+
+        keys = sorted(self.keys, key=self.keys.get, reverse=True)
+        return {
+            "success": bool(keys),
+            "private_key": keys[0] if keys else None,
+            "private_keys": keys,
+            "collisions": self.collisions,
+            "signatures_scanned": self.scanned,
+            "spilled": self.spilled,
+            "examples": self.examples
+        }
+
+def scan_nonce_reuse(signatures: Iterable[Dict[str, Any]], q: Optional[int] = None,
+                     verifier: Optional[Callable[[int], bool]] = None,
+                     max_index: int = NONCE_INDEX_LIMIT) -> Dict[str, Any]:
+    """Escanea un iterable de firmas y recupera claves de cada par con r repetido"""
+    scanner = NonceReuseScanner(q, verifier, max_index)
+    for signature in signatures:
+        scanner.add(signature)
+    return scanner.finish()
+
+# ============ TOOL ============
+
+@tool
+def nonce_reuse_scan(signatures: str, q: str = "", curve: str = "", pubkey: str = "",
+                     p: str = "", g: str = "", max_index: int = NONCE_INDEX_LIMIT) -> Dict[str, Any]:
+    """
+    Escanea volcados masivos de firmas ECDSA/DSA buscando nonces reutilizados
+    (mismo r) en una sola pasada y recupera la clave privada de cada par.
+
+    Args:
+        signatures: Firmas en JSON, JSON Lines, CSV o líneas "r= s= h=", o ruta al archivo
+        q: Orden del grupo (opcional si se da curve; sin q solo se detectan colisiones)
+        curve: Curva estándar (secp256k1, P-256)
+        pubkey: Clave pública para verificar ("x,y" o hex SEC1; entero y para DSA)
+        p, g: Parámetros DSA si se verifica con y = g^x mod p
+        max_index: Firmas indexadas en memoria antes de volcar a disco
+
+    Returns:
+        Dict con 'private_key', candidatos ordenados por votos ('private_keys'),
+        número de colisiones y firmas escaneadas
+    """
+    start = time.time()
+    try:
+        name = curve.lower().replace('-', '').replace('_', '')
+        q_int = parse_int(q) if q else (NAMED_CURVES[name][3] if name in NAMED_CURVES else None)
+        verifier = make_key_verifier(curve, pubkey, p, g)
+        result = scan_nonce_reuse(open_signatures(signatures), q_int, verifier, max_index)
+        result["attack_type"] = "ECDSA/DSA Nonce Reuse"
+        result["time"] = round(time.time() - start, 3)
+        if not result["success"]:
+            result["error"] = ("No reused nonces found" if not result["collisions"]
+                               else "Collisions found but group order q is unknown")
+
+        for d in result["private_keys"]:
+            try:
+                plaintext = d.to_bytes((d.bit_length() + 7) // 8, 'big').decode('utf-8', errors='ignore')
+                if 'flag{' in plaintext.lower():
+                    result["flag"] = plaintext
+                    break
+            except Exception:
+                pass
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "ECDSA/DSA Nonce Reuse",
+            "error": str(e)
+        }
+
+SIGNATURE_TOOLS = [
+    nonce_reuse_scan
+]
@@ -0,0 +1,219 @@
+"""
+Sustitución monoalfabética general: escalada con recocido simulado sobre
+log-probabilidades de cuadrigramas, actualizando la puntuación sólo en los
+cuadrigramas afectados por cada intercambio de la clave. Los reinicios
+aleatorios independientes se reparten entre procesos.
+"""
+
+import os
+import re
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from langchain_core.tools import tool
+
+from .ngrams import PLAINTEXT_THRESHOLD, letter_codes, quadgram_indices, quadgram_table
+
+# Reinicios aleatorios por defecto
+DEFAULT_RESTARTS = 8
+# Intercambios con recocido por reinicio (después se escala hasta no mejorar)
+ANNEAL_STEPS = 8000
+# Temperatura inicial en nats por cada 100 cuadrigramas (decrece linealmente hasta 0)
+ANNEAL_TEMPERATURE = 8.0
+# Reinicios que deben llegar a la mejor puntuación para parar antes (las letras
+# ausentes del texto pueden quedar en cualquier orden, así que se compara la puntuación)
+AGREEMENT = 2
+# Letras mínimas para intentar el ataque
+MIN_LETTERS = 40
+
+# Letras del inglés por frecuencia (clave inicial del primer reinicio)
+ENGLISH_ORDER = np.array([ord(c) - 65 for c in "ETAOINSHRDLCUMWFGYPBVKJXQZ"], dtype=np.int8)
+
+class SubstitutionClimber:
+    """
+    Texto cifrado como cuadrigramas únicos (dígitos int8 y recuentos). Una
+    clave es el array key[letra cifrada] = letra en claro; intercambiar dos
+    letras sólo recalcula los cuadrigramas que contienen alguna de ellas.
+    """
+
+    def __init__(self, codes: np.ndarray, language: str = "en"):
+        self.logp = np.asarray(quadgram_table(language))
+        unique, counts = np.unique(quadgram_indices(codes), return_counts=True)
+        self.counts = counts.astype(np.float64)
+        self.digits = np.stack([unique // 17576, unique // 676 % 26, unique // 26 % 26, unique % 26],
+                               axis=1).astype(np.int8)
+        # contains[x] = cuadrigramas con la letra cifrada x
+        self.contains = (self.digits[None, :, :] == np.arange(26)[:, None, None]).any(axis=2)
+        self.frequency = np.bincount(codes, minlength=26)
+        self.size = float(self.counts.sum())
+
+    def _logp(self, key: np.ndarray, rows) -> np.ndarray:
+        plain = key[self.digits[rows]].astype(np.int32)
+        return self.logp[plain[:, 0] * 17576 + plain[:, 1] * 676 + plain[:, 2] * 26 + plain[:, 3]]
+
+    def score(self, key: np.ndarray) -> float:
+        """Log-probabilidad total del texto descifrado con la clave"""
+        return float(self.counts @ self._logp(key, slice(None)))
+
+    def initial_key(self, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Clave aleatoria, o por orden de frecuencias si no se da generador"""
+        if rng is not None:
+            return rng.permutation(26).astype(np.int8)
+        key = np.empty(26, dtype=np.int8)
+        key[np.argsort(-self.frequency, kind="stable")] = ENGLISH_ORDER
+        return key
+
+    def climb(self, key: np.ndarray, rng: np.random.Generator,
+              steps: int = ANNEAL_STEPS) -> Tuple[np.ndarray, float]:
+        """
+        Recocido simulado con intercambios aleatorios y escalada final
+        sobre los 325 intercambios hasta que ninguno mejora.
+
+        Returns:
+            (clave, log-probabilidad media por cuadrigrama)
+        """
+        key = key.copy()
+        current = self._logp(key, slice(None))
+        total = float(self.counts @ current)
+        temperature = ANNEAL_TEMPERATURE * self.size / 100
+        pairs = rng.integers(0, 26, size=(steps, 2))
+        thresholds = np.log(rng.random(steps))
+
+        def try_swap(x: int, y: int, limit: float) -> bool:
+            nonlocal total
+            rows = np.flatnonzero(self.contains[x] | self.contains[y])
+            key[x], key[y] = key[y], key[x]
+            new = self._logp(key, rows)
+            delta = float(self.counts[rows] @ (new - current[rows]))
+            if delta > limit:
+                current[rows] = new
+                total += delta
+                return True
+            key[x], key[y] = key[y], key[x]
+            return False
+
+        for step in range(steps):
+            x, y = pairs[step]
+            if x == y:
+                continue
+            t = temperature * (1 - step / steps)
+            try_swap(int(x), int(y), t * thresholds[step] if t > 0 else 0.0)
+
+        improved = True
+        while improved:
+            improved = False
+            for x in range(26):
+                for y in range(x + 1, 26):
+                    if try_swap(x, y, 1e-9):
+                        improved = True
+        # Puntuación exacta (la suma incremental acumula redondeo)
+        return key, self.score(key) / self.size
+
+def _restart(codes: np.ndarray, seed: Optional[int], language: str) -> Tuple[bytes, float]:
+    """Un reinicio independiente (seed None = clave inicial por frecuencias)"""
+    climber = SubstitutionClimber(codes, language)
+    rng = np.random.default_rng(seed)
+    start_key = climber.initial_key(None if seed is None else rng)
+    key, score = climber.climb(start_key, rng)
+    return key.tobytes(), score
+
+def solve_substitution(ciphertext: str, restarts: int = DEFAULT_RESTARTS, workers: int = 0,
+                       seed: int = 0, timeout: float = 60.0, language: str = "en") -> Dict[str, Any]:
+    """
+    Reinicios independientes (el primero parte de la clave por frecuencias);
+    se para cuando AGREEMENT reinicios llegan a la misma mejor puntuación.
+
+    Returns:
+        Dict con 'key' (array), 'score' y 'restarts' ejecutados
+    """
+    codes = letter_codes(ciphertext)
+    seeds = [None] + [seed + i for i in range(1, restarts)]
+    workers = workers or os.cpu_count() or 1
+    deadline = time.time() + timeout
+    results: List[Tuple[bytes, float]] = []
+
+    def finished() -> bool:
+        best = max(score for _, score in results)
+        return sum(abs(score - best) < 1e-9 for _, score in results) >= AGREEMENT or time.time() > deadline
+
+    if workers == 1 or restarts == 1:
+        for s in seeds:
+            results.append(_restart(codes, s, language))
+            if finished():
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, restarts)) as pool:
+            futures = [pool.submit(_restart, codes, s, language) for s in seeds]
+            try:
+                for future in as_completed(futures, timeout=max(deadline - time.time(), 0)):
+                    results.append(future.result())
+                    if finished():
+                        break
+            except TimeoutError:
+                pass
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    best_key, best_score = max(results, key=lambda r: r[1])
+    return {"key": np.frombuffer(best_key, dtype=np.int8), "score": best_score, "restarts": len(results)}
+
+def decrypt(ciphertext: str, key: np.ndarray) -> str:
+    """Aplica la clave (letra cifrada -> letra en claro) conservando mayúsculas y el resto de caracteres"""
+    plain = "".join(chr(65 + int(k)) for k in key)
+    table = str.maketrans(string.ascii_uppercase + string.ascii_lowercase, plain + plain.lower())
+    return ciphertext.translate(table)
+
+# ============ HERRAMIENTA ============
+
+@tool
+def substitution_attack(ciphertext: str, restarts: int = DEFAULT_RESTARTS,
+                        workers: int = 0, timeout: int = 60) -> Dict[str, Any]:
+    """
+    Rompe una sustitución monoalfabética general (cualquier permutación del
+    alfabeto) por escalada sobre cuadrigramas del inglés con reinicios
+    aleatorios en paralelo.
+
+    Args:
+        ciphertext: Texto cifrado (se usan las letras A-Z/a-z)
+        restarts: Reinicios aleatorios independientes
+        workers: Procesos (0 = todos los núcleos)
+        timeout: Tiempo máximo en segundos
+
+    Returns:
+        Dict con 'key' (alfabeto en claro para A..Z cifradas), 'plaintext', 'score' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        if len(letter_codes(ciphertext)) < MIN_LETTERS:
+            return {"success": False, "attack_type": "Substitution",
+                    "error": f"Need at least {MIN_LETTERS} letters"}
+        solved = solve_substitution(ciphertext, restarts, workers, timeout=timeout)
+        plaintext = decrypt(ciphertext, solved["key"])
+        result = {
+            "success": solved["score"] >= PLAINTEXT_THRESHOLD,
+            "attack_type": "Substitution",
+            "key": "".join(chr(65 + int(k)) for k in solved["key"]),
+            "plaintext": plaintext,
+            "score": round(solved["score"], 4),
+            "restarts": solved["restarts"],
+        }
+        flag = re.search(r'flag\{[^}]*\}', plaintext, re.IGNORECASE)
+        if flag:
+            result["success"] = True
+            result["flag"] = flag.group()
+        result["time"] = round(time.perf_counter() - start, 6)
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "Substitution",
+            "error": str(e)
+        }
+
+SUBSTITUTION_TOOLS = [
+    substitution_attack
+]
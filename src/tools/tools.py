@@ -4,6 +4,7 @@ Optimizadas para uso con Gemini function calling
 Incluye RAG (Retrieval-Augmented Generation) para contexto histórico
 """
 
+import codecs
 import re
 import subprocess
 import tempfile
@@ -27,6 +28,18 @@ except ImportError as e:
     RAG_TOOLS = []
     RAG_AVAILABLE = False
 
+# Parser de volcados de firmas ECDSA/DSA
+try:
+    from .signatures import iter_signatures
+except ImportError:
+    iter_signatures = None
+
+# Huella estadística de cifrados (clase de caracteres, IoC, entropía, periodo)
+try:
+    from .fingerprint import extract_blob, fingerprint
+except ImportError:
+    fingerprint = None
+
 # ============ HERRAMIENTA 1: ANALIZAR ARCHIVOS ============
 
 @tool
@@ -145,6 +158,10 @@ def analyze_files(files: List[Dict[str, str]]) -> Dict[str, Any]:
         if 'xor' in content_lower or '^' in content:
             result["crypto_indicators"].append("XOR")
         
+        # LFSR (keystream de registro de desplazamiento con realimentación lineal)
+        if any(word in content_lower for word in ['lfsr', 'shift register', 'berlekamp']):
+            result["crypto_indicators"].append("LFSR")
+        
         # Hash
         if any(word in content_lower for word in ['md5', 'sha', 'hash']):
             result["crypto_indicators"].append("Hash")
@@ -156,6 +173,71 @@ def analyze_files(files: List[Dict[str, str]]) -> Dict[str, Any]:
         # ECC
         if 'elliptic' in content_lower or 'ecc' in content_lower:
             result["crypto_indicators"].append("ECC")
+            
+            # Parámetros de curva: EllipticCurve(GF(p), [a, b]) y a = ..., b = ...
+            curve_match = re.search(
+                r'EllipticCurve\s*\(\s*(?:GF|Zmod|FiniteField)\s*\(\s*(\w+)\s*\)\s*,\s*\[\s*(-?\w+)\s*,\s*(-?\w+)\s*\]',
+                content
+            )
+            if curve_match:
+                for var_name, token in zip(['p', 'a', 'b'], curve_match.groups()):
+                    try:
+                        result["variables"][var_name] = int(token, 0)
+                    except ValueError:
+                        if token in result["variables"]:
+                            result["variables"][var_name] = result["variables"][token]
+            for var_name, var_value in re.findall(r'\b([ab]|order)\s*=\s*(-?\d+|0x[0-9a-fA-F]+)\b', content):
+                try:
+                    result["variables"].setdefault(var_name, int(var_value, 0))
+                except ValueError:
+                    result["variables"].setdefault(var_name, int(var_value))
+            
+            # Puntos: G = E(x, y), Q = E.point(x, y) o G = (x, y)
+            point_pattern = r'(\w+)\s*=\s*(?:\w+(?:\.point)?)?\s*\(\s*(\d+|0x[0-9a-fA-F]+)\s*,\s*(\d+|0x[0-9a-fA-F]+)\s*\)'
+            for var_name, x_value, y_value in re.findall(point_pattern, content):
+                try:
+                    result.setdefault("ecc_points", {})[var_name] = (int(x_value, 0), int(y_value, 0))
+                except ValueError:
+                    pass
+        
+        # PRNG (Mersenne Twister de Python `random` y LCG "(a * x + c) % m")
+        lcg_found = re.search(r'\blcg\b', content_lower) is not None or \
+            re.search(r'\(\s*\w+\s*\*\s*\w+\s*\+\s*\w+\s*\)\s*%\s*\w+', content) is not None
+        if lcg_found:
+            result["prng_kind"] = "lcg"
+        if lcg_found or any(word in content_lower for word in ['getrandbits', 'random.seed', 'randbytes', 'mt19937', 'mersenne']):
+            result["crypto_indicators"].append("PRNG")
+            bits_match = re.search(r'getrandbits\s*\(\s*(\d+)\s*\)', content)
+            if bits_match:
+                result["prng_bits"] = int(bits_match.group(1))
+        
+        # Listas largas de enteros: salidas observadas del generador
+        for values in re.findall(r'\[\s*(\d+(?:\s*,\s*\d+){15,})\s*,?\s*\]', content):
+            outputs = [int(v) for v in re.findall(r'\d+', values)]
+            if len(outputs) > len(result.get("prng_outputs", [])):
+                result["prng_outputs"] = outputs
+        
+        # Varios cifrados hex largos: posible keystream reutilizado (many-time pad)
+        hex_blobs = re.findall(r'\b(?:[0-9a-fA-F]{2}){16,}\b', content)
+        if len(hex_blobs) >= 2:
+            known = result.setdefault("hex_ciphertexts", [])
+            known.extend(blob for blob in hex_blobs if blob not in known)
+        
+        # Volcados de firmas ECDSA/DSA: JSON, JSON Lines, CSV o líneas "r= s= h="
+        if iter_signatures is not None:
+            try:
+                signature_count = sum(1 for _ in iter_signatures(content))
+            except Exception:
+                signature_count = 0
+            if signature_count >= 2:
+                result["crypto_indicators"].append("Signatures")
+                result.setdefault("signature_files", {})[name] = signature_count
+        
+        # Huella del fragmento con más pinta de cifrado (el más largo de todos los archivos)
+        if fingerprint is not None:
+            blob = extract_blob(content)
+            if blob and len(blob) > result.get("fingerprint", {}).get("blob_length", 0):
+                result["fingerprint"] = dict(fingerprint(blob), file=name, blob_length=len(blob))
         
         # Encoding (Base64, Hex, etc.)
         if 'base64' in content_lower or 'b64encode' in content_lower or 'decode' in content_lower:
@@ -183,7 +265,8 @@ def classify_crypto(analysis: Dict[str, Any], use_ml: bool = True) -> Dict[str,
     Returns:
         {"type": "RSA", "confidence": 0.95, "method": "BERT"}
         o
-        {"type": "RSA", "confidence": 0.85, "method": "heuristic"}
+        {"type": "RSA", "confidence": 0.85, "attacks": [...], "method": "heuristic"}
+        ('attacks': ataques que recomienda la huella del cifrado, si la hay)
     """
     
     # INTENTO 1: ML (si disponible y use_ml=True)
@@ -219,6 +302,14 @@ def classify_crypto(analysis: Dict[str, Any], use_ml: bool = True) -> Dict[str,
                 if indicators:
                     text_parts.append(f"Indicators: {', '.join(indicators)}")
                 
+                # Agregar huella del cifrado
+                fp = analysis.get('fingerprint', {})
+                if fp.get('routes'):
+                    features = fp.get('features', {})
+                    text_parts.append(f"Fingerprint: charset={features.get('charset')}, "
+                                      f"period={features.get('period')}, "
+                                      f"attacks={', '.join(r['attack'] for r in fp['routes'])}")
+                
                 # Agregar contenido de archivos (muestra)
                 file_summary = analysis.get('file_summary', [])
                 if file_summary:
@@ -282,6 +373,12 @@ def classify_crypto(analysis: Dict[str, Any], use_ml: bool = True) -> Dict[str,
         xor_score += 0.7
     scores["XOR"] = min(xor_score, 1.0)
     
+    # LFSR detection (por encima de XOR: el keystream no es de un solo byte)
+    lfsr_score = 0.0
+    if "LFSR" in indicators:
+        lfsr_score += 0.8
+    scores["LFSR"] = min(lfsr_score, 1.0)
+    
     # Hash detection
     hash_score = 0.0
     if "Hash" in indicators:
@@ -310,12 +407,27 @@ def classify_crypto(analysis: Dict[str, Any], use_ml: bool = True) -> Dict[str,
         ecc_score += 0.4
     scores["ECC"] = min(ecc_score, 1.0)
     
+    # PRNG detection
+    prng_score = 0.0
+    if "PRNG" in indicators:
+        prng_score += 0.5
+        if len(analysis.get("prng_outputs", [])) >= 16:
+            prng_score += 0.3
+    scores["PRNG"] = min(prng_score, 1.0)
+    
+    # Huella del cifrado: cada ataque recomendado suma a su tipo según su confianza
+    routes = analysis.get("fingerprint", {}).get("routes", [])
+    for route in routes:
+        scores[route["type"]] = min(scores.get(route["type"], 0.0) + 0.4 * route["confidence"], 1.0)
+    attacks = [route["attack"] for route in routes]
+    
     # Seleccionar el mejor
     if not scores or max(scores.values()) < 0.3:
         return {
             "type": "Unknown",
             "confidence": 0.1,
             "all_scores": scores,
+            "attacks": attacks,
             "method": "heuristic"
         }
     
@@ -326,6 +438,7 @@ def classify_crypto(analysis: Dict[str, Any], use_ml: bool = True) -> Dict[str,
         "type": best_type,
         "confidence": confidence,
         "all_scores": scores,
+        "attacks": attacks,
         "method": "heuristic"
     }
 
@@ -726,144 +839,196 @@ except SystemExit:
 
 # ============ HERRAMIENTA 5: ATACAR CIFRADOS CLÁSICOS ============
 
-@tool
-def attack_classical(ciphertext: str, max_attempts: int = 500) -> Dict[str, Any]:
+def classical_candidates(ciphertext: str):
     """
-    Ataca cifrados clásicos mejorado (Caesar, XOR, etc.).
-    
-    Args:
-        ciphertext: Texto cifrado
-        max_attempts: Máximo de intentos
-        
-    Returns:
-        Dict con 'success', 'plaintext', 'cipher_type', 'key'
+    Ataque clásico como generador de Candidate: las familias se prueban en
+    orden (ROT/afín, XOR, Vigenère, transposición y XOR en haz) y cada una
+    sólo se ejecuta si el consumidor sigue pidiendo candidatos. Los
+    concluyentes (flag o texto natural con confianza) llevan en `info` los
+    campos del resultado.
     """
-    results = {
-        "caesar": [],
-        "xor": [],
-        "found": None
-    }
+    # Todos los candidatos se puntúan con el modelo de n-gramas compartido: un
+    # texto natural con suficientes letras termina el ataque aunque no tenga flag
+    import numpy as np
+    from .ngrams import score_many
+    from .candidates import Candidate
     
-    # ATAQUE 1: Caesar / ROT-N (mejorado)
-    for shift in range(26):
-        plaintext = ""
-        for char in ciphertext:
-            if char.isalpha():
-                base = ord('A') if char.isupper() else ord('a')
-                plaintext += chr((ord(char) - base + shift) % 26 + base)
-            else:
-                plaintext += char
-        
-        if "flag{" in plaintext.lower():
-            return {
-                "success": True,
-                "plaintext": plaintext,
-                "cipher_type": "Caesar",
-                "key": shift
-            }
-        results["caesar"].append((shift, plaintext[:50]))
+    # ATAQUE 1: familia ROT/afín (ROT-N, Atbash, 312 claves afines y ROT47) con
+    # el motor compartido: el barrido se puntúa sin descifrar cada clave
+    from .affine import sweep
     
-    # ATAQUE 2: XOR - MEJORADO
-    # Intentar interpretar como hex, base64, o raw bytes
-    import base64
+    for candidate in sweep(ciphertext):
+        key = candidate["key"]
+        if candidate["family"] == "ROT":
+            # Desplazamiento que se suma al cifrado para descifrar (ROT13 -> 13)
+            cipher_type, shown = "Caesar", (26 - key[1]) % 26
+        elif candidate["family"] == "ROT47":
+            cipher_type, shown = "ROT47", 47
+        else:
+            cipher_type, shown = candidate["family"], key
+        yield Candidate(
+            score=candidate["score"],
+            key=candidate.get("name", shown),
+            plaintext=candidate["plaintext"],
+            family="caesar",
+            # La clave identidad no cifra nada: sólo cuenta si aparece la flag
+            found=bool(candidate["flag"] or (candidate["confident"] and key != (1, 0))),
+            info={"cipher_type": cipher_type, "key": shown, "score": round(candidate["score"], 4),
+                  "language": candidate["language"]}
+        )
     
-    cipher_bytes_options = []
+    # ATAQUE 2: XOR. Con "flag{" o una cabecera de archivo la clave repetida, de
+    # cualquier longitud, se lee de C ^ crib; si no, las 256 claves de un byte se
+    # puntúan a la vez con NumPy (histograma de bytes)
+    from .xor import (parse_ciphertext, rank_single_byte, flag_keys, crib_keys, refine_crib_key, xor_with_key,
+                      as_array, PRINTABLE_MASK)
+    from .candidates import find_flag
     
-    # Opción 1: Hex
-    try:
-        if all(c in '0123456789abcdefABCDEF ' for c in ciphertext):
-            cipher_bytes_options.append(("hex", bytes.fromhex(ciphertext.replace(' ', ''))))
-    except:
-        pass
+    xor_candidates = []
+    for encoding_type, cipher_bytes in parse_ciphertext(ciphertext):
+        if not cipher_bytes:
+            continue
+        # Un cifrado en bruto que ya es texto imprimible es de los ataques de letras: un
+        # crib siempre encontraría una clave que reescribe cinco letras como "flag{"
+        printable_text = encoding_type == "raw" and PRINTABLE_MASK[as_array(cipher_bytes)].all()
+        for candidate in ([] if printable_text else crib_keys(cipher_bytes)[:3]):
+            # Las columnas que el crib no fija se completan con la búsqueda en haz
+            key = refine_crib_key(cipher_bytes, candidate)
+            plaintext = xor_with_key(cipher_bytes, key)
+            # Sólo una flag completa e imprimible ("flag{" lo pone el propio crib); en
+            # latin-1 para que ningún byte inválido desaparezca de la comprobación
+            flag = find_flag(plaintext.decode('latin-1'))
+            if flag and flag.isascii() and flag.isprintable():
+                plaintext = plaintext.decode('utf-8', errors='ignore')
+                yield Candidate(float("inf"), key.hex(), plaintext, "xor", True,
+                                {"cipher_type": f"XOR repeating-key crib ({encoding_type})",
+                                 "key": key.hex(), "keysize": len(key)})
+        for candidate in rank_single_byte(cipher_bytes, include=tuple(flag_keys(cipher_bytes))):
+            if b"flag{" in candidate["plaintext"].lower():
+                yield Candidate(float("inf"), candidate["key"], candidate["plaintext"].decode('utf-8', errors='ignore'),
+                                "xor", True,
+                                {"cipher_type": f"XOR single-byte ({encoding_type})", "key": hex(candidate["key"]),
+                                 "key_decimal": candidate["key"]})
+            # La clave 0 no cifra nada: no cuenta como texto descifrado
+            elif candidate["key"]:
+                xor_candidates.append((encoding_type, candidate))
     
-    # Opción 2: Base64
-    try:
-        cipher_bytes_options.append(("base64", base64.b64decode(ciphertext)))
-    except:
-        pass
+    if xor_candidates:
+        scores = score_many([c["plaintext"] for _, c in xor_candidates])
+        for i in np.argsort(-scores["score"], kind="stable"):
+            encoding_type, candidate = xor_candidates[i]
+            confident = bool(scores["confident"][i])
+            yield Candidate(
+                score=float(scores["score"][i]),
+                key=candidate["key"],
+                plaintext=candidate["plaintext"].decode('utf-8', errors='ignore') if confident else candidate["plaintext"],
+                family="xor",
+                found=confident,
+                info={"cipher_type": f"XOR single-byte ({encoding_type})", "key": hex(candidate["key"]),
+                      "key_decimal": candidate["key"], "score": round(float(scores["score"][i]), 4),
+                      "language": str(scores["language"][i])}
+            )
     
-    # Opción 3: Raw bytes
-    try:
-        cipher_bytes_options.append(("raw", ciphertext.encode()))
-    except:
-        pass
+    # ATAQUE 3: familia Vigenère: periodo por IoC/Kasiski y clave por columnas
+    # (las claves comunes se prueban además para textos demasiado cortos). Cada
+    # clave descifra sólo las letras ante cada "{" y una muestra para puntuar;
+    # el texto completo sólo se descifra para los candidatos concluyentes
+    from .vigenere import crack, decrypt, decrypt_windows
+    from .candidates import brace_windows, flag_shaped
+    from .affine import SAMPLE_CHARS
     
-    for encoding_type, cipher_bytes in cipher_bytes_options:
-        for key in range(256):
-            try:
-                plaintext_bytes = bytes([b ^ key for b in cipher_bytes])
-                plaintext = plaintext_bytes.decode('utf-8', errors='ignore')
-                
-                if "flag{" in plaintext.lower():
-                    return {
-                        "success": True,
-                        "plaintext": plaintext,
-                        "cipher_type": f"XOR single-byte ({encoding_type})",
-                        "key": hex(key),
-                        "key_decimal": key
-                    }
-                
-                results["xor"].append((key, plaintext[:50]))
-            except:
-                pass
+    common_keys = ["KEY", "SECRET", "PASSWORD", "CRYPTO", "FLAG", "CTF"]
+    vigenere_keys = [(c["variant"], c["key"]) for c in crack(ciphertext)[:3]] + [("vigenere", k) for k in common_keys]
+    windows = brace_windows(ciphertext)
+    for variant, key in vigenere_keys:
+        if windows and flag_shaped(decrypt_windows(ciphertext, windows, key, variant)):
+            yield Candidate(float("inf"), key, decrypt(ciphertext, key, variant), "vigenere", True,
+                            {"cipher_type": "Vigenère" if variant == "vigenere" else f"Vigenère ({variant})",
+                             "key": key})
     
-    # ATAQUE 3: ROT13 específico
-    try:
-        rot13_text = ciphertext.encode().decode('rot13')
-        if "flag{" in rot13_text.lower():
-            return {
-                "success": True,
-                "plaintext": rot13_text,
-                "cipher_type": "ROT13",
-                "key": 13
-            }
-    except:
-        pass
+    sample = ciphertext[:SAMPLE_CHARS]
+    samples = [decrypt(sample, key, variant) for variant, key in vigenere_keys]
+    scores = score_many(samples)
+    for i in np.argsort(-scores["score"], kind="stable"):
+        variant, key = vigenere_keys[i]
+        confident = bool(scores["confident"][i])
+        yield Candidate(
+            score=float(scores["score"][i]),
+            key=key,
+            plaintext=decrypt(ciphertext, key, variant) if confident else samples[i],
+            family="vigenere",
+            found=confident,
+            info={"cipher_type": "Vigenère" if variant == "vigenere" else f"Vigenère ({variant})", "key": key,
+                  "score": round(float(scores["score"][i]), 4), "language": str(scores["language"][i])}
+        )
     
-    # ATAQUE 4: Vigenère con claves comunes
-    common_keys = ["KEY", "SECRET", "PASSWORD", "CRYPTO", "FLAG", "CTF"]
-    for key in common_keys:
-        try:
-            plaintext = _vigenere_decrypt(ciphertext, key)
-            if "flag{" in plaintext.lower():
-                return {
-                    "success": True,
-                    "plaintext": plaintext,
-                    "cipher_type": "Vigenère",
-                    "key": key
-                }
-        except:
-            pass
+    # ATAQUE 4: transposición (rail fence, rutas y columnar), sólo si las
+    # frecuencias de letras ya son las de un idioma natural
+    from .transposition import looks_transposed, transposition_attack
+    
+    if looks_transposed(ciphertext):
+        transposed = transposition_attack.invoke({"ciphertext": ciphertext, "timeout": 20})
+        if transposed.get("success"):
+            yield Candidate(transposed["score"], transposed["key"], transposed["plaintext"], "transposition", True,
+                            {"cipher_type": f"Transposition ({transposed['family']})", "key": transposed["key"],
+                             "score": transposed["score"]})
     
+    # ATAQUE 5: último recurso para cifrados que no son texto: XOR con clave repetida
+    # de hasta 64 bytes (y no más de un cuarto de la muestra, BEAM_MIN_ROWS filas por
+    # columna) por búsqueda en haz, con un presupuesto de tiempo corto. Se puntúan
+    # los bytes descifrados (no el texto sin los bytes inválidos) y se acepta con
+    # las mismas comprobaciones que xor_beam_search
+    from .xor import beam_keys, is_english, BEAM_QUICK_BUDGET
+    
+    for encoding_type, cipher_bytes in parse_ciphertext(ciphertext):
+        if len(cipher_bytes) < 2 or (encoding_type == "raw" and PRINTABLE_MASK[as_array(cipher_bytes)].all()):
+            continue
+        for candidate in beam_keys(cipher_bytes, time_budget=BEAM_QUICK_BUDGET)[:1]:
+            candidate["plaintext"] = xor_with_key(cipher_bytes, candidate["key"])
+            scores = score_many([candidate["plaintext"]])
+            yield Candidate(
+                score=float(scores["score"][0]),
+                key=candidate["key"].hex(),
+                plaintext=candidate["plaintext"].decode('utf-8', errors='ignore'),
+                family="xor",
+                found=bool(candidate["flag"] or scores["confident"][0] or is_english(candidate)),
+                info={"cipher_type": f"XOR repeating-key beam ({encoding_type})", "key": candidate["key"].hex(),
+                      "keysize": candidate["keysize"]}
+            )
+
+def classical_result(found, top) -> Dict[str, Any]:
+    """Resultado de attack_classical a partir de lo que devuelve candidates.consume"""
+    if found:
+        return {"success": True, "plaintext": found.plaintext, **found.info}
     return {
         "success": False,
-        "attempts": {
-            "caesar": len(results["caesar"]),
-            "xor": len(results["xor"])
-        },
-        "sample_results": {
-            "caesar": results["caesar"][:5],
-            "xor": results["xor"][:5]
-        }
+        "attempts": top.counts,
+        "sample_results": top.samples()
     }
 
-def _vigenere_decrypt(ciphertext: str, key: str) -> str:
-    """Descifra texto usando Vigenère"""
-    plaintext = ""
-    key = key.upper()
-    key_index = 0
+@tool
+def attack_classical(ciphertext: str, max_attempts: int = 500) -> Dict[str, Any]:
+    """
+    Ataca cifrados clásicos mejorado (Caesar, XOR, etc.).
     
-    for char in ciphertext:
-        if char.isalpha():
-            base = ord('A') if char.isupper() else ord('a')
-            key_char = key[key_index % len(key)]
-            shift = ord(key_char) - ord('A')
-            plaintext += chr((ord(char) - base - shift) % 26 + base)
-            key_index += 1
-        else:
-            plaintext += char
+    Args:
+        ciphertext: Texto cifrado
+        max_attempts: Máximo de intentos
+        
+    Returns:
+        Dict con 'success', 'plaintext', 'cipher_type', 'key' (o, sin éxito,
+        'attempts' por familia y los 5 mejores candidatos en 'sample_results')
+    """
+    from .candidates import consume
     
-    return plaintext
+    # Los candidatos se generan bajo demanda: la búsqueda se corta en el primero
+    # concluyente y sólo se conservan los 5 mejores para el informe
+    return classical_result(*consume(classical_candidates(ciphertext)))
+
+def _vigenere_decrypt(ciphertext: str, key: str) -> str:
+    """Descifra texto usando Vigenère (tablas precalculadas de tools.vigenere)"""
+    from .vigenere import decrypt
+    return decrypt(ciphertext, key, "vigenere")
 
 # ============ HERRAMIENTA 6: EJECUTAR SAGEMATH ============
 
@@ -1026,15 +1191,28 @@ def decode_text(text: str, encodings: List[str] = None) -> Dict[str, Any]:
     # ROT13
     if 'rot13' in encodings:
         try:
-            decoded = text.encode().decode('rot13')
+            decoded = codecs.decode(text, 'rot13')
             results['rot13'] = decoded
             if 'flag{' in decoded.lower():
                 results['flag_found'] = {'encoding': 'rot13', 'text': decoded}
         except:
             results['rot13'] = "Error decoding"
     
+    # Decodificaciones que cambian el texto y dan lenguaje natural (aunque no haya flag)
+    from .ngrams import score_many
+    
+    decoded = [(name, value) for name, value in results.items()
+               if name != 'flag_found' and value != "Error decoding" and value and value != text]
+    if decoded:
+        scores = score_many([value for _, value in decoded])
+        results['scores'] = {name: round(float(score), 4) for (name, _), score in zip(decoded, scores["score"])}
+        best = int(scores["score"].argmax())
+        if scores["confident"][best]:
+            results['plaintext_found'] = {'encoding': decoded[best][0], 'text': decoded[best][1],
+                                          'language': str(scores["language"][best])}
+    
     return {
-        "success": 'flag_found' in results,
+        "success": 'flag_found' in results or 'plaintext_found' in results,
         "results": results
     }
 
@@ -1052,6 +1230,102 @@ try:
 except ImportError:
     RSA_TOOLS = []
 
+# Importar logaritmo discreto (Pohlig-Hellman / BSGS / Pollard rho)
+try:
+    from .dlog import DLOG_TOOLS
+except ImportError:
+    DLOG_TOOLS = []
+
+# Importar ataques de curvas elípticas
+try:
+    from .ecc import ECC_TOOLS
+except ImportError:
+    ECC_TOOLS = []
+
+# Importar Hidden Number Problem (ECDSA/DSA con nonces sesgados)
+try:
+    from .hnp import HNP_TOOLS
+except ImportError:
+    HNP_TOOLS = []
+
+# Importar reducción de retículos (LLL/BKZ) y ataque a knapsacks
+try:
+    from .lattice import LATTICE_TOOLS
+except ImportError:
+    LATTICE_TOOLS = []
+
+# Importar ataques al Mersenne Twister de Python `random`
+try:
+    from .mersenne import MT_TOOLS
+except ImportError:
+    MT_TOOLS = []
+
+# Importar ataques a generadores lineales congruenciales
+try:
+    from .lcg import LCG_TOOLS
+except ImportError:
+    LCG_TOOLS = []
+
+# Importar ataques XOR vectorizados
+try:
+    from .xor import XOR_TOOLS
+except ImportError:
+    XOR_TOOLS = []
+
+# Importar ataques a keystreams reutilizados (many-time pad)
+try:
+    from .many_time_pad import MANY_TIME_PAD_TOOLS
+except ImportError:
+    MANY_TIME_PAD_TOOLS = []
+
+# Importar ataques a cifrados de flujo con LFSR
+try:
+    from .lfsr import LFSR_TOOLS
+except ImportError:
+    LFSR_TOOLS = []
+
+# Importar familia Vigenère
+try:
+    from .vigenere import VIGENERE_TOOLS
+except ImportError:
+    VIGENERE_TOOLS = []
+
+# Importar sustitución monoalfabética (escalada sobre cuadrigramas)
+try:
+    from .substitution import SUBSTITUTION_TOOLS
+except ImportError:
+    SUBSTITUTION_TOOLS = []
+
+# Importar familia ROT/afín (tablas precalculadas y barrido por histograma)
+try:
+    from .affine import AFFINE_TOOLS
+except ImportError:
+    AFFINE_TOOLS = []
+
+# Importar transposición (rail fence, columnar y rutas)
+try:
+    from .transposition import TRANSPOSITION_TOOLS
+except ImportError:
+    TRANSPOSITION_TOOLS = []
+
+# Importar cifrado de Hill (álgebra lineal modular)
+try:
+    from .hill import HILL_TOOLS
+except ImportError:
+    HILL_TOOLS = []
+
+# Importar huella de cifrados (enrutado previo a los ataques)
+try:
+    from .fingerprint import FINGERPRINT_TOOLS
+except ImportError:
+    FINGERPRINT_TOOLS = []
+
+# Importar escáner de reutilización de nonces ECDSA/DSA
+try:
+    from .signatures import SIGNATURE_TOOLS
+except ImportError:
+    SIGNATURE_TOOLS = []
+
 # Lista de todas las herramientas para bind al LLM
 ALL_TOOLS = [
     analyze_files,
@@ -1062,4 +1336,4 @@ ALL_TOOLS = [
     execute_sage,
     factorize_number,
     decode_text
-] + EXTRA_TOOLS + RSA_TOOLS + RAG_TOOLS
\ No newline at end of file
+] + EXTRA_TOOLS + RSA_TOOLS + DLOG_TOOLS + ECC_TOOLS + LATTICE_TOOLS + HNP_TOOLS + SIGNATURE_TOOLS + MT_TOOLS + LCG_TOOLS + LFSR_TOOLS + XOR_TOOLS + MANY_TIME_PAD_TOOLS + VIGENERE_TOOLS + SUBSTITUTION_TOOLS + AFFINE_TOOLS + TRANSPOSITION_TOOLS + HILL_TOOLS + FINGERPRINT_TOOLS + RAG_TOOLS
\ No newline at end of file
@@ -0,0 +1,451 @@
+"""
+Cifrados de transposición: rail fence, columnar y rutas sobre rejillas.
+Cada candidato es una permutación de índices (posición en claro -> posición
+en el cifrado) que se aplica con indexado de NumPy sobre los códigos de letra
+del cifrado; ningún candidato se convierte en cadena hasta el final.
+"""
+
+import re
+import time
+from functools import lru_cache
+from itertools import permutations
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import numpy as np
+from langchain_core.tools import tool
+
+from .ngrams import LANGUAGES, PLAINTEXT_THRESHOLD, letter_codes, ngram_table, score_letter_matrix
+
+# Posiciones del texto en claro que se puntúan por candidato (mitad del
+# principio y mitad del final: un descifrado desplazado unas posiciones
+# estropea los extremos)
+SAMPLE_CHARS = 400
+# Candidatos puntuados por lote (filas de la matriz de permutaciones)
+BATCH = 2048
+# Raíles máximos del rail fence (se prueban todos los desfases de cada uno)
+MAX_RAILS = 40
+# Longitud máxima de la clave columnar
+MAX_KEY_LENGTH = 12
+# Hasta esta longitud las claves columnares se prueban todas (7! = 5040)
+EXHAUSTIVE_KEY_LENGTH = 7
+# Sucesores por columna que admite la poda por adyacencia de bigramas
+ADJACENCY_TOP = 4
+# Arranques de la escalada (cadenas voraces por adyacencia)
+CLIMB_STARTS = 6
+# Iteraciones máximas de la escalada por arranque
+MAX_ITERATIONS = 60
+# Caracteres por lote al puntuar rutas sobre el texto completo
+ROUTE_BATCH_CHARS = 2_000_000
+# Log-probabilidad media por letra (unigramas) a partir de la cual las
+# frecuencias del cifrado ya son las de un idioma natural (una transposición
+# no las cambia); el texto aleatorio queda por debajo de -3.5
+UNIGRAM_THRESHOLD = -3.15
+# Ganancia mínima (nats por letra) del mejor candidato sobre el texto sin permutar:
+# en un texto en claro, intercambiar bloques enteros puntúa casi igual que no tocarlo
+IDENTITY_GAIN = 0.1
+# Letras mínimas para intentar el ataque desde attack_classical
+MIN_LETTERS = 20
+# Familias disponibles
+FAMILIES = ("rail_fence", "columnar", "route")
+
+# ============ CÓDIGOS Y PUNTUACIÓN ============
+
+def char_array(text: str) -> np.ndarray:
+    """Puntos de código del texto (uint32, sin copia por carácter)"""
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+def position_codes(chars: np.ndarray) -> np.ndarray:
+    """Letra 0..25 de cada posición del cifrado, -1 si no es una letra ASCII"""
+    lower = chars | 0x20
+    return np.where((lower >= 97) & (lower <= 122), lower.astype(np.int32) - 97, -1)
+
+def apply_permutation(chars: np.ndarray, perm: np.ndarray) -> str:
+    """Texto en claro: plaintext[i] = ciphertext[perm[i]]"""
+    return chars[perm].tobytes().decode('utf-32-le')
+
+def score_permutations(codes: np.ndarray, perms: np.ndarray, languages=LANGUAGES) -> np.ndarray:
+    """
+    Log-probabilidad media por letra del texto en claro de cada fila de
+    `perms` (score_letter_matrix por lotes). Todas las letras cuentan, así que
+    un candidato no gana por romper cuadrigramas.
+
+    Returns:
+        Array (filas,) con el mejor idioma por fila (-inf sin letras)
+    """
+    scores = np.empty(len(perms))
+    for begin in range(0, len(perms), BATCH):
+        scores[begin:begin + BATCH] = score_letter_matrix(codes[perms[begin:begin + BATCH]], languages)
+    return scores
+
+def sample_positions(length: int) -> np.ndarray:
+    """Posiciones del texto en claro que se puntúan: principio y final"""
+    if length <= SAMPLE_CHARS:
+        return np.arange(length)
+    half = SAMPLE_CHARS // 2
+    return np.concatenate([np.arange(half), np.arange(length - half, length)])
+
+def looks_transposed(text: str) -> bool:
+    """Frecuencias de letras de idioma natural: candidato a transposición"""
+    codes = letter_codes(text)
+    # Un blob hex sólo tiene las letras a-f, frecuentes en inglés: no es texto transpuesto
+    if len(codes) < MIN_LETTERS or codes.max() < 6:
+        return False
+    return max(float(np.asarray(ngram_table(1, language))[codes].mean()) for language in LANGUAGES) >= UNIGRAM_THRESHOLD
+
+# ============ RAIL FENCE ============
+
+def rail_fence_permutations(length: int, rails: int, offsets,
+                            positions: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Permutaciones de descifrado del rail fence para varios desfases a la vez
+    (sólo en `positions` si se da), sin recorrer el zigzag: cada posición en
+    claro cae en el raíl q y su índice en el cifrado es lo que ocupan los
+    raíles anteriores más las posiciones previas del mismo raíl, contadas por
+    aritmética modular.
+    """
+    cycle = 2 * (rails - 1)
+    offsets = np.asarray(offsets).reshape(-1, 1)
+    positions = (np.arange(length) if positions is None else positions)[None, :]
+
+    def before(limit, residue):
+        # Posiciones x < limit con (x + desfase) % cycle == residue
+        first = (residue - offsets) % cycle
+        return np.maximum(0, (limit - first + cycle - 1) // cycle)
+
+    def in_rail(limit, rail):
+        # Los raíles interiores reciben dos fases por ciclo; los extremos, una
+        inner = (rail > 0) & (rail < rails - 1)
+        return before(limit, rail) + np.where(inner, before(limit, cycle - rail), 0)
+
+    phase = (positions + offsets) % cycle
+    rail = np.where(phase < rails, phase, cycle - phase)
+    sizes = in_rail(length, np.arange(rails)[None, :])
+    starts = np.cumsum(sizes, axis=1) - sizes
+    return np.take_along_axis(starts, rail, axis=1) + in_rail(positions, rail)
+
+def rail_fence_permutation(length: int, rails: int, offset: int = 0) -> np.ndarray:
+    """Permutación de descifrado completa de una clave del rail fence"""
+    return rail_fence_permutations(length, rails, [offset])[0]
+
+# ============ COLUMNAR ============
+
+def columnar_permutations(length: int, orders: np.ndarray, positions: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Permutaciones de descifrado de la columnar para varias claves a la vez
+    (sólo en `positions` si se da).
+    orders[m, c] = turno de lectura de la columna c del texto en claro; las
+    primeras length % k columnas tienen una fila más.
+    """
+    count, k = orders.shape
+    rows, long_columns = divmod(length, k)
+    column_length = rows + (np.arange(k) < long_columns)
+    # Longitud de cada bloque del cifrado según su turno de lectura
+    by_turn = np.empty_like(orders)
+    np.put_along_axis(by_turn, orders, np.broadcast_to(column_length, orders.shape), axis=1)
+    turn_start = np.cumsum(by_turn, axis=1) - by_turn
+    column_start = np.take_along_axis(turn_start, orders, axis=1)
+    positions = np.arange(length) if positions is None else positions
+    return column_start[:, positions % k] + positions // k
+
+def column_adjacency(codes: np.ndarray, order: np.ndarray, length: int) -> np.ndarray:
+    """
+    adjacency[a, b]: log-probabilidad media del bigrama (columna a, columna b)
+    fila a fila si la columna b va justo a la derecha de la a, con los bloques
+    que delimita la clave actual.
+    """
+    k = len(order)
+    rows = -(-length // k)
+    grid = columnar_permutations(length, order[None, :])[0]
+    padded = np.full(rows * k, -1)
+    padded[:length] = codes[grid]
+    columns = padded.reshape(rows, k).T
+    table = np.max([np.asarray(ngram_table(2, language)) for language in LANGUAGES], axis=0)
+    left, right = columns[:, None, :], columns[None, :, :]
+    valid = (left >= 0) & (right >= 0)
+    logp = np.where(valid, table[np.where(valid, left * 26 + right, 0)], 0).sum(axis=2)
+    adjacency = logp / np.maximum(valid.sum(axis=2), 1)
+    np.fill_diagonal(adjacency, -np.inf)
+    return adjacency
+
+@lru_cache(maxsize=None)
+def arrangement_moves(k: int) -> np.ndarray:
+    """
+    Movimientos sobre la disposición de columnas como permutaciones de
+    posiciones: intercambios y desplazamientos de bloques de cualquier tamaño.
+    """
+    moves = set()
+    base = list(range(k))
+    for i in range(k):
+        for j in range(i + 1, k):
+            swapped = base.copy()
+            swapped[i], swapped[j] = swapped[j], swapped[i]
+            moves.add(tuple(swapped))
+    for begin in range(k):
+        for end in range(begin + 1, k + 1):
+            block, rest = base[begin:end], base[:begin] + base[end:]
+            for target in range(len(rest) + 1):
+                moves.add(tuple(rest[:target] + block + rest[target:]))
+    moves.discard(tuple(base))
+    return np.array(sorted(moves), dtype=np.int64)
+
+def climb_columnar(codes: np.ndarray, length: int, k: int, deadline: float,
+                   start: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Escalada sobre la clave columnar de longitud k. En cada paso se generan
+    todos los intercambios y desplazamientos de bloques, pero sólo se puntúan
+    los que crean adyacencias entre columnas que están entre las ADJACENCY_TOP
+    mejores según los bigramas; si ninguno mejora se prueba el vecindario
+    completo antes de parar.
+
+    Returns:
+        (clave, puntuación)
+    """
+    moves = arrangement_moves(k)
+    sample = sample_positions(length)
+    order = start.copy()
+    best = float(score_permutations(codes, columnar_permutations(length, order[None, :], sample))[0])
+    for _ in range(MAX_ITERATIONS):
+        if time.perf_counter() > deadline:
+            break
+        candidates = order[moves]
+        adjacency = column_adjacency(codes, order, length)
+        allowed = np.zeros((k, k), dtype=bool)
+        top = np.argsort(-adjacency, axis=1)[:, :ADJACENCY_TOP]
+        allowed[np.arange(k)[:, None], top] = True
+        current = np.zeros((k, k), dtype=bool)
+        current[np.arange(k - 1), np.arange(1, k)] = True
+        pairs_allowed = allowed | current
+        # Las columnas se identifican por su posición en la disposición actual
+        left, right = moves[:, :-1], moves[:, 1:]
+        pruned = pairs_allowed[left, right].all(axis=1)
+        improved = False
+        for subset in (pruned, ~pruned):
+            if not subset.any():
+                continue
+            scores = score_permutations(codes, columnar_permutations(length, candidates[subset], sample))
+            top_index = int(scores.argmax())
+            if scores[top_index] > best + 1e-12:
+                order, best, improved = candidates[subset][top_index], float(scores[top_index]), True
+                break
+        if not improved:
+            break
+    return order, best
+
+def greedy_orders(codes: np.ndarray, length: int, k: int, count: int) -> List[np.ndarray]:
+    """Claves iniciales: cadenas voraces de columnas por adyacencia de bigramas"""
+    identity = np.arange(k)
+    adjacency = column_adjacency(codes, identity, length)
+    chains = []
+    for first in range(k):
+        chain, total = [first], 0.0
+        while len(chain) < k:
+            row = adjacency[chain[-1]].copy()
+            row[chain] = -np.inf
+            following = int(row.argmax())
+            total += row[following]
+            chain.append(following)
+        chains.append((total, chain))
+    chains.sort(key=lambda c: -c[0])
+    # La posición p del texto en claro la ocupa la columna chain[p] de la disposición identidad
+    return [np.array(chain) for _, chain in chains[:count]]
+
+def solve_columnar(codes: np.ndarray, length: int, max_key_length: int = MAX_KEY_LENGTH,
+                   deadline: float = float("inf")) -> List[Dict[str, Any]]:
+    """
+    Mejor clave por longitud: exhaustiva hasta EXHAUSTIVE_KEY_LENGTH y por
+    escalada con poda de adyacencias a partir de ahí.
+    """
+    results = []
+    for k in range(2, min(max_key_length, length // 2) + 1):
+        if time.perf_counter() > deadline:
+            break
+        if k <= EXHAUSTIVE_KEY_LENGTH:
+            orders = np.array(list(permutations(range(k))), dtype=np.int64)
+            scores = score_permutations(codes, columnar_permutations(length, orders, sample_positions(length)))
+            best = int(scores.argmax())
+            order, score = orders[best], float(scores[best])
+        else:
+            order, score = None, -np.inf
+            for start in greedy_orders(codes, length, k, CLIMB_STARTS):
+                climbed, climbed_score = climb_columnar(codes, length, k, deadline, start)
+                if climbed_score > score:
+                    order, score = climbed, climbed_score
+        results.append({"family": "columnar", "key": order.tolist(), "key_length": k, "score": score,
+                        "perm": columnar_permutations(length, order[None, :])[0]})
+    return results
+
+# ============ RUTAS ============
+
+def spiral(grid: np.ndarray) -> np.ndarray:
+    """Lectura en espiral horaria desde la esquina superior izquierda"""
+    parts = []
+    while grid.size:
+        parts.append(grid[0])
+        grid = np.rot90(grid[1:])
+    return np.concatenate(parts)
+
+ROUTE_READERS = {
+    "rows": lambda g: g.ravel(),
+    "snake": lambda g: np.concatenate([row if i % 2 == 0 else row[::-1] for i, row in enumerate(g)]),
+    "spiral": spiral,
+    "spiral_out": lambda g: spiral(g)[::-1],
+}
+
+def route_permutations(length: int) -> Iterator[Tuple[Dict[str, Any], np.ndarray]]:
+    """
+    Todas las rutas sobre rejillas completas filas × columnas = length: las 8
+    simetrías de la rejilla (esquina de partida y sentido) por cada lectura.
+    El cifrado es el texto en claro leído por la ruta, así que la permutación
+    de descifrado es la inversa del orden de lectura.
+    """
+    seen = set()
+    for rows in range(2, length // 2 + 1):
+        if length % rows:
+            continue
+        grid = np.arange(length).reshape(rows, length // rows)
+        for flip in (False, True):
+            for turns in range(4):
+                transformed = np.rot90(np.fliplr(grid) if flip else grid, turns)
+                for reader, read in ROUTE_READERS.items():
+                    order = read(transformed)
+                    perm = np.empty(length, dtype=np.int64)
+                    perm[order] = np.arange(length)
+                    signature = hash(perm.tobytes())
+                    if signature in seen:
+                        continue
+                    seen.add(signature)
+                    yield ({"rows": rows, "columns": length // rows, "route": reader,
+                            "flip": flip, "rotation": 90 * turns}, perm)
+
+def solve_routes(codes: np.ndarray, length: int, deadline: float = float("inf"),
+                 top_k: int = 5) -> List[Dict[str, Any]]:
+    """
+    Mejores rutas puntuadas sobre el texto completo: una ruta equivocada que
+    lee filas enteras produce fragmentos de texto real, así que una muestra
+    del principio no basta para compararlas y sólo los empalmes las delatan.
+    """
+    identity = np.arange(length)
+    batch = max(1, ROUTE_BATCH_CHARS // max(length, 1))
+    best: List[Dict[str, Any]] = []
+    pending: List[Tuple[Dict[str, Any], np.ndarray]] = []
+
+    def flush():
+        scores = score_permutations(codes, np.stack([perm for _, perm in pending]))
+        for (key, perm), score in zip(pending, scores):
+            best.append({"family": "route", "key": key, "score": float(score), "perm": perm})
+        best.sort(key=lambda c: -c["score"])
+        del best[top_k:]
+        pending.clear()
+
+    for key, perm in route_permutations(length):
+        if np.array_equal(perm, identity):
+            continue
+        pending.append((key, perm))
+        if len(pending) >= batch:
+            flush()
+            if time.perf_counter() > deadline:
+                break
+    if pending:
+        flush()
+    return best
+
+# ============ BARRIDO ============
+
+def solve_transposition(ciphertext: str, families=FAMILIES, max_key_length: int = MAX_KEY_LENGTH,
+                        timeout: float = 60.0) -> List[Dict[str, Any]]:
+    """
+    Mejor candidato de cada familia y clave (rail fence: raíles y desfase;
+    columnar: orden de lectura por columna; ruta: rejilla y recorrido),
+    ordenados por puntuación.
+
+    Returns:
+        Lista de dicts con 'family', 'key', 'score' y 'perm' (permutación completa)
+    """
+    chars = char_array(ciphertext)
+    codes = position_codes(chars)
+    length = len(chars)
+    deadline = time.perf_counter() + timeout
+    candidates = []
+
+    if "rail_fence" in families:
+        for rails in range(2, min(MAX_RAILS, length - 1) + 1):
+            offsets = np.arange(2 * (rails - 1))
+            scores = score_permutations(codes, rail_fence_permutations(length, rails, offsets, sample_positions(length)))
+            best = int(scores.argmax())
+            candidates.append({"family": "rail_fence", "key": {"rails": rails, "offset": int(offsets[best])},
+                               "score": float(scores[best]),
+                               "perm": rail_fence_permutation(length, rails, int(offsets[best]))})
+
+    if "route" in families and time.perf_counter() < deadline:
+        candidates.extend(solve_routes(codes, length, deadline))
+
+    if "columnar" in families:
+        candidates.extend(solve_columnar(codes, length, max_key_length, deadline))
+
+    candidates.sort(key=lambda c: -c["score"])
+    return candidates
+
+# ============ HERRAMIENTA ============
+
+@tool
+def transposition_attack(ciphertext: str, families: str = "all", max_key_length: int = MAX_KEY_LENGTH,
+                         timeout: int = 60) -> Dict[str, Any]:
+    """
+    Rompe cifrados de transposición: rail fence (todos los raíles y desfases),
+    rutas sobre rejillas (filas, serpiente, espiral desde cada esquina) y
+    columnar (claves de hasta 12 columnas, exhaustiva hasta 7 y por escalada
+    con poda de adyacencias de bigramas a partir de ahí).
+
+    Args:
+        ciphertext: Texto cifrado (se conservan espacios y signos)
+        families: "all" o lista separada por comas (rail_fence, columnar, route)
+        max_key_length: Longitud máxima de la clave columnar
+        timeout: Tiempo máximo en segundos
+
+    Returns:
+        Dict con 'family', 'key', 'plaintext', 'score', 'candidates' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        selected = FAMILIES if families == "all" else tuple(f.strip() for f in families.split(","))
+        candidates = solve_transposition(ciphertext, selected, max_key_length, timeout)
+        if not candidates:
+            return {
+                "success": False,
+                "attack_type": "Transposition",
+                "error": "Texto demasiado corto para las familias seleccionadas"
+            }
+        chars = char_array(ciphertext)
+        baseline = float(score_permutations(position_codes(chars), np.arange(len(chars))[None, :])[0])
+        # Los mejores se descifran enteros; la flag decide antes que la puntuación
+        decoded = [(c, apply_permutation(chars, c["perm"])) for c in candidates[:10]]
+        flagged = [(c, text) for c, text in decoded if re.search(r'flag\{[^}]*\}', text, re.IGNORECASE)]
+        best, plaintext = (flagged or decoded)[0]
+        flag = re.search(r'flag\{[^}]*\}', plaintext, re.IGNORECASE)
+
+        result = {
+            "success": bool(flag) or (best["score"] >= PLAINTEXT_THRESHOLD
+                                      and best["score"] > baseline + IDENTITY_GAIN),
+            "attack_type": "Transposition",
+            "family": best["family"],
+            "key": best["key"],
+            "plaintext": plaintext,
+            "score": round(best["score"], 4),
+            "baseline": round(baseline, 4),
+            "candidates": [{"family": c["family"], "key": c["key"], "score": round(c["score"], 4),
+                            "preview": text[:80]} for c, text in decoded[:5]],
+            "time": round(time.perf_counter() - start, 6),
+        }
+        if flag:
+            result["flag"] = flag.group()
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "Transposition",
+            "error": str(e)
+        }
+
+TRANSPOSITION_TOOLS = [
+    transposition_attack
+]
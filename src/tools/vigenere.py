@@ -0,0 +1,361 @@
+"""
+Familia Vigenère: Vigenère, Beaufort, Beaufort variante y autoclave.
+Periodo por índice de coincidencia y distancias de Kasiski, desplazamiento
+de cada columna por chi-cuadrado y descifrado con tablas precalculadas.
+"""
+
+import re
+import time
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from langchain_core.tools import tool
+
+from .ngrams import score_text
+from .xor import ENGLISH_LETTER_FREQ
+
+# Periodo (longitud de clave) máximo probado
+MAX_PERIOD = 50
+# Índice de coincidencia del inglés y de letras uniformes
+ENGLISH_IOC = 0.0667
+RANDOM_IOC = 1 / 26
+# Periodos con mejor IoC que se resuelven además del menor periodo "claramente inglés"
+PERIOD_CANDIDATES = 4
+# Celdas (periodos × símbolos) que se cuentan por lote en el IoC por columnas
+IOC_BATCH_CELLS = 1 << 16
+# Letras mínimas para intentar el ataque
+MIN_LETTERS = 20
+# Variantes de la familia
+VARIANTS = ("vigenere", "beaufort", "variant_beaufort", "autokey")
+
+# Modelo de letras del inglés
+LETTER_PROBS = ENGLISH_LETTER_FREQ / ENGLISH_LETTER_FREQ.sum()
+LETTER_LOGP = np.log(LETTER_PROBS)
+
+_LETTERS = np.arange(26)
+# Tablas de descifrado [clave, letra cifrada] -> letra en claro
+DECRYPT_TABLES = {
+    "vigenere": (_LETTERS[None, :] - _LETTERS[:, None]) % 26,
+    "beaufort": (_LETTERS[:, None] - _LETTERS[None, :]) % 26,
+    "variant_beaufort": (_LETTERS[None, :] + _LETTERS[:, None]) % 26,
+}
+# Permutaciones [clave, letra en claro] -> letra cifrada, para puntuar histogramas de columnas
+CIPHER_INDEX = {
+    "vigenere": (_LETTERS[None, :] + _LETTERS[:, None]) % 26,
+    "beaufort": (_LETTERS[:, None] - _LETTERS[None, :]) % 26,
+    "variant_beaufort": (_LETTERS[None, :] - _LETTERS[:, None]) % 26,
+}
+
+# ============ TEXTO ============
+
+def letter_values(text: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Texto como puntos de código (uint32), máscara de letras ASCII y sus
+    valores 0..25. El resto de caracteres se conserva y no avanza la clave.
+    """
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    upper = (codes >= 65) & (codes <= 90)
+    lower = (codes >= 97) & (codes <= 122)
+    mask = upper | lower
+    values = (codes[mask] & 0x1f).astype(np.int64) - 1
+    return codes, mask, values
+
+def rebuild(codes: np.ndarray, mask: np.ndarray, plain_values: np.ndarray) -> str:
+    """Sustituye las letras por los nuevos valores conservando mayúsculas y minúsculas"""
+    out = codes.copy()
+    base = np.where(codes[mask] >= 97, 97, 65).astype(np.uint32)
+    out[mask] = base + plain_values.astype(np.uint32)
+    return out.tobytes().decode('utf-32-le')
+
+def letter_loglik(values: np.ndarray) -> float:
+    """Log-verosimilitud media por letra frente a las frecuencias del inglés"""
+    if len(values) == 0:
+        return float('-inf')
+    return float(np.bincount(values, minlength=26) @ LETTER_LOGP / len(values))
+
+# ============ PERIODO ============
+
+def index_of_coincidence(values: np.ndarray, max_period: int = MAX_PERIOD, alphabet: int = 26) -> np.ndarray:
+    """
+    IoC medio de las columnas para cada periodo 1..max_period: un único
+    np.bincount por lote de periodos sobre (columna·alphabet + símbolo), con
+    lotes acotados a IOC_BATCH_CELLS celdas. Las parejas de cada columna,
+    sum c·(c - 1) = sum c² - n, salen de un bincount por posición con peso el
+    recuento de su celda: el coste sigue a las posiciones, no a las celdas
+    (con bytes, alphabet llega a 256 y casi todas las celdas están vacías).
+
+    Returns:
+        Array de longitud max_period + 1 (índice 0 = 0)
+    """
+    ioc = np.zeros(max_period + 1)
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) < 2:
+        return ioc
+    positions = np.arange(len(values))
+    batch = max(1, IOC_BATCH_CELLS // len(values))
+    for first in range(1, max_period + 1, batch):
+        periods = np.arange(first, min(first + batch, max_period + 1))
+        # Cada periodo ocupa `period` columnas a partir de su desplazamiento
+        offsets = np.concatenate(([0], np.cumsum(periods)))
+        columns = positions[None, :] % periods[:, None]
+        columns += offsets[:-1, None]
+        columns = columns.ravel()
+        cells = columns * alphabet
+        cells += np.tile(values, len(periods))
+        counts = np.bincount(cells, minlength=offsets[-1] * alphabet)
+        sizes = np.bincount(columns, minlength=offsets[-1])
+        pairs = np.bincount(columns, weights=counts[cells], minlength=offsets[-1]) - sizes
+        valid = sizes > 1
+        column_ioc = np.where(valid, pairs / np.maximum(sizes * (sizes - 1), 1), 0.0)
+        totals = np.add.reduceat(column_ioc, offsets[:-1])
+        counted = np.add.reduceat(valid.astype(np.int64), offsets[:-1])
+        ioc[periods] = np.where(counted > 0, totals / np.maximum(counted, 1), 0.0)
+    return ioc
+
+def kasiski(values: np.ndarray, max_period: int = MAX_PERIOD) -> np.ndarray:
+    """
+    Proporción de distancias entre trigramas repetidos divisibles por cada
+    periodo (los trigramas se ordenan una vez y las repeticiones consecutivas
+    dan las distancias).
+    """
+    scores = np.zeros(max_period + 1)
+    if len(values) < 6:
+        return scores
+    trigrams = values[:-2] * 676 + values[1:-1] * 26 + values[2:]
+    order = np.argsort(trigrams, kind="stable")
+    repeated = trigrams[order][1:] == trigrams[order][:-1]
+    distances = (order[1:] - order[:-1])[repeated]
+    if len(distances) == 0:
+        return scores
+    for period in range(1, max_period + 1):
+        scores[period] = float((distances % period == 0).mean())
+    return scores
+
+def estimate_periods(values: np.ndarray, max_period: int = MAX_PERIOD,
+                     candidates: int = PERIOD_CANDIDATES) -> Tuple[List[int], np.ndarray, np.ndarray]:
+    """
+    Periodos candidatos: el menor cuyo IoC se acerca al del inglés (sus
+    múltiplos también lo hacen) y los de mayor IoC, desempatando con Kasiski.
+
+    Returns:
+        (periodos, ioc, kasiski)
+    """
+    max_period = max(1, min(max_period, len(values) // 2))
+    ioc = index_of_coincidence(values, max_period)
+    kas = kasiski(values, max_period)
+    threshold = RANDOM_IOC + 0.75 * (ENGLISH_IOC - RANDOM_IOC)
+    periods: List[int] = []
+    english = [p for p in range(1, max_period + 1) if ioc[p] >= threshold]
+    if english:
+        periods.append(english[0])
+    ranked = sorted(range(1, max_period + 1), key=lambda p: (-(ioc[p] + 0.01 * kas[p]), p))
+    periods.extend(p for p in ranked[:candidates] if p not in periods)
+    return periods, ioc, kas
+
+# ============ CLAVE ============
+
+def column_key(values: np.ndarray, period: int, variant: str = "vigenere") -> np.ndarray:
+    """
+    Clave de cada columna por chi-cuadrado: los 26 desplazamientos de las
+    `period` columnas se evalúan a la vez permutando sus histogramas.
+    """
+    columns = np.arange(len(values)) % period
+    counts = np.bincount(columns * 26 + values, minlength=period * 26).reshape(period, 26).astype(np.float64)
+    # observed[c, k, p] = recuento en la columna c de la letra cifrada que corresponde a p con clave k
+    observed = counts[:, CIPHER_INDEX[variant]]
+    expected = counts.sum(axis=1)[:, None, None] * LETTER_PROBS
+    chi2 = ((observed - expected) ** 2 / np.maximum(expected, 1e-9)).sum(axis=2)
+    return chi2.argmin(axis=1)
+
+def decrypt_values(values: np.ndarray, key: np.ndarray, variant: str = "vigenere") -> np.ndarray:
+    """Descifra los valores 0..25 con una clave (array de 0..25) de la variante indicada"""
+    key = np.asarray(key, dtype=np.int64)
+    if len(key) == 0:
+        return values
+    if variant == "autokey":
+        return _autokey_decrypt(values, key)
+    keystream = np.resize(key, len(values))
+    return DECRYPT_TABLES[variant][keystream, values]
+
+def _alternating_sums(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Autoclave: P[j + t·m] = D_t - (-1)^t·k_j con D_t = C_t - D_{t-1} por columna.
+    D_t = (-1)^t · sum_{u<=t} (-1)^u C_u se calcula con un cumsum por columnas.
+
+    Returns:
+        (D de forma (filas, period), máscara de posiciones válidas)
+    """
+    rows = -(-len(values) // period)
+    padded = np.zeros(rows * period, dtype=np.int64)
+    padded[:len(values)] = values
+    matrix = padded.reshape(rows, period)
+    signs = np.where(np.arange(rows) % 2 == 0, 1, -1)[:, None]
+    sums = (np.cumsum(matrix * signs, axis=0) * signs) % 26
+    valid = (np.arange(rows * period) < len(values)).reshape(rows, period)
+    return sums, valid
+
+def _autokey_decrypt(values: np.ndarray, key: np.ndarray) -> np.ndarray:
+    sums, valid = _alternating_sums(values, len(key))
+    signs = np.where(np.arange(sums.shape[0]) % 2 == 0, -1, 1)[:, None]
+    plain = (sums + signs * key[None, :]) % 26
+    return plain[valid]
+
+def autokey_key(values: np.ndarray, period: int) -> Tuple[np.ndarray, float]:
+    """
+    Clave de autoclave de longitud `period`: en cada columna las filas pares
+    descifran con P = D - k y las impares con P = D + k, así que basta un
+    histograma por (columna, paridad) y las mismas permutaciones que Vigenère.
+
+    Returns:
+        (clave, log-verosimilitud media por letra)
+    """
+    sums, valid = _alternating_sums(values, period)
+    parity = np.broadcast_to((np.arange(sums.shape[0]) % 2)[:, None], sums.shape)
+    columns = np.broadcast_to(np.arange(period), sums.shape)
+    flat = ((columns * 2 + parity) * 26 + sums)[valid]
+    counts = np.bincount(flat, minlength=period * 52).reshape(period, 2, 26).astype(np.float64)
+    loglik = (counts[:, 0, CIPHER_INDEX["vigenere"]] @ LETTER_LOGP
+              + counts[:, 1, CIPHER_INDEX["variant_beaufort"]] @ LETTER_LOGP)
+    key = loglik.argmax(axis=1)
+    return key, float(loglik.max(axis=1).sum() / len(values))
+
+def crack(text: str, max_period: int = MAX_PERIOD, variants: Tuple[str, ...] = VARIANTS) -> List[Dict[str, Any]]:
+    """
+    Rompe la familia Vigenère sin clave: periodos candidatos, clave por
+    columnas para cada variante y orden por log-verosimilitud con una
+    penalización de ln(26) por letra de clave. Sólo se devuelven claves que
+    superan al propio texto sin descifrar (clave vacía, sin penalización):
+    así un texto en claro no sale como Vigenère con clave "A" ni con una clave
+    larga casi toda de "A".
+
+    Returns:
+        Candidatos ordenados con 'variant', 'key', 'period', 'loglik', 'score'
+    """
+    codes, mask, values = letter_values(text)
+    if len(values) < MIN_LETTERS:
+        return []
+    periods, ioc, kas = estimate_periods(values, max_period)
+    identity = letter_loglik(values)
+    results = []
+
+    def add(variant: str, key: np.ndarray):
+        plain = decrypt_values(values, key, variant)
+        loglik = letter_loglik(plain)
+        score = float(loglik - len(key) * np.log(26) / len(values))
+        if score <= identity:
+            return
+        results.append({
+            "variant": variant,
+            "key": "".join(chr(65 + int(k)) for k in key),
+            "period": len(key),
+            "loglik": loglik,
+            "score": score,
+            "ioc": round(float(ioc[len(key)]), 5) if len(key) < len(ioc) else None,
+            "kasiski": round(float(kas[len(key)]), 4) if len(key) < len(kas) else None,
+        })
+
+    for period in periods:
+        for variant in ("vigenere", "beaufort", "variant_beaufort"):
+            if variant in variants:
+                add(variant, column_key(values, period, variant))
+    if "autokey" in variants:
+        best = None
+        for period in range(1, max(1, min(max_period, len(values) // 4)) + 1):
+            key, loglik = autokey_key(values, period)
+            score = loglik - period * np.log(26) / len(values)
+            if best is None or score > best[0]:
+                best = (score, key)
+        if best is not None:
+            add("autokey", best[1])
+    # Vigenère y Beaufort variante dan el mismo texto (claves opuestas): se prefiere Vigenère
+    order = {variant: i for i, variant in enumerate(VARIANTS)}
+    results.sort(key=lambda r: (-round(r["score"], 9), order[r["variant"]]))
+    return results
+
+def decrypt(text: str, key: str, variant: str = "vigenere") -> str:
+    """Descifra con una clave conocida conservando el resto de caracteres"""
+    codes, mask, values = letter_values(text)
+    key_values = np.array([ord(c) - 65 for c in key.upper() if 'A' <= c <= 'Z'], dtype=np.int64)
+    return rebuild(codes, mask, decrypt_values(values, key_values, variant))
+
+def decrypt_windows(text: str, windows: List[Tuple[int, int, int]], key: str, variant: str = "vigenere") -> str:
+    """
+    Descifra sólo las ventanas (inicio, fin, letras previas) de candidates.brace_windows:
+    la clave se rota según las letras previas, así que el coste no depende del
+    tamaño del texto. La autoclave depende de todo el texto anterior y se descifra entera.
+    """
+    if variant == "autokey":
+        plaintext = decrypt(text, key, variant)
+        return "\n".join(plaintext[start:end] for start, end, _ in windows)
+    key = "".join(c for c in key.upper() if 'A' <= c <= 'Z')
+    if not key:
+        return "\n".join(text[start:end] for start, end, _ in windows)
+    return "\n".join(decrypt(text[start:end], key[letters % len(key):] + key[:letters % len(key)], variant)
+                     for start, end, letters in windows)
+
+# ============ HERRAMIENTA ============
+
+@tool
+def vigenere_attack(ciphertext: str, variant: str = "auto", key: str = "",
+                    max_period: int = MAX_PERIOD) -> Dict[str, Any]:
+    """
+    Rompe Vigenère, Beaufort, Beaufort variante y autoclave: periodo por
+    índice de coincidencia y Kasiski, desplazamiento de cada columna por
+    chi-cuadrado (o descifrado directo si se da la clave).
+
+    Args:
+        ciphertext: Texto cifrado (sólo se transforman las letras A-Z/a-z)
+        variant: 'auto', 'vigenere', 'beaufort', 'variant_beaufort' o 'autokey'
+        key: Clave conocida (opcional)
+        max_period: Longitud máxima de clave a probar
+
+    Returns:
+        Dict con 'variant', 'key', 'plaintext', 'candidates' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        variants = VARIANTS if variant == "auto" else (variant,)
+        if key:
+            chosen = variants[0]
+            plaintext = decrypt(ciphertext, key, chosen)
+            result: Dict[str, Any] = {"success": True, "attack_type": "Vigenere Family",
+                                      "variant": chosen, "key": key.upper(), "plaintext": plaintext}
+        else:
+            candidates = crack(ciphertext, max_period, variants)
+            if not candidates:
+                error = (f"Need at least {MIN_LETTERS} letters" if len(letter_values(ciphertext)[2]) < MIN_LETTERS
+                         else "No key beats the undeciphered text: not Vigenère-encrypted")
+                return {"success": False, "attack_type": "Vigenere Family", "error": error}
+            best = candidates[0]
+            plaintext = decrypt(ciphertext, best["key"], best["variant"])
+            quality = score_text(plaintext)
+            result = {
+                "success": quality["confident"],
+                "language": quality["language"],
+                "ngram": round(quality["score"], 4),
+                "attack_type": "Vigenere Family",
+                "variant": best["variant"],
+                "key": best["key"],
+                "period": best["period"],
+                "plaintext": plaintext,
+                "candidates": [{k: (round(v, 4) if isinstance(v, float) else v) for k, v in c.items()}
+                               for c in candidates[:5]],
+            }
+            if best["variant"] == "vigenere":
+                result["variant_beaufort_key"] = "".join(chr(65 + (26 - (ord(c) - 65)) % 26) for c in best["key"])
+        flag = re.search(r'flag\{[^}]*\}', result["plaintext"], re.IGNORECASE)
+        if flag:
+            result["success"] = True
+            result["flag"] = flag.group()
+        result["time"] = round(time.perf_counter() - start, 6)
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "Vigenere Family",
+            "error": str(e)
+        }
+
+VIGENERE_TOOLS = [
+    vigenere_attack
+]
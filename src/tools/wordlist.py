@@ -0,0 +1,280 @@
+"""
+Motor de diccionario en streaming: la wordlist se abre con mmap y se parte
+en bloques cortados en saltos de línea; cada proceso abre el mismo archivo,
+recorre su bloque y compara digests (bytes, no hex) con hashlib. La memoria
+es la de un bloque por proceso sea cual sea el tamaño de la lista, y el
+primer acierto cancela a todos los procesos. Con reglas de mutación
+(rules.py) cada tarea es un par (bloque de palabras, bloque de reglas).
+"""
+
+import hashlib
+import itertools
+import mmap
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .rules import compile_rule, mangle
+
+# Bytes de wordlist por tarea de un proceso
+CHUNK_BYTES = 4 << 20
+# Palabras entre comprobaciones de cancelación y actualizaciones del progreso
+BATCH_WORDS = 1 << 16
+# Tareas en vuelo por proceso (acota la memoria de los bloques pendientes)
+INFLIGHT_PER_WORKER = 2
+# Reglas por tarea: cada bloque de palabras se combina con bloques de este tamaño
+RULE_CHUNK = 16
+# Algoritmo de cada longitud de hash en hexadecimal
+HASH_LENGTHS = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+# Rutas habituales de las wordlists con nombre
+WORDLIST_PATHS = {
+    "rockyou": ["/usr/share/wordlists/rockyou.txt", "/usr/share/wordlists/rockyou.txt.gz",
+                "/opt/wordlists/rockyou.txt", "~/rockyou.txt", "rockyou.txt"],
+}
+
+# Contraseñas comunes (lista integrada "common")
+COMMON_PASSWORDS = [
+    "password", "123456", "password123", "admin", "letmein",
+    "welcome", "monkey", "1234567890", "qwerty", "abc123",
+    "Password1", "password1", "root", "toor", "pass",
+    "test", "guest", "user", "login", "secret",
+    "123123", "000000", "iloveyou", "1234567", "rockyou",
+    "12345678", "123456789", "welcome123"
+]
+
+Words = Union[str, bytes, Sequence[Union[str, bytes]]]
+
+# ============ WORDLISTS ============
+
+def find_wordlist(name: str) -> Optional[str]:
+    """Ruta de una wordlist: un archivo existente o una de WORDLIST_PATHS"""
+    if os.path.isfile(os.path.expanduser(name)):
+        return os.path.expanduser(name)
+    for path in WORDLIST_PATHS.get(name, []):
+        path = os.path.expanduser(path)
+        # Las listas comprimidas no se pueden mapear en memoria
+        if os.path.isfile(path) and not path.endswith(".gz"):
+            return path
+    return None
+
+def chunk_bounds(view: Union[mmap.mmap, bytes], chunk: int = CHUNK_BYTES) -> Iterator[Tuple[int, int]]:
+    """
+    (inicio, fin) de bloques de unos `chunk` bytes que empiezan y terminan en
+    un salto de línea: ninguna palabra queda partida entre dos procesos.
+    """
+    size = len(view)
+    start = 0
+    while start < size:
+        end = view.find(b"\n", min(start + chunk, size))
+        end = size if end < 0 else end + 1
+        yield start, end
+        start = end
+
+def split_words(block: bytes) -> List[bytes]:
+    """Palabras de un bloque (admite finales de línea \\r\\n)"""
+    words = block.split(b"\n")
+    if words and not words[-1]:
+        words.pop()
+    if b"\r" in block:
+        words = [word.rstrip(b"\r") for word in words]
+    return words
+
+# ============ HASH ============
+
+def detect_algorithm(hash_value: str) -> Optional[str]:
+    """Algoritmo por longitud del hash en hexadecimal"""
+    return HASH_LENGTHS.get(len(hash_value.strip()))
+
+def digest_function(algorithm: str) -> Callable[[bytes], bytes]:
+    """
+    Digest de una palabra copiando un objeto hashlib ya construido: se
+    reutiliza su estado inicial en lugar de resolver el constructor por
+    nombre en cada palabra.
+    """
+    base = hashlib.new(algorithm)
+    copy = base.copy
+
+    def digest(word: bytes) -> bytes:
+        state = copy()
+        state.update(word)
+        return state.digest()
+
+    return digest
+
+def candidates(words: Sequence[bytes], rules: Sequence[str] = ()) -> Iterator[bytes]:
+    """Las palabras tal cual o, con reglas, sus mutaciones generadas bajo demanda"""
+    return mangle(words, [compile_rule(rule) for rule in rules]) if rules else iter(words)
+
+def match_words(words: Sequence[bytes], digest: Callable[[bytes], bytes], targets: frozenset) -> Dict[bytes, bytes]:
+    """
+    {digest: palabra} de las palabras cuyo digest está en `targets`. El lote
+    se comprueba primero con isdisjoint (sin construir listas) y sólo si hay
+    acierto se busca qué palabra fue.
+    """
+    if targets.isdisjoint(map(digest, words)):
+        return {}
+    return {d: word for word in words for d in (digest(word),) if d in targets}
+
+# ============ PROCESOS ============
+
+# Estado de cada proceso: evento de cancelación y contador de palabras compartidos
+_cancel = None
+_counter = None
+
+def _init_worker(cancel, counter) -> None:
+    global _cancel, _counter
+    _cancel, _counter = cancel, counter
+
+def _crack_block(path: str, start: int, end: int, algorithm: str, targets: frozenset,
+                 rules: Tuple[str, ...] = ()) -> Tuple[Dict[bytes, bytes], int]:
+    """
+    Recorre las palabras de [start, end) del archivo mapeado, mutadas con
+    `rules` si se dan; para si otro proceso acierta.
+    """
+    digest = digest_function(algorithm)
+    found: Dict[bytes, bytes] = {}
+    tested = 0
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        words = split_words(view[start:end])
+    stream = candidates(words, rules)
+    while True:
+        if _cancel is not None and _cancel.is_set():
+            break
+        batch = list(itertools.islice(stream, BATCH_WORDS))
+        if not batch:
+            break
+        found.update(match_words(batch, digest, targets))
+        tested += len(batch)
+        if _counter is not None:
+            with _counter.get_lock():
+                _counter.value += len(batch)
+        if found and _cancel is not None:
+            _cancel.set()
+            break
+    return found, tested
+
+# ============ MOTOR ============
+
+def crack_words(words: Words, targets: Iterable[str], algorithm: str, rules: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Diccionario en memoria (lista o texto con una palabra por línea) en el
+    propio proceso, para listas pequeñas; con `rules`, sus mutaciones por lotes.
+
+    Returns:
+        Dict con 'found' ({hash: contraseña}) y 'tested'
+    """
+    if isinstance(words, (str, bytes)):
+        words = split_words(words.encode("utf-8") if isinstance(words, str) else words)
+    else:
+        words = [w.encode("utf-8") if isinstance(w, str) else w for w in words]
+    wanted = frozenset(bytes.fromhex(t.strip()) for t in targets)
+    digest = digest_function(algorithm)
+    found: Dict[bytes, bytes] = {}
+    tested = 0
+    stream = candidates(words, rules)
+    while len(found) < len(wanted):
+        batch = list(itertools.islice(stream, BATCH_WORDS))
+        if not batch:
+            break
+        found.update(match_words(batch, digest, wanted))
+        tested += len(batch)
+    return {"found": {d.hex(): w.decode("utf-8", errors="replace") for d, w in found.items()}, "tested": tested}
+
+def crack_file(path: str, targets: Iterable[str], algorithm: str, workers: int = 0,
+               timeout: float = 600.0, chunk: int = CHUNK_BYTES, rules: Sequence[str] = (),
+               progress: Optional[Callable[[int, int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Wordlist en disco de cualquier tamaño: bloques de `chunk` bytes cortados
+    en saltos de línea, repartidos entre procesos con un número acotado de
+    tareas en vuelo. Con `rules` cada tarea combina un bloque de palabras con
+    un bloque de RULE_CHUNK reglas (las primeras reglas recorren toda la lista
+    antes que las siguientes). El primer acierto (o el timeout) activa el
+    evento de cancelación y los procesos paran en su siguiente lote.
+
+    Args:
+        path: Ruta de la wordlist (una palabra por línea)
+        targets: Hashes en hexadecimal del mismo algoritmo
+        algorithm: Nombre hashlib (md5, sha1, sha256...)
+        workers: Procesos (0 = todos los núcleos)
+        timeout: Segundos máximos
+        chunk: Bytes por tarea
+        rules: Reglas de mutación (sintaxis de hashcat)
+        progress: Llamada opcional progress(bytes_hechos, bytes_totales, palabras); con
+            reglas, los bytes cuentan una vez por bloque de reglas
+
+    Returns:
+        Dict con 'found' ({hash: contraseña}), 'tested', 'bytes', 'complete' y 'workers'
+    """
+    wanted = frozenset(bytes.fromhex(t.strip()) for t in targets)
+    workers = workers or os.cpu_count() or 1
+    deadline = time.time() + timeout
+    found: Dict[bytes, bytes] = {}
+    tested = done = 0
+
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return {"found": {}, "tested": 0, "bytes": 0, "complete": True, "workers": 0}
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            bounds = list(chunk_bounds(view, chunk))
+    rule_chunks = [tuple(rules[i:i + RULE_CHUNK]) for i in range(0, len(rules), RULE_CHUNK)] or [()]
+    total = size * len(rule_chunks)
+    # Tareas (bloque de reglas, bloque de palabras) generadas bajo demanda
+    tasks = ((start, end, rule_chunk) for rule_chunk in rule_chunks for start, end in bounds)
+
+    if workers == 1 or len(bounds) * len(rule_chunks) == 1:
+        workers = 1
+        for start, end, rule_chunk in tasks:
+            block_found, block_tested = _crack_block(path, start, end, algorithm, wanted, rule_chunk)
+            found.update(block_found)
+            tested += block_tested
+            done += end - start
+            if progress:
+                progress(done, total, tested)
+            if found or time.time() > deadline:
+                break
+    else:
+        context = multiprocessing.get_context()
+        cancel, counter = context.Event(), context.Value("q", 0)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cancel, counter)) as pool:
+            running = {}
+
+            def submit():
+                for start, end, rule_chunk in tasks:
+                    running[pool.submit(_crack_block, path, start, end, algorithm, wanted, rule_chunk)] = end - start
+                    if len(running) >= workers * INFLIGHT_PER_WORKER:
+                        break
+
+            submit()
+            while running:
+                finished, _ = wait(running, timeout=max(min(deadline - time.time(), 1.0), 0),
+                                   return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done += running.pop(future)
+                    block_found, block_tested = future.result()
+                    found.update(block_found)
+                    tested += block_tested
+                if progress:
+                    progress(done, total, counter.value)
+                if found or time.time() > deadline:
+                    cancel.set()
+                    for future in running:
+                        future.cancel()
+                    for future in running:
+                        if not future.cancelled():
+                            block_found, block_tested = future.result()
+                            found.update(block_found)
+                            tested += block_tested
+                    break
+                submit()
+
+    return {
+        "found": {d.hex(): w.decode("utf-8", errors="replace") for d, w in found.items()},
+        "tested": tested,
+        "bytes": done,
+        "complete": done >= total and not found,
+        "workers": workers,
+    }
@@ -0,0 +1,908 @@
+"""
+XOR: puntuación vectorizada con NumPy de las 256 claves de un byte
+(log-verosimilitud de frecuencias de bytes y chi-cuadrado) y XOR con
+clave repetida (tamaño por distancia de Hamming normalizada); con texto
+conocido (prefijo de flag o cabecera de archivo) la clave se lee del cifrado.
+Para claves de hasta 64 bytes en cifrados cortos, búsqueda en haz que
+extiende la clave byte a byte con un modelo de bigramas de bytes.
+"""
+
+import base64
+import functools
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from langchain_core.tools import tool
+
+from .ngrams import LETTER_BYTES, ngram_table, score_many
+from .lfsr import DEFAULT_CRIBS, FILE_TRAILERS, MAX_HEX_BYTES
+
+# Frecuencias relativas de las letras en inglés (a-z)
+ENGLISH_LETTER_FREQ = np.array([
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+]) / 100
+# Reparto de la masa de probabilidad entre clases de bytes de un texto típico
+BYTE_CLASS_MASS = {"space": 0.15, "lower": 0.68, "upper": 0.05, "digit": 0.02, "punct": 0.085, "newline": 0.015}
+# Probabilidad residual de un byte no imprimible
+NONPRINTABLE_PROB = 1e-6
+# Claves devueltas por defecto
+DEFAULT_TOP_K = 5
+# Log-verosimilitud media por byte a partir de la cual un texto se considera legible
+ENGLISH_LOGLIK_THRESHOLD = -4.6
+# Proporción mínima de bytes imprimibles de un texto legible
+PRINTABLE_THRESHOLD = 0.95
+# Letras mínimas de un texto legible sin flag (en cifrados diminutos cualquier clave "lee" bien)
+MIN_ENGLISH_LETTERS = 16
+# Bytes de cada candidato que se devuelven como vista previa
+PREVIEW_BYTES = 200
+# Bytes de cada candidato que se puntúan con el modelo de n-gramas compartido
+NGRAM_SAMPLE_BYTES = 4096
+# Tamaño máximo de clave repetida que se prueba
+MAX_KEYSIZE = 256
+# Bytes iniciales usados para estimar el tamaño de clave y puntuar candidatos
+HAMMING_SAMPLE_BYTES = 1 << 16
+# Tamaños de clave (menor distancia de Hamming) que se resuelven por columnas
+KEYSIZE_CANDIDATES = 6
+# Prefijos de flag que se arrastran por todas las posiciones del cifrado
+FLAG_CRIBS = (b"flag{", b"FLAG{")
+# Cabeceras de archivo que se prueban en el offset 0 (compartidas con el ataque LFSR)
+FILE_CRIBS = {kind: magic for kind, magic in DEFAULT_CRIBS.items() if kind != "flag"}
+# Bytes de una cabecera de archivo que deben repetir el keystream para aceptar el periodo
+CRIB_REDUNDANCY = 3
+# Claves que se conservan por crib y periodo
+CRIB_KEYS = 3
+# Pérdida máxima (nats/byte) de las columnas fijadas por un crib de texto frente a su mejor byte
+CRIB_TOLERANCE = 0.5
+# Claves parciales que conserva la búsqueda en haz en cada columna
+BEAM_WIDTH = 32
+# Tamaño máximo de clave de la búsqueda en haz
+BEAM_MAX_KEYSIZE = 64
+# Bytes del cifrado que puntúa la búsqueda en haz (el coste por tamaño es BEAM_WIDTH·256·muestra)
+BEAM_SAMPLE_BYTES = 1024
+# Bytes mínimos por columna de clave: con menos, cualquier clave "descifra" ruido a texto
+BEAM_MIN_ROWS = 4
+# Presupuesto de tiempo (s) de la herramienta y de attack_classical, que la usa como último recurso
+BEAM_TIME_BUDGET = 10.0
+BEAM_QUICK_BUDGET = 2.0
+# Claves del haz final de cada tamaño que se descifran enteras en busca de la flag
+BEAM_FLAG_CHECKS = 3
+
+# Tabla XOR[k, b] = k ^ b: permuta histogramas en lugar de descifrar 256 veces
+XOR_TABLE = np.bitwise_xor.outer(np.arange(256, dtype=np.uint8), np.arange(256, dtype=np.uint8))
+
+def _english_model() -> np.ndarray:
+    probs = np.full(256, NONPRINTABLE_PROB)
+    probs[ord(' ')] = BYTE_CLASS_MASS["space"]
+    probs[ord('a'):ord('z') + 1] = BYTE_CLASS_MASS["lower"] * ENGLISH_LETTER_FREQ
+    probs[ord('A'):ord('Z') + 1] = BYTE_CLASS_MASS["upper"] * ENGLISH_LETTER_FREQ
+    probs[ord('0'):ord('9') + 1] = BYTE_CLASS_MASS["digit"] / 10
+    punctuation = [c for c in range(33, 127) if not chr(c).isalnum()]
+    probs[punctuation] = BYTE_CLASS_MASS["punct"] / len(punctuation)
+    probs[[ord('\n'), ord('\r'), ord('\t')]] = BYTE_CLASS_MASS["newline"] / 3
+    return probs / probs.sum()
+
+# Modelo de bytes de texto en inglés: probabilidades y sus logaritmos
+ENGLISH_BYTE_PROBS = _english_model()
+ENGLISH_BYTE_LOGP = np.log(ENGLISH_BYTE_PROBS)
+# Bytes imprimibles (incluye tabulador y saltos de línea)
+PRINTABLE_MASK = np.zeros(256, dtype=bool)
+PRINTABLE_MASK[32:127] = True
+PRINTABLE_MASK[[9, 10, 13]] = True
+# Número de bits a 1 de cada byte
+POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+# ============ PUNTUACIÓN ============
+
+def as_array(data) -> np.ndarray:
+    """Vista uint8 sin copia de bytes, bytearray, memoryview o array"""
+    if isinstance(data, np.ndarray):
+        return data.astype(np.uint8, copy=False).ravel()
+    return np.frombuffer(data, dtype=np.uint8)
+
+def byte_histogram(data) -> np.ndarray:
+    """
+    Recuento de cada valor de byte. Se cuentan pares de bytes como uint16
+    (65536 casillas, mitad de elementos) y se pliega la tabla por filas y
+    columnas: ~3x más rápido que np.bincount sobre uint8 en varios MB.
+    """
+    array = as_array(data)
+    even = len(array) & ~1
+    pairs = np.bincount(array[:even].view(np.uint16), minlength=65536).reshape(256, 256)
+    hist = pairs.sum(axis=0) + pairs.sum(axis=1)
+    if even < len(array):
+        hist[array[-1]] += 1
+    return hist.astype(np.float64)
+
+def score_histograms(histograms: np.ndarray, logp: np.ndarray = ENGLISH_BYTE_LOGP) -> Dict[str, np.ndarray]:
+    """
+    Puntúa las 256 claves de un byte para uno o varios histogramas a la vez.
+
+    El texto descifrado con la clave k tiene histograma h[b ^ k], así que
+    las métricas salen de productos matriciales h @ M[XOR_TABLE] sin tocar
+    los datos: el coste no depende del tamaño del cifrado.
+
+    Args:
+        histograms: Array (256,) o (m, 256) de recuentos de bytes
+        logp: Log-probabilidad de cada byte del texto en claro
+
+    Returns:
+        Dict con arrays (256,) o (m, 256): 'loglik' (media por byte),
+        'chi2' y 'printable' (proporción de bytes imprimibles)
+    """
+    hist = np.atleast_2d(histograms).astype(np.float64, copy=False)
+    totals = np.maximum(hist.sum(axis=1, keepdims=True), 1.0)
+    # score[m, k] = sum_b hist[m, b] * metric[b ^ k]
+    loglik = hist @ logp[XOR_TABLE] / totals
+    printable = hist @ PRINTABLE_MASK[XOR_TABLE].astype(np.float64) / totals
+    # Chi-cuadrado frente a N·P(p): sum (O - E)^2 / E = sum O^2 / (N·P) - N
+    chi2 = (hist ** 2) @ (1.0 / ENGLISH_BYTE_PROBS)[XOR_TABLE] / totals - totals
+    if np.ndim(histograms) == 1:
+        return {"loglik": loglik[0], "chi2": chi2[0], "printable": printable[0]}
+    return {"loglik": loglik, "chi2": chi2, "printable": printable}
+
+def rank_single_byte(data, top_k: int = DEFAULT_TOP_K, include: Tuple[int, ...] = ()) -> List[Dict[str, Any]]:
+    """
+    Claves de un byte ordenadas por log-verosimilitud de texto en inglés.
+
+    Args:
+        data: Texto cifrado
+        top_k: Número de claves mejor puntuadas
+        include: Claves que se añaden aunque no estén entre las top_k (p. ej. flag_keys)
+
+    Returns:
+        Lista de dicts con 'key', 'loglik', 'chi2', 'printable' y 'plaintext' (bytes)
+    """
+    array = as_array(data)
+    scores = score_histograms(byte_histogram(array))
+    order = [int(k) for k in np.argsort(-scores["loglik"], kind="stable")[:top_k]]
+    order += [k for k in include if k not in order]
+    return [{
+        "key": k,
+        "loglik": float(scores["loglik"][k]),
+        "chi2": float(scores["chi2"][k]),
+        "printable": float(scores["printable"][k]),
+        "plaintext": (array ^ np.uint8(k)).tobytes(),
+    } for k in order]
+
+def flag_keys(data, prefixes: Tuple[bytes, ...] = FLAG_CRIBS) -> List[int]:
+    """
+    Claves de un byte que producen un prefijo de flag: las diferencias
+    c[i] ^ c[i+1] no dependen de la clave, así que se buscan en el cifrado
+    sin descifrar y la clave sale de c[i] ^ 'f'.
+    """
+    array = as_array(data)
+    keys: List[int] = []
+    for prefix in prefixes:
+        n = len(prefix)
+        if len(array) < n:
+            continue
+        match = np.ones(len(array) - n + 1, dtype=bool)
+        for j in range(n - 1):
+            match &= (array[j:len(array) - n + 1 + j] ^ array[j + 1:len(array) - n + 2 + j]) == (prefix[j] ^ prefix[j + 1])
+        for position in np.flatnonzero(match):
+            key = int(array[position]) ^ prefix[0]
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+def is_english(candidate: Dict[str, Any]) -> bool:
+    """Umbrales de legibilidad sobre las métricas de un candidato y mínimo de letras de su texto"""
+    letters = int(LETTER_BYTES[np.frombuffer(candidate["plaintext"], dtype=np.uint8)].sum())
+    return (candidate["loglik"] >= ENGLISH_LOGLIK_THRESHOLD and candidate["printable"] >= PRINTABLE_THRESHOLD
+            and letters >= MIN_ENGLISH_LETTERS)
+
+def add_ngram_scores(candidates: List[Dict[str, Any]]) -> None:
+    """Añade 'ngram', 'language' y 'confident' (modelo de n-gramas) a cada candidato, en un lote"""
+    if not candidates:
+        return
+    scores = score_many([c["plaintext"][:NGRAM_SAMPLE_BYTES] for c in candidates])
+    for i, candidate in enumerate(candidates):
+        candidate["ngram"] = float(scores["score"][i])
+        candidate["language"] = str(scores["language"][i])
+        candidate["confident"] = bool(scores["confident"][i])
+
+# ============ CLAVE REPETIDA ============
+
+def hamming_distances(data, max_keysize: int = MAX_KEYSIZE, sample: int = HAMMING_SAMPLE_BYTES) -> np.ndarray:
+    """
+    Distancia de Hamming normalizada (bits distintos por bit) entre el cifrado
+    y él mismo desplazado k bytes, para k = 1..max_keysize. Equivale a
+    promediar la distancia entre todos los bloques consecutivos de tamaño k:
+    con el tamaño correcto (o un múltiplo) la clave se cancela y queda la
+    distancia entre textos, menor que entre bytes aleatorios.
+
+    Returns:
+        Array de longitud max_keysize + 1 (índice 0 = inf)
+    """
+    array = as_array(data)[:sample]
+    distances = np.full(max_keysize + 1, np.inf)
+    for k in range(1, min(max_keysize, len(array) - 1) + 1):
+        distances[k] = POPCOUNT_TABLE[array[:-k] ^ array[k:]].mean() / 8
+    return distances
+
+def column_histograms(data, keysize: int) -> np.ndarray:
+    """
+    Histogramas de las `keysize` columnas del cifrado. Las columnas son vistas
+    con stride sobre un reshape sin copia (fila = bloque de clave).
+    """
+    array = as_array(data)
+    full = len(array) - len(array) % keysize
+    blocks = array[:full].reshape(-1, keysize)
+    hists = np.empty((keysize, 256), dtype=np.float64)
+    for j in range(keysize):
+        hists[j] = np.bincount(blocks[:, j], minlength=256)
+    for j, byte in enumerate(array[full:]):
+        hists[j, byte] += 1
+    return hists
+
+def solve_repeating_key(data, keysize: int) -> Tuple[bytes, float]:
+    """
+    Mejor clave de `keysize` bytes: cada columna es un XOR de un byte y todas
+    se puntúan en un único lote con score_histograms.
+
+    Returns:
+        (clave, log-verosimilitud media del texto descifrado)
+    """
+    hists = column_histograms(data, keysize)
+    loglik = score_histograms(hists)["loglik"]
+    key = loglik.argmax(axis=1)
+    weights = hists.sum(axis=1)
+    total = float((loglik[np.arange(keysize), key] * weights).sum() / max(weights.sum(), 1.0))
+    return bytes(key.astype(np.uint8)), total
+
+def minimal_period(key: bytes) -> bytes:
+    """Reduce una clave que es repetición de otra más corta (p. ej. un múltiplo del tamaño real)"""
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and key == key[:period] * (len(key) // period):
+            return key[:period]
+    return key
+
+def xor_with_key(data, key: bytes) -> bytes:
+    """XOR con clave repetida: un broadcast sobre la vista (bloques, tamaño de clave)"""
+    array = as_array(data)
+    pad = (-len(array)) % len(key)
+    blocks = np.concatenate([array, np.zeros(pad, dtype=np.uint8)]).reshape(-1, len(key)) if pad else \
+        array.reshape(-1, len(key))
+    return (blocks ^ np.frombuffer(key, dtype=np.uint8)).tobytes()[:len(array)]
+
+def keysize_candidates(data, max_keysize: int = MAX_KEYSIZE,
+                       candidates: int = KEYSIZE_CANDIDATES) -> Tuple[List[int], np.ndarray]:
+    """
+    Tamaños de clave con menor distancia de Hamming. Los múltiplos del tamaño
+    real puntúan igual de bajo: se añade el MCD de los tamaños claramente bajos.
+
+    Returns:
+        (tamaños, distancias de hamming_distances)
+    """
+    array = as_array(data)
+    distances = hamming_distances(array, min(max_keysize, max(len(array) // 2, 1)))
+    finite = distances[np.isfinite(distances)]
+    sizes = [int(k) for k in np.argsort(distances, kind="stable")[:candidates] if np.isfinite(distances[k])]
+    low = np.flatnonzero(distances < (finite.min() + np.median(finite)) / 2) if len(finite) else []
+    if len(low):
+        divisor = int(np.gcd.reduce(low))
+        if divisor not in sizes:
+            sizes.insert(0, divisor)
+    return sizes, distances
+
+def break_repeating_key(data, max_keysize: int = MAX_KEYSIZE,
+                        candidates: int = KEYSIZE_CANDIDATES) -> List[Dict[str, Any]]:
+    """
+    Rompe XOR con clave repetida: tamaños con menor distancia de Hamming,
+    resolución por columnas y reducción de la clave a su periodo mínimo.
+
+    Returns:
+        Lista de candidatos ordenados por log-verosimilitud penalizada
+        ('score') con 'key', 'keysize', 'hamming', 'loglik', 'printable'
+    """
+    array = as_array(data)
+    sizes, distances = keysize_candidates(array, max_keysize, candidates)
+    sample = array[:HAMMING_SAMPLE_BYTES]
+    results: Dict[bytes, Dict[str, Any]] = {}
+    for size in sizes:
+        key, _ = solve_repeating_key(array, size)
+        key = minimal_period(key)
+        if key in results:
+            continue
+        plaintext = np.frombuffer(xor_with_key(sample, key), dtype=np.uint8)
+        hist = np.bincount(plaintext, minlength=256)
+        loglik = float(hist @ ENGLISH_BYTE_LOGP / max(len(plaintext), 1))
+        results[key] = {
+            "key": key,
+            "keysize": len(key),
+            "hamming": round(float(distances[size]), 4),
+            "loglik": loglik,
+            # MDL: cada byte de clave cuesta ln(256) nats; evita que claves largas sobreajusten textos cortos
+            "score": loglik - len(key) * np.log(256) / len(array),
+            "printable": float(hist @ PRINTABLE_MASK / max(len(plaintext), 1)),
+        }
+    return sorted(results.values(), key=lambda c: (-c["score"], c["keysize"]))
+
+# ============ CRIBS ============
+
+def column_tables(sample, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Log-verosimilitud y proporción de imprimibles de cada columna descifrada
+    con cada byte. Con los pesos de las columnas, la suma sobre las columnas
+    de peso[c]·T[c, key[c]] es la métrica del texto descifrado con `key`.
+
+    Returns:
+        (loglik, printable, pesos): arrays (period, 256), (period, 256), (period, 1)
+    """
+    hists = column_histograms(sample, period)
+    scores = score_histograms(hists)
+    return scores["loglik"], scores["printable"], hists.sum(axis=1, keepdims=True) / max(len(sample), 1)
+
+def default_cribs() -> List[Tuple[str, bytes, Optional[int]]]:
+    """(tipo, crib, offset): FLAG_CRIBS en cualquier posición (None) y FILE_CRIBS en el offset 0"""
+    return [("flag", crib, None) for crib in FLAG_CRIBS] + [(kind, magic, 0) for kind, magic in FILE_CRIBS.items()]
+
+def repeating_positions(data, crib: bytes, positions: np.ndarray, period: int) -> np.ndarray:
+    """
+    Posiciones donde el keystream implicado por el crib se repite con el
+    periodo dado: C[o+j] ^ C[o+j+p] == crib[j] ^ crib[j+p] no depende de la
+    clave. Se criba byte a byte, así que tras el primero quedan ~1/256.
+    """
+    array = as_array(data)
+    for j in range(len(crib) - period):
+        positions = positions[(array[positions + j] ^ array[positions + j + period]) == crib[j] ^ crib[j + period]]
+    return positions
+
+def crib_keys(data, cribs: Optional[List[Tuple[str, bytes, Optional[int]]]] = None,
+              max_keysize: int = MAX_KEYSIZE) -> List[Dict[str, Any]]:
+    """
+    Claves repetidas leídas directamente del cifrado con texto conocido, sin
+    recorrer el espacio de claves. Para cada periodo p, un crib en la posición
+    o fija key[(o + j) % p] = C[o + j] ^ crib[j]; si p < len(crib) el propio
+    crib debe repetir el keystream (repeating_positions, todas las posiciones
+    a la vez). Las columnas que el crib no cubre (claves más largas que el
+    crib) toman el mejor byte de su tabla y cada clave se verifica sobre todas
+    las columnas con column_tables, en un lote por periodo (ordenadas por MDL
+    sobre la clave entera, así que gana el periodo más corto que explica la
+    muestra): el texto debe ser imprimible, las columnas fijadas por el crib no pueden perder más de
+    CRIB_TOLERANCE nats/byte frente a su mejor byte y el descifrado tiene que
+    ganar al propio cifrado (clave nula) por ese mismo margen.
+
+    Periodos: 1..len(crib)-1 y los tamaños de keysize_candidates. Las
+    cabeceras de archivo no se verifican como texto: deben repetir el
+    keystream en al menos CRIB_REDUNDANCY bytes.
+
+    Args:
+        data: Texto cifrado
+        cribs: (tipo, crib, offset) con offset None = todas las posiciones (default_cribs())
+        max_keysize: Tamaño máximo de clave
+
+    Returns:
+        Candidatos con 'key', 'keysize', 'crib', 'crib_length', 'offset', 'loglik',
+        'score' y 'printable', ordenados por tipo (archivo primero) y 'score' (MDL)
+    """
+    array = as_array(data)
+    sample = array[:HAMMING_SAMPLE_BYTES]
+    sizes: Optional[List[int]] = None
+    tables: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    results: Dict[bytes, Dict[str, Any]] = {}
+
+    for kind, crib, offset in (default_cribs() if cribs is None else cribs):
+        n = len(crib)
+        if not n or len(array) < n:
+            continue
+        positions = np.arange(len(array) - n + 1) if offset is None else np.array([offset])
+        positions = positions[(positions >= 0) & (positions <= len(array) - n)]
+        is_file = kind in FILE_CRIBS
+        if is_file:
+            periods = range(1, n - CRIB_REDUNDANCY + 1)
+        else:
+            if sizes is None:
+                sizes, _ = keysize_candidates(array, max_keysize)
+            periods = sorted(set(range(1, n)) | {p for p in sizes if p <= max_keysize})
+        for p in periods:
+            if p < n:
+                where = repeating_positions(array, crib, positions, p)
+            else:
+                # Sin repetición dentro del crib: sólo las posiciones de la muestra, donde
+                # las columnas tienen pocos bytes y el crib corrige a la estadística
+                where = positions[:np.searchsorted(positions, len(sample))]
+            if not len(where):
+                continue
+            if p not in tables:
+                tables[p] = column_tables(sample, p)
+            column_loglik, column_printable, weights = tables[p]
+            loglik_table, printable_table = column_loglik * weights, column_printable * weights
+            best = loglik_table.argmax(axis=1)
+            # Columnas fijadas por el crib: su aporte sustituye al del mejor byte de la columna
+            covered = min(n, p)
+            columns = (where[:, None] + np.arange(covered)) % p
+            fixed = array[where[:, None] + np.arange(covered)] ^ np.frombuffer(crib[:covered], dtype=np.uint8)
+            loglik = loglik_table[np.arange(p), best].sum() + \
+                (loglik_table[columns, fixed] - loglik_table[columns, best[columns]]).sum(axis=1)
+            printable = printable_table[np.arange(p), best].sum() + \
+                (printable_table[columns, fixed] - printable_table[columns, best[columns]]).sum(axis=1)
+            # MDL como en break_repeating_key, por todos los bytes de la clave: cobrar sólo
+            # los que el crib no fija dejaría que un periodo más largo (columnas libres
+            # ajustadas al mejor byte) ganara al periodo corto que ya explica la muestra
+            score = loglik - p * np.log(256) / max(len(sample), 1)
+            if is_file:
+                candidates = np.arange(len(where))
+            else:
+                # Un crib mal colocado siempre descifra a sí mismo, pero estropea el resto de
+                # sus columnas: su pérdida frente al mejor byte de cada columna lo delata
+                column_weights = weights[columns, 0]
+                loss = ((column_loglik[columns, best[columns]] - column_loglik[columns, fixed]) * column_weights).sum(axis=1) \
+                    / np.maximum(column_weights.sum(axis=1), 1e-12)
+                # La clave tiene que descifrar algo: un cifrado que ya es texto (p. ej. Vigenère
+                # leído como bytes) puntúa igual con la clave nula y el crib sólo lo reescribiría
+                identity = loglik_table[:, 0].sum()
+                candidates = np.flatnonzero((loss <= CRIB_TOLERANCE) & (printable >= PRINTABLE_THRESHOLD) &
+                                            (loglik > identity + CRIB_TOLERANCE))
+            if len(candidates) > CRIB_KEYS:
+                candidates = candidates[np.argpartition(-score[candidates], CRIB_KEYS)[:CRIB_KEYS]]
+            for i in candidates:
+                key = best.astype(np.uint8)
+                key[columns[i]] = fixed[i]
+                key = minimal_period(key.tobytes())
+                if key in results:
+                    continue
+                results[key] = {
+                    "key": key,
+                    "keysize": len(key),
+                    "crib": kind,
+                    "crib_length": n,
+                    "offset": int(where[i]),
+                    "loglik": float(loglik[i]),
+                    "score": float(score[i]),
+                    "printable": float(printable[i]),
+                }
+            # La cabecera ya determina la clave: el periodo más corto que la repite es el bueno
+            if is_file:
+                break
+    return sorted(results.values(), key=lambda c: (c["crib"] not in FILE_CRIBS, -c["score"]))
+
+# ============ BÚSQUEDA EN HAZ ============
+
+@functools.lru_cache(maxsize=None)
+def bigram_logp() -> np.ndarray:
+    """
+    log P(b | a) aproximada de texto en inglés para cada par de bytes: el
+    modelo de bytes de ENGLISH_BYTE_LOGP más, entre dos letras, la
+    información mutua del par en las tablas de bigramas de ngrams.
+
+    Returns:
+        Array (256, 256) indexado [byte anterior, byte]
+    """
+    logp = np.tile(ENGLISH_BYTE_LOGP, (256, 1))
+    letters = np.r_[65:91, 97:123]
+    codes = letters % 32 - 1
+    pmi = np.asarray(ngram_table(2, "en"), dtype=np.float64).reshape(26, 26) - np.asarray(ngram_table(1, "en"))
+    logp[np.ix_(letters, letters)] += pmi[np.ix_(codes, codes)]
+    return logp
+
+def beam_keysize(data, keysize: int, beam_width: int = BEAM_WIDTH,
+                 fixed: Optional[Dict[int, int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Búsqueda en haz de una clave de `keysize` bytes: la primera columna se
+    puntúa con el modelo de bytes y cada columna siguiente extiende las
+    `beam_width` mejores claves parciales con los 256 bytes a la vez,
+    puntuando cada byte descifrado con el anterior de su bloque (bigramas).
+    El último paso añade los pares que cruzan de un bloque al siguiente.
+    Las columnas de `fixed` (columna -> byte, p. ej. las de un crib) sólo
+    admiten su byte.
+
+    Returns:
+        (claves (haz, keysize) uint8, log-verosimilitud total), de mejor a peor
+    """
+    array = as_array(data)
+    logp = bigram_logp()
+    columns = [array[j::keysize] for j in range(keysize)]
+    first = ENGLISH_BYTE_LOGP[XOR_TABLE] @ np.bincount(columns[0], minlength=256)
+    fixed = fixed or {}
+    extensions = np.arange(256, dtype=np.uint8)
+    if 0 in fixed:
+        first = np.where(extensions == fixed[0], first, -np.inf)
+    order = np.argsort(-first, kind="stable")[:beam_width]
+    order = order[np.isfinite(first[order])]
+    keys, scores = order[:, None].astype(np.uint8), first[order]
+    for j in range(1, keysize):
+        rows = len(columns[j])
+        previous = columns[j - 1][None, :rows] ^ keys[:, -1:]
+        # total[b, k] = haz[b] + sum_r logP(columna j ^ k | columna j-1 descifrada con el haz b)
+        total = scores[:, None] + logp[previous[:, None, :], columns[j][None, None, :] ^ extensions[None, :, None]].sum(axis=2)
+        if j in fixed:
+            total[:, extensions != fixed[j]] = -np.inf
+        flat = total.ravel()
+        best = np.argsort(-flat, kind="stable")[:beam_width] if flat.size <= 4 * beam_width else \
+            np.argpartition(-flat, beam_width)[:beam_width]
+        best = best[np.isfinite(flat[best])]
+        beam, byte = np.divmod(best, 256)
+        keys = np.concatenate([keys[beam], byte[:, None].astype(np.uint8)], axis=1)
+        scores = flat[best]
+    rows = len(columns[0]) - 1
+    if keysize > 1 and rows > 0:
+        last = columns[keysize - 1][None, :rows] ^ keys[:, -1:]
+        scores = scores + logp[last, columns[0][None, 1:rows + 1] ^ keys[:, :1]].sum(axis=1)
+    order = np.argsort(-scores, kind="stable")
+    return keys[order], scores[order]
+
+def refine_crib_key(data, candidate: Dict[str, Any], beam_width: int = BEAM_WIDTH) -> bytes:
+    """
+    Clave de un crib de texto (crib_keys) con las columnas que el crib no
+    cubre completadas por la búsqueda en haz en lugar del mejor byte de cada
+    columna por separado. Las cabeceras de archivo y las claves que el crib
+    ya cubre o de más de BEAM_MAX_KEYSIZE bytes se devuelven tal cual.
+    """
+    key, offset, length = candidate["key"], candidate["offset"], candidate["crib_length"]
+    if candidate["crib"] in FILE_CRIBS or len(key) <= length or len(key) > BEAM_MAX_KEYSIZE:
+        return key
+    fixed = {(offset + j) % len(key): key[(offset + j) % len(key)] for j in range(length)}
+    keys, _ = beam_keysize(as_array(data)[:BEAM_SAMPLE_BYTES], len(key), beam_width, fixed)
+    return keys[0].tobytes() if len(keys) else key
+
+def beam_keys(data, beam_width: int = BEAM_WIDTH, max_keysize: int = BEAM_MAX_KEYSIZE,
+              time_budget: float = BEAM_TIME_BUDGET) -> List[Dict[str, Any]]:
+    """
+    Clave repetida de tamaño desconocido por búsqueda en haz sobre todos los
+    tamaños hasta `max_keysize`, no sólo los que propone la distancia de
+    Hamming (que en cifrados cortos falla): esos van primero y después el
+    resto en orden, hasta que a cada columna le quedan BEAM_MIN_ROWS bytes.
+    Los tamaños se comparan por MDL (ln 256 nats por byte de
+    clave) y la búsqueda termina al agotar `time_budget` o al descifrar una flag.
+
+    Returns:
+        Candidatos ordenados (flag primero, luego 'score') con 'key', 'keysize',
+        'loglik', 'score', 'printable', 'flag' y 'keysizes_searched'
+    """
+    deadline = time.perf_counter() + time_budget
+    array = as_array(data)
+    sample = array[:BEAM_SAMPLE_BYTES]
+    limit = min(max_keysize, len(sample) // BEAM_MIN_ROWS)
+    hamming, _ = keysize_candidates(sample, limit) if limit else ([], None)
+    sizes = [k for k in hamming if k <= limit] + [k for k in range(1, limit + 1) if k not in hamming]
+    results: Dict[bytes, Dict[str, Any]] = {}
+    searched = 0
+    for size in sizes:
+        if time.perf_counter() > deadline:
+            break
+        keys, scores = beam_keysize(sample, size, beam_width)
+        searched += 1
+        for row, total in zip(keys[:BEAM_FLAG_CHECKS], scores[:BEAM_FLAG_CHECKS]):
+            key = minimal_period(row.tobytes())
+            if key in results:
+                continue
+            loglik = float(total) / len(sample)
+            plaintext = xor_with_key(array, key)
+            results[key] = {
+                "key": key,
+                "keysize": len(key),
+                "loglik": loglik,
+                # MDL: cada byte de clave cuesta ln(256) nats, como en break_repeating_key
+                "score": loglik - len(key) * np.log(256) / len(sample),
+                "printable": float(PRINTABLE_MASK[np.frombuffer(plaintext[:len(sample)], dtype=np.uint8)].mean()),
+                "flag": _flag(plaintext),
+            }
+        if any(c["flag"] for c in results.values()):
+            break
+    ranking = sorted(results.values(), key=lambda c: (c["flag"] is None, -c["score"], c["keysize"]))
+    for candidate in ranking:
+        candidate["keysizes_searched"] = searched
+    return ranking
+
+# ============ HERRAMIENTA ============
+
+def parse_ciphertext(ciphertext: str) -> List[Tuple[str, bytes]]:
+    """Interpretaciones posibles del texto cifrado: hex, base64 y bytes en bruto"""
+    options = []
+    compact = re.sub(r'\s+', '', ciphertext)
+    if compact and re.fullmatch(r'(?:[0-9a-fA-F]{2})+', compact):
+        # Los dígitos hex en bruto parecen letras tras el XOR: no se prueba 'raw'
+        return [("hex", bytes.fromhex(compact))]
+    if compact and re.fullmatch(r'[A-Za-z0-9+/]+={0,2}', compact) and len(compact) % 4 == 0:
+        try:
+            options.append(("base64", base64.b64decode(compact, validate=True)))
+        except ValueError:
+            pass
+    options.append(("raw", ciphertext.encode('latin-1', errors='ignore')))
+    return options
+
+def _flag(plaintext: bytes) -> Optional[str]:
+    match = re.search(rb'flag\{[^}]*\}', plaintext, re.IGNORECASE)
+    return match.group().decode('latin-1') if match else None
+
+@tool
+def xor_single_byte(ciphertext: str, top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+    """
+    Rompe XOR con clave de un byte puntuando las 256 claves a la vez
+    (histograma de bytes + log-verosimilitud y chi-cuadrado de texto en inglés).
+
+    Args:
+        ciphertext: Texto cifrado (hex, base64 o bytes en bruto)
+        top_k: Número de claves candidatas a devolver
+
+    Returns:
+        Dict con 'key', 'plaintext', 'candidates' (ranking) y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        best = None
+        ranking = []
+        for encoding, data in parse_ciphertext(ciphertext):
+            if not data:
+                continue
+            candidates = rank_single_byte(data, top_k, include=tuple(flag_keys(data)))
+            add_ngram_scores(candidates)
+            ranking.extend(candidates)
+            for candidate in candidates:
+                candidate["encoding"] = encoding
+                candidate["flag"] = _flag(candidate["plaintext"])
+                rank = (bool(candidate["flag"]), candidate["confident"], candidate["loglik"])
+                if best is None or rank > (bool(best["flag"]), best["confident"], best["loglik"]):
+                    best = candidate
+        if best is None:
+            return {"success": False, "attack_type": "XOR Single Byte", "error": "Empty ciphertext"}
+
+        ranking.sort(key=lambda c: -c["loglik"])
+        flag = best["flag"]
+        result = {
+            "success": bool(flag) or best["confident"] or is_english(best),
+            "attack_type": "XOR Single Byte",
+            "key": hex(best["key"]),
+            "key_decimal": best["key"],
+            "encoding": best["encoding"],
+            "plaintext": best["plaintext"].decode('utf-8', errors='ignore'),
+            "candidates": [{
+                "key": c["key"],
+                "encoding": c["encoding"],
+                "loglik": round(c["loglik"], 4),
+                "chi2": round(c["chi2"], 2),
+                "printable": round(c["printable"], 4),
+                "ngram": round(c["ngram"], 4),
+                "preview": c["plaintext"][:PREVIEW_BYTES].decode('utf-8', errors='replace'),
+            } for c in ranking[:top_k]],
+            "time": round(time.perf_counter() - start, 6),
+        }
+        if best["confident"]:
+            result["language"] = best["language"]
+        if flag:
+            result["flag"] = flag
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "XOR Single Byte",
+            "error": str(e)
+        }
+
+@tool
+def xor_repeating_key(ciphertext: str, max_keysize: int = MAX_KEYSIZE, top_k: int = 3) -> Dict[str, Any]:
+    """
+    Rompe XOR con clave repetida (Vigenère de bytes): estima el tamaño de
+    clave con la distancia de Hamming normalizada y resuelve cada columna
+    como un XOR de un byte, todas en un mismo lote.
+
+    Args:
+        ciphertext: Texto cifrado (hex, base64 o bytes en bruto)
+        max_keysize: Tamaño máximo de clave a probar (hasta 256 por defecto)
+        top_k: Número de claves candidatas a devolver
+
+    Returns:
+        Dict con 'key', 'keysize', 'plaintext', 'candidates' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        best = None
+        ranking = []
+        for encoding, data in parse_ciphertext(ciphertext):
+            if len(data) < 2:
+                continue
+            for candidate in break_repeating_key(data, max_keysize)[:top_k]:
+                candidate["encoding"] = encoding
+                candidate["plaintext"] = xor_with_key(data, candidate["key"])
+                candidate["flag"] = _flag(candidate["plaintext"])
+                ranking.append(candidate)
+        add_ngram_scores(ranking)
+        for candidate in ranking:
+            rank = (bool(candidate["flag"]), candidate["confident"], candidate["score"])
+            if best is None or rank > (bool(best["flag"]), best["confident"], best["score"]):
+                best = candidate
+        if best is None:
+            return {"success": False, "attack_type": "XOR Repeating Key", "error": "Ciphertext too short"}
+
+        ranking.sort(key=lambda c: -c["score"])
+        result = {
+            "success": bool(best["flag"]) or best["confident"] or is_english(best),
+            "attack_type": "XOR Repeating Key",
+            "key": best["key"].hex(),
+            "key_text": best["key"].decode('latin-1'),
+            "keysize": best["keysize"],
+            "encoding": best["encoding"],
+            "plaintext": best["plaintext"].decode('utf-8', errors='ignore'),
+            "candidates": [{
+                "key": c["key"].hex(),
+                "keysize": c["keysize"],
+                "encoding": c["encoding"],
+                "hamming": c["hamming"],
+                "loglik": round(c["loglik"], 4),
+                "score": round(c["score"], 4),
+                "printable": round(c["printable"], 4),
+                "ngram": round(c["ngram"], 4),
+                "preview": c["plaintext"][:PREVIEW_BYTES].decode('utf-8', errors='replace'),
+            } for c in ranking[:top_k]],
+            "time": round(time.perf_counter() - start, 6),
+        }
+        if best["confident"]:
+            result["language"] = best["language"]
+        if best["flag"]:
+            result["flag"] = best["flag"]
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "XOR Repeating Key",
+            "error": str(e)
+        }
+
+@tool
+def xor_crib_attack(ciphertext: str, known_plaintext: str = "", offset: int = -1,
+                    max_keysize: int = MAX_KEYSIZE, top_k: int = 3) -> Dict[str, Any]:
+    """
+    Recupera claves XOR repetidas de cualquier longitud con texto conocido:
+    prefijos de flag en todas las posiciones y cabeceras PNG/PDF/ZIP/GIF/JPEG
+    en el offset 0. La clave se lee de C ^ crib y se verifica sobre todo el
+    cifrado, sin recorrer el espacio de claves.
+
+    Args:
+        ciphertext: Texto cifrado (hex, base64 o bytes en bruto)
+        known_plaintext: Texto conocido propio en lugar de los cribs por defecto
+        offset: Posición en bytes del texto conocido (-1 = cualquier posición)
+        max_keysize: Tamaño máximo de clave a probar
+        top_k: Número de claves candidatas a devolver
+
+    Returns:
+        Dict con 'key', 'keysize', 'crib', 'offset', 'plaintext' (o 'plaintext_hex'
+        y 'file_type' para archivos), 'candidates' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        cribs = None
+        if known_plaintext:
+            cribs = [("known", known_plaintext.encode('latin-1'), offset if offset >= 0 else None)]
+        ranking = []
+        for encoding, data in parse_ciphertext(ciphertext):
+            for candidate in crib_keys(data, cribs, max_keysize)[:top_k]:
+                candidate["key"] = refine_crib_key(data, candidate)
+                candidate["encoding"] = encoding
+                candidate["plaintext"] = xor_with_key(data, candidate["key"])
+                candidate["flag"] = _flag(candidate["plaintext"])
+                ranking.append(candidate)
+        add_ngram_scores(ranking)
+
+        def rank(c):
+            return bool(c["flag"]), c["crib"] in FILE_CRIBS, c["confident"], c["score"]
+
+        if not ranking:
+            return {"success": False, "attack_type": "XOR Crib", "error": "No crib gave a consistent key"}
+        ranking.sort(key=rank, reverse=True)
+        best = ranking[0]
+        is_file = best["crib"] in FILE_CRIBS
+        result = {
+            "success": bool(best["flag"]) or is_file or best["confident"] or is_english(best),
+            "attack_type": "XOR Crib",
+            "key": best["key"].hex(),
+            "key_text": best["key"].decode('latin-1'),
+            "keysize": best["keysize"],
+            "crib": best["crib"],
+            "offset": best["offset"],
+            "encoding": best["encoding"],
+            "candidates": [{
+                "key": c["key"].hex(),
+                "keysize": c["keysize"],
+                "crib": c["crib"],
+                "offset": c["offset"],
+                "encoding": c["encoding"],
+                "score": round(c["score"], 4),
+                "printable": round(c["printable"], 4),
+                "ngram": round(c["ngram"], 4),
+                "preview": c["plaintext"][:PREVIEW_BYTES].decode('utf-8', errors='replace'),
+            } for c in ranking[:top_k]],
+            "time": round(time.perf_counter() - start, 6),
+        }
+        if is_file:
+            result["file_type"] = best["crib"]
+            result["trailer_found"] = FILE_TRAILERS[best["crib"]] in best["plaintext"]
+            if len(best["plaintext"]) <= MAX_HEX_BYTES:
+                result["plaintext_hex"] = best["plaintext"].hex()
+        else:
+            result["plaintext"] = best["plaintext"].decode('utf-8', errors='ignore')
+        if best["confident"]:
+            result["language"] = best["language"]
+        if best["flag"]:
+            result["flag"] = best["flag"]
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "XOR Crib",
+            "error": str(e)
+        }
+
+@tool
+def xor_beam_search(ciphertext: str, beam_width: int = BEAM_WIDTH, max_keysize: int = BEAM_MAX_KEYSIZE,
+                    time_budget: float = BEAM_TIME_BUDGET, top_k: int = 3) -> Dict[str, Any]:
+    """
+    Rompe XOR con clave repetida de hasta 64 bytes en cifrados cortos, donde
+    la distancia de Hamming no acierta el tamaño y no hay texto conocido al
+    principio: búsqueda en haz que extiende la clave byte a byte puntuando
+    las columnas ya descifradas con bigramas de bytes, para todos los tamaños.
+
+    Args:
+        ciphertext: Texto cifrado (hex, base64 o bytes en bruto)
+        beam_width: Claves parciales que se conservan en cada columna
+        max_keysize: Tamaño máximo de clave a probar
+        time_budget: Segundos máximos de búsqueda (para antes si aparece la flag)
+        top_k: Número de claves candidatas a devolver
+
+    Returns:
+        Dict con 'key', 'keysize', 'plaintext', 'candidates', 'keysizes_searched' y 'flag'
+    """
+    start = time.perf_counter()
+    try:
+        ranking = []
+        for encoding, data in parse_ciphertext(ciphertext):
+            if len(data) < 2:
+                continue
+            remaining = time_budget - (time.perf_counter() - start)
+            for candidate in beam_keys(data, beam_width, max_keysize, max(remaining, 0.0))[:top_k]:
+                candidate["encoding"] = encoding
+                candidate["plaintext"] = xor_with_key(data, candidate["key"])
+                ranking.append(candidate)
+            if any(c["flag"] for c in ranking):
+                break
+        if not ranking:
+            return {"success": False, "attack_type": "XOR Beam Search", "error": "Ciphertext too short"}
+        add_ngram_scores(ranking)
+        ranking.sort(key=lambda c: (bool(c["flag"]), c["confident"], c["score"]), reverse=True)
+        best = ranking[0]
+
+        result = {
+            "success": bool(best["flag"]) or best["confident"] or is_english(best),
+            "attack_type": "XOR Beam Search",
+            "key": best["key"].hex(),
+            "key_text": best["key"].decode('latin-1'),
+            "keysize": best["keysize"],
+            "encoding": best["encoding"],
+            "plaintext": best["plaintext"].decode('utf-8', errors='ignore'),
+            "keysizes_searched": best["keysizes_searched"],
+            "candidates": [{
+                "key": c["key"].hex(),
+                "keysize": c["keysize"],
+                "encoding": c["encoding"],
+                "loglik": round(c["loglik"], 4),
+                "score": round(c["score"], 4),
+                "printable": round(c["printable"], 4),
+                "ngram": round(c["ngram"], 4),
+                "preview": c["plaintext"][:PREVIEW_BYTES].decode('utf-8', errors='replace'),
+            } for c in ranking[:top_k]],
+            "time": round(time.perf_counter() - start, 6),
+        }
+        if best["confident"]:
+            result["language"] = best["language"]
+        if best["flag"]:
+            result["flag"] = best["flag"]
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "attack_type": "XOR Beam Search",
+            "error": str(e)
+        }
+
+XOR_TOOLS = [
+    xor_single_byte,
+    xor_repeating_key,
+    xor_crib_attack,
+    xor_beam_search
+]